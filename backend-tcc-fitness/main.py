@@ -1,22 +1,42 @@
 from fastapi import FastAPI, Depends, HTTPException, APIRouter
 from sqlalchemy.sql import text
-from src.core.database import get_db_mysql
+from src.core.database import get_db_mysql, aquecer_conexoes
 from sqlalchemy.orm import Session
 from src.routers.models.consultas import consulta_get
 from fastapi.middleware.cors import CORSMiddleware
 from src.core.init_db import create_db_tcc
+from src.core.config import SettingsHTTP
+from src.core.compressao import CompressaoMiddleware
+from src.core.replicas import LeituraPropriaMiddleware, roteador_leitura
+from src.routers.apis.treino.catalogo import inicializar_catalogo
+from src.routers.apis.dieta.alimentos import inicializar_tabela_composicao
+from src.routers.apis.gpt.jobs import inicializar_fila_jobs
+from src.routers.apis.gpt.consumo import inicializar_consumo_gpt
+from src.routers.apis.gpt.similaridade import inicializar_indices_similaridade
+from src.routers.apis.treino.sessao_ao_vivo import inicializar_sessoes_ao_vivo
+from src.routers.apis.treino.particionamento import inicializar_particionamento
 # IMPORTAÇÃO DOS ROUTERS
 from src.routers.router import router
-from src.routers.apis.usuario import cadastro
+from src.routers.apis.usuario import cadastro, sincronizacao, exportacao
 from src.routers.apis.dieta import dieta
-from src.routers.apis.gpt import gpt, gpt_dieta
-from src.routers.apis.treino import listagem, treino_usuario
+from src.routers.apis.gpt import gpt, gpt_dieta, lote
+from src.routers.apis.admin import banco
+from src.routers.apis.treino import listagem, treino_usuario, sessao_ao_vivo, progresso, recomendacao, particionamento
 ## ----------------------------------------------
 # from starlette.middleware.base import BaseHTTPMiddleware
 
 app = FastAPI()
 
 create_db_tcc()
+aquecer_conexoes()
+inicializar_catalogo()
+inicializar_tabela_composicao()
+inicializar_indices_similaridade()
+inicializar_consumo_gpt()
+inicializar_fila_jobs()
+inicializar_particionamento()
+inicializar_sessoes_ao_vivo()
+roteador_leitura.iniciar()
 
 app.include_router(router)
 
@@ -32,4 +52,8 @@ app.add_middleware(
     # allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+    expose_headers=["ETag", "Last-Modified"],
+)
+
+app.add_middleware(CompressaoMiddleware, tamanho_minimo=SettingsHTTP().HTTP_COMPRESSAO_MINIMO_BYTES)
+app.add_middleware(LeituraPropriaMiddleware)
@@ -0,0 +1,61 @@
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, só gzip
+    brotli = None
+
+
+class CompressaoMiddleware(BaseHTTPMiddleware):
+    """
+    Comprime respostas JSON acima do tamanho mínimo com brotli (se disponível e aceito) ou gzip.
+    Respostas em streaming (sem Content-Length) e já codificadas passam intactas.
+    """
+
+    def __init__(self, app, tamanho_minimo: int = 1024, nivel_gzip: int = 6, qualidade_brotli: int = 5):
+        super().__init__(app)
+        self.tamanho_minimo = tamanho_minimo
+        self.nivel_gzip = nivel_gzip
+        self.qualidade_brotli = qualidade_brotli
+
+    def _codificacao(self, aceitas: str) -> str | None:
+        codificacoes = {parte.split(";")[0].strip().lower() for parte in aceitas.split(",")}
+        if brotli is not None and "br" in codificacoes:
+            return "br"
+        if "gzip" in codificacoes:
+            return "gzip"
+        return None
+
+    def _comprimir(self, corpo: bytes, codificacao: str) -> bytes:
+        if codificacao == "br":
+            return brotli.compress(corpo, quality=self.qualidade_brotli)
+        return gzip.compress(corpo, compresslevel=self.nivel_gzip)
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        response = await call_next(request)
+        codificacao = self._codificacao(request.headers.get("accept-encoding", ""))
+        tamanho = response.headers.get("content-length")
+        if (
+            codificacao is None
+            or tamanho is None
+            or int(tamanho) < self.tamanho_minimo
+            or "content-encoding" in response.headers
+            or not response.headers.get("content-type", "").startswith("application/json")
+        ):
+            return response
+
+        corpo = b"".join([parte async for parte in response.body_iterator])
+        comprimido = await run_in_threadpool(self._comprimir, corpo, codificacao)
+        nova = Response(content=comprimido, status_code=response.status_code)
+        nova.raw_headers = [
+            (chave, valor) for chave, valor in response.raw_headers if chave.lower() not in (b"content-length", b"vary")
+        ] + [
+            (b"content-encoding", codificacao.encode()),
+            (b"vary", b"Accept-Encoding"),
+            (b"content-length", str(len(comprimido)).encode()),
+        ]
+        return nova
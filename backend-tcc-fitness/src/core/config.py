@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Any, Literal
 from dotenv import load_dotenv
 
 
@@ -11,7 +12,120 @@ class Settings(BaseSettings):
     MYSQL_PASSWORD: str
 
 
+class SettingsPool(BaseSettings):
+    load_dotenv()
+    # Perfil de implantação (ver PERFIS_POOL); os valores abaixo, quando definidos, sobrepõem o perfil
+    DB_PERFIL: Literal["desenvolvimento", "padrao", "producao"] = "padrao"
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int | None = None
+    DB_POOL_TIMEOUT: float | None = None
+    DB_POOL_RECYCLE: int | None = None
+    # Ping a cada checkout; sem ele, só conexões ociosas há mais que DB_PING_OCIOSO_SEGUNDOS são testadas
+    DB_PRE_PING: bool = False
+    DB_PING_OCIOSO_SEGUNDOS: float = 10.0
+    # Conexões abertas na inicialização (padrão: pool_size)
+    DB_AQUECER_CONEXOES: int | None = None
+
+
+class SettingsReplicas(BaseSettings):
+    load_dotenv()
+    # URLs SQLAlchemy das réplicas de leitura, em JSON (ex.: ["mysql+pymysql://u:s@host:3307/tcc"])
+    MYSQL_REPLICAS: list[str] = []
+    REPLICA_POOL_SIZE: int = 5
+    # Réplicas com atraso maior (ou sem resposta) saem do rodízio até a próxima verificação
+    REPLICA_ATRASO_MAXIMO_SEGUNDOS: float = 5.0
+    REPLICA_VERIFICACAO_SEGUNDOS: float = 10.0
+    # Após uma escrita, as leituras do mesmo cliente vão para o primário durante esta janela
+    REPLICA_LEITURA_PROPRIA_SEGUNDOS: float = 10.0
+
+
 class SettingsAuth(BaseSettings):
     load_dotenv()
     SECRET_KEY: str
-    ALGORITHM: str
\ No newline at end of file
+    ALGORITHM: str
+
+
+class SettingsHTTP(BaseSettings):
+    load_dotenv()
+    # Respostas JSON menores que isso não são comprimidas
+    HTTP_COMPRESSAO_MINIMO_BYTES: int = 1024
+
+
+class SettingsSync(BaseSettings):
+    load_dotenv()
+    # Janela relida a cada sincronização: cobre transações confirmadas depois da leitura anterior
+    SYNC_MARGEM_SEGUNDOS: int = 5
+    # Exclusões mais antigas são apagadas; clientes com marca anterior recebem tudo de novo
+    SYNC_RETENCAO_EXCLUSOES_DIAS: int = 30
+
+
+class SettingsSessao(BaseSettings):
+    load_dotenv()
+    # Séries das sessões ao vivo são gravadas ao acumular esta quantidade ou após este tempo
+    SESSAO_SERIES_POR_FLUSH: int = 20
+    SESSAO_FLUSH_SEGUNDOS: float = 15.0
+    # Diretório do log local das séries ainda não gravadas (recuperado na inicialização)
+    SESSAO_DIRETORIO_LOG: str = "data"
+    # Sessões ao vivo sem "finalizar" após este tempo são encerradas pelo servidor
+    SESSAO_EXPIRACAO_HORAS: float = 6.0
+
+
+class SettingsSeries(BaseSettings):
+    load_dotenv()
+    # Partições mensais de TCC.SERIES mais antigas que isso vão para TCC.SERIES_ARQUIVO
+    SERIES_ARQUIVAR_APOS_MESES: int = 24
+    # Partições criadas com antecedência para os próximos meses
+    SERIES_PARTICOES_FUTURAS: int = 3
+    SERIES_MANUTENCAO_HORAS: float = 24.0
+    # Linhas copiadas por transação na migração para a tabela particionada
+    SERIES_MIGRACAO_LOTE: int = 10000
+
+
+class SettingsGPT(BaseSettings):
+    load_dotenv()
+    # Circuit breaker das chamadas ao modelo
+    GPT_BREAKER_JANELA: int = 20
+    GPT_BREAKER_MIN_CHAMADAS: int = 5
+    GPT_BREAKER_TAXA_FALHA: float = 0.5
+    GPT_BREAKER_LATENCIA_SEGUNDOS: float = 45.0
+    GPT_BREAKER_TEMPO_ABERTO_SEGUNDOS: float = 60.0
+    # Sobrescrita das rotas de modelo em JSON, ex: {"ajuste_treino": {"modelo": "gpt-4o-mini"}}
+    GPT_ROTAS: dict[str, dict[str, Any]] = {}
+    # Prazo total das chamadas ao modelo e requisição de reserva (hedge) acima do percentil de latência
+    GPT_PRAZO_SEGUNDOS: float = 120.0
+    GPT_HEDGE_ATIVO: bool = True
+    GPT_HEDGE_PERCENTIL: float = 95.0
+    GPT_HEDGE_JANELA: int = 200
+    GPT_HEDGE_MIN_AMOSTRAS: int = 20
+    GPT_HEDGE_ATRASO_MINIMO_SEGUNDOS: float = 2.0
+    GPT_HEDGE_TAXA_MAXIMA: float = 0.05
+    # Agrupamento de chamadas idênticas simultâneas ao modelo
+    GPT_SINGLE_FLIGHT_MAX_EM_ANDAMENTO: int = 256
+    # Reaproveitamento de planos confirmados para anamneses quase idênticas
+    GPT_SIMILARIDADE_ATIVA: bool = True
+    GPT_SIMILARIDADE_DISTANCIA_MAXIMA: float = 1.0
+    GPT_SIMILARIDADE_MAX_PLANOS: int = 5000
+    GPT_SIMILARIDADE_DIRETORIO: str = "data"
+    # Intervalo de gravação dos índices em disco (inclusões ficam em memória até lá)
+    GPT_SIMILARIDADE_GRAVACAO_SEGUNDOS: float = 30.0
+    # Fila de jobs de geração em segundo plano
+    GPT_JOBS_WORKERS: int = 2
+    GPT_JOBS_ESPERA_MAXIMA_SEGUNDOS: float = 30.0
+    GPT_JOBS_MAX_TENTATIVAS: int = 3
+    GPT_JOBS_RETENCAO_DIAS: int = 7
+    # Geração em lote (importação de alunos)
+    GPT_LOTE_MAX_ITENS: int = 200
+    GPT_LOTE_CONCORRENCIA: int = 4
+    GPT_LOTE_TAMANHO_TRANSACAO: int = 25
+    # Consumo por usuário: tokens do dia (entrada + saída, 0 = sem limite), chamadas simultâneas e
+    # sobrescritas por usuário em JSON, ex: {"42": {"tokens_dia": 1000000, "concorrencia": 4}}
+    GPT_USUARIO_TOKENS_DIA: int = 300000
+    GPT_USUARIO_CONCORRENCIA: int = 2
+    GPT_USUARIO_LIMITES: dict[str, dict[str, int]] = {}
+    # Jobs e gerações do lote recusados com 429 são repetidos após esta espera, dobrada a cada tentativa
+    GPT_LIMITE_ESPERA_SEGUNDOS: float = 5.0
+    GPT_LIMITE_TENTATIVAS: int = 3
+    # Gravação em lote dos registros de consumo, consolidação diária e retenção das linhas por chamada
+    GPT_CONSUMO_GRAVACAO_SEGUNDOS: float = 5.0
+    GPT_CONSUMO_CONSOLIDACAO_SEGUNDOS: float = 300.0
+    GPT_CONSUMO_RETENCAO_DIAS: int = 30
@@ -3,12 +3,28 @@ from collections.abc import Generator
 from sqlalchemy import create_engine
 from sqlalchemy.orm.session import Session
 
-from src.core.config import Settings
+from src.core.config import Settings, SettingsPool
+from src.core.pool import MetricasPool, aquecer_pool, configurar_pool, monitorar, pool_medido
 
 sett = Settings()
 uri = f'{sett.MYSQL_USER}:{sett.MYSQL_PASSWORD}@{sett.MYSQL_HOST}:{sett.MYSQL_PORT}/{sett.MYSQL_DB}'
 
-engine = create_engine(f'mysql+pymysql://{uri}', pool_size=10, max_overflow=2, pool_timeout=30, pool_recycle=3600)
+sett_pool = SettingsPool()
+parametros_pool = configurar_pool(sett_pool.DB_PERFIL, {
+    "pool_size": sett_pool.DB_POOL_SIZE,
+    "max_overflow": sett_pool.DB_MAX_OVERFLOW,
+    "pool_timeout": sett_pool.DB_POOL_TIMEOUT,
+    "pool_recycle": sett_pool.DB_POOL_RECYCLE,
+})
+metricas_pool = MetricasPool()
+
+engine = create_engine(
+    f'mysql+pymysql://{uri}',
+    poolclass=pool_medido(metricas_pool),
+    pool_pre_ping=sett_pool.DB_PRE_PING,
+    **parametros_pool,
+)
+monitorar(engine, metricas_pool, None if sett_pool.DB_PRE_PING else sett_pool.DB_PING_OCIOSO_SEGUNDOS)
 
 
 def get_db_mysql() -> Generator[Session, None, None]:
@@ -18,3 +34,12 @@ def get_db_mysql() -> Generator[Session, None, None]:
             yield session
     except Exception as e:
         raise e
+
+
+def aquecer_conexoes() -> None:
+    """Abre o pool mínimo na inicialização da aplicação."""
+    quantidade = sett_pool.DB_AQUECER_CONEXOES
+    try:
+        aquecer_pool(engine, parametros_pool["pool_size"] if quantidade is None else quantidade)
+    except Exception as e:
+        print(f"Erro ao aquecer pool de conexões: {e}")
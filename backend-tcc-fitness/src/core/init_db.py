@@ -1,6 +1,6 @@
 from sqlalchemy import text
 from src.core.database import get_db_mysql  # ajuste conforme seu projeto
-from src.routers.models.query_db import queries_db
+from src.routers.models.query_db import queries_db, migrations_db
 
 def create_db_tcc():
     """Cria o banco 'tcc' e a tabela USUARIO se não existirem usando a sessão do get_db_mysql."""
@@ -15,7 +15,41 @@ def create_db_tcc():
             session.execute(text(query))
             session.commit()
 
+        apply_migrations(session)
+
     except Exception as e:
         print(f"Erro ao criar banco ou tabela: {e}")
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+
+def apply_migrations(session):
+    """Aplica as alterações de schema em tabelas existentes que ainda não as possuem."""
+    for migration in migrations_db:
+        if "coluna" in migration:
+            # Com "precisao", a migração altera uma coluna temporal existente que ainda tem precisão menor
+            existe_query = """
+                SELECT 1 FROM information_schema.COLUMNS
+                WHERE UPPER(TABLE_SCHEMA) = 'TCC' AND UPPER(TABLE_NAME) = :tabela AND COLUMN_NAME = :nome
+                  AND (:precisao IS NULL OR DATETIME_PRECISION >= :precisao)
+            """
+            nome = migration["coluna"]
+        elif "gatilho" in migration:
+            existe_query = """
+                SELECT 1 FROM information_schema.TRIGGERS
+                WHERE UPPER(TRIGGER_SCHEMA) = 'TCC' AND UPPER(EVENT_OBJECT_TABLE) = :tabela AND TRIGGER_NAME = :nome
+            """
+            nome = migration["gatilho"]
+        else:
+            existe_query = """
+                SELECT 1 FROM information_schema.STATISTICS
+                WHERE UPPER(TABLE_SCHEMA) = 'TCC' AND UPPER(TABLE_NAME) = :tabela AND INDEX_NAME = :nome
+            """
+            nome = migration["indice"]
+
+        existe = session.execute(text(existe_query), {
+            "tabela": migration["tabela"], "nome": nome, "precisao": migration.get("precisao"),
+        }).first()
+        if not existe:
+            session.execute(text(migration["query"]))
+            session.commit()
@@ -0,0 +1,128 @@
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.pool import QueuePool
+from threading import Lock
+import numpy as np
+import time
+
+
+# Tamanho do pool por perfil de implantação; "padrao" mantém os valores anteriores
+PERFIS_POOL = {
+    "desenvolvimento": {"pool_size": 2, "max_overflow": 3, "pool_timeout": 5, "pool_recycle": 1800},
+    "padrao": {"pool_size": 10, "max_overflow": 2, "pool_timeout": 30, "pool_recycle": 3600},
+    "producao": {"pool_size": 20, "max_overflow": 10, "pool_timeout": 5, "pool_recycle": 1800},
+}
+
+JANELA_ESPERAS = 2000
+
+
+class MetricasPool:
+    """Esperas por conexão (janela das últimas JANELA_ESPERAS) e contadores de abertura/fechamento."""
+
+    def __init__(self):
+        self._esperas: deque[float] = deque(maxlen=JANELA_ESPERAS)
+        self._lock = Lock()
+        self.contadores = {"checkouts": 0, "timeouts": 0, "abertas": 0, "fechadas": 0, "invalidadas": 0, "pings_falhos": 0}
+
+    def contar(self, nome: str) -> None:
+        with self._lock:
+            self.contadores[nome] += 1
+
+    def registrar_espera(self, segundos: float, sucesso: bool) -> None:
+        with self._lock:
+            self._esperas.append(segundos)
+            self.contadores["checkouts" if sucesso else "timeouts"] += 1
+
+    def estado(self, pool) -> dict:
+        with self._lock:
+            esperas = np.array(self._esperas, dtype=float)
+            contadores = dict(self.contadores)
+        percentis = (
+            {f"p{p}": round(float(np.percentile(esperas, p)) * 1000, 2) for p in (50, 95, 99)}
+            if len(esperas) else {}
+        )
+        return {
+            "tamanho": pool.size(),
+            "emUso": pool.checkedout(),
+            "livres": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "esperaMs": {**percentis, "max": round(float(esperas.max()) * 1000, 2) if len(esperas) else None},
+            **contadores,
+        }
+
+
+def pool_medido(metricas: MetricasPool) -> type[QueuePool]:
+    """QueuePool que mede quanto cada checkout esperou por uma conexão (mantida em pool.recreate())."""
+
+    class PoolMedido(QueuePool):
+        def _do_get(self):
+            inicio = time.perf_counter()
+            try:
+                conexao = super()._do_get()
+            except Exception:
+                metricas.registrar_espera(time.perf_counter() - inicio, False)
+                raise
+            metricas.registrar_espera(time.perf_counter() - inicio, True)
+            return conexao
+
+    PoolMedido.metricas = metricas
+    return PoolMedido
+
+
+def configurar_pool(perfil: str, sobrescritas: dict) -> dict:
+    """Parâmetros do create_engine: perfil com os valores definidos explicitamente por cima."""
+    return {**PERFIS_POOL[perfil], **{chave: valor for chave, valor in sobrescritas.items() if valor is not None}}
+
+
+def monitorar(engine: Engine, metricas: MetricasPool, ping_ocioso: float | None) -> None:
+    """
+    Registra os eventos de conexão nas métricas e, se ping_ocioso for informado, testa no checkout as
+    conexões paradas há mais tempo que isso (as quebradas são substituídas antes de chegar à requisição).
+    """
+
+    @event.listens_for(engine, "connect")
+    def _aberta(conexao_dbapi, registro):
+        metricas.contar("abertas")
+
+    @event.listens_for(engine, "close")
+    def _fechada(conexao_dbapi, registro):
+        metricas.contar("fechadas")
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidada(conexao_dbapi, registro, excecao):
+        metricas.contar("invalidadas")
+
+    @event.listens_for(engine, "checkin")
+    def _devolvida(conexao_dbapi, registro):
+        registro.info["devolvida_em"] = time.monotonic()
+
+    if ping_ocioso is None:
+        return
+
+    @event.listens_for(engine, "checkout")
+    def _verificar(conexao_dbapi, registro, proxy):
+        devolvida_em = registro.info.get("devolvida_em")
+        if devolvida_em is None or time.monotonic() - devolvida_em < ping_ocioso:
+            return
+        try:
+            cursor = conexao_dbapi.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception as exc:
+            metricas.contar("pings_falhos")
+            # O pool descarta a conexão e tenta outra
+            raise DisconnectionError() from exc
+
+
+def aquecer_pool(engine: Engine, quantidade: int) -> int:
+    """Abre `quantidade` conexões e as devolve ao pool, para que as primeiras requisições não paguem a conexão."""
+    conexoes = []
+    try:
+        for _ in range(quantidade):
+            conexoes.append(engine.connect())
+    finally:
+        for conexao in conexoes:
+            conexao.close()
+    return len(conexoes)
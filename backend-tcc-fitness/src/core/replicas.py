@@ -0,0 +1,179 @@
+from collections.abc import Generator
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm.session import Session
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from threading import Lock, Thread
+import itertools
+import time
+
+from src.core.config import SettingsReplicas
+from src.core.database import engine, sett_pool
+from src.core.pool import MetricasPool, monitorar, pool_medido
+
+
+COOKIE_ESCRITA = "tcc_escrita"
+METODOS_LEITURA = ("GET", "HEAD", "OPTIONS")
+
+
+class Replica:
+    """Engine de uma réplica de leitura e o resultado da última verificação."""
+
+    def __init__(self, url: str, pool_size: int):
+        self.nome = make_url(url).render_as_string(hide_password=True)
+        self.metricas = MetricasPool()
+        self.engine = create_engine(
+            url,
+            poolclass=pool_medido(self.metricas),
+            pool_size=pool_size,
+            max_overflow=0,
+            pool_timeout=5,
+            pool_recycle=3600,
+            pool_pre_ping=sett_pool.DB_PRE_PING,
+        )
+        monitorar(self.engine, self.metricas, None if sett_pool.DB_PRE_PING else sett_pool.DB_PING_OCIOSO_SEGUNDOS)
+        self.saudavel = False
+        self.atraso: float | None = None
+        self.erro: str | None = None
+
+    def verificar(self, atraso_maximo: float) -> None:
+        try:
+            with self.engine.connect() as conexao:
+                try:
+                    status = conexao.execute(text("SHOW REPLICA STATUS")).mappings().first()
+                    atraso = status["Seconds_Behind_Source"] if status else 0
+                except Exception:
+                    # MySQL anterior ao 8.0.22
+                    status = conexao.execute(text("SHOW SLAVE STATUS")).mappings().first()
+                    atraso = status["Seconds_Behind_Master"] if status else 0
+            # Sem status de replicação (instância avulsa, ex.: testes locais) o atraso é considerado zero;
+            # replicação parada (atraso NULL) tira a réplica do rodízio
+            self.atraso = None if atraso is None else float(atraso)
+            self.saudavel = self.atraso is not None and self.atraso <= atraso_maximo
+            self.erro = None if self.atraso is not None else "Replicação parada"
+        except Exception as exc:
+            self.saudavel, self.atraso, self.erro = False, None, str(exc)[:200]
+
+
+class RoteadorLeitura:
+    """
+    Distribui as leituras entre as réplicas saudáveis (rodízio), com volta ao primário quando nenhuma
+    está disponível ou quando o cliente escreveu há pouco (leitura das próprias escritas).
+    """
+
+    def __init__(self, urls: list[str], pool_size: int, atraso_maximo: float, intervalo: float, janela_propria: float):
+        self.replicas = [Replica(url, pool_size) for url in urls]
+        self.atraso_maximo = atraso_maximo
+        self.intervalo = intervalo
+        self.janela_propria = janela_propria
+        self._rodizio = itertools.count()
+        self._escritas: dict[str, float] = {}
+        self._lock = Lock()
+        self._thread: Thread | None = None
+        self.leituras = {"replica": 0, "primario": 0, "leitura_propria": 0}
+
+    @property
+    def ativo(self) -> bool:
+        return bool(self.replicas)
+
+    def verificar(self) -> None:
+        for replica in self.replicas:
+            replica.verificar(self.atraso_maximo)
+
+    def _executar(self) -> None:
+        while True:
+            self.verificar()
+            time.sleep(self.intervalo)
+
+    def iniciar(self) -> None:
+        if self.ativo and self._thread is None:
+            self.verificar()
+            self._thread = Thread(target=self._executar, name="replicas-verificacao", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _cliente(request: Request) -> str:
+        return request.headers.get("authorization") or (request.client.host if request.client else "")
+
+    def registrar_escrita(self, request: Request) -> None:
+        agora = time.monotonic()
+        with self._lock:
+            self._escritas[self._cliente(request)] = agora
+            if len(self._escritas) > 10000:
+                self._escritas = {
+                    cliente: momento for cliente, momento in self._escritas.items()
+                    if agora - momento < self.janela_propria
+                }
+
+    def _escrita_recente(self, request: Request) -> bool:
+        with self._lock:
+            momento = self._escritas.get(self._cliente(request))
+        if momento is not None and time.monotonic() - momento < self.janela_propria:
+            return True
+        # O cookie cobre escritas atendidas por outro processo
+        try:
+            return time.time() - float(request.cookies.get(COOKIE_ESCRITA, 0)) < self.janela_propria
+        except ValueError:
+            return False
+
+    def engine_para(self, request: Request | None = None) -> Engine:
+        """Engine de leitura para a requisição: réplica saudável ou o primário."""
+        if not self.ativo:
+            return engine
+        if request is not None and self._escrita_recente(request):
+            self.leituras["leitura_propria"] += 1
+            return engine
+        saudaveis = [replica for replica in self.replicas if replica.saudavel]
+        if not saudaveis:
+            self.leituras["primario"] += 1
+            return engine
+        self.leituras["replica"] += 1
+        return saudaveis[next(self._rodizio) % len(saudaveis)].engine
+
+    def estado(self) -> dict:
+        return {
+            "ativo": self.ativo,
+            "atrasoMaximoSegundos": self.atraso_maximo,
+            "replicas": [
+                {
+                    "nome": replica.nome,
+                    "saudavel": replica.saudavel,
+                    "atraso": replica.atraso,
+                    "erro": replica.erro,
+                    "pool": replica.metricas.estado(replica.engine.pool),
+                }
+                for replica in self.replicas
+            ],
+            "leituras": dict(self.leituras),
+        }
+
+
+_sett = SettingsReplicas()
+roteador_leitura = RoteadorLeitura(
+    _sett.MYSQL_REPLICAS,
+    _sett.REPLICA_POOL_SIZE,
+    _sett.REPLICA_ATRASO_MAXIMO_SEGUNDOS,
+    _sett.REPLICA_VERIFICACAO_SEGUNDOS,
+    _sett.REPLICA_LEITURA_PROPRIA_SEGUNDOS,
+)
+
+
+def get_db_leitura(request: Request) -> Generator[Session, None, None]:
+    """Sessão somente leitura: réplica quando disponível (para endpoints GET)."""
+    with Session(roteador_leitura.engine_para(request)) as session:
+        yield session
+
+
+class LeituraPropriaMiddleware(BaseHTTPMiddleware):
+    """Marca o cliente após escritas bem-sucedidas para que as próximas leituras vejam o que ele gravou."""
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        response = await call_next(request)
+        if roteador_leitura.ativo and request.method not in METODOS_LEITURA and response.status_code < 400:
+            roteador_leitura.registrar_escrita(request)
+            response.set_cookie(
+                COOKIE_ESCRITA, str(time.time()), max_age=int(roteador_leitura.janela_propria) + 1, httponly=True
+            )
+        return response
@@ -0,0 +1,22 @@
+from src.routers.router import router
+from src.core.database import engine, metricas_pool, parametros_pool, sett_pool
+from src.core.replicas import roteador_leitura
+
+
+@router.get("/admin/banco")
+def estado_banco():
+    """
+    Estado do acesso ao banco.
+    Returns:
+        dict: Pool do primário (perfil, parâmetros, conexões em uso, overflow, percentis de espera em ms,
+        aberturas e fechamentos de conexões) e réplicas de leitura (saúde, atraso e pool).
+    """
+    return {
+        "pool": {
+            "perfil": sett_pool.DB_PERFIL,
+            "parametros": parametros_pool,
+            "prePing": sett_pool.DB_PRE_PING,
+            **metricas_pool.estado(engine.pool),
+        },
+        "replicas": roteador_leitura.estado(),
+    }
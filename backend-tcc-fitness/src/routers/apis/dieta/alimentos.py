@@ -0,0 +1,470 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from threading import Lock
+import numpy as np
+import unicodedata
+import re
+
+from src.core.database import get_db_mysql
+from src.routers.models.consultas import consulta_get
+from src.routers.apis.treino.catalogo import normalizar_nome
+
+
+# Tabela de composição inicial, valores por 100 g (referência TACO/USDA):
+# (nome, kcal, proteína g, carboidrato g, gordura g, gramas por unidade, categoria, restrições)
+ALIMENTOS_PADRAO = [
+    ("Arroz Branco Cozido", 128, 2.5, 28.1, 0.2, None, "carboidrato", ""),
+    ("Arroz Integral Cozido", 124, 2.6, 25.8, 1.0, None, "carboidrato", ""),
+    ("Feijão Carioca Cozido", 76, 4.8, 13.6, 0.5, None, "carboidrato", ""),
+    ("Feijão Preto Cozido", 77, 4.5, 14.0, 0.5, None, "carboidrato", ""),
+    ("Lentilha Cozida", 93, 6.3, 16.3, 0.5, None, "carboidrato", ""),
+    ("Grão De Bico Cozido", 164, 8.9, 27.4, 2.6, None, "carboidrato", ""),
+    ("Batata Doce Cozida", 77, 0.6, 18.4, 0.1, None, "carboidrato", ""),
+    ("Batata Inglesa Cozida", 52, 1.2, 11.9, 0.0, None, "carboidrato", ""),
+    ("Mandioca Cozida", 125, 0.6, 30.1, 0.3, None, "carboidrato", ""),
+    ("Macarrão Cozido", 157, 5.8, 30.9, 0.9, None, "carboidrato", "gluten"),
+    ("Macarrão Integral Cozido", 149, 6.0, 30.0, 1.7, None, "carboidrato", "gluten"),
+    ("Pão Francês", 300, 8.0, 58.6, 3.1, 50, "carboidrato", "gluten"),
+    ("Pão Integral", 253, 9.4, 49.9, 3.7, 25, "carboidrato", "gluten"),
+    ("Tapioca", 242, 0.0, 60.0, 0.0, None, "carboidrato", ""),
+    ("Aveia Em Flocos", 394, 13.9, 66.6, 8.5, None, "carboidrato", "gluten"),
+    ("Cuscuz De Milho Cozido", 113, 2.2, 25.3, 0.7, None, "carboidrato", ""),
+    ("Granola", 421, 10.0, 66.0, 13.0, None, "carboidrato", "gluten"),
+    ("Milho Verde Cozido", 98, 3.2, 17.1, 2.4, None, "carboidrato", ""),
+    ("Quinoa Cozida", 120, 4.4, 21.3, 1.9, None, "carboidrato", ""),
+    ("Peito De Frango Grelhado", 159, 32.0, 0.0, 2.5, None, "proteina", "carne"),
+    ("Coxa De Frango Assada", 215, 28.5, 0.0, 10.4, None, "proteina", "carne"),
+    ("Patinho Grelhado", 219, 35.9, 0.0, 7.3, None, "proteina", "carne"),
+    ("Carne Moída Refogada", 212, 26.7, 0.0, 10.9, None, "proteina", "carne"),
+    ("Alcatra Grelhada", 241, 31.9, 0.0, 11.6, None, "proteina", "carne"),
+    ("Peito De Peru", 105, 17.0, 2.0, 3.0, None, "proteina", "carne"),
+    ("Filé De Tilápia Grelhado", 128, 26.2, 0.0, 2.7, None, "proteina", "peixe"),
+    ("Salmão Grelhado", 229, 23.9, 0.0, 14.0, None, "proteina", "peixe"),
+    ("Atum Em Conserva", 166, 26.2, 0.0, 6.0, None, "proteina", "peixe"),
+    ("Sardinha Em Conserva", 285, 15.9, 0.0, 24.0, None, "proteina", "peixe"),
+    ("Camarão Cozido", 90, 19.0, 0.0, 1.0, None, "proteina", "frutos_mar"),
+    ("Ovo Cozido", 146, 13.3, 0.6, 9.5, 50, "proteina", "ovo"),
+    ("Ovo Mexido", 240, 15.6, 1.2, 18.6, 50, "proteina", "ovo"),
+    ("Clara De Ovo", 52, 10.9, 0.7, 0.2, 33, "proteina", "ovo"),
+    ("Tofu", 76, 8.1, 1.9, 4.8, None, "proteina", "soja"),
+    ("Whey Protein", 400, 80.0, 8.0, 6.0, None, "proteina", "leite"),
+    ("Leite Integral", 61, 3.2, 4.7, 3.3, None, "laticinio", "leite"),
+    ("Leite Desnatado", 35, 3.4, 4.9, 0.2, None, "laticinio", "leite"),
+    ("Iogurte Natural", 51, 4.1, 1.9, 3.0, None, "laticinio", "leite"),
+    ("Iogurte Grego", 97, 9.0, 3.9, 5.0, None, "laticinio", "leite"),
+    ("Queijo Minas Frescal", 264, 17.4, 3.2, 20.2, None, "laticinio", "leite"),
+    ("Queijo Muçarela", 330, 22.6, 3.0, 25.2, None, "laticinio", "leite"),
+    ("Queijo Cottage", 98, 11.1, 3.4, 4.3, None, "laticinio", "leite"),
+    ("Ricota", 140, 12.6, 3.8, 8.1, None, "laticinio", "leite"),
+    ("Requeijão", 257, 9.6, 2.4, 23.4, None, "laticinio", "leite"),
+    ("Bebida De Soja", 41, 3.0, 3.5, 1.8, None, "laticinio", "soja"),
+    ("Leite De Amêndoas", 15, 0.6, 0.3, 1.2, None, "laticinio", "castanha"),
+    ("Azeite De Oliva", 884, 0.0, 0.0, 100.0, None, "gordura", ""),
+    ("Abacate", 96, 1.2, 6.0, 8.4, None, "gordura", ""),
+    ("Pasta De Amendoim", 589, 25.0, 20.0, 50.0, None, "gordura", "amendoim"),
+    ("Amendoim Torrado", 606, 22.5, 18.7, 54.0, None, "gordura", "amendoim"),
+    ("Castanha Do Pará", 643, 14.5, 15.1, 63.5, 4, "gordura", "castanha"),
+    ("Castanha De Caju", 570, 18.5, 29.1, 46.3, 2, "gordura", "castanha"),
+    ("Nozes", 620, 14.0, 18.4, 59.4, 5, "gordura", "castanha"),
+    ("Manteiga", 726, 0.4, 0.1, 82.4, None, "gordura", "leite"),
+    ("Chia", 486, 16.5, 42.1, 30.7, None, "gordura", ""),
+    ("Linhaça", 495, 14.1, 43.3, 32.3, None, "gordura", ""),
+    ("Banana", 98, 1.3, 26.0, 0.1, 86, "fruta", ""),
+    ("Maçã", 56, 0.3, 15.2, 0.0, 130, "fruta", ""),
+    ("Mamão", 40, 0.5, 10.4, 0.1, None, "fruta", ""),
+    ("Morango", 30, 0.9, 6.8, 0.3, 12, "fruta", ""),
+    ("Laranja", 37, 1.0, 8.9, 0.1, 180, "fruta", ""),
+    ("Abacaxi", 48, 0.9, 12.3, 0.1, None, "fruta", ""),
+    ("Melancia", 33, 0.9, 8.1, 0.0, None, "fruta", ""),
+    ("Manga", 72, 0.4, 19.4, 0.2, None, "fruta", ""),
+    ("Uva", 53, 0.7, 13.6, 0.2, None, "fruta", ""),
+    ("Pera", 53, 0.6, 14.0, 0.1, 130, "fruta", ""),
+    ("Kiwi", 51, 1.3, 11.5, 0.6, 76, "fruta", ""),
+    ("Açaí", 58, 0.8, 6.2, 3.9, None, "fruta", ""),
+    ("Mel", 309, 0.0, 84.0, 0.0, None, "outro", "mel"),
+    ("Brócolis Cozido", 25, 2.1, 4.4, 0.5, None, "vegetal", ""),
+    ("Alface", 11, 1.3, 1.7, 0.2, None, "vegetal", ""),
+    ("Tomate", 15, 1.1, 3.1, 0.2, None, "vegetal", ""),
+    ("Cenoura Crua", 34, 1.3, 7.7, 0.2, None, "vegetal", ""),
+    ("Cenoura Cozida", 30, 0.8, 6.7, 0.2, None, "vegetal", ""),
+    ("Abobrinha Cozida", 15, 1.1, 3.0, 0.2, None, "vegetal", ""),
+    ("Espinafre Refogado", 67, 2.7, 4.2, 5.4, None, "vegetal", ""),
+    ("Couve Refogada", 90, 1.7, 8.7, 6.6, None, "vegetal", ""),
+    ("Pepino", 10, 0.9, 2.0, 0.0, None, "vegetal", ""),
+    ("Abóbora Cozida", 48, 1.4, 10.8, 0.7, None, "vegetal", ""),
+    ("Beterraba Cozida", 32, 1.3, 7.2, 0.1, None, "vegetal", ""),
+    ("Vagem Cozida", 25, 1.5, 5.5, 0.2, None, "vegetal", ""),
+    ("Chuchu Cozido", 19, 0.4, 4.8, 0.0, None, "vegetal", ""),
+    ("Café Sem Açúcar", 9, 0.7, 1.5, 0.1, None, "outro", ""),
+]
+
+# Colunas da matriz de nutrientes (por 100 g)
+NUTRIENTES = ("kcal", "proteina", "carboidrato", "gordura")
+
+# Conversão de medidas caseiras para gramas
+MEDIDAS_CASEIRAS = {
+    "colher de sopa": 15,
+    "colheres de sopa": 15,
+    "colher de cha": 5,
+    "colheres de cha": 5,
+    "xicara": 160,
+    "xicaras": 160,
+    "fatia": 25,
+    "fatias": 25,
+    "copo": 200,
+    "copos": 200,
+    "concha": 100,
+    "conchas": 100,
+    "scoop": 30,
+    "scoops": 30,
+    "pedaco": 50,
+    "pedacos": 50,
+}
+
+UNIDADES = {"unidade", "unidades", "un", "und", "unid"}
+
+# Peso assumido para "1 unidade" de um alimento sem peso unitário cadastrado
+GRAMAS_UNIDADE_PADRAO = 50
+
+# Fração mínima das palavras do alimento da tabela que precisam estar no nome + preparo gerados pela IA
+PRECISAO_MINIMA = 0.5
+
+# Pesos da distância entre alimentos no índice de equivalência nutricional
+PESO_DENSIDADE = 0.15
+PENALIDADE_CATEGORIA = 0.5
+
+
+def _numero(texto: str) -> float | None:
+    fracao = re.search(r"(\d+)\s*/\s*(\d+)", texto)
+    if fracao and int(fracao.group(2)):
+        return int(fracao.group(1)) / int(fracao.group(2))
+    encontrado = re.search(r"\d+(?:[.,]\d+)?", texto)
+    return float(encontrado.group().replace(",", ".")) if encontrado else None
+
+
+def _sem_acento(texto: str) -> str:
+    # Diferente de normalizar_nome, preserva preposições ("colher de sopa")
+    sem_acento = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode("ascii")
+    return " ".join("".join(char if char.isalpha() else " " for char in sem_acento.lower()).split())
+
+
+def chave_alimento(nome: str) -> str:
+    # Nome normalizado no singular, para "Ovos Cozidos" encontrar "Ovo Cozido"
+    return " ".join(
+        palavra[:-1] if len(palavra) > 3 and palavra.endswith("s") else palavra
+        for palavra in normalizar_nome(nome).split()
+    )
+
+
+def interpretar_quantidade(quantidade: str) -> tuple[float | None, str]:
+    """
+    Converte a quantidade do formato da IA ("150 g", "200 ml", "2 unidades", "1 colher de sopa")
+    em (valor, unidade). A unidade é "g", "unidade" ou uma das MEDIDAS_CASEIRAS;
+    mililitros são tratados como gramas.
+    """
+    valor = _numero(quantidade or "")
+    texto = _sem_acento(quantidade)
+    palavras = set(texto.split())
+
+    for medida in MEDIDAS_CASEIRAS:
+        if medida in texto:
+            return (valor if valor is not None else 1.0), medida
+    if palavras & UNIDADES:
+        return (valor if valor is not None else 1.0), "unidade"
+    if palavras & {"kg", "l", "litro", "litros"}:
+        return (valor * 1000 if valor is not None else None), "g"
+    return valor, "g"
+
+
+def parse_alimentos(alimentos: str) -> list[dict]:
+    """
+    Converte o texto "Nome - Quantidade - Preparo; ..." prescrito no PROMPT_TEMPLATE da dieta
+    em itens estruturados.
+    Returns:
+        list: Itens com nome, quantidade_texto, valor, unidade e preparo.
+    """
+    itens = []
+    for bruto in (alimentos or "").split(";"):
+        partes = [parte.strip() for parte in bruto.split(" - ")]
+        if not partes or not partes[0]:
+            continue
+        nome = partes[0]
+        quantidade = partes[1] if len(partes) > 1 else ""
+        preparo = " - ".join(partes[2:]) if len(partes) > 2 else ""
+        valor, unidade = interpretar_quantidade(quantidade)
+        itens.append({
+            "nome": nome,
+            "quantidade_texto": quantidade,
+            "valor": valor,
+            "unidade": unidade,
+            "preparo": preparo,
+        })
+    return itens
+
+
+def _indice_vizinhos(nutrientes: np.ndarray, categorias: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pré-calcula, para cada alimento, os demais ordenados por equivalência nutricional.
+    A distância compara a fração da energia vinda de cada macronutriente (a porção é
+    reescalada para igualar as calorias), a densidade energética e a categoria.
+    Returns:
+        tuple: (vizinhos, distancias), matrizes n x n; vizinhos[i] lista índices do mais ao menos parecido.
+    """
+    kcal = np.maximum(nutrientes[:, 0], 1.0)
+    perfil = nutrientes[:, 1:] * np.array([4.0, 4.0, 9.0]) / kcal[:, None]
+    densidade = np.log(kcal)
+    categoria = np.array(categorias, dtype=object)
+
+    distancias = (
+        np.linalg.norm(perfil[:, None, :] - perfil[None, :, :], axis=2)
+        + PESO_DENSIDADE * np.abs(densidade[:, None] - densidade[None, :])
+        + PENALIDADE_CATEGORIA * (categoria[:, None] != categoria[None, :])
+    )
+    return np.argsort(distancias, axis=1, kind="stable"), distancias
+
+
+class TabelaComposicao:
+    """Tabela de composição de alimentos em colunas NumPy (valores por 100 g)."""
+
+    def __init__(self, linhas: list[dict] | None = None):
+        self._lock = Lock()
+        self.carregar(linhas or [])
+
+    def carregar(self, linhas: list[dict]) -> None:
+        ids = np.array([int(linha["id_alimento"]) for linha in linhas], dtype=np.int64)
+        nutrientes = np.array(
+            [[float(linha[coluna] or 0) for coluna in NUTRIENTES] for linha in linhas],
+            dtype=np.float64,
+        ).reshape(len(linhas), len(NUTRIENTES))
+        gramas_unidade = np.array(
+            [float(linha.get("gramas_unidade") or GRAMAS_UNIDADE_PADRAO) for linha in linhas],
+            dtype=np.float64,
+        )
+        nomes = [linha["nome"] for linha in linhas]
+        categorias = [linha.get("categoria") or "" for linha in linhas]
+        restricoes = [
+            frozenset(tag for tag in (linha.get("restricoes") or "").split(",") if tag)
+            for linha in linhas
+        ]
+        nomes_normalizados = [chave_alimento(nome) for nome in nomes]
+        vizinhos, distancias = _indice_vizinhos(nutrientes, categorias)
+
+        with self._lock:
+            self.ids = ids
+            self.nutrientes = nutrientes
+            self.gramas_unidade = gramas_unidade
+            self.nomes = nomes
+            self.categorias = categorias
+            self.restricoes = restricoes
+            self.nomes_normalizados = nomes_normalizados
+            self.por_nome = {nome: indice for indice, nome in enumerate(nomes_normalizados)}
+            self.por_id = {int(id_alimento): indice for indice, id_alimento in enumerate(ids)}
+            self.vizinhos = vizinhos
+            self.distancias = distancias
+
+    def __len__(self) -> int:
+        return len(self.nomes)
+
+    def associar(self, nome: str, preparo: str = "") -> int | None:
+        """
+        Índice (linha da matriz) do alimento correspondente ao nome, ou None.
+        O preparo desempata variações do mesmo alimento ("Ovo" + "Mexido" -> "Ovo Mexido").
+        Fora da correspondência exata, todas as palavras do nome precisam estar no alimento da tabela
+        ("Iogurte Desnatado" não vira "Leite Desnatado") e empates são ambíguos ("Batata Cozida"
+        serve para a doce e a inglesa): nesses casos retorna None em vez de escolher um vizinho.
+        """
+        normalizado = chave_alimento(nome)
+        if not normalizado:
+            return None
+        for chave in (chave_alimento(f"{nome} {preparo}"), normalizado):
+            exato = self.por_nome.get(chave)
+            if exato is not None:
+                return exato
+
+        tokens = set(normalizado.split())
+        tokens_preparo = tokens | set(chave_alimento(preparo).split())
+        aceitos = []
+        for indice, candidato in enumerate(self.nomes_normalizados):
+            tokens_candidato = set(candidato.split())
+            if not tokens <= tokens_candidato:
+                continue
+            # Quanto do alimento é explicado por nome + preparo
+            precisao = len(tokens_preparo & tokens_candidato) / len(tokens_candidato)
+            aceitos.append((precisao, indice))
+        if not aceitos:
+            return None
+        aceitos.sort(reverse=True)
+        if len(aceitos) > 1 and aceitos[0][0] == aceitos[1][0]:
+            return None
+        precisao, indice = aceitos[0]
+        return indice if precisao >= PRECISAO_MINIMA else None
+
+    def gramas(self, indice: int | None, valor: float | None, unidade: str) -> float | None:
+        if valor is None:
+            return None
+        if unidade == "g":
+            return valor
+        if unidade == "unidade":
+            return valor * (self.gramas_unidade[indice] if indice is not None else GRAMAS_UNIDADE_PADRAO)
+        return valor * MEDIDAS_CASEIRAS.get(unidade, GRAMAS_UNIDADE_PADRAO)
+
+    def calcular(self, indices: np.ndarray, gramas: np.ndarray) -> np.ndarray:
+        """Nutrientes de cada item (linhas) em uma única operação vetorizada; itens sem associação ficam zerados."""
+        validos = (indices >= 0) & ~np.isnan(gramas)
+        resultado = np.zeros((len(indices), len(NUTRIENTES)), dtype=np.float64)
+        resultado[validos] = self.nutrientes[indices[validos]] * (gramas[validos, None] / 100.0)
+        return resultado
+
+
+tabela_composicao = TabelaComposicao()
+
+# Cópia da tabela padrão com ids provisórios, usada quando o banco não pôde ser carregado
+tabela_padrao = TabelaComposicao([
+    {
+        "id_alimento": indice, "nome": nome, "kcal": kcal, "proteina": proteina, "carboidrato": carboidrato,
+        "gordura": gordura, "gramas_unidade": gramas_unidade, "categoria": categoria, "restricoes": restricoes,
+    }
+    for indice, (nome, kcal, proteina, carboidrato, gordura, gramas_unidade, categoria, restricoes)
+    in enumerate(ALIMENTOS_PADRAO, start=1)
+])
+
+
+def tabela_disponivel() -> TabelaComposicao:
+    return tabela_composicao if len(tabela_composicao) else tabela_padrao
+
+
+def estruturar_refeicoes(refeicoes: list[dict], tabela: TabelaComposicao | None = None) -> dict:
+    """
+    Estrutura os alimentos de todas as refeições e calcula kcal e macros por item,
+    por refeição e da dieta inteira em uma passada vetorizada.
+    Args:
+        refeicoes (list): Refeições no formato da IA ({"calorias", "alimentos", "tipoRefeicao"}).
+    Returns:
+        dict: "itens" (lista por refeição), "por_refeicao", "total" e "cobertura" (refeições 100% associadas).
+    """
+    tabela = tabela or tabela_disponivel()
+    itens_por_refeicao = [parse_alimentos(refeicao.get("alimentos", "")) for refeicao in refeicoes]
+
+    todos = [item for itens in itens_por_refeicao for item in itens]
+    indice_refeicao = np.array(
+        [posicao for posicao, itens in enumerate(itens_por_refeicao) for _ in itens], dtype=np.int64
+    )
+    indices = np.array(
+        [-1 if (indice := tabela.associar(item["nome"], item["preparo"])) is None else indice for item in todos], dtype=np.int64
+    )
+    gramas = np.array(
+        [
+            np.nan if (valor := tabela.gramas(indice if indice >= 0 else None, item["valor"], item["unidade"])) is None else valor
+            for item, indice in zip(todos, indices)
+        ],
+        dtype=np.float64,
+    )
+
+    por_item = tabela.calcular(indices, gramas)
+    por_refeicao = np.zeros((len(refeicoes), len(NUTRIENTES)), dtype=np.float64)
+    np.add.at(por_refeicao, indice_refeicao, por_item)
+
+    associados = (indices >= 0) & ~np.isnan(gramas)
+    faltando = np.zeros(len(refeicoes), dtype=np.int64)
+    np.add.at(faltando, indice_refeicao, (~associados).astype(np.int64))
+
+    for item, indice, grama, nutrientes in zip(todos, indices, gramas, por_item):
+        # Ids provisórios da tabela padrão não existem no banco e não são expostos
+        item["id_alimento"] = int(tabela.ids[indice]) if indice >= 0 and tabela is tabela_composicao else None
+        item["gramas"] = None if np.isnan(grama) else round(float(grama), 1)
+        item["associado"] = bool(indice >= 0 and not np.isnan(grama))
+        item.update({nome: round(float(valor), 1) for nome, valor in zip(NUTRIENTES, nutrientes)})
+
+    return {
+        "itens": itens_por_refeicao,
+        "por_refeicao": [
+            {nome: round(float(valor), 1) for nome, valor in zip(NUTRIENTES, linha)} for linha in por_refeicao
+        ],
+        "total": {nome: round(float(valor), 1) for nome, valor in zip(NUTRIENTES, por_refeicao.sum(axis=0))},
+        "cobertura": [bool(itens) and not falta for itens, falta in zip(itens_por_refeicao, faltando)],
+    }
+
+
+def formatar_alimentos(itens: list[dict]) -> str:
+    """Texto "Nome - Quantidade - Preparo; ..." a partir dos itens estruturados."""
+    return "; ".join(
+        " - ".join(parte for parte in (item["nome"], item["quantidade_texto"], item["preparo"]) if parte)
+        for item in itens
+    )
+
+
+def inserir_alimentos_refeicao(session: Session, id_refeicao: int, itens: list[dict]) -> None:
+    """Grava os alimentos estruturados de uma refeição em TCC.ALIMENTO_REFEICAO (uma única instrução)."""
+    if not itens:
+        return
+    session.execute(
+        text(
+            """
+            INSERT INTO TCC.ALIMENTO_REFEICAO
+                (id_refeicao, ordem, nome, quantidade, preparo, gramas, id_alimento, kcal, proteina, carboidrato, gordura)
+            VALUES
+                (:id_refeicao, :ordem, :nome, :quantidade, :preparo, :gramas, :id_alimento, :kcal, :proteina, :carboidrato, :gordura)
+            """
+        ),
+        [
+            {
+                "id_refeicao": id_refeicao,
+                "ordem": ordem,
+                "nome": item["nome"][:100],
+                "quantidade": item["quantidade_texto"][:50],
+                "preparo": item["preparo"][:100],
+                "gramas": item["gramas"],
+                "id_alimento": item["id_alimento"],
+                "kcal": item["kcal"],
+                "proteina": item["proteina"],
+                "carboidrato": item["carboidrato"],
+                "gordura": item["gordura"],
+            }
+            for ordem, item in enumerate(itens)
+        ],
+    )
+
+
+def popular_tabela_composicao(session: Session) -> None:
+    """Insere os alimentos padrão que ainda não existem na tabela de composição."""
+    session.execute(
+        text(
+            """
+            INSERT IGNORE INTO TCC.ALIMENTO_COMPOSICAO
+                (nome, kcal, proteina, carboidrato, gordura, gramas_unidade, categoria, restricoes)
+            VALUES (:nome, :kcal, :proteina, :carboidrato, :gordura, :gramas_unidade, :categoria, :restricoes)
+            """
+        ),
+        [
+            {
+                "nome": nome, "kcal": kcal, "proteina": proteina, "carboidrato": carboidrato, "gordura": gordura,
+                "gramas_unidade": gramas_unidade, "categoria": categoria, "restricoes": restricoes,
+            }
+            for nome, kcal, proteina, carboidrato, gordura, gramas_unidade, categoria, restricoes in ALIMENTOS_PADRAO
+        ],
+    )
+    session.commit()
+
+
+def carregar_tabela_composicao(session: Session) -> None:
+    linhas = consulta_get(
+        """
+        SELECT id_alimento, nome, kcal, proteina, carboidrato, gordura, gramas_unidade, categoria, restricoes
+        FROM TCC.ALIMENTO_COMPOSICAO
+        """,
+        session,
+    )
+    tabela_composicao.carregar(linhas)
+
+
+def inicializar_tabela_composicao() -> None:
+    """Popula e carrega a tabela de composição de alimentos na inicialização da aplicação."""
+    db_gen = get_db_mysql()
+    session = next(db_gen)
+    try:
+        popular_tabela_composicao(session)
+        carregar_tabela_composicao(session)
+    except Exception as e:
+        print(f"Erro ao carregar tabela de composição de alimentos: {e}")
+    finally:
+        session.close()
@@ -1,15 +1,36 @@
-from fastapi import Depends, HTTPException, Query
+from fastapi import Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+import numpy as np
 
 from src.routers.router import router
 from src.core.database import get_db_mysql
+from src.core.replicas import get_db_leitura
 from src.routers.models.consultas import consulta_get
+from src.routers.models.cache_http import validar_cache
+from src.routers.apis.dieta.alimentos import (
+    tabela_disponivel,
+    tabela_composicao,
+    inserir_alimentos_refeicao,
+    NUTRIENTES,
+)
+from src.routers.apis.dieta.substituicao import (
+    estruturar_refeicao,
+    localizar_alimento,
+    ranquear_substitutos,
+    aplicar_substituto,
+)
+from src.routers.apis.dieta.energia import calcular_metas_lote
+from src.routers.models.anamnesemodel import PostAnamneseDieta
+from pydantic import BaseModel, Field
+from typing import Literal
 
 @router.get("/dietas_usuario")
 def listar_dietas_usuario(
+    request: Request,
+    response: Response,
     id_usuario: int = Query(..., alias="idUsuario", description="ID do usuário"),
-    session: Session = Depends(get_db_mysql)
+    session: Session = Depends(get_db_leitura)
 ):
     """Retorna as dietas associadas a um usuário.
     
@@ -17,8 +38,11 @@ def listar_dietas_usuario(
         id_usuario (int): ID do usuário.
         session (Session): Sessão do banco de dados.
     Returns:
-        dict: Dicionário contendo a lista de dietas do usuário.
+        dict: Dicionário contendo a lista de dietas do usuário (304 se o ETag enviado ainda vale).
     """
+    nao_modificado = validar_cache(request, response, session, "dietas_usuario", {"id_usuario": id_usuario})
+    if nao_modificado:
+        return nao_modificado
     query = """
     SELECT d.id_dieta, d.nome, d.descricao, c.calorias
     FROM TCC.DIETA d
@@ -29,8 +53,10 @@ def listar_dietas_usuario(
 
 @router.get("/refeicoes_dieta")
 def refeicoes_dieta(
+    request: Request,
+    response: Response,
     id_dieta: int = Query(..., alias="idDieta", description="ID da dieta"),
-    session: Session = Depends(get_db_mysql)
+    session: Session = Depends(get_db_leitura)
 ):
     """Retorna as refeições de uma dieta específica.
     
@@ -38,12 +64,173 @@ def refeicoes_dieta(
         id_dieta (int): ID da dieta.
         session (Session): Sessão do banco de dados.
     Returns:
-        dict: Dicionário contendo as refeições da dieta.
+        dict: Dicionário contendo as refeições da dieta (304 se o ETag enviado ainda vale).
     """
+    nao_modificado = validar_cache(request, response, session, "refeicoes_dieta", {"id_dieta": id_dieta})
+    if nao_modificado:
+        return nao_modificado
     query = """
     SELECT r.id_refeicao, r.tipo_refeicao, r.id_dieta, r.calorias, r.alimentos
     FROM TCC.DIETA d
     LEFT JOIN TCC.REFEICOES r ON r.id_dieta = d.id_dieta
     WHERE d.ID_DIETA = :id_dieta;
     """
-    return consulta_get(query, session, {"id_dieta": id_dieta})
\ No newline at end of file
+    return consulta_get(query, session, {"id_dieta": id_dieta})
+
+@router.get("/dieta/nutrientes")
+def nutrientes_dieta(
+    id_dieta: int = Query(..., alias="idDieta", description="ID da dieta"),
+    session: Session = Depends(get_db_leitura)
+):
+    """Retorna kcal e macronutrientes por refeição e da dieta inteira,
+    calculados a partir dos alimentos estruturados e da tabela de composição.
+
+    Args:
+        id_dieta (int): ID da dieta.
+        session (Session): Sessão do banco de dados.
+    Returns:
+        dict: Nutrientes por refeição, total da dieta e alimentos não reconhecidos.
+    """
+    query = """
+    SELECT r.id_refeicao, r.tipo_refeicao, r.calorias, a.nome, a.gramas, a.id_alimento
+    FROM TCC.REFEICOES r
+    LEFT JOIN TCC.ALIMENTO_REFEICAO a ON a.id_refeicao = r.id_refeicao
+    WHERE r.id_dieta = :id_dieta
+    ORDER BY r.id_refeicao, a.ordem;
+    """
+    linhas = consulta_get(query, session, {"id_dieta": id_dieta})
+    if not linhas:
+        raise HTTPException(status_code=404, detail="Dieta não encontrada ou sem refeições")
+
+    tabela = tabela_disponivel()
+    refeicoes, posicao_refeicao = np.unique(
+        np.array([linha["id_refeicao"] for linha in linhas], dtype=np.int64), return_inverse=True
+    )
+    indices = np.array(
+        [tabela.por_id.get(linha["id_alimento"], -1) if linha["id_alimento"] is not None else -1 for linha in linhas],
+        dtype=np.int64,
+    )
+    gramas = np.array(
+        [np.nan if linha["gramas"] is None else float(linha["gramas"]) for linha in linhas], dtype=np.float64
+    )
+
+    por_refeicao = np.zeros((len(refeicoes), len(NUTRIENTES)), dtype=np.float64)
+    np.add.at(por_refeicao, posicao_refeicao, tabela.calcular(indices, gramas))
+
+    dados_refeicao = {linha["id_refeicao"]: linha for linha in linhas}
+    return {
+        "refeicoes": [
+            {
+                "id_refeicao": int(id_refeicao),
+                "tipo_refeicao": dados_refeicao[id_refeicao]["tipo_refeicao"],
+                "calorias": dados_refeicao[id_refeicao]["calorias"],
+                **{nome: round(float(valor), 1) for nome, valor in zip(NUTRIENTES, linha)},
+            }
+            for id_refeicao, linha in zip(refeicoes, por_refeicao)
+        ],
+        "total": {nome: round(float(valor), 1) for nome, valor in zip(NUTRIENTES, por_refeicao.sum(axis=0))},
+        "naoReconhecidos": [
+            linha["nome"] for linha, indice in zip(linhas, indices) if linha["nome"] is not None and indice < 0
+        ],
+    }
+
+
+class SubstituicaoAlimentoPayload(BaseModel):
+    id_refeicao: int = Field(..., alias="idRefeicao")
+    alimento: str
+    id_substituto: int | None = Field(None, alias="idSubstituto")
+    alimentos_nao_gosta: str | None = None
+    tipo_alimentacao: str | None = None
+    alergias: str | None = None
+    aplicar: bool = False
+    limite: int = Field(5, ge=1, le=20)
+
+
+@router.post("/dieta/refeicoes/substituir")
+def substituir_alimento(payload: SubstituicaoAlimentoPayload, session: Session = Depends(get_db_mysql)):
+    """Substitui um alimento de uma refeição gravada sem chamar a IA, mantendo as calorias.
+
+    Args:
+        payload (SubstituicaoAlimentoPayload): Refeição, alimento, restrições e substituto escolhido (opcional).
+        session (Session): Sessão do banco de dados.
+    Returns:
+        dict: Alternativas ranqueadas e a refeição com a troca (gravada quando "aplicar" é verdadeiro).
+    """
+    query = """
+    SELECT id_refeicao, tipo_refeicao, calorias, alimentos
+    FROM TCC.REFEICOES
+    WHERE id_refeicao = :id_refeicao;
+    """
+    linhas = consulta_get(query, session, {"id_refeicao": payload.id_refeicao})
+    if not linhas:
+        raise HTTPException(status_code=404, detail="Refeição não encontrada")
+    refeicao = linhas[0]
+
+    tabela = tabela_disponivel()
+    itens = estruturar_refeicao(refeicao, tabela)
+    posicao = localizar_alimento(itens, payload.alimento)
+    substitutos = ranquear_substitutos(
+        tabela,
+        itens,
+        posicao,
+        payload.alimentos_nao_gosta,
+        payload.tipo_alimentacao,
+        payload.alergias,
+        limite=len(tabela) if payload.id_substituto is not None else payload.limite,
+    )
+    if payload.id_substituto is not None:
+        escolhido = next((item for item in substitutos if item["id_alimento"] == payload.id_substituto), None)
+        if escolhido is None:
+            raise HTTPException(status_code=400, detail="Substituto informado não é compatível com as restrições")
+        substitutos = [escolhido]
+    if not substitutos:
+        raise HTTPException(status_code=404, detail="Nenhum alimento substituto compatível encontrado")
+
+    nova_refeicao, novos_itens = aplicar_substituto(refeicao, itens, posicao, substitutos[0])
+
+    if payload.aplicar:
+        try:
+            session.execute(text("""
+            UPDATE TCC.REFEICOES SET alimentos = :alimentos, calorias = :calorias
+            WHERE id_refeicao = :id_refeicao;
+            """), {
+                "alimentos": nova_refeicao["alimentos"],
+                "calorias": nova_refeicao["calorias"],
+                "id_refeicao": payload.id_refeicao,
+            })
+            session.execute(
+                text("DELETE FROM TCC.ALIMENTO_REFEICAO WHERE id_refeicao = :id_refeicao;"),
+                {"id_refeicao": payload.id_refeicao},
+            )
+            inserir_alimentos_refeicao(
+                session,
+                payload.id_refeicao,
+                [item if tabela is tabela_composicao else {**item, "id_alimento": None} for item in novos_itens],
+            )
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            raise HTTPException(status_code=500, detail=f"Erro ao salvar substituição: {exc}") from exc
+
+    return {
+        "original": itens[posicao],
+        "substitutos": substitutos,
+        "refeicao": nova_refeicao,
+        "aplicado": payload.aplicar,
+    }
+
+
+@router.post("/dieta/metas")
+def metas_caloricas(
+    anamneses: list[PostAnamneseDieta],
+    formula: Literal["mifflin", "harris"] = Query("mifflin", description="Equação da TMB"),
+):
+    """Calcula as metas calóricas (TMB, total diário, macros e calorias por refeição) de uma ou várias anamneses.
+
+    Args:
+        anamneses (list[PostAnamneseDieta]): Anamneses de dieta.
+        formula (str): "mifflin" (Mifflin-St Jeor) ou "harris" (Harris-Benedict).
+    Returns:
+        list: Metas de cada anamnese, na ordem recebida.
+    """
+    return calcular_metas_lote(anamneses, formula)
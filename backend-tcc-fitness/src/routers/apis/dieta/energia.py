@@ -0,0 +1,236 @@
+from typing import Literal
+import numpy as np
+import re
+
+from src.routers.models.anamnesemodel import PostAnamneseDieta
+from src.routers.apis.treino.catalogo import normalizar_nome
+from src.routers.apis.gpt.validacao import total_calorico_descricao
+
+
+# Fator de atividade pela avaliação da rotina (texto livre), do mais ao menos específico
+FATORES_ATIVIDADE = (
+    (("muito ativ", "atleta", "intens"), 1.725),
+    (("sedentar", "inativ", "parad"), 1.2),
+    (("leve", "pouco ativ"), 1.375),
+    (("ativ", "moderad"), 1.55),
+)
+FATOR_ATIVIDADE_PADRAO = 1.375
+
+OBJETIVOS = (
+    (("emagrec", "perd", "defini", "secar", "reduz"), "emagrecimento"),
+    (("ganh", "massa", "hipertrof", "muscul"), "ganho"),
+    (("manut", "manter"), "manutencao"),
+)
+
+# Ajuste por objetivo: déficit limitado a 20% do gasto total, superávit fixo
+DEFICIT_KCAL = 500
+DEFICIT_MAXIMO = 0.20
+SUPERAVIT_KCAL = 300
+
+# Calorias mínimas por sexo (mulher, homem)
+PISO_CALORICO = {"f": 1200, "m": 1500}
+
+# Proteína (g por kg de peso atual) por objetivo e fração das calorias vinda de gordura
+PROTEINA_G_KG = {"emagrecimento": 2.0, "ganho": 1.8, "manutencao": 1.6}
+FRACAO_GORDURA = 0.25
+
+# Peso relativo de cada refeição na distribuição das calorias (percentuais do PROMPT_TEMPLATE)
+PESO_REFEICAO = {"Café da manhã": 0.22, "Lanche": 0.12, "Almoço": 0.33, "Jantar": 0.27, "Ceia": 0.07}
+
+# Refeições por quantidade informada, em ordem cronológica
+REFEICOES_POR_QUANTIDADE = {
+    1: ["Almoço"],
+    2: ["Almoço", "Jantar"],
+    3: ["Café da manhã", "Almoço", "Jantar"],
+    4: ["Café da manhã", "Almoço", "Lanche", "Jantar"],
+    5: ["Café da manhã", "Lanche", "Almoço", "Lanche", "Jantar"],
+    6: ["Café da manhã", "Lanche", "Almoço", "Lanche", "Jantar", "Ceia"],
+}
+MAXIMO_REFEICOES = max(REFEICOES_POR_QUANTIDADE)
+
+
+def interpretar_sexo(sexo: str) -> str:
+    """"m", "f" ou "" quando não informado."""
+    normalizado = normalizar_nome(sexo)
+    if normalizado.startswith(("f", "mulher")):
+        return "f"
+    if normalizado.startswith(("m", "homem")):
+        return "m"
+    return ""
+
+
+def interpretar_objetivo(anamnese: PostAnamneseDieta) -> str:
+    texto = normalizar_nome(anamnese.objetivo)
+    for termos, objetivo in OBJETIVOS:
+        if any(termo in texto for termo in termos):
+            return objetivo
+    # Objetivo em texto livre não reconhecido: usa a diferença entre peso desejado e atual
+    diferenca = anamnese.pesodesejado - anamnese.pesoatual
+    if diferenca <= -1:
+        return "emagrecimento"
+    if diferenca >= 1:
+        return "ganho"
+    return "manutencao"
+
+
+def interpretar_fator_atividade(avalicao_rotina: str) -> float:
+    texto = normalizar_nome(avalicao_rotina)
+    for termos, fator in FATORES_ATIVIDADE:
+        if any(termo in texto for termo in termos):
+            return fator
+    return FATOR_ATIVIDADE_PADRAO
+
+
+def refeicoes_do_dia(qtd_refeicoes: int) -> list[str]:
+    return REFEICOES_POR_QUANTIDADE[max(1, min(qtd_refeicoes or 3, MAXIMO_REFEICOES))]
+
+
+def calcular_metas_lote(
+    anamneses: list[PostAnamneseDieta],
+    formula: Literal["mifflin", "harris"] = "mifflin",
+) -> list[dict]:
+    """
+    Calcula TMB, gasto total, calorias diárias, macros e calorias por refeição
+    de várias anamneses de uma vez, com as contas feitas em vetores NumPy.
+    Args:
+        anamneses (list): Anamneses de dieta.
+        formula (str): "mifflin" (Mifflin-St Jeor) ou "harris" (Harris-Benedict revisada).
+    Returns:
+        list: Metas de cada anamnese, na mesma ordem. A soma das refeições é igual ao total diário.
+    """
+    if not anamneses:
+        return []
+
+    sexos = [interpretar_sexo(anamnese.sexo) for anamnese in anamneses]
+    objetivos = [interpretar_objetivo(anamnese) for anamnese in anamneses]
+    peso = np.array([anamnese.pesoatual for anamnese in anamneses], dtype=np.float64)
+    altura = np.array([anamnese.altura for anamnese in anamneses], dtype=np.float64)
+    # Altura informada em metros na anamnese; valores acima de 3 já estão em centímetros
+    altura_cm = np.where(altura <= 3, altura * 100, altura)
+    idade = np.array([anamnese.idade for anamnese in anamneses], dtype=np.float64)
+    masculino = np.array([sexo == "m" for sexo in sexos], dtype=np.float64)
+    # Sexo não informado usa a média das duas equações
+    peso_sexo = np.where([sexo == "" for sexo in sexos], 0.5, masculino)
+
+    if formula == "harris":
+        tmb_m = 88.362 + 13.397 * peso + 4.799 * altura_cm - 5.677 * idade
+        tmb_f = 447.593 + 9.247 * peso + 3.098 * altura_cm - 4.330 * idade
+    else:
+        tmb_m = 10 * peso + 6.25 * altura_cm - 5 * idade + 5
+        tmb_f = 10 * peso + 6.25 * altura_cm - 5 * idade - 161
+    tmb = peso_sexo * tmb_m + (1 - peso_sexo) * tmb_f
+
+    fator = np.array([interpretar_fator_atividade(anamnese.avalicao_rotina) for anamnese in anamneses])
+    gasto_total = tmb * fator
+
+    emagrecimento = np.array([objetivo == "emagrecimento" for objetivo in objetivos])
+    ganho = np.array([objetivo == "ganho" for objetivo in objetivos])
+    ajuste = np.where(emagrecimento, -np.minimum(DEFICIT_KCAL, gasto_total * DEFICIT_MAXIMO), 0.0)
+    ajuste = np.where(ganho, SUPERAVIT_KCAL, ajuste)
+
+    piso = np.array([PISO_CALORICO["f"] if sexo == "f" else PISO_CALORICO["m"] for sexo in sexos], dtype=np.float64)
+    calorias = np.maximum(gasto_total + ajuste, np.maximum(tmb, piso))
+    calorias = (np.round(calorias / 10) * 10).astype(np.int64)
+
+    proteina = peso * np.array([PROTEINA_G_KG[objetivo] for objetivo in objetivos])
+    gordura = calorias * FRACAO_GORDURA / 9
+    carboidrato = np.maximum(calorias - proteina * 4 - gordura * 9, 0) / 4
+
+    # Distribuição por refeição: pesos normalizados por linha, arredondados sem perder calorias
+    tipos = [refeicoes_do_dia(anamnese.qtd_refeicoes) for anamnese in anamneses]
+    pesos = np.zeros((len(anamneses), MAXIMO_REFEICOES), dtype=np.float64)
+    for linha, refeicoes in enumerate(tipos):
+        pesos[linha, :len(refeicoes)] = [PESO_REFEICAO[tipo] for tipo in refeicoes]
+    pesos /= pesos.sum(axis=1, keepdims=True)
+    por_refeicao = np.floor(pesos * calorias[:, None]).astype(np.int64)
+    maior = np.argmax(pesos, axis=1)
+    por_refeicao[np.arange(len(anamneses)), maior] += calorias - por_refeicao.sum(axis=1)
+
+    return [
+        {
+            "formula": formula,
+            "tmb": int(round(tmb[linha])),
+            "fator_atividade": float(fator[linha]),
+            "gasto_total": int(round(gasto_total[linha])),
+            "objetivo": objetivos[linha],
+            "ajuste": int(round(ajuste[linha])),
+            "calorias_diarias": int(calorias[linha]),
+            "macros": {
+                "proteina_g": int(round(proteina[linha])),
+                "carboidrato_g": int(round(carboidrato[linha])),
+                "gordura_g": int(round(gordura[linha])),
+            },
+            "refeicoes": [
+                {"tipoRefeicao": tipo, "calorias": int(por_refeicao[linha, posicao])}
+                for posicao, tipo in enumerate(tipos[linha])
+            ],
+        }
+        for linha in range(len(anamneses))
+    ]
+
+
+def calcular_metas(anamnese: PostAnamneseDieta, formula: Literal["mifflin", "harris"] = "mifflin") -> dict:
+    return calcular_metas_lote([anamnese], formula)[0]
+
+
+def formatar_metas(metas: dict) -> str:
+    """Texto das metas para o prompt da dieta."""
+    refeicoes = "\n".join(
+        f"  {posicao}. {refeicao['tipoRefeicao']}: {refeicao['calorias']} kcal"
+        for posicao, refeicao in enumerate(metas["refeicoes"], start=1)
+    )
+    macros = metas["macros"]
+    return (
+        f"TMB: {metas['tmb']} kcal | Gasto total (fator {metas['fator_atividade']}): {metas['gasto_total']} kcal\n"
+        f"Objetivo: {metas['objetivo']} (ajuste de {metas['ajuste']:+d} kcal)\n"
+        f"TOTAL CALÓRICO DIÁRIO: {metas['calorias_diarias']} kcal\n"
+        f"Macros: proteína {macros['proteina_g']} g, carboidrato {macros['carboidrato_g']} g, gordura {macros['gordura_g']} g\n"
+        f"Refeições (nesta ordem, com estas calorias):\n{refeicoes}"
+    )
+
+
+def aplicar_metas(plano: dict, metas: dict) -> list[str]:
+    """
+    Fixa no plano gerado as calorias calculadas pelo sistema: cada refeição recebe a meta
+    da sua posição e a descrição passa a citar o total diário calculado.
+    Returns:
+        list: Ajustes feitos (vazia quando o plano já seguia as metas).
+    """
+    ajustes = []
+    refeicoes = plano.get("refeicoes") or []
+    if len(refeicoes) == len(metas["refeicoes"]):
+        for refeicao, meta in zip(refeicoes, metas["refeicoes"]):
+            if refeicao.get("calorias") != meta["calorias"]:
+                refeicao["calorias"] = meta["calorias"]
+                ajustes.append(f"calorias:{meta['tipoRefeicao']}")
+
+    if atualizar_total_descricao(plano):
+        ajustes.append("descricao:total")
+    return ajustes
+
+
+def atualizar_total_descricao(plano: dict) -> bool:
+    """
+    Faz a descrição da dieta citar a soma das calorias das refeições.
+    Returns:
+        bool: True se a descrição foi alterada.
+    """
+    refeicoes = plano.get("refeicoes") or []
+    total = sum(refeicao.get("calorias") or 0 for refeicao in refeicoes)
+    descricao = str(plano.get("descricao") or "")
+    citado = total_calorico_descricao(descricao)
+    if citado == total:
+        return False
+    if citado is None:
+        plano["descricao"] = f"{descricao.rstrip()} Total calórico diário: {total} kcal.".strip()
+    else:
+        plano["descricao"] = re.sub(
+            r"(\d{1,2}[.\s]?\d{3}|\d{3,4})(\s*(?:kcal|calorias))",
+            lambda achado: (
+                f"{total}{achado.group(2)}"
+                if int(re.sub(r"[.\s]", "", achado.group(1))) == citado else achado.group(0)
+            ),
+            descricao,
+            flags=re.IGNORECASE,
+        )
+    return True
@@ -0,0 +1,169 @@
+from fastapi import HTTPException
+import copy
+
+from src.routers.apis.dieta.alimentos import (
+    TabelaComposicao,
+    estruturar_refeicoes,
+    formatar_alimentos,
+    chave_alimento,
+    NUTRIENTES,
+)
+from src.routers.apis.treino.catalogo import termos_excluidos, normalizar_nome
+
+
+# Restrições da tabela de composição excluídas por tipo de alimentação (texto livre da anamnese)
+RESTRICOES_POR_TIPO = (
+    (("vegan",), {"carne", "peixe", "frutos_mar", "ovo", "leite", "mel"}),
+    (("vegetarian", "ovolacto"), {"carne", "peixe", "frutos_mar"}),
+    (("pescetarian", "pescatarian"), {"carne"}),
+    (("lactose",), {"leite"}),
+    (("gluten", "celiac"), {"gluten"}),
+)
+
+# Termos de alergias/intolerâncias e as restrições correspondentes
+RESTRICOES_POR_ALERGIA = (
+    (("amendoim", "amendoins"), "amendoim"),
+    (("castanha", "noz", "nozes", "amendoa", "caju"), "castanha"),
+    (("leite", "lactose", "laticinio", "caseina"), "leite"),
+    (("ovo",), "ovo"),
+    (("gluten", "trigo", "celiac"), "gluten"),
+    (("soja",), "soja"),
+    (("peixe",), "peixe"),
+    (("camarao", "camaroes", "frutos mar", "crustaceo", "marisco"), "frutos_mar"),
+    (("mel",), "mel"),
+)
+
+# Porções reescaladas são arredondadas para múltiplos deste valor (g)
+ARREDONDAMENTO_GRAMAS = 5
+
+
+def _cita_termo(palavras: list[str], termo: str) -> bool:
+    # Palavras inteiras, aceitando o plural regular: "ovos" cita "ovo", mas "novo" não; "melao" não cita "mel"
+    partes = termo.split()
+    return any(
+        all(palavra in (parte, parte + "s", parte + "es") for palavra, parte in zip(palavras[inicio:], partes))
+        for inicio in range(len(palavras) - len(partes) + 1)
+    )
+
+
+def restricoes_excluidas(tipo_alimentacao: str | None, alergias: str | None) -> set[str]:
+    """Restrições da tabela de composição proibidas pelo tipo de alimentação e pelas alergias."""
+    excluidas = set()
+    tipo = normalizar_nome(tipo_alimentacao or "")
+    for termos, restricoes in RESTRICOES_POR_TIPO:
+        if any(termo in tipo for termo in termos):
+            excluidas |= restricoes
+    palavras = normalizar_nome(alergias or "").split()
+    for termos, restricao in RESTRICOES_POR_ALERGIA:
+        if any(_cita_termo(palavras, termo) for termo in termos):
+            excluidas.add(restricao)
+    return excluidas
+
+
+def localizar_alimento(itens: list[dict], alimento: str) -> int:
+    """Posição do alimento na refeição, pelo nome exato ou pelo primeiro que o contém."""
+    chave = chave_alimento(alimento)
+    chaves = [chave_alimento(item["nome"]) for item in itens]
+    if chave in chaves:
+        return chaves.index(chave)
+    for posicao, nome in enumerate(chaves):
+        if chave and (chave in nome or nome in chave):
+            return posicao
+    raise HTTPException(status_code=404, detail="Alimento informado não existe na refeição")
+
+
+def ranquear_substitutos(
+    tabela: TabelaComposicao,
+    itens: list[dict],
+    posicao: int,
+    alimentos_nao_gosta: str | None = None,
+    tipo_alimentacao: str | None = None,
+    alergias: str | None = None,
+    limite: int = 5,
+) -> list[dict]:
+    """
+    Lista alimentos equivalentes ao da posição informada, usando o índice de vizinhos
+    pré-calculado da tabela de composição e reescalando a porção para manter as calorias.
+    Args:
+        tabela (TabelaComposicao): Tabela de composição carregada.
+        itens (list): Alimentos estruturados da refeição (estruturar_refeicoes).
+        posicao (int): Posição do alimento a ser trocado.
+        alimentos_nao_gosta, tipo_alimentacao, alergias (str | None): Restrições em texto livre da anamnese.
+        limite (int): Quantidade máxima de alternativas.
+    Returns:
+        list: Substitutos do mais para o menos equivalente, com porção e nutrientes já reescalados.
+    """
+    original = itens[posicao]
+    indice = tabela.associar(original["nome"], original["preparo"])
+    if indice is None or not original["gramas"] or not original["kcal"]:
+        raise HTTPException(status_code=400, detail="Alimento não reconhecido na tabela de composição")
+
+    excluidas = restricoes_excluidas(tipo_alimentacao, alergias)
+    nao_gosta = termos_excluidos(alimentos_nao_gosta)
+    na_refeicao = {tabela.associar(item["nome"], item["preparo"]) for item in itens}
+
+    substitutos = []
+    for vizinho in tabela.vizinhos[indice]:
+        vizinho = int(vizinho)
+        if vizinho == indice or vizinho in na_refeicao or tabela.restricoes[vizinho] & excluidas:
+            continue
+        nome_normalizado = normalizar_nome(tabela.nomes[vizinho])
+        if any(termo in nome_normalizado for termo in nao_gosta):
+            continue
+
+        kcal_100g = tabela.nutrientes[vizinho, 0]
+        # Sem calorias (água, chá, refrigerante zero) não há porção que reponha as do original
+        if kcal_100g <= 0:
+            continue
+        gramas = max(
+            ARREDONDAMENTO_GRAMAS,
+            round(original["kcal"] / kcal_100g * 100 / ARREDONDAMENTO_GRAMAS) * ARREDONDAMENTO_GRAMAS,
+        )
+        nutrientes = tabela.nutrientes[vizinho] * gramas / 100.0
+        substitutos.append({
+            "id_alimento": int(tabela.ids[vizinho]),
+            "nome": tabela.nomes[vizinho],
+            "categoria": tabela.categorias[vizinho],
+            "gramas": float(gramas),
+            "distancia": round(float(tabela.distancias[indice, vizinho]), 3),
+            **{nome: round(float(valor), 1) for nome, valor in zip(NUTRIENTES, nutrientes)},
+        })
+        if len(substitutos) >= limite:
+            break
+    return substitutos
+
+
+def aplicar_substituto(refeicao: dict, itens: list[dict], posicao: int, substituto: dict) -> tuple[dict, list[dict]]:
+    """
+    Troca o alimento pela porção reescalada do substituto e recalcula as calorias da refeição.
+    Returns:
+        tuple: (refeição com alimentos e calorias atualizados, novos itens estruturados).
+    """
+    novos_itens = copy.deepcopy(itens)
+    original = novos_itens[posicao]
+    novos_itens[posicao] = {
+        **original,
+        "nome": substituto["nome"],
+        "quantidade_texto": f"{substituto['gramas']:.0f} g",
+        "valor": substituto["gramas"],
+        "unidade": "g",
+        "gramas": substituto["gramas"],
+        "id_alimento": substituto["id_alimento"],
+        **{nome: substituto[nome] for nome in NUTRIENTES},
+    }
+
+    nova_refeicao = {**refeicao, "alimentos": formatar_alimentos(novos_itens)}
+    nova_refeicao["calorias"] = max(
+        0, round((refeicao.get("calorias") or 0) - original["kcal"] + substituto["kcal"])
+    )
+    return nova_refeicao, novos_itens
+
+
+def estruturar_refeicao(refeicao: dict, tabela: TabelaComposicao) -> list[dict]:
+    """Itens estruturados de uma refeição gravada em TCC.REFEICOES."""
+    itens = estruturar_refeicoes(
+        [{"alimentos": refeicao.get("alimentos") or "", "calorias": refeicao.get("calorias")}], tabela
+    )["itens"][0]
+    if not itens:
+        raise HTTPException(status_code=400, detail="Refeição sem alimentos no formato esperado")
+    return itens
@@ -0,0 +1,225 @@
+from fastapi import HTTPException
+from typing import Any, Callable, Literal
+import copy
+import time
+
+from src.core.config import SettingsGPT
+from src.routers.apis.gpt.funcs_gpt import gpt_response
+from src.routers.apis.gpt.validacao import (
+    REPROMPT_SUFFIX_TEMPLATE,
+    validar_plano_treino,
+    validar_plano_dieta,
+    reparar_plano_treino,
+    reparar_plano_dieta,
+)
+
+
+CAMPOS_EXERCICIO = {"nomeExercicio", "equipamento", "grupoMuscular", "idExercicio", "series", "repeticoes", "descansoSegundos"}
+CAMPOS_TREINO = {"nome", "descricao", "duracaoMinutos", "dificuldade"}
+CAMPOS_PROGRAMA = {"nomePrograma", "descricaoPrograma"}
+CAMPOS_REFEICAO = {"calorias", "alimentos", "tipoRefeicao"}
+CAMPOS_DIETA = {"nome", "descricao"}
+
+
+def _operacao_invalida(detalhe: str) -> HTTPException:
+    return HTTPException(status_code=502, detail=f"Operação de ajuste inválida retornada pela IA: {detalhe}")
+
+
+def _indice(operacao: dict, chave: str, lista: list) -> int:
+    try:
+        indice = int(operacao.get(chave))
+    except (TypeError, ValueError):
+        raise _operacao_invalida(f"'{chave}' ausente ou não numérico")
+    if indice < 0 or indice >= len(lista):
+        raise _operacao_invalida(f"'{chave}' fora do intervalo ({indice})")
+    return indice
+
+
+def _objeto(operacao: dict, chave: str) -> dict:
+    valor = operacao.get(chave)
+    if not isinstance(valor, dict) or not valor:
+        raise _operacao_invalida(f"'{chave}' deve ser um objeto não vazio")
+    return valor
+
+
+def _campos(operacao: dict, permitidos: set[str]) -> dict:
+    campos = _objeto(operacao, "campos")
+    desconhecidos = set(campos) - permitidos
+    if desconhecidos:
+        raise _operacao_invalida(f"campos não permitidos {sorted(desconhecidos)}")
+    return campos
+
+
+def _estrutura_invalida() -> HTTPException:
+    return HTTPException(status_code=400, detail="Estrutura do plano atual inválida")
+
+
+def _lista_de_objetos(valor: Any) -> list[dict]:
+    if not isinstance(valor, list) or not all(isinstance(item, dict) for item in valor):
+        raise _estrutura_invalida()
+    return valor
+
+
+def _validar_resultado(validar: Callable[[dict], None], plano: dict) -> None:
+    # O plano atual veio do cliente, mas o resultado inválido é consequência das operações da IA
+    try:
+        validar(plano)
+    except HTTPException as exc:
+        raise _operacao_invalida(f"o plano resultante é inválido ({exc.detail})") from exc
+
+
+def _listar_operacoes(operacoes: Any) -> list[dict]:
+    if not isinstance(operacoes, list):
+        raise _operacao_invalida("'operacoes' deve ser uma lista")
+    for operacao in operacoes:
+        if not isinstance(operacao, dict) or not operacao.get("op"):
+            raise _operacao_invalida("cada operação deve ter o campo 'op'")
+    return operacoes
+
+
+def aplicar_operacoes_treino(plano_atual: dict, operacoes: Any) -> dict:
+    """
+    Aplica uma lista de operações de edição ao plano de treino atual e valida o resultado.
+    Args:
+        plano_atual (dict): Plano de treino atual ({"programaTreino", "treinos"}).
+        operacoes (list): Operações retornadas pela IA, aplicadas na ordem recebida.
+    Returns:
+        dict: Novo plano de treino, já reparado e validado com as regras de persistência.
+    """
+    if not isinstance(plano_atual, dict):
+        raise _estrutura_invalida()
+    plano = copy.deepcopy(plano_atual)
+    treinos = _lista_de_objetos(plano.get("treinos"))
+    for treino in treinos:
+        _lista_de_objetos(treino.setdefault("exercicios", []))
+    if not isinstance(plano.get("programaTreino", {}), dict):
+        raise _estrutura_invalida()
+
+    for operacao in _listar_operacoes(operacoes):
+        op = operacao["op"]
+
+        if op == "alterar_programa":
+            plano.setdefault("programaTreino", {}).update(_campos(operacao, CAMPOS_PROGRAMA))
+
+        elif op == "adicionar_treino":
+            treino = copy.deepcopy(_objeto(operacao, "valor"))
+            if not isinstance(treino.setdefault("exercicios", []), list):
+                raise _operacao_invalida("'exercicios' do treino adicionado deve ser uma lista")
+            if "idUsuario" not in treino and treinos:
+                treino["idUsuario"] = treinos[0].get("idUsuario")
+            treinos.append(treino)
+
+        elif op == "remover_treino":
+            treinos.pop(_indice(operacao, "treino", treinos))
+
+        elif op == "alterar_treino":
+            treino = treinos[_indice(operacao, "treino", treinos)]
+            treino.update(_campos(operacao, CAMPOS_TREINO))
+
+        elif op in ("substituir_exercicio", "alterar_exercicio", "adicionar_exercicio", "remover_exercicio"):
+            treino = treinos[_indice(operacao, "treino", treinos)]
+            exercicios = treino["exercicios"]
+
+            if op == "adicionar_exercicio":
+                exercicios.append(dict(_objeto(operacao, "valor")))
+                continue
+
+            indice = _indice(operacao, "exercicio", exercicios)
+            if op == "remover_exercicio":
+                exercicios.pop(indice)
+            elif op == "alterar_exercicio":
+                exercicios[indice].update(_campos(operacao, CAMPOS_EXERCICIO))
+            else:
+                # Substituição parcial herda os campos não informados do exercício original
+                novo = {**exercicios[indice], **_objeto(operacao, "valor")}
+                exercicios[indice] = novo
+
+        else:
+            raise _operacao_invalida(f"operação desconhecida '{op}'")
+
+    plano, _ = reparar_plano_treino(plano)
+    _validar_resultado(validar_plano_treino, plano)
+    return plano
+
+
+def aplicar_operacoes_dieta(plano_atual: dict, operacoes: Any) -> dict:
+    """
+    Aplica uma lista de operações de edição ao plano de dieta atual e valida o resultado.
+    Args:
+        plano_atual (dict): Plano de dieta atual ({"nome", "descricao", "usuario", "refeicoes"}).
+        operacoes (list): Operações retornadas pela IA, aplicadas na ordem recebida.
+    Returns:
+        dict: Novo plano de dieta, já reparado e validado.
+    """
+    if not isinstance(plano_atual, dict):
+        raise _estrutura_invalida()
+    plano = copy.deepcopy(plano_atual)
+    refeicoes = _lista_de_objetos(plano.get("refeicoes"))
+
+    for operacao in _listar_operacoes(operacoes):
+        op = operacao["op"]
+
+        if op == "alterar_dieta":
+            plano.update(_campos(operacao, CAMPOS_DIETA))
+
+        elif op == "adicionar_refeicao":
+            refeicao = dict(_objeto(operacao, "valor"))
+            posicao = operacao.get("posicao")
+            if isinstance(posicao, int) and 0 <= posicao <= len(refeicoes):
+                refeicoes.insert(posicao, refeicao)
+            else:
+                refeicoes.append(refeicao)
+
+        elif op == "remover_refeicao":
+            refeicoes.pop(_indice(operacao, "refeicao", refeicoes))
+
+        elif op == "alterar_refeicao":
+            refeicoes[_indice(operacao, "refeicao", refeicoes)].update(_campos(operacao, CAMPOS_REFEICAO))
+
+        elif op == "substituir_refeicao":
+            indice = _indice(operacao, "refeicao", refeicoes)
+            refeicoes[indice] = {**refeicoes[indice], **_objeto(operacao, "valor")}
+
+        else:
+            raise _operacao_invalida(f"operação desconhecida '{op}'")
+
+    plano, _ = reparar_plano_dieta(plano)
+    _validar_resultado(validar_plano_dieta, plano)
+    return plano
+
+
+def ajustar_por_operacoes(
+    prompt: str,
+    tipo: Literal["treino", "dieta"],
+    plano_atual: dict,
+    usuario_id: int | None = None,
+    max_tentativas: int = 2,
+) -> tuple[dict, list[dict]]:
+    """
+    Pede as operações de ajuste à IA e as aplica ao plano atual. Operações inválidas ou que produzem
+    um plano inválido geram nova chamada com os motivos, como em gerar_plano_validado.
+    Args:
+        prompt (str): Prompt de ajuste por operações.
+        tipo (str): "treino" ou "dieta".
+        plano_atual (dict): Plano enviado pelo cliente.
+        usuario_id (int | None): ID do usuário da anamnese.
+        max_tentativas (int): Número máximo de chamadas à IA.
+    Returns:
+        tuple[dict, list[dict]]: Plano ajustado e validado e as operações aplicadas.
+    """
+    aplicar = aplicar_operacoes_treino if tipo == "treino" else aplicar_operacoes_dieta
+    limite = time.monotonic() + SettingsGPT().GPT_PRAZO_SEGUNDOS
+    prompt_atual = prompt
+    for tentativa in range(max_tentativas):
+        resposta = gpt_response(
+            prompt_atual, rota=f"patch_{tipo}", prazo=limite - time.monotonic(), usuario_id=usuario_id
+        )
+        operacoes = resposta.get("operacoes")
+        try:
+            return aplicar(plano_atual, operacoes), operacoes
+        except HTTPException as exc:
+            # 400 é erro no plano do cliente: repetir a chamada não resolve
+            if exc.status_code != 502 or tentativa == max_tentativas - 1:
+                raise
+            prompt_atual = prompt + REPROMPT_SUFFIX_TEMPLATE.format(violacoes=f"- {exc.detail}")
+    raise HTTPException(status_code=502, detail="Ajuste da IA inválido")
@@ -0,0 +1,88 @@
+from collections import deque
+from threading import Lock
+import time
+
+from src.core.config import SettingsGPT
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker das chamadas ao modelo.
+    Abre quando a fração de falhas (erros ou respostas acima da latência limite) na janela
+    recente ultrapassa o limiar; depois do tempo de espera libera uma chamada de teste (meio-aberto).
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio-aberto"
+
+    def __init__(
+        self,
+        janela: int,
+        min_chamadas: int,
+        taxa_falha: float,
+        latencia_limite: float,
+        tempo_aberto: float,
+    ):
+        self.min_chamadas = min_chamadas
+        self.taxa_falha = taxa_falha
+        self.latencia_limite = latencia_limite
+        self.tempo_aberto = tempo_aberto
+        self._resultados: deque[bool] = deque(maxlen=janela)
+        self._estado = self.FECHADO
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._lock = Lock()
+
+    def permite_chamada(self) -> bool:
+        with self._lock:
+            if self._estado == self.FECHADO:
+                return True
+            if self._estado == self.ABERTO and time.monotonic() - self._aberto_em >= self.tempo_aberto:
+                self._estado = self.MEIO_ABERTO
+            if self._estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+            return False
+
+    def registrar(self, sucesso: bool, latencia: float) -> None:
+        falha = not sucesso or latencia > self.latencia_limite
+        with self._lock:
+            if self._estado == self.MEIO_ABERTO:
+                self._teste_em_andamento = False
+                if falha:
+                    self._abrir()
+                else:
+                    self._estado = self.FECHADO
+                    self._resultados.clear()
+                return
+
+            self._resultados.append(falha)
+            total = len(self._resultados)
+            if total >= self.min_chamadas and sum(self._resultados) / total >= self.taxa_falha:
+                self._abrir()
+
+    def _abrir(self) -> None:
+        self._estado = self.ABERTO
+        self._aberto_em = time.monotonic()
+        self._resultados.clear()
+
+    def estado(self) -> dict:
+        with self._lock:
+            total = len(self._resultados)
+            return {
+                "estado": self._estado,
+                "chamadas_na_janela": total,
+                "taxa_falha": sum(self._resultados) / total if total else 0.0,
+            }
+
+
+_sett = SettingsGPT()
+
+breaker_gpt = CircuitBreaker(
+    janela=_sett.GPT_BREAKER_JANELA,
+    min_chamadas=_sett.GPT_BREAKER_MIN_CHAMADAS,
+    taxa_falha=_sett.GPT_BREAKER_TAXA_FALHA,
+    latencia_limite=_sett.GPT_BREAKER_LATENCIA_SEGUNDOS,
+    tempo_aberto=_sett.GPT_BREAKER_TEMPO_ABERTO_SEGUNDOS,
+)
@@ -0,0 +1,395 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from fastapi import HTTPException, Query
+from sqlalchemy import text
+from threading import Lock, Thread
+from typing import Any
+import time
+
+from src.routers.router import router
+from src.core.config import SettingsGPT
+from src.core.database import get_db_mysql
+from src.routers.models.consultas import consulta_get
+
+
+# Chamadas mais recentes que isso ainda podem ter inserções em andamento com id menor: ficam para a próxima consolidação
+MARGEM_CONSOLIDACAO_SEGUNDOS = 60
+LINHAS_POR_EXCLUSAO = 10000
+# Registros guardados em memória enquanto o banco estiver indisponível
+MAX_PENDENTES = 50000
+
+INSERIR_USO = """
+    INSERT INTO TCC.USO_GPT
+        (registrado_em, id_usuario, rota, modelo, sucesso, tokens_entrada, tokens_cache, tokens_saida, latencia_ms)
+    VALUES
+        (:registrado_em, :id_usuario, :rota, :modelo, :sucesso, :tokens_entrada, :tokens_cache, :tokens_saida, :latencia_ms);
+"""
+
+# Consolidado do dia mais as chamadas ainda não consolidadas
+TOKENS_DO_DIA = """
+    SELECT id_usuario, SUM(tokens) AS tokens FROM (
+        SELECT id_usuario, tokens_entrada + tokens_saida AS tokens
+        FROM TCC.USO_GPT_DIARIO
+        WHERE dia = :dia AND id_usuario > 0
+        UNION ALL
+        SELECT id_usuario, tokens_entrada + tokens_saida
+        FROM TCC.USO_GPT
+        WHERE id > (SELECT ultimo_id FROM TCC.USO_GPT_CONSOLIDACAO WHERE id = 1)
+          AND registrado_em >= :dia AND id_usuario IS NOT NULL
+    ) uso
+    GROUP BY id_usuario;
+"""
+
+CONSOLIDAR = """
+    INSERT INTO TCC.USO_GPT_DIARIO
+        (dia, id_usuario, rota, chamadas, falhas, tokens_entrada, tokens_cache, tokens_saida,
+         latencia_total_ms, latencia_maxima_ms)
+    SELECT * FROM (
+        SELECT DATE(registrado_em) AS dia, COALESCE(id_usuario, 0) AS id_usuario, rota,
+               COUNT(*) AS chamadas, SUM(1 - sucesso) AS falhas, SUM(tokens_entrada) AS tokens_entrada,
+               SUM(tokens_cache) AS tokens_cache, SUM(tokens_saida) AS tokens_saida,
+               SUM(latencia_ms) AS latencia_total_ms, MAX(latencia_ms) AS latencia_maxima_ms
+        FROM TCC.USO_GPT
+        WHERE id > :de AND id <= :ate
+        GROUP BY DATE(registrado_em), COALESCE(id_usuario, 0), rota
+    ) novo
+    ON DUPLICATE KEY UPDATE
+        chamadas = USO_GPT_DIARIO.chamadas + novo.chamadas,
+        falhas = USO_GPT_DIARIO.falhas + novo.falhas,
+        tokens_entrada = USO_GPT_DIARIO.tokens_entrada + novo.tokens_entrada,
+        tokens_cache = USO_GPT_DIARIO.tokens_cache + novo.tokens_cache,
+        tokens_saida = USO_GPT_DIARIO.tokens_saida + novo.tokens_saida,
+        latencia_total_ms = USO_GPT_DIARIO.latencia_total_ms + novo.latencia_total_ms,
+        latencia_maxima_ms = GREATEST(USO_GPT_DIARIO.latencia_maxima_ms, novo.latencia_maxima_ms);
+"""
+
+_sett = SettingsGPT()
+
+
+def _sessao():
+    return next(get_db_mysql())
+
+
+def espera_limite(tentativa: int) -> float:
+    """Segundos até repetir uma chamada recusada com 429 na tentativa informada (backoff exponencial)."""
+    return _sett.GPT_LIMITE_ESPERA_SEGUNDOS * 2 ** max(tentativa - 1, 0)
+
+
+class ConsumoGPT:
+    """
+    Contabiliza tokens e latência de cada chamada ao modelo por usuário e rota e aplica os limites por usuário.
+    Os registros são gravados em lote em TCC.USO_GPT e consolidados por dia em TCC.USO_GPT_DIARIO.
+    O consumo do dia usado nos limites fica em memória: total lido do banco na última sincronização
+    mais o que este processo registrou depois dela, então a verificação não consulta o banco.
+    O usuário é o usuario_id informado pelo cliente na anamnese (as rotas da IA não exigem o token de
+    login): os limites contêm o uso normal do app e laços de reenvio, mas não impedem um cliente de
+    atribuir chamadas a outro id.
+    """
+
+    def __init__(
+        self,
+        tokens_dia: int,
+        concorrencia: int,
+        limites_usuarios: dict[str, dict[str, int]],
+        intervalo_gravacao: float,
+        intervalo_consolidacao: float,
+        retencao_dias: int,
+    ):
+        self.tokens_dia = tokens_dia
+        self.concorrencia = concorrencia
+        self.limites_usuarios = limites_usuarios
+        self.intervalo_gravacao = intervalo_gravacao
+        self.intervalo_consolidacao = intervalo_consolidacao
+        self.retencao_dias = retencao_dias
+        self._lock = Lock()
+        self._dia = date.today()
+        self._banco: dict[int, int] = {}
+        self._locais: dict[int, int] = defaultdict(int)
+        self._em_andamento: dict[int, int] = defaultdict(int)
+        self._pendentes: list[dict] = []
+        self._thread: Thread | None = None
+        self.recusadas = {"orcamento": 0, "concorrencia": 0}
+        self.descartados = 0
+
+    def limites(self, usuario_id: int) -> tuple[int, int]:
+        """Tokens por dia e chamadas simultâneas permitidos ao usuário (0 = sem limite)."""
+        especificos = self.limites_usuarios.get(str(usuario_id), {})
+        return especificos.get("tokens_dia", self.tokens_dia), especificos.get("concorrencia", self.concorrencia)
+
+    def _virar_dia(self) -> None:
+        # Chamado com o lock
+        hoje = date.today()
+        if hoje != self._dia:
+            self._dia, self._banco, self._locais = hoje, {}, defaultdict(int)
+
+    def _consumidos(self, usuario_id: int) -> int:
+        return self._banco.get(usuario_id, 0) + self._locais.get(usuario_id, 0)
+
+    def consumidos(self, usuario_id: int) -> int:
+        with self._lock:
+            self._virar_dia()
+            return self._consumidos(usuario_id)
+
+    @contextmanager
+    def reservar(self, usuario_id: int | None):
+        """
+        Ocupa uma das chamadas simultâneas do usuário durante o bloco.
+        Raises:
+            HTTPException: 429 se o usuário esgotou os tokens do dia ou já tem chamadas demais em andamento.
+        """
+        if usuario_id is None:
+            yield
+            return
+        tokens_dia, concorrencia = self.limites(usuario_id)
+        with self._lock:
+            self._virar_dia()
+            if tokens_dia and self._consumidos(usuario_id) >= tokens_dia:
+                self.recusadas["orcamento"] += 1
+                raise HTTPException(status_code=429, detail="Limite diário de uso da IA atingido para o usuário")
+            if concorrencia and self._em_andamento[usuario_id] >= concorrencia:
+                self.recusadas["concorrencia"] += 1
+                raise HTTPException(status_code=429, detail="Muitas chamadas simultâneas à IA para o usuário")
+            self._em_andamento[usuario_id] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._em_andamento[usuario_id] -= 1
+                if self._em_andamento[usuario_id] <= 0:
+                    del self._em_andamento[usuario_id]
+
+    def registrar(
+        self,
+        usuario_id: int | None,
+        config: dict[str, Any],
+        latencia: float,
+        sucesso: bool,
+        tokens_entrada: int = 0,
+        tokens_cache: int = 0,
+        tokens_saida: int = 0,
+    ) -> None:
+        """Conta os tokens no consumo do dia e guarda o registro para a próxima gravação em lote."""
+        registro = {
+            "registrado_em": datetime.now(),
+            "id_usuario": usuario_id,
+            "rota": config["rota"],
+            "modelo": config["modelo"],
+            "sucesso": int(sucesso),
+            "tokens_entrada": tokens_entrada,
+            "tokens_cache": tokens_cache,
+            "tokens_saida": tokens_saida,
+            "latencia_ms": int(latencia * 1000),
+        }
+        with self._lock:
+            self._virar_dia()
+            if usuario_id is not None:
+                self._locais[usuario_id] += tokens_entrada + tokens_saida
+            if len(self._pendentes) >= MAX_PENDENTES:
+                self._pendentes.pop(0)
+                self.descartados += 1
+            self._pendentes.append(registro)
+
+    def sincronizar(self) -> int:
+        """
+        Grava os registros pendentes e relê do banco o consumo do dia de todos os usuários
+        (inclui o que outros processos gravaram).
+        Returns:
+            int: Quantidade de registros gravados.
+        """
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, []
+            dia = self._dia
+        session = _sessao()
+        try:
+            if pendentes:
+                session.execute(text(INSERIR_USO), pendentes)
+                session.commit()
+        except Exception:
+            with self._lock:
+                self._pendentes = (pendentes + self._pendentes)[-MAX_PENDENTES:]
+            session.close()
+            raise
+        try:
+            linhas = consulta_get(TOKENS_DO_DIA, session, {"dia": dia})
+        finally:
+            session.close()
+        with self._lock:
+            # Só substitui a base se o dia não virou durante a leitura; os registros gravados agora
+            # passam a vir do banco e saem da parte local
+            if dia == self._dia == date.today():
+                self._banco = {int(linha["id_usuario"]): int(linha["tokens"] or 0) for linha in linhas}
+                for registro in pendentes:
+                    usuario_id = registro["id_usuario"]
+                    if usuario_id is not None and registro["registrado_em"].date() == dia:
+                        self._locais[usuario_id] -= registro["tokens_entrada"] + registro["tokens_saida"]
+                        if self._locais[usuario_id] <= 0:
+                            del self._locais[usuario_id]
+            else:
+                self._virar_dia()
+        return len(pendentes)
+
+    def consolidar(self) -> dict:
+        """
+        Soma por dia, usuário e rota as chamadas ainda não consolidadas e remove as linhas por chamada
+        mais antigas que GPT_CONSUMO_RETENCAO_DIAS. Um processo por vez (GET_LOCK).
+        Returns:
+            dict: Linhas consolidadas e removidas.
+        """
+        session = _sessao()
+        try:
+            if not session.execute(text("SELECT GET_LOCK('tcc_uso_gpt_consolidacao', 0)")).scalar():
+                return {"consolidadas": 0, "removidas": 0}
+            try:
+                de = session.execute(text(
+                    "SELECT ultimo_id FROM TCC.USO_GPT_CONSOLIDACAO WHERE id = 1 FOR UPDATE;"
+                )).scalar() or 0
+                ate = session.execute(text("""
+                    SELECT COALESCE(MAX(id), :de) FROM TCC.USO_GPT WHERE id > :de AND registrado_em < :limite;
+                """), {
+                    "de": de,
+                    "limite": datetime.now() - timedelta(seconds=MARGEM_CONSOLIDACAO_SEGUNDOS),
+                }).scalar()
+                if ate > de:
+                    session.execute(text(CONSOLIDAR), {"de": de, "ate": ate})
+                    session.execute(text("UPDATE TCC.USO_GPT_CONSOLIDACAO SET ultimo_id = :ate WHERE id = 1;"), {"ate": ate})
+                session.commit()
+
+                removidas = 0
+                corte = datetime.combine(date.today() - timedelta(days=self.retencao_dias), datetime.min.time())
+                while True:
+                    resultado = session.execute(text("""
+                        DELETE FROM TCC.USO_GPT WHERE id <= :ate AND registrado_em < :corte ORDER BY id LIMIT :limite;
+                    """), {"ate": ate, "corte": corte, "limite": LINHAS_POR_EXCLUSAO})
+                    session.commit()
+                    removidas += resultado.rowcount
+                    if resultado.rowcount < LINHAS_POR_EXCLUSAO:
+                        break
+                return {"consolidadas": ate - de, "removidas": removidas}
+            finally:
+                session.execute(text("SELECT RELEASE_LOCK('tcc_uso_gpt_consolidacao')"))
+        finally:
+            session.close()
+
+    def _executar(self) -> None:
+        ultima_consolidacao = time.monotonic()
+        while True:
+            time.sleep(self.intervalo_gravacao)
+            try:
+                self.sincronizar()
+                if time.monotonic() - ultima_consolidacao >= self.intervalo_consolidacao:
+                    ultima_consolidacao = time.monotonic()
+                    self.consolidar()
+            except Exception as exc:
+                print(f"Erro ao gravar o consumo da IA: {exc}")
+
+    def iniciar(self) -> None:
+        if self._thread is None:
+            self._thread = Thread(target=self._executar, name="gpt-consumo", daemon=True)
+            self._thread.start()
+
+    def estado(self) -> dict:
+        with self._lock:
+            self._virar_dia()
+            return {
+                "dia": self._dia.isoformat(),
+                "limites": {
+                    "tokensDia": self.tokens_dia,
+                    "concorrencia": self.concorrencia,
+                    "usuarios": self.limites_usuarios,
+                },
+                "usuariosComConsumo": len(set(self._banco) | set(self._locais)),
+                "chamadasEmAndamento": sum(self._em_andamento.values()),
+                "pendentes": len(self._pendentes),
+                "descartados": self.descartados,
+                "recusadas": dict(self.recusadas),
+            }
+
+
+consumo_gpt = ConsumoGPT(
+    _sett.GPT_USUARIO_TOKENS_DIA,
+    _sett.GPT_USUARIO_CONCORRENCIA,
+    _sett.GPT_USUARIO_LIMITES,
+    _sett.GPT_CONSUMO_GRAVACAO_SEGUNDOS,
+    _sett.GPT_CONSUMO_CONSOLIDACAO_SEGUNDOS,
+    _sett.GPT_CONSUMO_RETENCAO_DIAS,
+)
+
+
+def inicializar_consumo_gpt() -> None:
+    """Carrega o consumo do dia de todos os usuários e agenda a gravação e a consolidação."""
+    try:
+        consumo_gpt.sincronizar()
+    except Exception as e:
+        print(f"Erro ao carregar o consumo da IA: {e}")
+    consumo_gpt.iniciar()
+
+
+@router.get("/gpt/consumo")
+def consultar_consumo(
+    id_usuario: int | None = Query(None, alias="idUsuario", description="ID do usuário; sem ele, totais de todos"),
+    dias: int = Query(7, ge=1, le=90, description="Quantidade de dias, incluindo hoje"),
+):
+    """
+    Retorna o consumo da IA por dia e rota (consolidado mais as chamadas ainda não consolidadas).
+    Args:
+        id_usuario (int | None): ID do usuário.
+        dias (int): Quantidade de dias.
+    Returns:
+        dict: Linhas por dia e rota (chamadas, falhas, tokens de entrada/cache/saída, latência média e máxima),
+        e, para um usuário, o consumo de hoje em memória e os limites; sem usuário, o estado da contabilização.
+    """
+    desde = date.today() - timedelta(days=dias - 1)
+    filtro = "AND id_usuario = :id_usuario" if id_usuario is not None else ""
+    session = _sessao()
+    try:
+        linhas = consulta_get(f"""
+            SELECT dia, rota, SUM(chamadas) AS chamadas, SUM(falhas) AS falhas,
+                   SUM(tokens_entrada) AS tokens_entrada, SUM(tokens_cache) AS tokens_cache,
+                   SUM(tokens_saida) AS tokens_saida, SUM(latencia_total_ms) AS latencia_total_ms,
+                   MAX(latencia_maxima_ms) AS latencia_maxima_ms
+            FROM (
+                SELECT dia, rota, chamadas, falhas, tokens_entrada, tokens_cache, tokens_saida,
+                       latencia_total_ms, latencia_maxima_ms
+                FROM TCC.USO_GPT_DIARIO
+                WHERE dia >= :desde {filtro}
+                UNION ALL
+                SELECT DATE(registrado_em), rota, 1, 1 - sucesso, tokens_entrada, tokens_cache, tokens_saida,
+                       latencia_ms, latencia_ms
+                FROM TCC.USO_GPT
+                WHERE id > (SELECT ultimo_id FROM TCC.USO_GPT_CONSOLIDACAO WHERE id = 1)
+                  AND registrado_em >= :desde {filtro}
+            ) uso
+            GROUP BY dia, rota
+            ORDER BY dia DESC, rota;
+        """, session, {"desde": desde, "id_usuario": id_usuario})
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar consumo da IA: {exc}")
+    finally:
+        session.close()
+
+    consumo = [
+        {
+            "dia": str(linha["dia"]),
+            "rota": linha["rota"],
+            "chamadas": int(linha["chamadas"]),
+            "falhas": int(linha["falhas"]),
+            "tokensEntrada": int(linha["tokens_entrada"]),
+            "tokensCache": int(linha["tokens_cache"]),
+            "tokensSaida": int(linha["tokens_saida"]),
+            "latenciaMediaMs": round(int(linha["latencia_total_ms"]) / int(linha["chamadas"])) if linha["chamadas"] else 0,
+            "latenciaMaximaMs": int(linha["latencia_maxima_ms"]),
+        }
+        for linha in linhas
+    ]
+    if id_usuario is None:
+        return {"consumo": consumo, "estado": consumo_gpt.estado()}
+    tokens_dia, concorrencia = consumo_gpt.limites(id_usuario)
+    return {
+        "consumo": consumo,
+        "hoje": {
+            "tokens": consumo_gpt.consumidos(id_usuario),
+            "limiteTokens": tokens_dia,
+            "limiteConcorrencia": concorrencia,
+        },
+    }
@@ -8,35 +8,150 @@ from openai import OpenAI
 import os
 from dotenv import load_dotenv
 import json
+import time
+import copy
 from typing import Any
 from pydantic import BaseModel, Field
+from src.routers.apis.gpt.circuit_breaker import breaker_gpt
+from src.routers.apis.gpt.single_flight import SingleFlight
+from src.routers.apis.gpt.roteamento import roteador_gpt
+from src.routers.apis.gpt.hedging import Cancelamento, hedger_gpt
+from src.routers.apis.gpt.consumo import consumo_gpt
+from src.core.config import SettingsGPT
 
-def gpt_response(prompt: str) -> dict:
-    load_dotenv()
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="OPENAI_API_KEY não configurada")
+# Estimativa de tokens do prompt quando o provedor não informa o uso (chamada cancelada)
+CARACTERES_POR_TOKEN = 4
 
-    client = OpenAI(api_key=api_key)
+_sett = SettingsGPT()
+single_flight_gpt = SingleFlight(_sett.GPT_SINGLE_FLIGHT_MAX_EM_ANDAMENTO)
+
+
+def gpt_response(
+    prompt: str,
+    max_output_tokens: int | None = None,
+    rota: str = "plano_treino",
+    prazo: float | None = None,
+    usuario_id: int | None = None,
+) -> dict:
+    """
+    Envia o prompt ao modelo da rota informada e devolve o JSON da resposta.
+    Chamadas simultâneas com o mesmo prompt final e a mesma configuração compartilham uma única chamada.
+    Se a resposta demorar mais que o percentil recente da rota, uma requisição de reserva é disparada (hedge).
+    Os limites do usuário (tokens do dia e chamadas simultâneas) são verificados antes da chamada, sem consultar o banco.
+    Args:
+        prompt (str): Prompt completo.
+        max_output_tokens (int | None): Sobrescreve o limite de saída da rota.
+        rota (str): Tarefa ("plano_treino", "ajuste_dieta", "patch_treino", ...) usada para escolher o modelo.
+        prazo (float | None): Segundos para a resposta; estourado, retorna 504. Padrão: GPT_PRAZO_SEGUNDOS.
+        usuario_id (int | None): Usuário a quem o consumo é atribuído (informado pelo cliente, não autenticado);
+            limite estourado retorna 429.
+    """
+    config = roteador_gpt.resolver(rota, prompt)
+    if max_output_tokens:
+        config["max_output_tokens"] = max_output_tokens
+    prazo = prazo if prazo is not None else _sett.GPT_PRAZO_SEGUNDOS
+    if prazo <= 0:
+        raise HTTPException(status_code=504, detail="Prazo para a resposta do modelo esgotado")
+    limite = time.monotonic() + prazo
+    chave = SingleFlight.chave(prompt, config["modelo"], config.get("max_output_tokens"), config.get("reasoning"))
 
-    response = client.responses.create(
-        model="ft:gpt-4o-mini-2024-07-18:tcc:teste2:CbGGCMeu",
-        input=prompt
-    )
+    def chamar() -> dict:
+        # Só quem dispara a chamada ocupa uma vaga do usuário: os agrupados aguardam sem chamar o modelo
+        with consumo_gpt.reservar(usuario_id):
+            return hedger_gpt.executar(
+                rota, lambda cancelamento: _chamar_modelo(prompt, config, cancelamento, limite, usuario_id), prazo
+            )
 
-    raw_text = parse_response_output(response)
+    return single_flight_gpt.executar(chave, chamar)
+
+
+def _decodificar(raw_text: str) -> dict:
     if not raw_text:
         raise HTTPException(status_code=502, detail="Resposta vazia do modelo")
-
     try:
-        return json.loads(raw_text)
+        resposta = json.loads(raw_text)
     except json.JSONDecodeError:
         try:
             json_payload = extract_json_payload(raw_text)
-            return json.loads(json_payload)
+            resposta = json.loads(json_payload)
         except json.JSONDecodeError as exc:
             raise HTTPException(status_code=502, detail=f"Falha ao decodificar JSON da IA: {exc}") from exc
-        
+    # Quem chama lê campos da resposta (.get("operacoes"), "treinos"...): lista ou escalar é resposta inválida
+    if not isinstance(resposta, dict):
+        raise HTTPException(status_code=502, detail="Resposta da IA não é um objeto JSON")
+    return resposta
+
+
+def _chamar_substituto(prompt: str, config: dict, usuario_id: int | None) -> dict:
+    substituto = roteador_gpt.substituto(config["rota"])
+    inicio = time.monotonic()
+    try:
+        resposta = substituto(prompt, config)
+    except Exception:
+        roteador_gpt.registrar(config, time.monotonic() - inicio, False)
+        consumo_gpt.registrar(usuario_id, config, time.monotonic() - inicio, False)
+        raise
+    roteador_gpt.registrar(config, time.monotonic() - inicio, True)
+    consumo_gpt.registrar(usuario_id, config, time.monotonic() - inicio, True)
+    if isinstance(resposta, dict):
+        return copy.deepcopy(resposta)
+    if not isinstance(resposta, str):
+        raise HTTPException(status_code=502, detail="Resposta da IA não é um objeto JSON")
+    return _decodificar(resposta)
+
+
+def _chamar_modelo(
+    prompt: str, config: dict, cancelamento: Cancelamento, limite: float, usuario_id: int | None = None
+) -> dict:
+    if roteador_gpt.substituto(config["rota"]) is not None:
+        return _chamar_substituto(prompt, config, usuario_id)
+
+    load_dotenv()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise HTTPException(status_code=500, detail="OPENAI_API_KEY não configurada")
+
+    if not breaker_gpt.permite_chamada():
+        raise HTTPException(status_code=503, detail="Modelo temporariamente indisponível (circuit breaker aberto)")
+
+    client = OpenAI(api_key=api_key)
+    # Tentativa perdedora do hedge: fechar o cliente aborta a requisição em andamento
+    cancelamento.ao_cancelar(client.close)
+
+    request_kwargs: dict[str, Any] = {
+        "model": config["modelo"],
+        "input": prompt,
+        "timeout": max(limite - time.monotonic(), 1.0),
+    }
+    if config.get("max_output_tokens"):
+        request_kwargs["max_output_tokens"] = config["max_output_tokens"]
+    if config.get("reasoning"):
+        request_kwargs["reasoning"] = config["reasoning"]
+
+    inicio = time.monotonic()
+    try:
+        response = client.responses.create(**request_kwargs)
+    except Exception as exc:
+        latencia = time.monotonic() - inicio
+        if cancelamento.cancelado:
+            # A tentativa perdedora do hedge já chegou ao provedor: o prompt entra no consumo, estimado
+            consumo_gpt.registrar(usuario_id, config, latencia, False, len(prompt) // CARACTERES_POR_TOKEN)
+            raise HTTPException(status_code=499, detail="Chamada ao modelo cancelada") from exc
+        breaker_gpt.registrar(False, latencia)
+        roteador_gpt.registrar(config, latencia, False)
+        consumo_gpt.registrar(usuario_id, config, latencia, False)
+        raise HTTPException(status_code=502, detail=f"Falha na chamada ao modelo: {exc}") from exc
+    latencia = time.monotonic() - inicio
+    breaker_gpt.registrar(True, latencia)
+    usage = getattr(response, "usage", None)
+    tokens_entrada = getattr(usage, "input_tokens", 0) or 0
+    tokens_cache = getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0) or 0
+    tokens_saida = getattr(usage, "output_tokens", 0) or 0
+    roteador_gpt.registrar(config, latencia, True, tokens_entrada, tokens_saida)
+    consumo_gpt.registrar(usuario_id, config, latencia, True, tokens_entrada, tokens_cache, tokens_saida)
+
+    return _decodificar(parse_response_output(response))
+
 def parse_response_output(response: Any) -> str:
     if hasattr(response, "output_text") and response.output_text:
         return response.output_text
@@ -0,0 +1,233 @@
+from fastapi import HTTPException
+import re
+import unicodedata
+
+from src.routers.models.anamnesemodel import PostAnamnese
+from src.routers.apis.treino.catalogo import catalogo_disponivel, normalizar_nome
+from src.routers.apis.gpt.validacao import validar_plano_treino
+
+
+# Séries, repetições e descanso por nível (regras de SÉRIES, REPETIÇÕES E DESCANSO do PROMPT_TEMPLATE)
+VOLUME_POR_NIVEL = {
+    "iniciante": {"series": 3, "repeticoes": 12, "descanso": 60},
+    "intermediario": {"series": 4, "repeticoes": 10, "descanso": 90},
+    "avancado": {"series": 4, "repeticoes": 8, "descanso": 120},
+}
+
+# Cada vaga de exercício: (grupo muscular do catálogo, prefixos de nome aceitos ou None)
+PEITO = ("Peito", None)
+COSTAS = ("Costas", None)
+OMBRO = ("Ombro", None)
+BICEPS = ("Braço", ("rosca",))
+TRICEPS = ("Braço", ("triceps", "mergulho"))
+PERNA = ("Perna", None)
+GLUTEO = ("Glúteo", None)
+ABDOMEN = ("Abdômen", None)
+
+# Complemento quando o catálogo filtrado não tem exercícios suficientes para o foco do treino
+TODAS_AS_VAGAS = [PERNA, PEITO, COSTAS, OMBRO, GLUTEO, BICEPS, TRICEPS, ABDOMEN]
+MIN_EXERCICIOS = 4
+
+# Vagas em ordem de prioridade: os primeiros N exercícios são usados conforme o tempo disponível
+TREINOS_BASE = {
+    "Full Body": [PERNA, PEITO, COSTAS, OMBRO, GLUTEO, BICEPS, TRICEPS, ABDOMEN, PERNA],
+    "Superiores": [PEITO, COSTAS, OMBRO, PEITO, COSTAS, BICEPS, TRICEPS, OMBRO, ABDOMEN],
+    "Inferiores": [PERNA, PERNA, GLUTEO, PERNA, GLUTEO, PERNA, ABDOMEN, GLUTEO, ABDOMEN],
+    "Peito, Ombros e Tríceps": [PEITO, PEITO, OMBRO, PEITO, OMBRO, TRICEPS, TRICEPS, OMBRO, ABDOMEN],
+    "Peito e Tríceps": [PEITO, PEITO, PEITO, TRICEPS, TRICEPS, PEITO, TRICEPS, ABDOMEN, ABDOMEN],
+    "Costas e Bíceps": [COSTAS, COSTAS, COSTAS, BICEPS, BICEPS, COSTAS, BICEPS, ABDOMEN, ABDOMEN],
+    "Pernas e Glúteos": [PERNA, PERNA, GLUTEO, PERNA, GLUTEO, PERNA, GLUTEO, PERNA, ABDOMEN],
+    "Ombros e Braços": [OMBRO, OMBRO, BICEPS, TRICEPS, OMBRO, BICEPS, TRICEPS, OMBRO, ABDOMEN],
+}
+
+# Divisões clássicas por número de dias, sem repetir o mesmo grupo em dias consecutivos
+DIVISOES = {
+    1: ("Full Body", ["Full Body"]),
+    2: ("Superiores/Inferiores", ["Superiores", "Inferiores"]),
+    3: ("Push/Pull/Legs", ["Peito, Ombros e Tríceps", "Costas e Bíceps", "Pernas e Glúteos"]),
+    4: ("Superiores/Inferiores", ["Superiores", "Inferiores", "Superiores", "Inferiores"]),
+    5: ("ABCDE", ["Peito e Tríceps", "Costas e Bíceps", "Pernas e Glúteos", "Ombros e Braços", "Inferiores"]),
+    6: ("Push/Pull/Legs 2x", ["Peito, Ombros e Tríceps", "Costas e Bíceps", "Pernas e Glúteos"] * 2),
+    7: ("Push/Pull/Legs 2x + Full Body", ["Peito, Ombros e Tríceps", "Costas e Bíceps", "Pernas e Glúteos"] * 2 + ["Full Body"]),
+}
+
+DIAS_DA_SEMANA = ("segunda", "terca", "quarta", "quinta", "sexta", "sabado", "domingo")
+NUMEROS_POR_EXTENSO = {"um": 1, "uma": 1, "dois": 2, "duas": 2, "tres": 3, "quatro": 4, "cinco": 5, "seis": 6, "sete": 7}
+_DIA = r"(segunda|terca|quarta|quinta|sexta|sabado|domingo)(?:[\s-]*feira)?"
+
+OBJETIVOS = (
+    (("hipertrof", "massa", "ganho", "musculo"), "Hipertrofia"),
+    (("emagrec", "perda", "perder", "gordura", "definic"), "Emagrecimento"),
+    (("forca",), "Força"),
+)
+
+
+def _primeiro_inteiro(texto: str) -> int | None:
+    encontrado = re.search(r"\d+", texto or "")
+    return int(encontrado.group()) if encontrado else None
+
+
+def interpretar_dias(dias_semana: str) -> int:
+    """
+    Número de treinos a partir de "3", "3 dias", "segunda, quarta e sexta", "segunda a sexta",
+    "fim de semana" ou "todos os dias".
+    """
+    # Sem normalizar_nome: ele descarta o "a" de "segunda a sexta"
+    texto = unicodedata.normalize("NFKD", dias_semana or "").encode("ascii", "ignore").decode("ascii").lower()
+    if re.search(r"\btod[oa]s?\s+(?:os\s+)?dias?\b|\bdiariamente\b", texto):
+        return 7
+
+    dias: set[int] = set()
+    for intervalo in re.finditer(rf"\b{_DIA}\s+(?:a|ate)\s+(?:o\s+|a\s+)?{_DIA}\b", texto):
+        inicio, fim = DIAS_DA_SEMANA.index(intervalo.group(1)), DIAS_DA_SEMANA.index(intervalo.group(2))
+        dias.update((inicio + passo) % 7 for passo in range((fim - inicio) % 7 + 1))
+    dias.update(DIAS_DA_SEMANA.index(dia.group(1)) for dia in re.finditer(rf"\b{_DIA}\b", texto))
+    if re.search(r"\b(?:fim|fins|finais)\s+de\s+semana\b", texto):
+        dias.update((5, 6))
+
+    por_extenso = next((NUMEROS_POR_EXTENSO[palavra] for palavra in re.findall(r"[a-z]+", texto) if palavra in NUMEROS_POR_EXTENSO), None)
+    quantidade = len(dias) or _primeiro_inteiro(texto) or por_extenso or 3
+    return max(1, min(quantidade, 7))
+
+
+def interpretar_minutos(tempo_treino_por_dia: str) -> int:
+    """Minutos por treino a partir de "60", "45 minutos", "1 hora" ou "1h30"."""
+    normalizado = normalizar_nome(tempo_treino_por_dia)
+    numeros = [int(numero) for numero in re.findall(r"\d+", normalizado)]
+    if not numeros:
+        return 60
+    if re.search(r"\d\s*h|hora", normalizado):
+        minutos = numeros[0] * 60 + (numeros[1] if len(numeros) > 1 else 0)
+    else:
+        minutos = numeros[0]
+    return max(10, min(minutos, 180))
+
+
+def interpretar_nivel(experiencia: str) -> str:
+    normalizado = normalizar_nome(experiencia)
+    if "avanc" in normalizado:
+        return "avancado"
+    if "intermed" in normalizado:
+        return "intermediario"
+    return "iniciante"
+
+
+def interpretar_objetivo(anamnese: PostAnamnese) -> str:
+    texto = normalizar_nome(" ".join(anamnese.objetivos or []) + " " + (anamnese.objetivo_especifico or ""))
+    for termos, objetivo in OBJETIVOS:
+        if any(termo in texto for termo in termos):
+            return objetivo
+    return "Condicionamento"
+
+
+def quantidade_exercicios(minutos: int, volume: dict) -> int:
+    """Exercícios que cabem no tempo disponível (mínimo 5, máximo 9; 4 abaixo de 30 minutos)."""
+    minutos_por_exercicio = volume["series"] * (40 + volume["descanso"]) / 60 + 1
+    if minutos < 30:
+        return 4
+    return max(5, min(int(minutos // minutos_por_exercicio), 9))
+
+
+def _escolher_exercicio(vaga: tuple, usados: set[int], deslocamento: int, anamnese: PostAnamnese) -> dict | None:
+    grupo, prefixos = vaga
+    candidatos = catalogo_disponivel().candidatos(
+        grupo, anamnese.equipamentos, anamnese.exercicio_nao_gosta, anamnese.lesao
+    )
+    livres = [exercicio for exercicio in candidatos if exercicio["id_exercicio"] not in usados]
+    if prefixos:
+        especificos = [
+            exercicio for exercicio in livres
+            if normalizar_nome(exercicio["nome"]).startswith(prefixos)
+        ]
+        livres = especificos or livres
+    if not livres:
+        return None
+    return livres[deslocamento % len(livres)]
+
+
+def gerar_plano_local(anamnese: PostAnamnese) -> dict:
+    """
+    Gera, sem chamar a IA, um plano de treino no mesmo formato do PROMPT_TEMPLATE
+    aplicando as regras de divisão, volume e descanso por nível.
+    Args:
+        anamnese (PostAnamnese): Dados da anamnese do usuário.
+    Returns:
+        dict: Plano no formato {"programaTreino", "treinos"}, já validado como os planos da IA.
+    Raises:
+        HTTPException: 422 quando as restrições da anamnese deixam menos de MIN_EXERCICIOS exercícios
+        disponíveis para um treino.
+    """
+    dias = interpretar_dias(anamnese.dias_semana)
+    minutos = interpretar_minutos(anamnese.tempo_treino_por_dia)
+    nivel = interpretar_nivel(anamnese.experiencia)
+    objetivo = interpretar_objetivo(anamnese)
+    volume = VOLUME_POR_NIVEL[nivel]
+    quantidade = quantidade_exercicios(minutos, volume)
+    nome_divisao, treinos_divisao = DIVISOES[dias]
+
+    aviso_lesao = ""
+    if normalizar_nome(anamnese.lesao) not in ("", "nenhuma", "nenhum", "nao"):
+        aviso_lesao = f" Atenção à limitação informada ({anamnese.lesao}): interrompa qualquer exercício que cause dor."
+
+    treinos = []
+    repeticoes_do_treino: dict[str, int] = {}
+    for numero, foco in enumerate(treinos_divisao, start=1):
+        # Treinos repetidos na semana (ex: Push/Pull/Legs 2x) recebem variações de exercícios
+        ocorrencia = repeticoes_do_treino.get(foco, 0)
+        repeticoes_do_treino[foco] = ocorrencia + 1
+
+        usados: set[int] = set()
+        exercicios = []
+        vagas = TREINOS_BASE[foco]
+        while len(exercicios) < quantidade:
+            anteriores = len(exercicios)
+            for vaga in vagas:
+                if len(exercicios) >= quantidade:
+                    break
+                escolhido = _escolher_exercicio(vaga, usados, ocorrencia, anamnese)
+                if escolhido is None:
+                    continue
+                usados.add(escolhido["id_exercicio"])
+                exercicios.append({
+                    "nomeExercicio": escolhido["nome"],
+                    "equipamento": escolhido["equipamento"],
+                    "grupoMuscular": escolhido["grupo_muscular"],
+                    "idExercicio": escolhido["id_exercicio"],
+                    "series": volume["series"],
+                    "repeticoes": volume["repeticoes"],
+                    "descansoSegundos": volume["descanso"],
+                })
+            if vagas is TODAS_AS_VAGAS and len(exercicios) == anteriores:
+                break
+            # Equipamentos, preferências ou lesão esgotaram o foco: completa com os demais grupos
+            vagas = TODAS_AS_VAGAS
+        if len(exercicios) < MIN_EXERCICIOS:
+            raise HTTPException(
+                status_code=422,
+                detail=f"As restrições da anamnese deixam menos de {MIN_EXERCICIOS} exercícios disponíveis para o treino de {foco.lower()}.",
+            )
+
+        treinos.append({
+            "nome": f"Treino {numero:02d} - {foco} {objetivo}",
+            "descricao": (
+                f"Treino de {foco.lower()} com foco em {objetivo.lower()}, nível {nivel}: "
+                f"{volume['series']}x{volume['repeticoes']} com {volume['descanso']}s de descanso.{aviso_lesao}"
+            ),
+            "idUsuario": anamnese.usuario_id,
+            "duracaoMinutos": minutos,
+            "dificuldade": nivel,
+            "exercicios": exercicios,
+        })
+
+    plano = {
+        "programaTreino": {
+            "nomePrograma": f"Programa {nome_divisao} - {objetivo}",
+            "descricaoPrograma": (
+                f"Plano inicial de {dias} dia(s) por semana na divisão {nome_divisao}, "
+                f"gerado automaticamente a partir da anamnese para o nível {nivel}."
+            ),
+        },
+        "treinos": treinos,
+    }
+    validar_plano_treino(plano)
+    return plano
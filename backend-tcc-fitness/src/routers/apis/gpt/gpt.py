@@ -1,15 +1,31 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from src.routers.router import router
 from src.core.database import get_db_mysql
 from src.routers.models.anamnesemodel import PostAnamnese
-from src.routers.apis.gpt.funcs_gpt import gpt_response
+from src.routers.apis.gpt.funcs_gpt import gpt_response, single_flight_gpt
+from src.routers.apis.gpt.roteamento import roteador_gpt
+from src.routers.apis.gpt.hedging import hedger_gpt
+from src.routers.apis.gpt.validacao import validar_plano_treino, gerar_plano_validado
+from src.routers.apis.gpt.ajuste_patch import ajustar_por_operacoes
+from src.routers.apis.treino.catalogo import catalogo
+from src.routers.apis.gpt.gerador_local import gerar_plano_local
+from src.routers.apis.gpt.circuit_breaker import breaker_gpt
+from src.routers.apis.gpt.jobs import fila_jobs
+from src.routers.apis.gpt.similaridade import (
+    buscar_plano_similar,
+    registrar_geracao,
+    descartar_geracao,
+    anamnese_da_geracao,
+    indexar_plano_confirmado,
+)
+from src.routers.apis.treino.substituicao import ranquear_substitutos, aplicar_substituto, localizar_exercicio
 from openai import OpenAI
 import os
 from dotenv import load_dotenv
 import json
-from typing import Any
+from typing import Any, Literal
 from pydantic import BaseModel, Field
 
 PROMPT_TEMPLATE = """
@@ -183,12 +199,46 @@ IMPORTANTE: Se o usuário pediu "mais dias", você DEVE adicionar os treinos. Se
 Gere o NOVO plano completo em JSON, aplicando as alterações e mantendo todas as regras.
 """
 
+PATCH_ADJUSTMENT_TEMPLATE = """
+Você é uma IA especializada em prescrição de treinos de musculação. O usuário quer ajustar um plano de treino existente.
+NÃO gere o plano completo novamente: responda SOMENTE com a lista mínima de operações de edição que aplica as alterações pedidas.
+
+=== FORMATO DA RESPOSTA (APENAS JSON) ===
+{"operacoes": [ ...operações... ]}
+
+=== OPERAÇÕES PERMITIDAS (índices começam em 0 e são aplicadas na ordem da lista) ===
+- {"op": "substituir_exercicio", "treino": i, "exercicio": j, "valor": {"nomeExercicio", "equipamento", "grupoMuscular", "series", "repeticoes", "descansoSegundos"}}
+- {"op": "alterar_exercicio", "treino": i, "exercicio": j, "campos": {"series"?, "repeticoes"?, "descansoSegundos"?}}
+- {"op": "adicionar_exercicio", "treino": i, "valor": {exercício completo}}
+- {"op": "remover_exercicio", "treino": i, "exercicio": j}
+- {"op": "adicionar_treino", "valor": {treino completo com "exercicios"}}
+- {"op": "remover_treino", "treino": i}
+- {"op": "alterar_treino", "treino": i, "campos": {"nome"?, "descricao"?, "duracaoMinutos"?, "dificuldade"?}}
+- {"op": "alterar_programa", "campos": {"nomePrograma"?, "descricaoPrograma"?}}
+
+=== REGRAS ===
+- Mantenha tudo o que o usuário não pediu para mudar
+- Cada treino deve continuar com no mínimo 5 exercícios (máximo 9)
+- Substituições mantêm o mesmo grupo muscular ("Peito" | "Costas" | "Ombro" | "Braço" | "Perna" | "Glúteo" | "Abdômen")
+- series >= 1, repeticoes >= 1, descansoSegundos >= 15, duracaoMinutos >= 10 (inteiros)
+- Respeite lesões, equipamentos disponíveis e exercícios que o usuário não gosta
+- Apenas musculação tradicional (sem cárdio ou atividades funcionais)
 
-def build_prompt(anamnese: PostAnamnese) -> str:
+=== ANAMNESE DO USUÁRIO ===
+<<<RESPOSTAS_ANAMNESE>>>
+
+=== PLANO ATUAL ===
+<<<PLANO_ATUAL>>>
+
+=== ALTERAÇÕES SOLICITADAS ===
+<<<AJUSTES>>>
+"""
+
+def build_anamnese_text(anamnese: PostAnamnese) -> str:
     objetivos_text = ", ".join(anamnese.objetivos) if anamnese.objetivos else "não especificado"
     equipamentos_text = anamnese.equipamentos or "não informado"
 
-    anamnese_text = (
+    return (
         f"ID do usuário: {anamnese.usuario_id}\n"
         f"Idade: {anamnese.idade}\n"
         f"Sexo: {anamnese.sexo}\n"
@@ -204,7 +254,10 @@ def build_prompt(anamnese: PostAnamnese) -> str:
         f"Exercícios que não gosta: {anamnese.exercicio_nao_gosta or 'nenhum'}\n"
         f"Equipamentos disponíveis: {equipamentos_text}"
     )
-    return PROMPT_TEMPLATE.replace("<<<RESPOSTAS_ANAMNESE>>>", anamnese_text)
+
+
+def build_prompt(anamnese: PostAnamnese) -> str:
+    return PROMPT_TEMPLATE.replace("<<<RESPOSTAS_ANAMNESE>>>", build_anamnese_text(anamnese))
 
 
 def build_adjustment_prompt(anamnese: PostAnamnese, plano_atual: dict, ajustes: str) -> str:
@@ -217,14 +270,22 @@ def build_adjustment_prompt(anamnese: PostAnamnese, plano_atual: dict, ajustes:
     )
 
 
+def build_patch_prompt(anamnese: PostAnamnese, plano_atual: dict, ajustes: str) -> str:
+    plano_json = json.dumps(plano_atual, ensure_ascii=False, separators=(",", ":"))
+    ajustes_texto = ajustes.strip() or "Sem ajustes adicionais fornecidos."
+    return (
+        PATCH_ADJUSTMENT_TEMPLATE
+        .replace("<<<RESPOSTAS_ANAMNESE>>>", build_anamnese_text(anamnese))
+        .replace("<<<PLANO_ATUAL>>>", plano_json)
+        .replace("<<<AJUSTES>>>", ajustes_texto)
+    )
 
 
 def persist_workout_plan(plan: dict, session: Session) -> dict:
-    programa = plan.get("programaTreino")
-    treinos = plan.get("treinos")
+    validar_plano_treino(plan)
 
-    if not isinstance(programa, dict) or not isinstance(treinos, list) or not treinos:
-        raise HTTPException(status_code=400, detail="Estrutura do plano inválida")
+    programa = plan["programaTreino"]
+    treinos = plan["treinos"]
 
     insert_programa_sql = text(
         """
@@ -242,8 +303,8 @@ def persist_workout_plan(plan: dict, session: Session) -> dict:
 
     insert_exercicio_treino_sql = text(
         """
-        INSERT INTO TCC.EXERCICIO_TREINO (nome_exercicio, equipamento, grupo_muscular, id_treino, descanso, series, reps)
-        VALUES (:nome_exercicio, :equipamento, :grupo_muscular, :id_treino, :descanso, :series, :reps)
+        INSERT INTO TCC.EXERCICIO_TREINO (nome_exercicio, equipamento, grupo_muscular, id_treino, id_exercicio, descanso, series, reps)
+        VALUES (:nome_exercicio, :equipamento, :grupo_muscular, :id_treino, :id_exercicio, :descanso, :series, :reps)
         """
     )
 
@@ -251,14 +312,7 @@ def persist_workout_plan(plan: dict, session: Session) -> dict:
 
     nome_programa = programa.get("nomePrograma")
     descricao_programa = programa.get("descricaoPrograma")
-
-    if not nome_programa or not descricao_programa:
-        raise HTTPException(status_code=400, detail="Dados do programa incompletos")
-
-    try:
-        usuario_programa_id = int(treinos[0].get("idUsuario"))
-    except (TypeError, ValueError):
-        raise HTTPException(status_code=400, detail="ID de usuário inválido no plano gerado")
+    usuario_programa_id = int(treinos[0].get("idUsuario"))
 
     programa_result = session.execute(
         insert_programa_sql,
@@ -273,34 +327,15 @@ def persist_workout_plan(plan: dict, session: Session) -> dict:
         raise HTTPException(status_code=500, detail="Falha ao inserir programa de treino")
 
     for treino in treinos:
-        try:
-            id_usuario = int(treino.get("idUsuario"))
-            duracao = int(treino.get("duracaoMinutos"))
-        except (TypeError, ValueError):
-            raise HTTPException(status_code=400, detail="Campos numéricos inválidos no treino gerado")
-
-        if id_usuario < 1 or duracao < 10:
-            raise HTTPException(status_code=400, detail="Valores inconsistentes no treino gerado")
-
-        if id_usuario != usuario_programa_id:
-            raise HTTPException(status_code=400, detail="Todos os treinos do programa devem pertencer ao mesmo usuário")
-
-        nome_treino = treino.get("nome")
-        descricao_treino = treino.get("descricao")
-        dificuldade = treino.get("dificuldade")
-
-        if not nome_treino or not descricao_treino or not dificuldade:
-            raise HTTPException(status_code=400, detail="Dados obrigatórios do treino ausentes")
-
         result_treino = session.execute(
             insert_treino_sql,
             {
-                "nome": nome_treino,
-                "descricao": descricao_treino,
-                "id_usuario": id_usuario,
+                "nome": treino.get("nome"),
+                "descricao": treino.get("descricao"),
+                "id_usuario": int(treino.get("idUsuario")),
                 "id_programa_treino": programa_id,
-                "duracao": duracao,
-                "dificuldade": dificuldade.lower(),
+                "duracao": int(treino.get("duracaoMinutos")),
+                "dificuldade": treino.get("dificuldade").lower(),
             }
         )
         treino_id = result_treino.lastrowid
@@ -309,36 +344,21 @@ def persist_workout_plan(plan: dict, session: Session) -> dict:
 
         treinos_inseridos.append(treino_id)
 
-        exercicios = treino.get("exercicios") or []
-        if not exercicios:
-            raise HTTPException(status_code=400, detail="Treino gerado sem exercícios")
-
-        for exercicio in exercicios:
-            try:
-                nome = exercicio.get("nomeExercicio")
-                equipamento = exercicio.get("equipamento")
-                grupo_muscular = exercicio.get("grupoMuscular")
-                if not nome or not equipamento or not grupo_muscular:
-                    raise HTTPException(status_code=400, detail="Dados obrigatórios do exercício ausentes")
-                series_total = int(exercicio.get("series"))
-                repeticoes = int(exercicio.get("repeticoes"))
-                descanso = int(exercicio.get("descansoSegundos"))
-            except (TypeError, ValueError):
-                raise HTTPException(status_code=400, detail="Campos numéricos inválidos nos exercícios gerados")
-
-            if series_total < 1 or repeticoes < 1 or descanso < 15:
-                raise HTTPException(status_code=400, detail="Valores inconsistentes nos exercícios gerados")
-
+        for exercicio in treino.get("exercicios"):
+            # O idExercicio gerado pela IA não é confiável: associa pelo nome ao catálogo canônico
+            id_exercicio = catalogo.associar(exercicio.get("nomeExercicio"), exercicio.get("grupoMuscular"))
+            exercicio["idExercicio"] = id_exercicio
             result_ex_treino = session.execute(
                 insert_exercicio_treino_sql,
                 {
-                    "nome_exercicio": nome,
-                    "equipamento": equipamento,
-                    "grupo_muscular": grupo_muscular,
-                    "series": series_total,
-                    "reps": repeticoes,
+                    "nome_exercicio": exercicio.get("nomeExercicio"),
+                    "equipamento": exercicio.get("equipamento"),
+                    "grupo_muscular": exercicio.get("grupoMuscular"),
+                    "series": int(exercicio.get("series")),
+                    "reps": int(exercicio.get("repeticoes")),
                     "id_treino": treino_id,
-                    "descanso": descanso,
+                    "id_exercicio": id_exercicio,
+                    "descanso": int(exercicio.get("descansoSegundos")),
                 }
             )
             id_ex_treino = result_ex_treino.lastrowid
@@ -367,30 +387,111 @@ class AdjustmentPayload(BaseModel):
     anamnese: PostAnamnese
     plano_atual: dict = Field(..., alias="planoAtual")
     ajustes: str
+    modo: Literal["completo", "patch"] = "completo"
 
 
 @router.post("/gpt")
-def gpt(anamnese: PostAnamnese):
+def gpt(
+    anamnese: PostAnamnese,
+    gerador: Literal["ia", "local"] = Query("ia", description="'local' gera um plano inicial instantâneo sem chamar a IA"),
+    reutilizar: bool = Query(True, description="Reaproveita um plano confirmado de anamnese quase idêntica"),
+):
     """
     Gera um plano de treino personalizado usando GPT com base na anamnese fornecida.
+    Se o modelo estiver indisponível (erro ou circuit breaker aberto), responde com o gerador local.
     Args:
         anamnese (PostAnamnese): Dados da anamnese do usuário.
+        gerador (str): "ia" (padrão) ou "local".
+        reutilizar (bool): Consulta o índice de planos confirmados antes de chamar a IA.
         Returns:
-            dict: Resposta com mensagem de sucesso e o plano gerado.
+            dict: Resposta com mensagem de sucesso, o plano gerado e a origem ("ia", "similar" ou "local").
         """
+    if gerador == "local":
+        return {
+            "message": "Plano gerado com sucesso",
+            "plano": gerar_plano_local(anamnese),
+            "origem": "local",
+        }
+
+    similar = buscar_plano_similar("treino", anamnese) if reutilizar else None
+    if similar is not None:
+        return {
+            "message": "Plano gerado com sucesso",
+            "plano": similar[0],
+            "origem": "similar",
+            "distancia": similar[1],
+        }
+
     prompt = build_prompt(anamnese)
-    plano = gpt_response(prompt)
+    try:
+        plano = gerar_plano_validado(prompt, "treino", anamnese.usuario_id)
+    except HTTPException as exc:
+        if exc.status_code < 500:
+            raise
+        print(f"Falha na geração pela IA, usando gerador local: {exc.detail}")
+        return {
+            "message": "Plano gerado com sucesso",
+            "plano": gerar_plano_local(anamnese),
+            "origem": "local",
+        }
+    registrar_geracao("treino", anamnese, plano)
     print(plano)
     return {
         "message": "Plano gerado com sucesso",
         "plano": plano,
+        "origem": "ia",
     }
 
 
+@router.get("/gpt/status")
+def status_gpt():
+    """
+    Retorna o estado do circuit breaker, do agrupamento de chamadas e do hedge das chamadas ao modelo.
+    Returns:
+        dict: Estado ("fechado", "aberto" ou "meio-aberto"), taxa de falha na janela recente,
+        contadores de chamadas agrupadas e de hedges/prazos estourados.
+    """
+    return {
+        **breaker_gpt.estado(),
+        "single_flight": single_flight_gpt.estado(),
+        "hedging": hedger_gpt.estado(),
+    }
+
+
+@router.get("/gpt/rotas")
+def rotas_gpt():
+    """
+    Retorna a configuração das rotas de modelo e as métricas acumuladas por rota e modelo.
+    Returns:
+        dict: Rotas (modelo, limites, preços), rotas substituídas localmente e, por "rota:modelo",
+        chamadas, falhas, latência média/máxima, tokens e custo estimado em dólares.
+    """
+    return roteador_gpt.estado()
+
+
 @router.post("/gpt/ajustar")
 def ajustar_plano(payload: AdjustmentPayload):
+    """
+    Ajusta um plano de treino existente.
+    No modo "patch" a IA devolve apenas operações de edição, aplicadas e validadas no servidor;
+    no modo "completo" a IA regenera o plano inteiro.
+    Args:
+        payload (AdjustmentPayload): Anamnese, plano atual, ajustes pedidos e modo do ajuste.
+    Returns:
+        dict: Resposta com mensagem de sucesso e o plano ajustado.
+    """
+    descartar_geracao("treino", payload.anamnese.usuario_id)
+    if payload.modo == "patch":
+        prompt = build_patch_prompt(payload.anamnese, payload.plano_atual, payload.ajustes)
+        plano, operacoes = ajustar_por_operacoes(prompt, "treino", payload.plano_atual, payload.anamnese.usuario_id)
+        return {
+            "message": "Plano ajustado com sucesso",
+            "plano": plano,
+            "operacoes": operacoes,
+        }
+
     prompt = build_adjustment_prompt(payload.anamnese, payload.plano_atual, payload.ajustes)
-    plano = gpt_response(prompt)
+    plano = gerar_plano_validado(prompt, "treino", payload.anamnese.usuario_id, rota="ajuste_treino")
     print(plano)
     return {
         "message": "Plano ajustado com sucesso",
@@ -398,16 +499,121 @@ def ajustar_plano(payload: AdjustmentPayload):
     }
 
 
+def _job_treino(payload: dict) -> dict:
+    return gpt(PostAnamnese(**payload), gerador="ia", reutilizar=True)
+
+
+def _job_ajuste_treino(payload: dict) -> dict:
+    return ajustar_plano(AdjustmentPayload(**payload))
+
+
+fila_jobs.registrar("treino", _job_treino)
+fila_jobs.registrar("ajuste_treino", _job_ajuste_treino)
+
+
+@router.post("/gpt/jobs/treino", status_code=202)
+def criar_job_treino(anamnese: PostAnamnese):
+    """
+    Agenda a geração de um plano de treino em segundo plano e retorna imediatamente.
+    Args:
+        anamnese (PostAnamnese): Dados da anamnese do usuário.
+    Returns:
+        dict: Id do job para consulta em /gpt/jobs/{idJob}.
+    """
+    return fila_jobs.enfileirar("treino", anamnese.model_dump(), anamnese.usuario_id)
+
+
+@router.post("/gpt/jobs/treino/ajustar", status_code=202)
+def criar_job_ajuste_treino(payload: AdjustmentPayload):
+    """
+    Agenda o ajuste de um plano de treino em segundo plano; ajustes têm prioridade sobre planos novos.
+    Args:
+        payload (AdjustmentPayload): Anamnese, plano atual, ajustes pedidos e modo do ajuste.
+    Returns:
+        dict: Id do job para consulta em /gpt/jobs/{idJob}.
+    """
+    return fila_jobs.enfileirar("ajuste_treino", payload.model_dump(by_alias=True), payload.anamnese.usuario_id)
+
+
+class SubstitutionPayload(BaseModel):
+    plano_atual: dict = Field(..., alias="planoAtual")
+    treino: int
+    exercicio: int
+    id_substituto: int | None = Field(None, alias="idSubstituto")
+    equipamentos: str | None = None
+    lesao: str | None = None
+    exercicio_nao_gosta: str | None = None
+    anamnese: PostAnamnese | None = None
+
+
+@router.post("/gpt/ajustar/substituir")
+def substituir_exercicio(payload: SubstitutionPayload):
+    """
+    Substitui um exercício do plano localmente, sem chamar a IA.
+    As restrições não informadas são lidas da anamnese, quando enviada. Só recorre ao ajuste
+    por operações da IA quando o catálogo não tem nenhuma alternativa compatível.
+    Args:
+        payload (SubstitutionPayload): Plano atual, posição do exercício, restrições e substituto escolhido (opcional).
+    Returns:
+        dict: Plano com a troca aplicada, alternativas ranqueadas e a origem ("local" ou "ia").
+    """
+    anamnese = payload.anamnese
+    equipamentos = payload.equipamentos if payload.equipamentos is not None else (anamnese.equipamentos if anamnese else None)
+    lesao = payload.lesao if payload.lesao is not None else (anamnese.lesao if anamnese else None)
+    nao_gosta = payload.exercicio_nao_gosta if payload.exercicio_nao_gosta is not None else (anamnese.exercicio_nao_gosta if anamnese else None)
+
+    alternativas = ranquear_substitutos(
+        payload.plano_atual, payload.treino, payload.exercicio, equipamentos, lesao, nao_gosta
+    )
+
+    if alternativas:
+        escolhido = alternativas[0]
+        if payload.id_substituto is not None:
+            escolhido = next((alt for alt in alternativas if alt["id_exercicio"] == payload.id_substituto), None)
+            if escolhido is None:
+                raise HTTPException(status_code=400, detail="Substituto informado não é compatível com as restrições")
+        return {
+            "message": "Exercício substituído com sucesso",
+            "plano": aplicar_substituto(payload.plano_atual, payload.treino, payload.exercicio, escolhido),
+            "alternativas": alternativas,
+            "origem": "local",
+        }
+
+    if anamnese is None:
+        raise HTTPException(status_code=404, detail="Nenhum exercício substituto compatível encontrado")
+
+    atual = localizar_exercicio(payload.plano_atual, payload.treino, payload.exercicio)
+    ajustes = (
+        f"Substitua o exercício '{atual.get('nomeExercicio')}' (treino {payload.treino}, exercício {payload.exercicio}) "
+        f"por outro do mesmo grupo muscular compatível com as restrições."
+    )
+    prompt = build_patch_prompt(anamnese, payload.plano_atual, ajustes)
+    plano, _ = ajustar_por_operacoes(prompt, "treino", payload.plano_atual, anamnese.usuario_id)
+    return {
+        "message": "Exercício substituído com sucesso",
+        "plano": plano,
+        "alternativas": [],
+        "origem": "ia",
+    }
+
+
 @router.post("/gpt/confirm")
-def confirmar_plano(payload: PlanPayload, session: Session = Depends(get_db_mysql)):
+def confirmar_plano(
+    payload: PlanPayload,
+    somente_ids: bool = Query(False, alias="somenteIds", description="Não devolve o plano salvo, só os ids"),
+    session: Session = Depends(get_db_mysql),
+):
     """
     Confirma e persiste o plano de treino gerado pelo GPT no banco de dados.
     Args:
         payload (PlanPayload): Payload contendo o plano de treino gerado.
+        somente_ids (bool): Responde apenas com os ids gerados, sem o plano.
         session (Session): Sessão do banco de dados injetada pelo FastAPI.
     Returns:
         dict: Resposta com mensagem de sucesso, detalhes do programa e IDs dos treinos inseridos.
     """
+    # Antes de persistir: a persistência grava o idExercicio do catálogo no plano
+    anamnese = anamnese_da_geracao("treino", payload.plano)
     try:
         resultado = persist_workout_plan(payload.plano, session)
         session.commit()
@@ -418,6 +624,15 @@ def confirmar_plano(payload: PlanPayload, session: Session = Depends(get_db_mysq
         session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao salvar treino: {exc}") from exc
 
+    if anamnese is not None:
+        indexar_plano_confirmado("treino", resultado["plano"], anamnese)
+
+    if somente_ids:
+        return {
+            "message": "Plano gerado e salvo com sucesso",
+            "idProgramaTreino": resultado["programa"]["id_programa_treino"],
+            "treinosIds": resultado["treinos_inseridos"],
+        }
     return {
         "message": "Plano gerado e salvo com sucesso",
         "programa": resultado["programa"],
@@ -1,13 +1,25 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from src.routers.router import router
 from src.core.database import get_db_mysql
 from src.routers.models.anamnesemodel import PostAnamneseDieta
 from src.routers.apis.gpt.funcs_gpt import gpt_response
+from src.routers.apis.gpt.ajuste_patch import ajustar_por_operacoes
+from src.routers.apis.gpt.validacao import validar_plano_dieta, gerar_plano_validado
+from src.routers.apis.dieta.alimentos import estruturar_refeicoes, inserir_alimentos_refeicao
+from src.routers.apis.gpt.jobs import fila_jobs
+from src.routers.apis.gpt.similaridade import (
+    buscar_plano_similar,
+    registrar_geracao,
+    descartar_geracao,
+    anamnese_da_geracao,
+    indexar_plano_confirmado,
+)
+from src.routers.apis.dieta.energia import calcular_metas, formatar_metas, aplicar_metas, atualizar_total_descricao
 from src.routers.models.consultas import consulta_get
 from pydantic import BaseModel, Field
-from typing import Any
+from typing import Any, Literal
 import json
 
 PROMPT_TEMPLATE = """
@@ -41,16 +53,8 @@ ORDEM DAS REFEIÇÕES (CRÍTICO):
 - NUNCA misture horários (ex: não coloque jantar antes de almoço)
 
 CALORIAS - CONSISTÊNCIA OBRIGATÓRIA:
-1. Calcule primeiro o TOTAL CALÓRICO DIÁRIO baseado em:
-   - Peso atual, altura, idade, sexo
-   - Objetivo (déficit para emagrecimento, superávit para ganho, manutenção)
-   - Nível de atividade (estimado pela rotina)
-2. Distribua as calorias entre as refeições proporcionalmente:
-   - Café da manhã: 20-25% do total
-   - Lanches: 10-15% cada
-   - Almoço: 30-35% do total
-   - Jantar: 25-30% do total
-   - Ceia: 5-10% do total (se houver)
+1. O TOTAL CALÓRICO DIÁRIO, os macros e as calorias de cada refeição JÁ FORAM CALCULADOS pelo sistema (seção METAS CALÓRICAS). NÃO recalcule TMB nem percentuais.
+2. Gere exatamente as refeições listadas nas METAS CALÓRICAS, na mesma ordem, usando em "calorias" o valor indicado para cada uma
 3. A SOMA das calorias de TODAS as refeições DEVE ser EXATAMENTE igual ao total calórico diário (tolerância: ±10 kcal)
 4. A descrição do plano DEVE mencionar EXATAMENTE o mesmo total calórico que a soma das refeições
 5. VALIDAÇÃO OBRIGATÓRIA: Antes de finalizar, some todas as calorias das refeições e garanta que seja igual ao total mencionado na descrição
@@ -101,23 +105,12 @@ PASSO 1 - INTERPRETAÇÃO:
 - Identifique condições médicas (diabetes, hipertensão, etc.) - adaptar rigorosamente
 - Anote número de refeições e horários informados
 
-PASSO 2 - CÁLCULO CALÓRICO:
-- Calcule TMB (Taxa Metabólica Basal) usando fórmula apropriada
-- Ajuste por objetivo:
-  * Emagrecimento: TMB x 1.2-1.4 (déficit de 300-500 kcal)
-  * Ganho de massa: TMB x 1.6-1.8 (superávit de 300-500 kcal)
-  * Manutenção: TMB x 1.4-1.6
-- Defina o TOTAL CALÓRICO DIÁRIO (use valor inteiro, ex: 2000, 1800, 2500)
+PASSO 2 - METAS CALÓRICAS:
+- Use o TOTAL CALÓRICO DIÁRIO e os macros da seção METAS CALÓRICAS (não recalcule)
+- Cite esse total EXATO na descrição do plano
 
 PASSO 3 - DISTRIBUIÇÃO DE REFEIÇÕES:
-- Determine quantas refeições gerar (baseado em qtd_refeicoes informado)
-- Defina tipos de refeição conforme número:
-  * 3 refeições: Café, Almoço, Jantar
-  * 4 refeições: Café, Almoço, Lanche, Jantar
-  * 5 refeições: Café, Lanche manhã, Almoço, Lanche tarde, Jantar
-  * 6 refeições: Café, Lanche manhã, Almoço, Lanche tarde, Jantar, Ceia
-- Distribua calorias proporcionalmente conforme percentuais mencionados
-- Se horários específicos informados, use essa ordem. Se "a cada 3 horas", calcule horários padrão
+- Gere as refeições listadas nas METAS CALÓRICAS, com os tipos e as calorias indicados
 
 PASSO 4 - ORDENAÇÃO DAS REFEIÇÕES:
 - Ordene as refeições cronologicamente (mais cedo → mais tarde)
@@ -145,6 +138,9 @@ PASSO 6 - VALIDAÇÃO FINAL:
 === ANAMNESE DO USUÁRIO ===
 <<<RESPOSTAS_ANAMNESE>>>
 
+=== METAS CALÓRICAS (CALCULADAS PELO SISTEMA - USE EXATAMENTE) ===
+<<<METAS_CALORICAS>>>
+
 LEMBRE-SE CRITICAMENTE:
 - Ordenar refeições cronologicamente (mais cedo → mais tarde)
 - Calorias totais na descrição = soma das calorias das refeições (verificar antes de finalizar)
@@ -210,8 +206,42 @@ IMPORTANTE: Se o usuário mencionou alergia específica ou alimento que não pod
 Gere o NOVO plano completo em JSON, aplicando as alterações e mantendo TODAS as regras.
 """
 
+PATCH_ADJUSTMENT_TEMPLATE = """
+Você é uma IA especializada em prescrição de dietas personalizadas. O usuário quer ajustar um plano de dieta existente.
+NÃO gere a dieta completa novamente: responda SOMENTE com a lista mínima de operações de edição que aplica as alterações pedidas.
+
+=== FORMATO DA RESPOSTA (APENAS JSON) ===
+{"operacoes": [ ...operações... ]}
+
+=== OPERAÇÕES PERMITIDAS (índices começam em 0 e são aplicadas na ordem da lista) ===
+- {"op": "substituir_refeicao", "refeicao": i, "valor": {"calorias", "alimentos", "tipoRefeicao"}}
+- {"op": "alterar_refeicao", "refeicao": i, "campos": {"calorias"?, "alimentos"?, "tipoRefeicao"?}}
+- {"op": "adicionar_refeicao", "posicao": i, "valor": {"calorias", "alimentos", "tipoRefeicao"}}
+- {"op": "remover_refeicao", "refeicao": i}
+- {"op": "alterar_dieta", "campos": {"nome"?, "descricao"?}}
+
+=== REGRAS ===
+- Mantenha tudo o que o usuário não pediu para mudar
+- Substituições de alimentos mantêm valor calórico similar
+- Alimentos no formato "Nome Do Alimento - Quantidade - Preparo; ..."
+- Refeições em ordem cronológica: Café da manhã → Lanche → Almoço → Lanche → Jantar → Ceia
+- Se o total calórico mudar, inclua "alterar_dieta" atualizando o total citado na descrição
+- Nunca inclua alimentos alérgenos ou que o usuário não gosta
+
+=== ANAMNESE DO USUÁRIO ===
+<<<RESPOSTAS_ANAMNESE>>>
+
+=== METAS CALÓRICAS (CALCULADAS PELO SISTEMA - USE EXATAMENTE) ===
+<<<METAS_CALORICAS>>>
+
+=== PLANO ATUAL ===
+<<<PLANO_ATUAL>>>
+
+=== ALTERAÇÕES SOLICITADAS ===
+<<<AJUSTES>>>
+"""
 
-def build_prompt(anamnese: PostAnamneseDieta) -> str:
+def build_anamnese_text(anamnese: PostAnamneseDieta) -> str:
     # Destacar alergias e condições médicas
     alergias_info = ""
     if anamnese.possui_alergias:
@@ -252,11 +282,20 @@ def build_prompt(anamnese: PostAnamneseDieta) -> str:
         f"Usa suplementos: {'sim' if anamnese.uso_suplementos else 'não'}"
     )
 
-    return PROMPT_TEMPLATE.replace("<<<RESPOSTAS_ANAMNESE>>>", anamnese_text)
+    return anamnese_text
+
+
+def build_prompt(anamnese: PostAnamneseDieta, metas: dict | None = None) -> str:
+    metas = metas or calcular_metas(anamnese)
+    return (
+        PROMPT_TEMPLATE
+        .replace("<<<RESPOSTAS_ANAMNESE>>>", build_anamnese_text(anamnese))
+        .replace("<<<METAS_CALORICAS>>>", formatar_metas(metas))
+    )
 
 
-def build_adjustment_prompt(anamnese: PostAnamneseDieta, plano_atual: dict, ajustes: str) -> str:
-    base_prompt = build_prompt(anamnese)
+def build_adjustment_prompt(anamnese: PostAnamneseDieta, plano_atual: dict, ajustes: str, metas: dict | None = None) -> str:
+    base_prompt = build_prompt(anamnese, metas)
     plano_json = json.dumps(plano_atual, ensure_ascii=False, indent=2)
     ajustes_texto = ajustes.strip() or "Sem ajustes adicionais fornecidos"
     return base_prompt + ADJUSTMENT_SUFFIX_TEMPLATE.format(
@@ -265,51 +304,154 @@ def build_adjustment_prompt(anamnese: PostAnamneseDieta, plano_atual: dict, ajus
     )
 
 
+def build_patch_prompt(anamnese: PostAnamneseDieta, plano_atual: dict, ajustes: str, metas: dict | None = None) -> str:
+    metas = metas or calcular_metas(anamnese)
+    plano_json = json.dumps(plano_atual, ensure_ascii=False, separators=(",", ":"))
+    ajustes_texto = ajustes.strip() or "Sem ajustes adicionais fornecidos"
+    return (
+        PATCH_ADJUSTMENT_TEMPLATE
+        .replace("<<<RESPOSTAS_ANAMNESE>>>", build_anamnese_text(anamnese))
+        .replace("<<<METAS_CALORICAS>>>", formatar_metas(metas))
+        .replace("<<<PLANO_ATUAL>>>", plano_json)
+        .replace("<<<AJUSTES>>>", ajustes_texto)
+    )
+
+
 class AdjustmentPayload(BaseModel):
     anamnese: PostAnamneseDieta
     plano_atual: dict = Field(..., alias="planoAtual")
     ajustes: str
+    modo: Literal["completo", "patch"] = "completo"
 
 
 @router.post("/gpt/dieta")
-def gpt_dieta(anamnese: PostAnamneseDieta):
+def gpt_dieta(
+    anamnese: PostAnamneseDieta,
+    reutilizar: bool = Query(True, description="Reaproveita um plano confirmado de anamnese quase idêntica"),
+):
     """
     Gera um plano de dieta personalizado usando GPT com base na anamnese fornecida.
     Args:
         anamnese (PostAnamneseDieta): Dados da anamnese do usuário.
+        reutilizar (bool): Consulta o índice de planos confirmados antes de chamar a IA.
     Returns:
-        dict: Resposta contendo o plano de dieta gerado.
+        dict: Resposta contendo o plano de dieta gerado e a origem ("ia" ou "similar").
     """
-    prompt = build_prompt(anamnese)
-    plano = gpt_response(prompt)
+    metas = calcular_metas(anamnese)
+    similar = buscar_plano_similar("dieta", anamnese) if reutilizar else None
+    if similar is not None:
+        plano = similar[0]
+        aplicar_metas(plano, metas)
+        return {
+            "message": "Plano gerado com sucesso",
+            "plano": plano,
+            "metas": metas,
+            "origem": "similar",
+            "distancia": similar[1],
+        }
+
+    prompt = build_prompt(anamnese, metas)
+    plano = gerar_plano_validado(prompt, "dieta", anamnese.usuario_id)
+    aplicar_metas(plano, metas)
+    registrar_geracao("dieta", anamnese, plano)
     print(plano)
     return {
         "message": "Plano gerado com sucesso",
         "plano": plano,
+        "metas": metas,
+        "origem": "ia",
     }
 
 
 @router.post("/gpt/dieta/ajustar")
 def ajustar_dieta(payload: AdjustmentPayload):
-    prompt = build_adjustment_prompt(payload.anamnese, payload.plano_atual, payload.ajustes)
-    plano = gpt_response(prompt)
+    """
+    Ajusta um plano de dieta existente.
+    No modo "patch" a IA devolve apenas operações de edição, aplicadas e validadas no servidor;
+    no modo "completo" a IA regenera a dieta inteira. Nos dois modos as metas calóricas calculadas
+    pelo sistema são fixadas no plano ajustado, como em /gpt/dieta.
+    Args:
+        payload (AdjustmentPayload): Anamnese, plano atual, ajustes pedidos e modo do ajuste.
+    Returns:
+        dict: Resposta com mensagem de sucesso, o plano ajustado e as metas.
+    """
+    descartar_geracao("dieta", payload.anamnese.usuario_id)
+    metas = calcular_metas(payload.anamnese)
+    if payload.modo == "patch":
+        prompt = build_patch_prompt(payload.anamnese, payload.plano_atual, payload.ajustes, metas)
+        plano, operacoes = ajustar_por_operacoes(prompt, "dieta", payload.plano_atual, payload.anamnese.usuario_id)
+        aplicar_metas(plano, metas)
+        return {
+            "message": "Plano de dieta ajustado com sucesso",
+            "plano": plano,
+            "metas": metas,
+            "operacoes": operacoes,
+        }
+
+    prompt = build_adjustment_prompt(payload.anamnese, payload.plano_atual, payload.ajustes, metas)
+    plano = gerar_plano_validado(prompt, "dieta", payload.anamnese.usuario_id, rota="ajuste_dieta")
+    aplicar_metas(plano, metas)
     print(plano)
     return {
         "message": "Plano de dieta ajustado com sucesso",
         "plano": plano,
+        "metas": metas,
     }
 
 
+def _job_dieta(payload: dict) -> dict:
+    return gpt_dieta(PostAnamneseDieta(**payload), reutilizar=True)
+
+
+def _job_ajuste_dieta(payload: dict) -> dict:
+    return ajustar_dieta(AdjustmentPayload(**payload))
+
+
+fila_jobs.registrar("dieta", _job_dieta)
+fila_jobs.registrar("ajuste_dieta", _job_ajuste_dieta)
+
+
+@router.post("/gpt/jobs/dieta", status_code=202)
+def criar_job_dieta(anamnese: PostAnamneseDieta):
+    """
+    Agenda a geração de um plano de dieta em segundo plano e retorna imediatamente.
+    Args:
+        anamnese (PostAnamneseDieta): Dados da anamnese do usuário.
+    Returns:
+        dict: Id do job para consulta em /gpt/jobs/{idJob}.
+    """
+    return fila_jobs.enfileirar("dieta", anamnese.model_dump(), anamnese.usuario_id)
+
+
+@router.post("/gpt/jobs/dieta/ajustar", status_code=202)
+def criar_job_ajuste_dieta(payload: AdjustmentPayload):
+    """
+    Agenda o ajuste de um plano de dieta em segundo plano; ajustes têm prioridade sobre planos novos.
+    Args:
+        payload (AdjustmentPayload): Anamnese, plano atual, ajustes pedidos e modo do ajuste.
+    Returns:
+        dict: Id do job para consulta em /gpt/jobs/{idJob}.
+    """
+    return fila_jobs.enfileirar("ajuste_dieta", payload.model_dump(by_alias=True), payload.anamnese.usuario_id)
+
+
 @router.post("/gpt/dieta/confirm")
-def confirmar_dieta(payload: dict, session: Session = Depends(get_db_mysql)):
+def confirmar_dieta(
+    payload: dict,
+    somente_ids: bool = Query(False, alias="somenteIds", description="Não devolve o plano salvo, só os ids"),
+    session: Session = Depends(get_db_mysql),
+):
     """
     Confirma e persiste o plano de dieta gerado pelo GPT no banco de dados.
     Args:
         payload (dict): Dados contendo o plano de dieta a ser salvo.
+        somente_ids (bool): Responde apenas com os ids gerados, sem o plano.
         session (Session): Sessão do banco de dados.
     Returns:
         dict: Resposta indicando o sucesso da operação e detalhes do plano salvo.
     """
+    # Antes de persistir: a persistência recalcula calorias e grava ids no plano
+    anamnese = anamnese_da_geracao("dieta", payload['plano'])
     try:
         resultado = persist_diet_plan(payload['plano'], session)
         session.commit()
@@ -320,6 +462,15 @@ def confirmar_dieta(payload: dict, session: Session = Depends(get_db_mysql)):
         session.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao salvar treino: {exc}") from exc
 
+    if anamnese is not None:
+        indexar_plano_confirmado("dieta", resultado["plano"], anamnese)
+
+    if somente_ids:
+        return {
+            "message": "Plano gerado e salvo com sucesso",
+            "idDieta": resultado["id_dieta"],
+            "refeicoesIds": [refeicao["idRefeicao"] for refeicao in resultado["treinos_inseridos"]],
+        }
     return {
         "message": "Plano gerado e salvo com sucesso",
         "programa": resultado["programa"],
@@ -328,6 +479,7 @@ def confirmar_dieta(payload: dict, session: Session = Depends(get_db_mysql)):
     }
 
 def persist_diet_plan(plano: dict, session: Session) -> dict:
+    validar_plano_dieta(plano)
     try:
         insert_dieta_query = text("""
         INSERT INTO TCC.DIETA (nome, descricao, id_usuario)
@@ -343,6 +495,23 @@ def persist_diet_plan(plano: dict, session: Session) -> dict:
         VALUES (:id_dieta, :tipo_refeicao, :alimentos, :calorias);
         """)
 
+        # Alimentos estruturados e nutrientes calculados localmente pela tabela de composição
+        composicao = estruturar_refeicoes(plano["refeicoes"])
+        ajustadas = False
+        for refeicao, itens, nutrientes, coberta in zip(
+            plano["refeicoes"], composicao["itens"], composicao["por_refeicao"], composicao["cobertura"]
+        ):
+            # Só com todos os alimentos associados com segurança as calorias calculadas substituem as da IA;
+            # senão fica o valor da IA e os alimentos não reconhecidos são sinalizados
+            if coberta and round(nutrientes["kcal"]) != refeicao["calorias"]:
+                refeicao["caloriasDeclaradas"] = refeicao["calorias"]
+                refeicao["calorias"] = round(nutrientes["kcal"])
+                ajustadas = True
+            refeicao["alimentosNaoAssociados"] = [item["nome"] for item in itens if not item["associado"]]
+        # A descrição cita o total diário: acompanha as calorias recalculadas
+        if ajustadas:
+            atualizar_total_descricao(plano)
+
         session.execute(insert_dieta_query, {
             "nome": plano["nome"],
             "descricao": plano["descricao"],
@@ -352,18 +521,24 @@ def persist_diet_plan(plano: dict, session: Session) -> dict:
         last_dieta_id = consulta_get(get_last_dieta_id_query, session, {"usuario": plano["usuario"]})[0]["last_id"]
 
         refeicoes_inseridas = []
-        for refeicao in plano["refeicoes"]:
-            session.execute(insert_refeicoes_query, {
+        for refeicao, itens, nutrientes in zip(plano["refeicoes"], composicao["itens"], composicao["por_refeicao"]):
+            id_refeicao = session.execute(insert_refeicoes_query, {
                 "id_dieta": last_dieta_id,
                 "tipo_refeicao": refeicao["tipoRefeicao"],
                 "alimentos": refeicao["alimentos"],
                 "calorias": refeicao["calorias"],
-            })
+            }).lastrowid
+
+            inserir_alimentos_refeicao(session, id_refeicao, itens)
+            refeicao["idRefeicao"] = id_refeicao
+            refeicao["nutrientes"] = nutrientes
             refeicoes_inseridas.append(refeicao)
 
         return {
+            "id_dieta": last_dieta_id,
             "programa": plano["nome"],
             "treinos_inseridos": refeicoes_inseridas,
+            "nutrientes": composicao["total"],
             "plano": plano,
         }
     except Exception as exc:
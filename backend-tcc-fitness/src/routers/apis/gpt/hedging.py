@@ -0,0 +1,200 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from threading import Event, Lock, Thread
+from typing import Any, Callable
+import time
+import numpy as np
+from fastapi import HTTPException
+
+from src.core.config import SettingsGPT
+
+
+class Cancelamento:
+    """Sinal de cancelamento de uma tentativa: quem executa a chamada registra como abortá-la."""
+
+    def __init__(self):
+        self._evento = Event()
+        self._callbacks: list[Callable[[], Any]] = []
+        self._lock = Lock()
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento.is_set()
+
+    def ao_cancelar(self, callback: Callable[[], Any]) -> None:
+        with self._lock:
+            if not self._evento.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancelar(self) -> None:
+        with self._lock:
+            if self._evento.is_set():
+                return
+            self._evento.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+class Hedger:
+    """
+    Chamadas com prazo e requisição de reserva (hedge): se a primeira tentativa não responder até o
+    percentil configurado das latências recentes da rota, uma segunda tentativa idêntica é disparada
+    e vale a que terminar primeiro; a outra é cancelada. A fração de chamadas com hedge é limitada.
+    """
+
+    def __init__(
+        self,
+        ativo: bool,
+        percentil: float,
+        janela: int,
+        min_amostras: int,
+        atraso_minimo: float,
+        taxa_maxima: float,
+    ):
+        self.ativo = ativo
+        self.percentil = percentil
+        self.janela = janela
+        self.min_amostras = min_amostras
+        self.atraso_minimo = atraso_minimo
+        self.taxa_maxima = taxa_maxima
+        self._latencias: dict[str, deque[float]] = {}
+        self._recentes: deque[bool] = deque(maxlen=janela)
+        self._lock = Lock()
+        self._estatisticas = {
+            "chamadas": 0, "hedges": 0, "hedges_vencedores": 0, "hedges_negados": 0, "prazos_estourados": 0,
+        }
+
+    def registrar_latencia(self, rota: str, latencia: float) -> None:
+        with self._lock:
+            self._latencias.setdefault(rota, deque(maxlen=self.janela)).append(latencia)
+
+    def atraso_hedge(self, rota: str) -> float | None:
+        """Tempo de espera antes do hedge, ou None enquanto a rota não tem amostras suficientes."""
+        with self._lock:
+            amostras = list(self._latencias.get(rota, ()))
+        if not self.ativo or len(amostras) < self.min_amostras:
+            return None
+        return max(float(np.percentile(amostras, self.percentil)), self.atraso_minimo)
+
+    def _reservar_hedge(self) -> bool:
+        # Orçamento de hedges nas últimas "janela" chamadas (janela cheia no denominador desde o início)
+        with self._lock:
+            if sum(self._recentes) + 1 > self.taxa_maxima * self.janela:
+                self._estatisticas["hedges_negados"] += 1
+                return False
+            self._estatisticas["hedges"] += 1
+            return True
+
+    def executar(self, rota: str, tentativa: Callable[[Cancelamento], Any], prazo: float) -> Any:
+        """
+        Executa a tentativa com prazo total e, se a rota estiver lenta, com uma tentativa de reserva.
+        Args:
+            rota (str): Rota do modelo; as latências são acompanhadas por rota.
+            tentativa (Callable): Executa uma chamada; recebe o Cancelamento que deve respeitar.
+            prazo (float): Segundos até o fim da chamada, somando todas as tentativas.
+        Returns:
+            Any: Resultado da primeira tentativa bem-sucedida.
+        """
+        limite = time.monotonic() + prazo
+        with self._lock:
+            self._estatisticas["chamadas"] += 1
+        atraso = self.atraso_hedge(rota)
+
+        execucoes: dict[Future, tuple[Cancelamento, float, bool]] = {}
+
+        def disparar(hedge: bool) -> Future:
+            futuro: Future = Future()
+            cancelamento = Cancelamento()
+            execucoes[futuro] = (cancelamento, time.monotonic(), hedge)
+
+            def rodar():
+                try:
+                    futuro.set_result(tentativa(cancelamento))
+                except BaseException as exc:
+                    futuro.set_exception(exc)
+
+            Thread(target=rodar, name=f"gpt-{rota}{'-hedge' if hedge else ''}", daemon=True).start()
+            return futuro
+
+        def encerrar(vencedor: Future | None) -> None:
+            agora = time.monotonic()
+            for futuro, (cancelamento, inicio_tentativa, _) in execucoes.items():
+                if futuro is vencedor or futuro.done():
+                    continue
+                cancelamento.cancelar()
+                # Latência de quem perdeu é no mínimo o tempo já decorrido: mantém o percentil honesto
+                self.registrar_latencia(rota, agora - inicio_tentativa)
+
+        inicio = time.monotonic()
+        pendentes = {disparar(hedge=False)}
+        erro: BaseException | None = None
+        hedge_disparado = hedge_enviado = False
+
+        while pendentes:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            espera = restante
+            if atraso is not None and not hedge_disparado:
+                espera = min(restante, max(atraso - (time.monotonic() - inicio), 0.0))
+
+            concluidos, pendentes = wait(pendentes, timeout=espera, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                if futuro.exception() is not None:
+                    erro = futuro.exception()
+                    continue
+                _, inicio_tentativa, hedge = execucoes[futuro]
+                self.registrar_latencia(rota, time.monotonic() - inicio_tentativa)
+                encerrar(futuro)
+                with self._lock:
+                    self._recentes.append(hedge_enviado)
+                    if hedge:
+                        self._estatisticas["hedges_vencedores"] += 1
+                return futuro.result()
+
+            if not concluidos and pendentes and atraso is not None and not hedge_disparado:
+                hedge_disparado = True
+                if self._reservar_hedge():
+                    hedge_enviado = True
+                    # Já concluída ou não, a reserva entra nas pendentes: o próximo wait a devolve
+                    pendentes.add(disparar(hedge=True))
+
+        encerrar(None)
+        with self._lock:
+            self._recentes.append(hedge_enviado)
+        if erro is not None and not pendentes:
+            raise erro
+        with self._lock:
+            self._estatisticas["prazos_estourados"] += 1
+        raise HTTPException(status_code=504, detail=f"Modelo não respondeu dentro do prazo de {prazo:.1f}s")
+
+    def estado(self) -> dict:
+        with self._lock:
+            rotas = {rota: len(amostras) for rota, amostras in self._latencias.items()}
+            estatisticas = dict(self._estatisticas)
+            taxa = sum(self._recentes) / len(self._recentes) if self._recentes else 0.0
+        return {
+            **estatisticas,
+            "ativo": self.ativo,
+            "taxa_hedge_recente": taxa,
+            "atraso_por_rota": {rota: self.atraso_hedge(rota) for rota in rotas},
+            "amostras_por_rota": rotas,
+        }
+
+
+_sett = SettingsGPT()
+
+hedger_gpt = Hedger(
+    ativo=_sett.GPT_HEDGE_ATIVO,
+    percentil=_sett.GPT_HEDGE_PERCENTIL,
+    janela=_sett.GPT_HEDGE_JANELA,
+    min_amostras=_sett.GPT_HEDGE_MIN_AMOSTRAS,
+    atraso_minimo=_sett.GPT_HEDGE_ATRASO_MINIMO_SEGUNDOS,
+    taxa_maxima=_sett.GPT_HEDGE_TAXA_MAXIMA,
+)
@@ -0,0 +1,290 @@
+from fastapi import HTTPException, Query
+from sqlalchemy import text
+from queue import PriorityQueue
+from threading import Condition, Lock, Thread, Timer
+from typing import Callable
+import itertools
+import json
+import time
+import uuid
+
+from src.routers.router import router
+from src.core.config import SettingsGPT
+from src.core.database import get_db_mysql
+from src.routers.models.consultas import consulta_get
+from src.routers.apis.gpt.consumo import espera_limite
+
+
+# Menor valor = executado antes: ajustes de planos existentes passam na frente de planos novos
+PRIORIDADES = {
+    "ajuste_treino": 0,
+    "ajuste_dieta": 0,
+    "treino": 1,
+    "dieta": 1,
+    "lote_treino": 2,
+    "lote_dieta": 2,
+    "progresso": 3,
+}
+
+STATUS_FINAIS = ("concluido", "erro")
+
+
+def _sessao():
+    return next(get_db_mysql())
+
+
+class FilaJobs:
+    """
+    Fila de geração em segundo plano: os jobs ficam gravados em TCC.JOB_GERACAO
+    (sobrevivem a reinícios) e são executados por um número fixo de threads, por prioridade.
+    Job recusado pelos limites de uso da IA (429) volta para a fila com espera crescente, até max_tentativas.
+    Um job interrompido por uma queda é executado de novo na inicialização: os handlers devem ser idempotentes
+    (o lote, por exemplo, marca cada item salvo na mesma transação do plano).
+    """
+
+    def __init__(self, workers: int, max_tentativas: int, retencao_dias: int):
+        self.workers = max(1, workers)
+        self.max_tentativas = max_tentativas
+        self.retencao_dias = retencao_dias
+        self._fila: PriorityQueue = PriorityQueue()
+        self._sequencia = itertools.count()
+        self._handlers: dict[str, Callable[[dict], dict]] = {}
+        self._concluidos = Condition()
+        self._lock = Lock()
+        self._threads: list[Thread] = []
+
+    def registrar(self, tipo: str, handler: Callable[[dict], dict]) -> None:
+        """Associa um tipo de job à função que o executa a partir do payload gravado."""
+        self._handlers[tipo] = handler
+
+    def iniciar(self) -> None:
+        """Recupera os jobs interrompidos ou pendentes e inicia as threads (idempotente)."""
+        with self._lock:
+            if self._threads:
+                return
+            self._recuperar()
+            for numero in range(self.workers):
+                thread = Thread(target=self._executar, name=f"fila-jobs-{numero}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _recuperar(self) -> None:
+        session = _sessao()
+        try:
+            # Jobs que estavam executando quando o processo caiu voltam para a fila até o limite de tentativas
+            session.execute(text("""
+            UPDATE TCC.JOB_GERACAO
+            SET status = 'erro', status_code = 500, concluido_em = NOW(3),
+                erro = 'Execução interrompida repetidamente'
+            WHERE status = 'executando' AND tentativas >= :max_tentativas;
+            """), {"max_tentativas": self.max_tentativas})
+            session.execute(text("""
+            UPDATE TCC.JOB_GERACAO SET status = 'pendente' WHERE status = 'executando';
+            """))
+            session.execute(text("""
+            DELETE FROM TCC.JOB_GERACAO
+            WHERE status IN ('concluido', 'erro') AND concluido_em < NOW(3) - INTERVAL :dias DAY;
+            """), {"dias": self.retencao_dias})
+            session.commit()
+            pendentes = consulta_get(
+                """
+                SELECT id_job, prioridade FROM TCC.JOB_GERACAO
+                WHERE status = 'pendente'
+                ORDER BY prioridade, criado_em;
+                """,
+                session,
+            )
+        finally:
+            session.close()
+        for job in pendentes:
+            self._fila.put((job["prioridade"], next(self._sequencia), job["id_job"]))
+
+    def enfileirar(self, tipo: str, payload: dict, usuario_id: int | None = None, id_job: str | None = None) -> dict:
+        """
+        Grava um job pendente e o coloca na fila.
+        Args:
+            id_job (str | None): Id já reservado pelo chamador, quando o payload precisa conhecê-lo.
+        Returns:
+            dict: Id do job, status e prioridade.
+        """
+        if tipo not in self._handlers:
+            raise HTTPException(status_code=400, detail=f"Tipo de job desconhecido: {tipo}")
+        self.iniciar()
+
+        id_job = id_job or str(uuid.uuid4())
+        prioridade = PRIORIDADES.get(tipo, max(PRIORIDADES.values()))
+        session = _sessao()
+        try:
+            session.execute(text("""
+            INSERT INTO TCC.JOB_GERACAO (id_job, tipo, prioridade, id_usuario, payload)
+            VALUES (:id_job, :tipo, :prioridade, :id_usuario, :payload);
+            """), {
+                "id_job": id_job,
+                "tipo": tipo,
+                "prioridade": prioridade,
+                "id_usuario": usuario_id,
+                "payload": json.dumps(payload, ensure_ascii=False, default=str),
+            })
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            raise HTTPException(status_code=500, detail=f"Erro ao criar job: {exc}") from exc
+        finally:
+            session.close()
+
+        self._fila.put((prioridade, next(self._sequencia), id_job))
+        return {"idJob": id_job, "status": "pendente", "prioridade": prioridade}
+
+    def _executar(self) -> None:
+        while True:
+            _, _, id_job = self._fila.get()
+            try:
+                self._processar(id_job)
+            except Exception as exc:
+                print(f"Erro inesperado na fila de jobs ({id_job}): {exc}")
+            finally:
+                self._fila.task_done()
+
+    def _processar(self, id_job: str) -> None:
+        session = _sessao()
+        try:
+            # Reserva atômica: só um worker (ou processo) passa daqui com o mesmo job
+            reservado = session.execute(text("""
+            UPDATE TCC.JOB_GERACAO
+            SET status = 'executando', iniciado_em = NOW(3), tentativas = tentativas + 1
+            WHERE id_job = :id_job AND status = 'pendente';
+            """), {"id_job": id_job}).rowcount
+            session.commit()
+            if not reservado:
+                return
+            job = consulta_get(
+                "SELECT tipo, payload, prioridade, tentativas FROM TCC.JOB_GERACAO WHERE id_job = :id_job;",
+                session,
+                {"id_job": id_job},
+            )[0]
+        finally:
+            session.close()
+
+        resultado, erro, status_code = None, None, 200
+        try:
+            resultado = self._handlers[job["tipo"]](json.loads(job["payload"]))
+        except HTTPException as exc:
+            erro, status_code = str(exc.detail), exc.status_code
+        except Exception as exc:
+            erro, status_code = f"Erro interno: {exc}", 500
+
+        if status_code == 429 and job["tentativas"] < self.max_tentativas:
+            self._reagendar(id_job, job, erro)
+            return
+
+        session = _sessao()
+        try:
+            session.execute(text("""
+            UPDATE TCC.JOB_GERACAO
+            SET status = :status, resultado = :resultado, erro = :erro, status_code = :status_code,
+                concluido_em = NOW(3)
+            WHERE id_job = :id_job;
+            """), {
+                "status": "erro" if erro else "concluido",
+                "resultado": None if erro else json.dumps(resultado, ensure_ascii=False, default=str),
+                "erro": erro[:2000] if erro else None,
+                "status_code": status_code,
+                "id_job": id_job,
+            })
+            session.commit()
+        finally:
+            session.close()
+
+        with self._concluidos:
+            self._concluidos.notify_all()
+
+    def _reagendar(self, id_job: str, job: dict, erro: str) -> None:
+        """Devolve o job à fila depois da espera da tentativa (pendente no banco: um reinício também o retoma)."""
+        session = _sessao()
+        try:
+            session.execute(text("""
+            UPDATE TCC.JOB_GERACAO SET status = 'pendente', erro = :erro, status_code = 429
+            WHERE id_job = :id_job;
+            """), {"erro": erro[:2000], "id_job": id_job})
+            session.commit()
+        finally:
+            session.close()
+        espera = Timer(
+            espera_limite(job["tentativas"]),
+            self._fila.put,
+            args=((job["prioridade"], next(self._sequencia), id_job),),
+        )
+        espera.daemon = True
+        espera.start()
+
+    def consultar(self, id_job: str, esperar: float = 0.0) -> dict:
+        """
+        Estado de um job. Com esperar > 0, aguarda (long-poll) até o job terminar ou o tempo acabar.
+        """
+        limite = time.monotonic() + max(esperar, 0.0)
+        while True:
+            session = _sessao()
+            try:
+                linhas = consulta_get(
+                    """
+                    SELECT id_job, tipo, prioridade, status, resultado, erro, status_code, tentativas,
+                           criado_em, iniciado_em, concluido_em
+                    FROM TCC.JOB_GERACAO WHERE id_job = :id_job;
+                    """,
+                    session,
+                    {"id_job": id_job},
+                )
+            finally:
+                session.close()
+            if not linhas:
+                raise HTTPException(status_code=404, detail="Job não encontrado")
+            job = linhas[0]
+
+            restante = limite - time.monotonic()
+            if job["status"] in STATUS_FINAIS or restante <= 0:
+                break
+            # Acorda a cada conclusão local e, no máximo a cada segundo, relê o banco (jobs de outros processos)
+            with self._concluidos:
+                self._concluidos.wait(min(restante, 1.0))
+
+        return {
+            "idJob": job["id_job"],
+            "tipo": job["tipo"],
+            "prioridade": job["prioridade"],
+            "status": job["status"],
+            "tentativas": job["tentativas"],
+            "resultado": json.loads(job["resultado"]) if job["resultado"] else None,
+            "erro": job["erro"],
+            "statusCode": job["status_code"],
+            "criadoEm": job["criado_em"],
+            "iniciadoEm": job["iniciado_em"],
+            "concluidoEm": job["concluido_em"],
+        }
+
+
+_sett = SettingsGPT()
+fila_jobs = FilaJobs(_sett.GPT_JOBS_WORKERS, _sett.GPT_JOBS_MAX_TENTATIVAS, _sett.GPT_JOBS_RETENCAO_DIAS)
+
+
+def inicializar_fila_jobs() -> None:
+    """Retoma os jobs gravados e inicia os workers na inicialização da aplicação."""
+    try:
+        fila_jobs.iniciar()
+    except Exception as e:
+        print(f"Erro ao iniciar fila de jobs: {e}")
+
+
+@router.get("/gpt/jobs/{id_job}")
+def consultar_job(
+    id_job: str,
+    esperar: float = Query(0, ge=0, description="Segundos para aguardar a conclusão (long-poll)"),
+):
+    """
+    Retorna o estado e, quando concluído, o resultado de um job de geração.
+    Args:
+        id_job (str): Id retornado na criação do job.
+        esperar (float): Tempo máximo de espera pela conclusão, limitado pela configuração.
+    Returns:
+        dict: Status ("pendente", "executando", "concluido" ou "erro"), resultado e erro.
+    """
+    return fila_jobs.consultar(id_job, min(esperar, _sett.GPT_JOBS_ESPERA_MAXIMA_SEGUNDOS))
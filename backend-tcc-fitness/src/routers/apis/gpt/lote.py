@@ -0,0 +1,367 @@
+from fastapi import HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy import text
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Literal
+import copy
+import hashlib
+import json
+import time
+import uuid
+
+from src.routers.router import router
+from src.core.config import SettingsGPT
+from src.core.database import get_db_mysql
+from src.routers.models.consultas import consulta_get
+from src.routers.models.anamnesemodel import PostAnamnese, PostAnamneseDieta
+from src.routers.apis.gpt.jobs import fila_jobs
+from src.routers.apis.gpt.consumo import espera_limite
+from src.routers.apis.gpt.validacao import gerar_plano_validado
+from src.routers.apis.gpt.gerador_local import gerar_plano_local
+from src.routers.apis.gpt.similaridade import (
+    buscar_planos_similares,
+    registrar_geracao,
+    indexar_plano_confirmado,
+    reescrever_usuario,
+)
+from src.routers.apis.gpt import gpt as gpt_treino, gpt_dieta
+from src.routers.apis.dieta.energia import calcular_metas_lote, aplicar_metas
+
+
+_sett = SettingsGPT()
+
+
+class LoteTreinoPayload(BaseModel):
+    anamneses: list[PostAnamnese] = Field(..., min_length=1)
+    persistir: bool = False
+    reutilizar: bool = True
+
+
+class LoteDietaPayload(BaseModel):
+    anamneses: list[PostAnamneseDieta] = Field(..., min_length=1)
+    persistir: bool = False
+    reutilizar: bool = True
+
+
+def _sessao():
+    return next(get_db_mysql())
+
+
+def _chave(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _prompts(tipo: str, anamneses: list) -> tuple[list[str], list[dict | None]]:
+    """
+    Prompt de cada anamnese e, na dieta, as metas calculadas em lote.
+    O ID do usuário é neutralizado no prompt da chave: alunos com a mesma anamnese compartilham a geração.
+    """
+    if tipo == "treino":
+        return [gpt_treino.build_prompt(anamnese.model_copy(update={"usuario_id": 0})) for anamnese in anamneses], [None] * len(anamneses)
+    metas = calcular_metas_lote(anamneses)
+    prompts = [
+        gpt_dieta.build_prompt(anamnese.model_copy(update={"usuario_id": 0}), meta)
+        for anamnese, meta in zip(anamneses, metas)
+    ]
+    return prompts, metas
+
+
+def _gerar(tipo: str, anamnese, metas: dict | None) -> tuple[dict, str]:
+    """
+    Gera o plano de um representante do grupo; recusas pelos limites de uso (429) são repetidas
+    com espera crescente até GPT_LIMITE_TENTATIVAS. Returns: (plano, origem).
+    """
+    for tentativa in range(1, _sett.GPT_LIMITE_TENTATIVAS + 1):
+        try:
+            return _gerar_uma_vez(tipo, anamnese, metas)
+        except HTTPException as exc:
+            if exc.status_code != 429 or tentativa == _sett.GPT_LIMITE_TENTATIVAS:
+                raise
+            time.sleep(espera_limite(tentativa))
+    raise HTTPException(status_code=429, detail="Limite de uso da IA atingido")
+
+
+def _gerar_uma_vez(tipo: str, anamnese, metas: dict | None) -> tuple[dict, str]:
+    if tipo == "treino":
+        try:
+            return gerar_plano_validado(gpt_treino.build_prompt(anamnese), "treino", anamnese.usuario_id), "ia"
+        except HTTPException as exc:
+            if exc.status_code < 500:
+                raise
+            # Mesmo comportamento do /gpt: indisponibilidade da IA cai no gerador local
+            return gerar_plano_local(anamnese), "local"
+    plano = gerar_plano_validado(gpt_dieta.build_prompt(anamnese, metas), "dieta", anamnese.usuario_id)
+    return plano, "ia"
+
+
+ATUALIZAR_ITEM = text("""
+UPDATE TCC.LOTE_GERACAO_ITEM
+SET status = :status, origem = :origem, resultado = :resultado, erro = :erro, id_persistido = :id_persistido
+WHERE id_lote = :id_lote AND posicao = :posicao;
+""")
+
+
+def _atualizar_itens(id_lote: str, linhas: list[dict]) -> None:
+    if not linhas:
+        return
+    session = _sessao()
+    try:
+        session.execute(ATUALIZAR_ITEM, [{"id_lote": id_lote, "id_persistido": None, **linha} for linha in linhas])
+        session.commit()
+    finally:
+        session.close()
+
+
+def _inserir_itens(id_lote: str, anamneses: list, chaves: list[str]) -> None:
+    # INSERT IGNORE: o endpoint e o worker podem gravar os itens, o que chegar primeiro vale
+    session = _sessao()
+    try:
+        session.execute(text("""
+        INSERT IGNORE INTO TCC.LOTE_GERACAO_ITEM (id_lote, posicao, id_usuario, chave)
+        VALUES (:id_lote, :posicao, :id_usuario, :chave);
+        """), [
+            {"id_lote": id_lote, "posicao": posicao, "id_usuario": anamnese.usuario_id, "chave": chave}
+            for posicao, (anamnese, chave) in enumerate(zip(anamneses, chaves))
+        ])
+        session.commit()
+    finally:
+        session.close()
+
+
+def _persistir(tipo: str, id_lote: str, anamneses: list, planos: dict[int, tuple[dict, str]]) -> list[dict]:
+    """
+    Persiste os planos em transações de até GPT_LOTE_TAMANHO_TRANSACAO itens.
+    Cada item roda num savepoint: um plano inválido não desfaz os demais da transação.
+    O item é marcado "persistido" na mesma transação do plano: um job retomado após uma queda
+    nunca salva o mesmo plano duas vezes.
+    """
+    persistir: Callable[[dict, Any], dict] = (
+        gpt_treino.persist_workout_plan if tipo == "treino" else gpt_dieta.persist_diet_plan
+    )
+    posicoes = sorted(planos)
+    linhas: list[dict] = []
+    for inicio in range(0, len(posicoes), _sett.GPT_LOTE_TAMANHO_TRANSACAO):
+        bloco = posicoes[inicio:inicio + _sett.GPT_LOTE_TAMANHO_TRANSACAO]
+        salvas: list[dict] = []
+        erros: list[dict] = []
+        session = _sessao()
+        try:
+            for posicao in bloco:
+                plano, origem = planos[posicao]
+                try:
+                    with session.begin_nested():
+                        resultado = persistir(plano, session)
+                        linha = {
+                            "posicao": posicao, "status": "persistido", "origem": origem,
+                            "resultado": json.dumps(resultado["plano"], ensure_ascii=False, default=str), "erro": None,
+                            "id_persistido": (
+                                resultado["programa"]["id_programa_treino"] if tipo == "treino" else resultado["id_dieta"]
+                            ),
+                        }
+                        session.execute(ATUALIZAR_ITEM, {"id_lote": id_lote, **linha})
+                    salvas.append({**linha, "plano": resultado["plano"]})
+                except Exception as exc:
+                    erro = str(exc.detail) if isinstance(exc, HTTPException) else f"Erro ao salvar plano: {exc}"
+                    erros.append({"posicao": posicao, "erro": erro})
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            salvas, erros = [], [{"posicao": posicao, "erro": f"Erro ao salvar lote: {exc}"} for posicao in bloco]
+        finally:
+            session.close()
+
+        for linha in salvas:
+            plano = linha.pop("plano")
+            if linha["origem"] == "ia":
+                indexar_plano_confirmado(tipo, plano, anamneses[linha["posicao"]])
+            linhas.append(linha)
+        # O plano gerado fica no item para consulta; o status indica que não foi salvo
+        falhas = [
+            {
+                "posicao": item["posicao"], "status": "erro", "origem": planos[item["posicao"]][1],
+                "resultado": json.dumps(planos[item["posicao"]][0], ensure_ascii=False), "erro": item["erro"][:2000],
+            }
+            for item in erros
+        ]
+        _atualizar_itens(id_lote, falhas)
+        linhas.extend(falhas)
+    return linhas
+
+
+def processar_lote(tipo: Literal["treino", "dieta"], id_lote: str, payload: dict) -> dict:
+    """
+    Gera os planos de um lote: agrupa anamneses com o mesmo prompt, reaproveita planos similares em lote
+    e chama a IA uma vez por grupo, com no máximo GPT_LOTE_CONCORRENCIA chamadas simultâneas.
+    Returns:
+        dict: Contagem de itens por origem, erros e planos persistidos.
+    """
+    modelo = PostAnamnese if tipo == "treino" else PostAnamneseDieta
+    anamneses = [modelo(**anamnese) for anamnese in payload["anamneses"]]
+    prompts, metas = _prompts(tipo, anamneses)
+    chaves = [_chave(prompt) for prompt in prompts]
+    _inserir_itens(id_lote, anamneses, chaves)
+
+    # Retomada após reinício: itens já concluídos não são gerados de novo
+    session = _sessao()
+    try:
+        existentes = consulta_get(
+            "SELECT posicao, status, origem, resultado FROM TCC.LOTE_GERACAO_ITEM WHERE id_lote = :id_lote;",
+            session,
+            {"id_lote": id_lote},
+        )
+    finally:
+        session.close()
+    planos: dict[int, tuple[dict, str]] = {
+        item["posicao"]: (json.loads(item["resultado"]), item["origem"])
+        for item in existentes
+        if item["status"] == "concluido" and item["resultado"]
+    }
+    ja_persistidos = {item["posicao"] for item in existentes if item["status"] == "persistido"}
+    pendentes = [posicao for posicao in range(len(anamneses)) if posicao not in planos and posicao not in ja_persistidos]
+
+    contagem = {"total": len(anamneses), "unicos": len(set(chaves)), "similar": 0, "ia": 0, "local": 0, "erros": 0}
+    linhas: list[dict] = []
+
+    def concluir(posicao: int, plano: dict, origem: str) -> None:
+        if metas[posicao] is not None:
+            aplicar_metas(plano, metas[posicao])
+        planos[posicao] = (plano, origem)
+        contagem[origem] += 1
+        linhas.append({
+            "posicao": posicao, "status": "concluido", "origem": origem,
+            "resultado": json.dumps(plano, ensure_ascii=False), "erro": None,
+        })
+
+    if payload.get("reutilizar", True) and pendentes:
+        similares = buscar_planos_similares(tipo, [anamneses[posicao] for posicao in pendentes])
+        for posicao, similar in zip(list(pendentes), similares):
+            if similar is not None:
+                concluir(posicao, similar[0], "similar")
+                pendentes.remove(posicao)
+        _atualizar_itens(id_lote, linhas)
+        linhas.clear()
+
+    grupos: dict[str, list[int]] = {}
+    for posicao in pendentes:
+        grupos.setdefault(chaves[posicao], []).append(posicao)
+
+    with ThreadPoolExecutor(max_workers=max(1, _sett.GPT_LOTE_CONCORRENCIA)) as executor:
+        futuros = {
+            executor.submit(_gerar, tipo, anamneses[posicoes[0]], metas[posicoes[0]]): posicoes
+            for posicoes in grupos.values()
+        }
+        for futuro in as_completed(futuros):
+            posicoes = futuros[futuro]
+            try:
+                plano, origem = futuro.result()
+            except Exception as exc:
+                erro = str(exc.detail) if isinstance(exc, HTTPException) else f"Erro interno: {exc}"
+                contagem["erros"] += len(posicoes)
+                linhas.extend(
+                    {"posicao": posicao, "status": "erro", "origem": None, "resultado": None, "erro": erro[:2000]}
+                    for posicao in posicoes
+                )
+            else:
+                for posicao in posicoes:
+                    copia = reescrever_usuario(tipo, copy.deepcopy(plano), anamneses[posicao].usuario_id)
+                    concluir(posicao, copia, origem)
+                    if origem == "ia" and not payload.get("persistir"):
+                        registrar_geracao(tipo, anamneses[posicao], copia)
+            # Status por item visível enquanto o restante do lote ainda está sendo gerado
+            _atualizar_itens(id_lote, linhas)
+            linhas.clear()
+
+    persistidos = len(ja_persistidos)
+    if payload.get("persistir") and planos:
+        salvas = _persistir(tipo, id_lote, anamneses, planos)
+        persistidos += sum(linha["status"] == "persistido" for linha in salvas)
+        contagem["erros"] += sum(linha["status"] == "erro" for linha in salvas)
+
+    return {**contagem, "persistidos": persistidos}
+
+
+fila_jobs.registrar("lote_treino", lambda payload: processar_lote("treino", payload["idLote"], payload))
+fila_jobs.registrar("lote_dieta", lambda payload: processar_lote("dieta", payload["idLote"], payload))
+
+
+def _criar_lote(tipo: Literal["treino", "dieta"], payload: LoteTreinoPayload | LoteDietaPayload) -> dict:
+    if len(payload.anamneses) > _sett.GPT_LOTE_MAX_ITENS:
+        raise HTTPException(status_code=413, detail=f"Lote acima do limite de {_sett.GPT_LOTE_MAX_ITENS} anamneses")
+    dados = payload.model_dump()
+    # O id do lote vai no payload para o worker gravar os itens sob o mesmo id do job
+    dados["idLote"] = id_lote = str(uuid.uuid4())
+    job = fila_jobs.enfileirar(f"lote_{tipo}", dados, id_job=id_lote)
+    prompts, _ = _prompts(tipo, payload.anamneses)
+    chaves = [_chave(prompt) for prompt in prompts]
+    _inserir_itens(id_lote, payload.anamneses, chaves)
+    return {**job, "idLote": id_lote, "total": len(chaves), "unicos": len(set(chaves))}
+
+
+@router.post("/gpt/lote/treino", status_code=202)
+def criar_lote_treino(payload: LoteTreinoPayload):
+    """
+    Agenda a geração de planos de treino para várias anamneses (importação de alunos de uma academia).
+    Args:
+        payload (LoteTreinoPayload): Anamneses, se os planos devem ser salvos e se planos similares podem ser reaproveitados.
+    Returns:
+        dict: Id do lote, total de anamneses e quantas gerações distintas serão feitas.
+    """
+    return _criar_lote("treino", payload)
+
+
+@router.post("/gpt/lote/dieta", status_code=202)
+def criar_lote_dieta(payload: LoteDietaPayload):
+    """
+    Agenda a geração de planos de dieta para várias anamneses.
+    Args:
+        payload (LoteDietaPayload): Anamneses, se os planos devem ser salvos e se planos similares podem ser reaproveitados.
+    Returns:
+        dict: Id do lote, total de anamneses e quantas gerações distintas serão feitas.
+    """
+    return _criar_lote("dieta", payload)
+
+
+@router.get("/gpt/lote/{id_lote}")
+def consultar_lote(
+    id_lote: str,
+    planos: bool = Query(False, description="Inclui o plano gerado de cada item"),
+):
+    """
+    Retorna o status do lote e de cada item.
+    Args:
+        id_lote (str): Id retornado na criação do lote.
+        planos (bool): Inclui os planos gerados na resposta.
+    Returns:
+        dict: Status do job do lote, resumo e itens com status, origem, erro e id do plano salvo.
+    """
+    job = fila_jobs.consultar(id_lote)
+    session = _sessao()
+    try:
+        itens = consulta_get(
+            f"""
+            SELECT posicao, id_usuario, status, origem, erro, id_persistido{', resultado' if planos else ''}
+            FROM TCC.LOTE_GERACAO_ITEM WHERE id_lote = :id_lote ORDER BY posicao;
+            """,
+            session,
+            {"id_lote": id_lote},
+        )
+    finally:
+        session.close()
+    return {
+        "idLote": id_lote,
+        "status": job["status"],
+        "resumo": job["resultado"],
+        "erro": job["erro"],
+        "itens": [
+            {
+                "posicao": item["posicao"],
+                "idUsuario": item["id_usuario"],
+                "status": item["status"],
+                "origem": item["origem"],
+                "erro": item["erro"],
+                "idPersistido": item["id_persistido"],
+                **({"plano": json.loads(item["resultado"]) if item["resultado"] else None} if planos else {}),
+            }
+            for item in itens
+        ],
+    }
@@ -0,0 +1,132 @@
+from threading import Lock
+from typing import Any, Callable
+import copy
+
+from src.core.config import SettingsGPT
+
+
+MODELO_FINE_TUNE = "ft:gpt-4o-mini-2024-07-18:tcc:teste2:CbGGCMeu"
+MODELO_RAPIDO = "gpt-4o-mini"
+
+# Rotas por tarefa. Preços em dólares por milhão de tokens (entrada, saída).
+# "limite_caracteres" + "modelo_grande": prompts acima do limite vão para o modelo grande.
+ROTAS_PADRAO: dict[str, dict[str, Any]] = {
+    "plano_treino": {
+        "modelo": MODELO_FINE_TUNE, "max_output_tokens": 6000, "reasoning": None,
+        "preco_entrada": 0.30, "preco_saida": 1.20,
+    },
+    "plano_dieta": {
+        "modelo": MODELO_FINE_TUNE, "max_output_tokens": 4000, "reasoning": None,
+        "preco_entrada": 0.30, "preco_saida": 1.20,
+    },
+    "ajuste_treino": {
+        "modelo": MODELO_RAPIDO, "max_output_tokens": 6000, "reasoning": None,
+        "preco_entrada": 0.15, "preco_saida": 0.60,
+        "limite_caracteres": 20000, "modelo_grande": MODELO_FINE_TUNE,
+    },
+    "ajuste_dieta": {
+        "modelo": MODELO_RAPIDO, "max_output_tokens": 4000, "reasoning": None,
+        "preco_entrada": 0.15, "preco_saida": 0.60,
+        "limite_caracteres": 20000, "modelo_grande": MODELO_FINE_TUNE,
+    },
+    # Modo patch: só uma lista curta de operações, cabe com folga em 1500 tokens
+    "patch_treino": {
+        "modelo": MODELO_RAPIDO, "max_output_tokens": 1500, "reasoning": None,
+        "preco_entrada": 0.15, "preco_saida": 0.60,
+    },
+    "patch_dieta": {
+        "modelo": MODELO_RAPIDO, "max_output_tokens": 1500, "reasoning": None,
+        "preco_entrada": 0.15, "preco_saida": 0.60,
+    },
+}
+
+# Substituto local de uma rota: recebe (prompt, configuração resolvida) e devolve o JSON ou o texto da resposta
+Substituto = Callable[[str, dict], dict | str]
+
+
+class RoteadorModelos:
+    """Escolhe o modelo e os parâmetros de cada chamada e acumula latência, tokens e custo por rota."""
+
+    def __init__(self, rotas: dict[str, dict[str, Any]]):
+        self.rotas = rotas
+        self._substitutos: dict[str, Substituto] = {}
+        self._metricas: dict[str, dict[str, float]] = {}
+        self._lock = Lock()
+
+    def resolver(self, rota: str, prompt: str) -> dict[str, Any]:
+        """Configuração efetiva da rota para o prompt informado (modelo escolhido pelo tamanho da entrada)."""
+        if rota not in self.rotas:
+            raise ValueError(f"Rota de modelo desconhecida: {rota}")
+        config = copy.deepcopy(self.rotas[rota])
+        limite = config.pop("limite_caracteres", None)
+        modelo_grande = config.pop("modelo_grande", None)
+        if limite and modelo_grande and len(prompt) > limite:
+            config["modelo"] = modelo_grande
+        config["rota"] = rota
+        return config
+
+    def substituir(self, rota: str, substituto: Substituto) -> None:
+        """Troca a chamada ao modelo da rota por uma função local (testes e desenvolvimento)."""
+        self._substitutos[rota] = substituto
+
+    def restaurar(self, rota: str | None = None) -> None:
+        if rota is None:
+            self._substitutos.clear()
+        else:
+            self._substitutos.pop(rota, None)
+
+    def substituto(self, rota: str) -> Substituto | None:
+        return self._substitutos.get(rota)
+
+    def registrar(
+        self,
+        config: dict[str, Any],
+        latencia: float,
+        sucesso: bool,
+        tokens_entrada: int = 0,
+        tokens_saida: int = 0,
+    ) -> None:
+        custo = (
+            tokens_entrada * config.get("preco_entrada", 0.0)
+            + tokens_saida * config.get("preco_saida", 0.0)
+        ) / 1_000_000
+        chave = f"{config['rota']}:{config['modelo']}"
+        with self._lock:
+            metricas = self._metricas.setdefault(chave, {
+                "chamadas": 0, "falhas": 0, "latencia_total": 0.0, "latencia_maxima": 0.0,
+                "tokens_entrada": 0, "tokens_saida": 0, "custo_usd": 0.0,
+            })
+            metricas["chamadas"] += 1
+            metricas["falhas"] += 0 if sucesso else 1
+            metricas["latencia_total"] += latencia
+            metricas["latencia_maxima"] = max(metricas["latencia_maxima"], latencia)
+            metricas["tokens_entrada"] += tokens_entrada
+            metricas["tokens_saida"] += tokens_saida
+            metricas["custo_usd"] += custo
+
+    def estado(self) -> dict:
+        with self._lock:
+            metricas = {
+                chave: {
+                    **valores,
+                    "latencia_media": round(valores["latencia_total"] / valores["chamadas"], 3) if valores["chamadas"] else 0.0,
+                    "custo_usd": round(valores["custo_usd"], 6),
+                }
+                for chave, valores in self._metricas.items()
+            }
+        return {
+            "rotas": self.rotas,
+            "substituidas": sorted(self._substitutos),
+            "metricas": metricas,
+        }
+
+
+def _rotas_configuradas() -> dict[str, dict[str, Any]]:
+    # GPT_ROTAS (JSON) sobrescreve campos das rotas padrão ou cria rotas novas
+    rotas = copy.deepcopy(ROTAS_PADRAO)
+    for rota, campos in SettingsGPT().GPT_ROTAS.items():
+        rotas[rota] = {**rotas.get(rota, {}), **campos}
+    return rotas
+
+
+roteador_gpt = RoteadorModelos(_rotas_configuradas())
@@ -0,0 +1,359 @@
+from threading import Lock, Thread
+from typing import Literal
+import atexit
+import hashlib
+import json
+import os
+import time
+import numpy as np
+
+from src.core.config import SettingsGPT
+from src.routers.models.anamnesemodel import PostAnamnese, PostAnamneseDieta
+from src.routers.apis.treino.catalogo import (
+    normalizar_nome,
+    equipamentos_permitidos,
+    regioes_lesionadas,
+    termos_excluidos,
+)
+from src.routers.apis.gpt.gerador_local import (
+    interpretar_dias,
+    interpretar_minutos,
+    interpretar_nivel,
+    interpretar_objetivo as objetivo_treino,
+)
+from src.routers.apis.dieta.energia import (
+    interpretar_sexo,
+    interpretar_objetivo as objetivo_dieta,
+    calcular_metas,
+)
+
+
+# Largura das faixas dos campos numéricos: a distância entre anamneses é medida em faixas
+FAIXA_IDADE = 5
+FAIXA_PESO = 5
+FAIXA_ALTURA_CM = 5
+FAIXA_CALORIAS = 100
+
+# Anamneses geradas e ainda não confirmadas, por usuário, expiram depois deste tempo
+VALIDADE_PENDENTE_SEGUNDOS = 24 * 3600
+
+
+def conteudo_plano(tipo: Literal["treino", "dieta"], plano: dict) -> dict:
+    """
+    Só os campos do formato do PROMPT_TEMPLATE: ids e dados gravados na persistência (idRefeicao,
+    nutrientes, calorias declaradas etc.) nunca vão para o índice servido a outros usuários.
+    """
+    if tipo == "treino":
+        programa = plano.get("programaTreino") or {}
+        return {
+            "programaTreino": {
+                "nomePrograma": programa.get("nomePrograma"),
+                "descricaoPrograma": programa.get("descricaoPrograma"),
+            },
+            "treinos": [
+                {
+                    **{campo: treino.get(campo) for campo in ("nome", "descricao", "idUsuario", "duracaoMinutos", "dificuldade")},
+                    "exercicios": [
+                        {
+                            campo: exercicio.get(campo)
+                            for campo in (
+                                "nomeExercicio", "equipamento", "grupoMuscular", "idExercicio",
+                                "series", "repeticoes", "descansoSegundos",
+                            )
+                        }
+                        for exercicio in treino.get("exercicios") or []
+                    ],
+                }
+                for treino in plano.get("treinos") or []
+            ],
+        }
+    return {
+        **{campo: plano.get(campo) for campo in ("nome", "descricao", "usuario")},
+        "refeicoes": [
+            {campo: refeicao.get(campo) for campo in ("tipoRefeicao", "calorias", "alimentos")}
+            for refeicao in plano.get("refeicoes") or []
+        ],
+    }
+
+
+def _impressao(tipo: Literal["treino", "dieta"], plano: dict) -> str:
+    return hashlib.sha1(json.dumps(conteudo_plano(tipo, plano), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _usuario_do_plano(tipo: Literal["treino", "dieta"], plano: dict) -> int | None:
+    if tipo == "treino":
+        treinos = plano.get("treinos") or [{}]
+        return treinos[0].get("idUsuario")
+    return plano.get("usuario")
+
+
+def _termos(texto: str | None) -> str:
+    return ",".join(sorted(set(termos_excluidos(texto))))
+
+
+def _assinatura(*campos) -> str:
+    return hashlib.sha1("|".join(str(campo) for campo in campos).encode("utf-8")).hexdigest()
+
+
+def codificar_treino(anamnese: PostAnamnese) -> tuple[str, np.ndarray]:
+    """
+    Codifica a anamnese de treino em (assinatura dos campos categóricos, vetor numérico em faixas).
+    Só anamneses com a mesma assinatura são comparadas.
+    """
+    equipamentos = equipamentos_permitidos(anamnese.equipamentos)
+    assinatura = _assinatura(
+        interpretar_sexo(anamnese.sexo),
+        interpretar_nivel(anamnese.experiencia),
+        objetivo_treino(anamnese),
+        interpretar_dias(anamnese.dias_semana),
+        interpretar_minutos(anamnese.tempo_treino_por_dia) // 15,
+        ",".join(sorted(equipamentos)) if equipamentos is not None else "*",
+        ",".join(sorted(regioes_lesionadas(anamnese.lesao))),
+        _termos(anamnese.exercicio_nao_gosta),
+        normalizar_nome(anamnese.condicao_medica),
+    )
+    vetor = np.array([anamnese.idade / FAIXA_IDADE, anamnese.peso / FAIXA_PESO], dtype=np.float32)
+    return assinatura, vetor
+
+
+def codificar_dieta(anamnese: PostAnamneseDieta) -> tuple[str, np.ndarray]:
+    """Codifica a anamnese de dieta em (assinatura dos campos categóricos, vetor numérico em faixas)."""
+    altura_cm = anamnese.altura * 100 if anamnese.altura <= 3 else anamnese.altura
+    assinatura = _assinatura(
+        interpretar_sexo(anamnese.sexo),
+        objetivo_dieta(anamnese),
+        normalizar_nome(anamnese.tipo_alimentacao),
+        _termos(anamnese.alimentos_nao_gosta),
+        _termos(anamnese.alimentos_gosta),
+        anamnese.qtd_refeicoes,
+        anamnese.lanche_entre_refeicoes,
+        anamnese.possui_alergias,
+        normalizar_nome(anamnese.possui_condicao_medica),
+    )
+    vetor = np.array(
+        [
+            anamnese.idade / FAIXA_IDADE,
+            altura_cm / FAIXA_ALTURA_CM,
+            anamnese.pesoatual / FAIXA_PESO,
+            anamnese.pesodesejado / FAIXA_PESO,
+            calcular_metas(anamnese)["calorias_diarias"] / FAIXA_CALORIAS,
+        ],
+        dtype=np.float32,
+    )
+    return assinatura, vetor
+
+
+class IndiceSimilaridade:
+    """
+    Planos confirmados indexados pela anamnese de origem. Os vetores ficam numa matriz NumPy
+    e a busca compara, de uma vez, cada consulta com todos os planos da mesma assinatura.
+    Inclusões só marcam o índice como alterado: o arquivo é regravado periodicamente por `salvar`.
+    """
+
+    def __init__(self, dimensao: int, arquivo: str, max_planos: int):
+        self.dimensao = dimensao
+        self.arquivo = arquivo
+        self.max_planos = max_planos
+        self._lock = Lock()
+        self.vetores = np.zeros((0, dimensao), dtype=np.float32)
+        self.assinaturas: list[str] = []
+        self.planos: list[str] = []
+        self._alterado = False
+
+    def __len__(self) -> int:
+        return len(self.planos)
+
+    def adicionar(self, assinatura: str, vetor: np.ndarray, plano: dict) -> None:
+        with self._lock:
+            self.vetores = np.vstack([self.vetores, vetor.reshape(1, -1)])[-self.max_planos:]
+            self.assinaturas = (self.assinaturas + [assinatura])[-self.max_planos:]
+            self.planos = (self.planos + [json.dumps(plano, ensure_ascii=False)])[-self.max_planos:]
+            self._alterado = True
+
+    def buscar_lote(self, consultas: list[tuple[str, np.ndarray]], distancia_maxima: float) -> list[tuple[dict, float] | None]:
+        """
+        Plano mais próximo de cada consulta, ou None quando não há nenhum dentro da distância.
+        Returns:
+            list: (plano, distância) ou None, na ordem das consultas.
+        """
+        with self._lock:
+            vetores, assinaturas, planos = self.vetores, np.array(self.assinaturas, dtype=object), self.planos
+
+        resultados: list[tuple[dict, float] | None] = [None] * len(consultas)
+        if not len(planos) or not consultas:
+            return resultados
+
+        # Agrupa as consultas por assinatura: uma matriz de distâncias por grupo
+        por_assinatura: dict[str, list[int]] = {}
+        for posicao, (assinatura, _) in enumerate(consultas):
+            por_assinatura.setdefault(assinatura, []).append(posicao)
+
+        for assinatura, posicoes in por_assinatura.items():
+            linhas = np.flatnonzero(assinaturas == assinatura)
+            if not len(linhas):
+                continue
+            alvo = np.stack([consultas[posicao][1] for posicao in posicoes])
+            distancias = np.linalg.norm(alvo[:, None, :] - vetores[linhas][None, :, :], axis=2)
+            melhores = distancias.argmin(axis=1)
+            for posicao, linha_melhor, distancia in zip(posicoes, melhores, distancias[np.arange(len(posicoes)), melhores]):
+                if distancia <= distancia_maxima:
+                    resultados[posicao] = (json.loads(planos[linhas[linha_melhor]]), float(distancia))
+        return resultados
+
+    def salvar(self) -> bool:
+        """Regrava o arquivo se houve inclusões desde a última gravação. Returns: True se gravou."""
+        with self._lock:
+            if not self._alterado:
+                return False
+            vetores, assinaturas, planos = self.vetores, list(self.assinaturas), list(self.planos)
+            self._alterado = False
+        try:
+            self._gravar(vetores, assinaturas, planos)
+        except OSError:
+            with self._lock:
+                self._alterado = True
+            raise
+        return True
+
+    def _gravar(self, vetores: np.ndarray, assinaturas: list[str], planos: list[str]) -> None:
+        diretorio = os.path.dirname(self.arquivo)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        temporario = f"{self.arquivo}.tmp.npz"
+        np.savez_compressed(
+            temporario,
+            vetores=vetores,
+            assinaturas=np.array(assinaturas, dtype=str),
+            planos=np.array(planos, dtype=str),
+        )
+        os.replace(temporario, self.arquivo)
+
+    def carregar(self) -> None:
+        if not os.path.exists(self.arquivo):
+            return
+        with np.load(self.arquivo, allow_pickle=False) as dados:
+            vetores = dados["vetores"].astype(np.float32).reshape(-1, self.dimensao)
+            assinaturas = [str(assinatura) for assinatura in dados["assinaturas"]]
+            planos = [str(plano) for plano in dados["planos"]]
+        with self._lock:
+            self.vetores, self.assinaturas, self.planos = vetores, assinaturas, planos
+
+
+_sett = SettingsGPT()
+indices = {
+    "treino": IndiceSimilaridade(2, os.path.join(_sett.GPT_SIMILARIDADE_DIRETORIO, "similaridade_treino.npz"), _sett.GPT_SIMILARIDADE_MAX_PLANOS),
+    "dieta": IndiceSimilaridade(5, os.path.join(_sett.GPT_SIMILARIDADE_DIRETORIO, "similaridade_dieta.npz"), _sett.GPT_SIMILARIDADE_MAX_PLANOS),
+}
+CODIFICADORES = {"treino": codificar_treino, "dieta": codificar_dieta}
+
+# Última geração da IA de cada usuário aguardando a confirmação: anamnese recebida na geração
+# e impressão do plano devolvido (só o mesmo plano, sem edições, é indexado)
+_pendentes: dict[tuple[str, int], tuple[float, PostAnamnese | PostAnamneseDieta, str]] = {}
+_pendentes_lock = Lock()
+
+
+def reescrever_usuario(tipo: str, plano: dict, usuario_id: int) -> dict:
+    """Atribui o plano a outro usuário (idUsuario dos treinos ou campo usuario da dieta)."""
+    if tipo == "treino":
+        for treino in plano.get("treinos") or []:
+            treino["idUsuario"] = usuario_id
+    else:
+        plano["usuario"] = usuario_id
+    return plano
+
+
+def buscar_planos_similares(
+    tipo: Literal["treino", "dieta"],
+    anamneses: list[PostAnamnese | PostAnamneseDieta],
+) -> list[tuple[dict, float] | None]:
+    """Busca em lote planos confirmados para anamneses quase idênticas, já com o usuário reescrito."""
+    if not _sett.GPT_SIMILARIDADE_ATIVA or not anamneses:
+        return [None] * len(anamneses)
+    consultas = [CODIFICADORES[tipo](anamnese) for anamnese in anamneses]
+    resultados = indices[tipo].buscar_lote(consultas, _sett.GPT_SIMILARIDADE_DISTANCIA_MAXIMA)
+    return [
+        None if resultado is None else (reescrever_usuario(tipo, resultado[0], anamnese.usuario_id), resultado[1])
+        for anamnese, resultado in zip(anamneses, resultados)
+    ]
+
+
+def buscar_plano_similar(tipo: Literal["treino", "dieta"], anamnese: PostAnamnese | PostAnamneseDieta) -> tuple[dict, float] | None:
+    return buscar_planos_similares(tipo, [anamnese])[0]
+
+
+def registrar_geracao(
+    tipo: Literal["treino", "dieta"], anamnese: PostAnamnese | PostAnamneseDieta, plano: dict
+) -> None:
+    """Guarda a anamnese e a impressão de um plano recém-gerado pela IA até a confirmação."""
+    agora = time.monotonic()
+    with _pendentes_lock:
+        for chave in [chave for chave, (criado, *_) in _pendentes.items() if agora - criado > VALIDADE_PENDENTE_SEGUNDOS]:
+            del _pendentes[chave]
+        _pendentes[(tipo, anamnese.usuario_id)] = (agora, anamnese, _impressao(tipo, plano))
+
+
+def descartar_geracao(tipo: Literal["treino", "dieta"], usuario_id: int) -> None:
+    """Planos ajustados a pedido do usuário não são reaproveitados para outras anamneses."""
+    with _pendentes_lock:
+        _pendentes.pop((tipo, usuario_id), None)
+
+
+def anamnese_da_geracao(tipo: Literal["treino", "dieta"], plano: dict) -> PostAnamnese | PostAnamneseDieta | None:
+    """
+    Anamnese com que o servidor gerou exatamente este plano (antes de persistido), ou None quando o plano
+    não é o último gerado pela IA para o usuário. A confirmação usa esta anamnese, nunca a enviada pelo cliente.
+    """
+    chave = (tipo, _usuario_do_plano(tipo, plano))
+    with _pendentes_lock:
+        pendente = _pendentes.get(chave)
+    if pendente is None or pendente[2] != _impressao(tipo, plano):
+        return None
+    return pendente[1]
+
+
+def indexar_plano_confirmado(
+    tipo: Literal["treino", "dieta"],
+    plano: dict,
+    anamnese: PostAnamnese | PostAnamneseDieta,
+) -> bool:
+    """
+    Indexa um plano validado e confirmado pela anamnese que o gerou no servidor
+    (anamnese_da_geracao ou a anamnese do próprio lote).
+    Returns:
+        bool: True quando o plano foi indexado.
+    """
+    with _pendentes_lock:
+        _pendentes.pop((tipo, anamnese.usuario_id), None)
+    if not _sett.GPT_SIMILARIDADE_ATIVA:
+        return False
+    assinatura, vetor = CODIFICADORES[tipo](anamnese)
+    indices[tipo].adicionar(assinatura, vetor, conteudo_plano(tipo, plano))
+    return True
+
+
+def salvar_indices() -> None:
+    for tipo, indice in indices.items():
+        try:
+            indice.salvar()
+        except OSError as e:
+            print(f"Erro ao salvar índice de similaridade ({tipo}): {e}")
+
+
+def _gravar_periodicamente() -> None:
+    while True:
+        time.sleep(_sett.GPT_SIMILARIDADE_GRAVACAO_SEGUNDOS)
+        salvar_indices()
+
+
+def inicializar_indices_similaridade() -> None:
+    """
+    Carrega do disco os índices de planos confirmados e inicia a gravação periódica
+    (a cada GPT_SIMILARIDADE_GRAVACAO_SEGUNDOS e no encerramento do processo).
+    """
+    for tipo, indice in indices.items():
+        try:
+            indice.carregar()
+        except Exception as e:
+            print(f"Erro ao carregar índice de similaridade ({tipo}): {e}")
+    Thread(target=_gravar_periodicamente, name="similaridade-gravacao", daemon=True).start()
+    atexit.register(salvar_indices)
@@ -0,0 +1,69 @@
+from threading import Event, Lock
+from typing import Any, Callable
+import copy
+import hashlib
+
+
+class _Chamada:
+    def __init__(self):
+        self.concluida = Event()
+        self.resultado: Any = None
+        self.erro: BaseException | None = None
+        self.participantes = 1
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas idênticas simultâneas: o primeiro chamador executa a função e os demais
+    com a mesma chave aguardam e recebem o mesmo resultado (ou a mesma exceção).
+    O número de chaves em andamento é limitado; acima do limite as chamadas seguem sem agrupamento.
+    """
+
+    def __init__(self, max_em_andamento: int):
+        self.max_em_andamento = max_em_andamento
+        self._em_andamento: dict[str, _Chamada] = {}
+        self._lock = Lock()
+        self._estatisticas = {"executadas": 0, "agrupadas": 0, "sem_agrupamento": 0}
+
+    @staticmethod
+    def chave(*partes: Any) -> str:
+        return hashlib.sha256("\x1f".join(str(parte) for parte in partes).encode("utf-8")).hexdigest()
+
+    def executar(self, chave: str, funcao: Callable[[], Any]) -> Any:
+        with self._lock:
+            chamada = self._em_andamento.get(chave)
+            if chamada is not None:
+                chamada.participantes += 1
+                self._estatisticas["agrupadas"] += 1
+                lider = False
+            elif len(self._em_andamento) >= self.max_em_andamento:
+                self._estatisticas["sem_agrupamento"] += 1
+                chamada, lider = None, True
+            else:
+                chamada = self._em_andamento[chave] = _Chamada()
+                self._estatisticas["executadas"] += 1
+                lider = True
+
+        if chamada is None:
+            return funcao()
+
+        if lider:
+            try:
+                chamada.resultado = funcao()
+            except BaseException as exc:
+                chamada.erro = exc
+            finally:
+                with self._lock:
+                    self._em_andamento.pop(chave, None)
+                chamada.concluida.set()
+        else:
+            chamada.concluida.wait()
+
+        if chamada.erro is not None:
+            raise chamada.erro
+        # Cada chamador recebe a sua cópia: os planos são alterados depois (reparos, ajustes)
+        return copy.deepcopy(chamada.resultado)
+
+    def estado(self) -> dict:
+        with self._lock:
+            return {**self._estatisticas, "em_andamento": len(self._em_andamento)}
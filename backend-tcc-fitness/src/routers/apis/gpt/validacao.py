@@ -0,0 +1,390 @@
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from collections import Counter
+from threading import Lock
+from typing import Any, Literal
+import copy
+import re
+import time
+import unicodedata
+
+from src.routers.router import router
+from src.core.config import SettingsGPT
+from src.routers.models.plano_model import PlanoTreino, PlanoDieta
+from src.routers.apis.gpt.funcs_gpt import gpt_response
+
+
+DESCANSO_MINIMO = 15
+DURACAO_MINIMA = 10
+
+GRUPOS_MUSCULARES = {
+    "peito": "Peito",
+    "costas": "Costas",
+    "ombro": "Ombro",
+    "ombros": "Ombro",
+    "braco": "Braço",
+    "bracos": "Braço",
+    "biceps": "Braço",
+    "triceps": "Braço",
+    "perna": "Perna",
+    "pernas": "Perna",
+    "gluteo": "Glúteo",
+    "gluteos": "Glúteo",
+    "abdomen": "Abdômen",
+    "abdominal": "Abdômen",
+}
+
+DIFICULDADES = {"iniciante", "intermediario", "avancado"}
+
+# Posição cronológica de cada tipo de refeição; lanches são resolvidos pela posição original
+ORDEM_REFEICOES = {
+    "Café da manhã": 0,
+    "Almoço": 2,
+    "Jantar": 4,
+    "Ceia": 5,
+}
+
+# Tolerância da soma das refeições em relação ao total citado na descrição (mesma do prompt)
+TOLERANCIA_CALORIAS = 10
+
+REPROMPT_SUFFIX_TEMPLATE = """
+
+=== CORREÇÃO OBRIGATÓRIA ===
+A resposta anterior foi rejeitada pela validação pelos motivos abaixo. Gere novamente o JSON completo corrigindo TODOS eles:
+{violacoes}
+"""
+
+_estatisticas: dict[str, Counter] = {"treino": Counter(), "dieta": Counter()}
+_estatisticas_lock = Lock()
+
+
+def _registrar(tipo: str, *chaves: str) -> None:
+    with _estatisticas_lock:
+        for chave in chaves:
+            _estatisticas[tipo][chave] += 1
+
+
+def _normalizar(texto: str) -> str:
+    sem_acento = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return sem_acento.strip().lower()
+
+
+def _inteiro(valor: Any) -> int | None:
+    """Converte números e strings numéricas ("12", "12.0", "60s", "8-12") para int."""
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, int):
+        return valor
+    if isinstance(valor, float):
+        return round(valor)
+    if isinstance(valor, str):
+        encontrado = re.search(r"-?\d+(?:[.,]\d+)?", valor)
+        if encontrado:
+            return round(float(encontrado.group().replace(",", ".")))
+    return None
+
+
+def _reparar_inteiro(obj: dict, campo: str, minimo: int | None, reparos: list[str], codigo: str) -> None:
+    if campo not in obj:
+        return
+    original = obj[campo]
+    valor = _inteiro(original)
+    if valor is None:
+        return
+    if valor != original or not isinstance(original, int):
+        reparos.append(f"coercao_numerica:{codigo}")
+    if minimo is not None and valor < minimo:
+        reparos.append(f"minimo:{codigo}")
+        valor = minimo
+    obj[campo] = valor
+
+
+def _violacoes(modelo: type[BaseModel], plano: Any) -> list[str]:
+    try:
+        modelo.model_validate(plano)
+    except ValidationError as exc:
+        return [
+            f"{'.'.join(str(parte) for parte in erro['loc']) or 'plano'}: {erro['msg']}"
+            for erro in exc.errors()
+        ]
+    return []
+
+
+def validar_plano_treino(plan: dict) -> None:
+    """
+    Valida um plano de treino com o modelo tipado usado na persistência.
+    Args:
+        plan (dict): Plano no formato retornado pela IA ({"programaTreino", "treinos"}).
+    Raises:
+        HTTPException: 400 quando o plano viola alguma regra.
+    """
+    violacoes = _violacoes(PlanoTreino, plan)
+    if violacoes:
+        raise HTTPException(status_code=400, detail=f"Plano de treino inválido: {'; '.join(violacoes)}")
+
+
+def validar_plano_dieta(plano: dict) -> None:
+    """
+    Valida um plano de dieta com o modelo tipado usado na persistência.
+    Args:
+        plano (dict): Plano no formato retornado pela IA ({"nome", "descricao", "usuario", "refeicoes"}).
+    Raises:
+        HTTPException: 400 quando o plano viola alguma regra.
+    """
+    violacoes = _violacoes(PlanoDieta, plano)
+    if violacoes:
+        raise HTTPException(status_code=400, detail=f"Plano de dieta inválido: {'; '.join(violacoes)}")
+
+
+def reparar_plano_treino(plano: Any, usuario_id: int | None = None) -> tuple[Any, list[str]]:
+    """
+    Corrige de forma determinística o que for possível em um plano de treino gerado.
+    Args:
+        plano (dict): Plano retornado pela IA.
+        usuario_id (int | None): ID do usuário da anamnese, usado para corrigir idUsuario.
+    Returns:
+        tuple: Plano reparado (cópia) e lista com os códigos dos reparos aplicados.
+    """
+    reparos: list[str] = []
+    if not isinstance(plano, dict) or not isinstance(plano.get("treinos"), list):
+        return plano, reparos
+
+    plano = copy.deepcopy(plano)
+    for treino in plano["treinos"]:
+        if not isinstance(treino, dict):
+            continue
+
+        if usuario_id is not None and _inteiro(treino.get("idUsuario")) != usuario_id:
+            treino["idUsuario"] = usuario_id
+            reparos.append("usuario:idUsuario")
+        _reparar_inteiro(treino, "idUsuario", None, reparos, "idUsuario")
+        _reparar_inteiro(treino, "duracaoMinutos", DURACAO_MINIMA, reparos, "duracaoMinutos")
+
+        dificuldade = treino.get("dificuldade")
+        if isinstance(dificuldade, str) and dificuldade != _normalizar(dificuldade) and _normalizar(dificuldade) in DIFICULDADES:
+            treino["dificuldade"] = _normalizar(dificuldade)
+            reparos.append("normalizacao:dificuldade")
+
+        for exercicio in treino.get("exercicios") or []:
+            if not isinstance(exercicio, dict):
+                continue
+            _reparar_inteiro(exercicio, "series", 1, reparos, "series")
+            _reparar_inteiro(exercicio, "repeticoes", 1, reparos, "repeticoes")
+            _reparar_inteiro(exercicio, "descansoSegundos", DESCANSO_MINIMO, reparos, "descansoSegundos")
+
+            grupo = exercicio.get("grupoMuscular")
+            if isinstance(grupo, str):
+                canonico = GRUPOS_MUSCULARES.get(_normalizar(grupo))
+                if canonico and canonico != grupo:
+                    exercicio["grupoMuscular"] = canonico
+                    reparos.append("normalizacao:grupoMuscular")
+
+    return plano, reparos
+
+
+def _tipo_refeicao_canonico(tipo: str) -> str | None:
+    normalizado = _normalizar(tipo)
+    if normalizado.startswith("cafe") or "desjejum" in normalizado:
+        return "Café da manhã"
+    if normalizado.startswith("lanche"):
+        return "Lanche"
+    if normalizado.startswith("almoco"):
+        return "Almoço"
+    if normalizado.startswith("jantar"):
+        return "Jantar"
+    if normalizado.startswith("ceia"):
+        return "Ceia"
+    return None
+
+
+def _ordenar_refeicoes(refeicoes: list[dict]) -> list[dict]:
+    tipos = [_tipo_refeicao_canonico(str(refeicao.get("tipoRefeicao", ""))) for refeicao in refeicoes]
+    if any(tipo is None for tipo in tipos):
+        return refeicoes
+
+    indice_almoco = tipos.index("Almoço") if "Almoço" in tipos else None
+    posicoes = []
+    for indice, (refeicao, tipo) in enumerate(zip(refeicoes, tipos)):
+        if tipo == "Lanche":
+            rotulo = _normalizar(str(refeicao.get("tipoRefeicao", "")))
+            manha = "manha" in rotulo or (
+                "tarde" not in rotulo and "noite" not in rotulo
+                and indice_almoco is not None and indice < indice_almoco
+            )
+            posicao = 1 if manha else 3
+        else:
+            posicao = ORDEM_REFEICOES[tipo]
+        posicoes.append(posicao)
+
+    # sorted é estável: refeições do mesmo tipo mantêm a ordem original
+    return [refeicao for _, refeicao in sorted(zip(posicoes, refeicoes), key=lambda par: par[0])]
+
+
+_NUMERO_KCAL = r"(\d{1,2}[.\s]?\d{3}|\d{3,4})\s*(?:kcal|calorias)"
+
+
+def total_calorico_descricao(descricao: str) -> int | None:
+    """
+    Extrai o total calórico diário citado na descrição da dieta: o valor marcado como total
+    ("Total: 2000 kcal", "Total calórico diário: 2.000 kcal") ou, sem marcação, o único valor em kcal.
+    Returns:
+        int | None: None quando não há total ou quando a descrição cita valores diferentes sem distinguir o total.
+    """
+    def valores(padrao: str) -> set[int]:
+        return {
+            int(re.sub(r"[.\s]", "", numero))
+            for numero in re.findall(padrao, descricao or "", flags=re.IGNORECASE)
+        }
+
+    # "total" seguido, na mesma frase, do número em kcal
+    explicitos = valores(r"\btotal\b[^\d;\n]{0,40}?" + _NUMERO_KCAL)
+    citados = explicitos or valores(_NUMERO_KCAL)
+    return citados.pop() if len(citados) == 1 else None
+
+
+def _reconciliar_calorias(plano: dict, reparos: list[str]) -> None:
+    refeicoes = plano["refeicoes"]
+    calorias = [refeicao.get("calorias") for refeicao in refeicoes]
+    if not calorias or not all(isinstance(valor, int) and valor >= 0 for valor in calorias):
+        return
+
+    soma = sum(calorias)
+    total = total_calorico_descricao(str(plano.get("descricao", "")))
+    if total is None:
+        if soma > 0 and isinstance(plano.get("descricao"), str) and plano["descricao"]:
+            plano["descricao"] = f"{plano['descricao'].rstrip()} Total calórico diário: {soma} kcal."
+            reparos.append("calorias:total_ausente")
+        return
+
+    if soma == 0 or abs(soma - total) <= TOLERANCIA_CALORIAS:
+        return
+
+    # Redistribui proporcionalmente para que a soma fique exatamente igual ao total descrito
+    escaladas = [round(valor * total / soma) for valor in calorias]
+    maior = max(range(len(escaladas)), key=escaladas.__getitem__)
+    escaladas[maior] += total - sum(escaladas)
+    for refeicao, valor in zip(refeicoes, escaladas):
+        refeicao["calorias"] = valor
+    reparos.append("calorias:reconciliadas")
+
+
+def reparar_plano_dieta(plano: Any, usuario_id: int | None = None) -> tuple[Any, list[str]]:
+    """
+    Corrige de forma determinística o que for possível em um plano de dieta gerado:
+    coerção numérica, tipos de refeição, ordem cronológica e soma calórica.
+    Args:
+        plano (dict): Plano retornado pela IA.
+        usuario_id (int | None): ID do usuário da anamnese, usado para corrigir o campo usuario.
+    Returns:
+        tuple: Plano reparado (cópia) e lista com os códigos dos reparos aplicados.
+    """
+    reparos: list[str] = []
+    if not isinstance(plano, dict):
+        return plano, reparos
+
+    plano = copy.deepcopy(plano)
+    if usuario_id is not None and _inteiro(plano.get("usuario")) != usuario_id:
+        plano["usuario"] = usuario_id
+        reparos.append("usuario:usuario")
+    _reparar_inteiro(plano, "usuario", None, reparos, "usuario")
+
+    refeicoes = plano.get("refeicoes")
+    if not isinstance(refeicoes, list) or not all(isinstance(refeicao, dict) for refeicao in refeicoes):
+        return plano, reparos
+
+    for refeicao in refeicoes:
+        _reparar_inteiro(refeicao, "calorias", 0, reparos, "calorias")
+        tipo = refeicao.get("tipoRefeicao")
+        if isinstance(tipo, str):
+            canonico = _tipo_refeicao_canonico(tipo)
+            if canonico and canonico != tipo and _normalizar(canonico) == _normalizar(tipo):
+                refeicao["tipoRefeicao"] = canonico
+                reparos.append("normalizacao:tipoRefeicao")
+
+    ordenadas = _ordenar_refeicoes(refeicoes)
+    if ordenadas != refeicoes:
+        plano["refeicoes"] = ordenadas
+        reparos.append("ordem:refeicoes")
+
+    _reconciliar_calorias(plano, reparos)
+    return plano, reparos
+
+
+def _campo_violacao(violacao: str) -> str:
+    """Agrupa violações pelo campo, sem os índices das listas (treinos.0.exercicios.2.series -> treinos.exercicios.series)."""
+    return re.sub(r"\.\d+", "", violacao.split(":")[0])
+
+
+def revisar_plano(tipo: Literal["treino", "dieta"], plano: Any, usuario_id: int | None = None) -> tuple[Any, list[str], list[str]]:
+    """
+    Repara e valida um plano gerado, registrando as estatísticas de violação.
+    Returns:
+        tuple: Plano reparado, reparos aplicados e violações que não puderam ser corrigidas.
+    """
+    if tipo == "treino":
+        plano, reparos = reparar_plano_treino(plano, usuario_id)
+        violacoes = _violacoes(PlanoTreino, plano)
+    else:
+        plano, reparos = reparar_plano_dieta(plano, usuario_id)
+        violacoes = _violacoes(PlanoDieta, plano)
+
+    chaves = ["planos_verificados"]
+    chaves += [f"reparo:{codigo}" for codigo in reparos]
+    chaves += [f"violacao:{_campo_violacao(violacao)}" for violacao in violacoes]
+    if reparos:
+        chaves.append("planos_reparados")
+    if violacoes:
+        chaves.append("planos_invalidos")
+    _registrar(tipo, *chaves)
+    return plano, reparos, violacoes
+
+
+def gerar_plano_validado(
+    prompt: str,
+    tipo: Literal["treino", "dieta"],
+    usuario_id: int | None = None,
+    max_tentativas: int = 2,
+    rota: str | None = None,
+    prazo: float | None = None,
+) -> dict:
+    """
+    Chama a IA e garante que o plano retornado passe na validação antes de chegar ao cliente.
+    Reparos determinísticos são aplicados localmente; somente saídas irreparáveis geram nova chamada.
+    Args:
+        prompt (str): Prompt completo de geração ou ajuste.
+        tipo (str): "treino" ou "dieta".
+        usuario_id (int | None): ID do usuário da anamnese.
+        max_tentativas (int): Número máximo de chamadas à IA.
+        rota (str | None): Rota de modelo; por padrão "plano_<tipo>".
+        prazo (float | None): Segundos para todas as chamadas somadas; padrão GPT_PRAZO_SEGUNDOS.
+    Returns:
+        dict: Plano reparado e válido.
+    """
+    prompt_atual = prompt
+    violacoes: list[str] = []
+    limite = time.monotonic() + (prazo if prazo is not None else SettingsGPT().GPT_PRAZO_SEGUNDOS)
+    for tentativa in range(max_tentativas):
+        if tentativa:
+            _registrar(tipo, "reprompts")
+        plano = gpt_response(
+            prompt_atual, rota=rota or f"plano_{tipo}", prazo=limite - time.monotonic(), usuario_id=usuario_id
+        )
+        plano, _, violacoes = revisar_plano(tipo, plano, usuario_id)
+        if not violacoes:
+            return plano
+        prompt_atual = prompt + REPROMPT_SUFFIX_TEMPLATE.format(
+            violacoes="\n".join(f"- {violacao}" for violacao in violacoes)
+        )
+
+    raise HTTPException(status_code=502, detail=f"Plano gerado pela IA inválido: {'; '.join(violacoes)}")
+
+
+@router.get("/gpt/validacao/estatisticas")
+def estatisticas_validacao():
+    """
+    Retorna as estatísticas de validação dos planos gerados desde o início do processo.
+    Returns:
+        dict: Contadores por tipo de plano (verificados, reparados, inválidos, reprompts e por regra).
+    """
+    with _estatisticas_lock:
+        return {tipo: dict(contador) for tipo, contador in _estatisticas.items()}
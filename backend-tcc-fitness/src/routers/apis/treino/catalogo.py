@@ -0,0 +1,339 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from difflib import SequenceMatcher
+from threading import Lock
+import unicodedata
+
+from src.core.database import get_db_mysql
+from src.routers.models.consultas import consulta_get
+
+
+# Catálogo canônico inicial: (nome, equipamento, grupo muscular, regiões articulares exigidas)
+EXERCICIOS_PADRAO = [
+    ("Supino Reto com Barra", "Barra", "Peito", "ombro,cotovelo,punho"),
+    ("Supino Reto com Halteres", "Halteres", "Peito", "ombro,cotovelo"),
+    ("Supino Inclinado com Barra", "Barra", "Peito", "ombro,cotovelo,punho"),
+    ("Supino Inclinado com Halteres", "Halteres", "Peito", "ombro,cotovelo"),
+    ("Supino Declinado com Barra", "Barra", "Peito", "ombro,cotovelo,punho"),
+    ("Supino Reto na Máquina", "Máquina", "Peito", "ombro,cotovelo"),
+    ("Crucifixo com Halteres", "Halteres", "Peito", "ombro"),
+    ("Crucifixo na Máquina (Peck Deck)", "Máquina", "Peito", "ombro"),
+    ("Crossover na Polia", "Polia", "Peito", "ombro"),
+    ("Flexão de Braços", "Peso corporal", "Peito", "ombro,punho,cotovelo"),
+    ("Puxada Frontal na Polia", "Polia", "Costas", "ombro,cotovelo"),
+    ("Puxada com Triângulo", "Polia", "Costas", "cotovelo"),
+    ("Barra Fixa", "Peso corporal", "Costas", "ombro,cotovelo"),
+    ("Remada Curvada com Barra", "Barra", "Costas", "lombar,cotovelo"),
+    ("Remada Unilateral com Halter", "Halteres", "Costas", "cotovelo"),
+    ("Remada Baixa na Polia", "Polia", "Costas", "lombar,cotovelo"),
+    ("Remada Cavalinho", "Barra", "Costas", "lombar,cotovelo"),
+    ("Remada na Máquina", "Máquina", "Costas", "cotovelo"),
+    ("Pulldown com Braços Estendidos", "Polia", "Costas", "ombro"),
+    ("Levantamento Terra", "Barra", "Costas", "lombar,joelho,quadril"),
+    ("Desenvolvimento com Halteres", "Halteres", "Ombro", "ombro,cotovelo"),
+    ("Desenvolvimento com Barra", "Barra", "Ombro", "ombro,cotovelo,lombar"),
+    ("Desenvolvimento na Máquina", "Máquina", "Ombro", "ombro,cotovelo"),
+    ("Elevação Lateral com Halteres", "Halteres", "Ombro", "ombro"),
+    ("Elevação Lateral na Polia", "Polia", "Ombro", "ombro"),
+    ("Elevação Frontal com Halteres", "Halteres", "Ombro", "ombro"),
+    ("Crucifixo Inverso com Halteres", "Halteres", "Ombro", "ombro,lombar"),
+    ("Crucifixo Inverso na Máquina", "Máquina", "Ombro", "ombro"),
+    ("Face Pull na Polia", "Polia", "Ombro", "ombro"),
+    ("Encolhimento com Halteres", "Halteres", "Ombro", "cervical"),
+    ("Rosca Direta com Barra", "Barra", "Braço", "cotovelo,punho"),
+    ("Rosca Alternada com Halteres", "Halteres", "Braço", "cotovelo"),
+    ("Rosca Martelo com Halteres", "Halteres", "Braço", "cotovelo"),
+    ("Rosca Scott na Máquina", "Máquina", "Braço", "cotovelo"),
+    ("Rosca na Polia", "Polia", "Braço", "cotovelo"),
+    ("Rosca Concentrada", "Halteres", "Braço", "cotovelo"),
+    ("Tríceps Pulley", "Polia", "Braço", "cotovelo"),
+    ("Tríceps Corda na Polia", "Polia", "Braço", "cotovelo"),
+    ("Tríceps Testa com Barra", "Barra", "Braço", "cotovelo,punho"),
+    ("Tríceps Francês com Halter", "Halteres", "Braço", "cotovelo,ombro"),
+    ("Mergulho no Banco", "Peso corporal", "Braço", "ombro,cotovelo,punho"),
+    ("Agachamento Livre com Barra", "Barra", "Perna", "joelho,lombar,quadril"),
+    ("Agachamento Goblet", "Halteres", "Perna", "joelho,quadril"),
+    ("Agachamento no Smith", "Smith", "Perna", "joelho,quadril"),
+    ("Agachamento Hack", "Máquina", "Perna", "joelho"),
+    ("Leg Press 45°", "Máquina", "Perna", "joelho,lombar"),
+    ("Cadeira Extensora", "Máquina", "Perna", "joelho"),
+    ("Mesa Flexora", "Máquina", "Perna", "joelho,lombar"),
+    ("Cadeira Flexora", "Máquina", "Perna", "joelho"),
+    ("Afundo com Halteres", "Halteres", "Perna", "joelho,quadril,tornozelo"),
+    ("Agachamento Búlgaro", "Halteres", "Perna", "joelho,quadril,tornozelo"),
+    ("Stiff com Barra", "Barra", "Perna", "lombar,quadril"),
+    ("Stiff com Halteres", "Halteres", "Perna", "lombar,quadril"),
+    ("Panturrilha em Pé na Máquina", "Máquina", "Perna", "tornozelo,lombar"),
+    ("Panturrilha Sentado", "Máquina", "Perna", "tornozelo"),
+    ("Agachamento com Peso Corporal", "Peso corporal", "Perna", "joelho,quadril"),
+    ("Elevação Pélvica com Barra", "Barra", "Glúteo", "quadril,lombar"),
+    ("Elevação Pélvica na Máquina", "Máquina", "Glúteo", "quadril"),
+    ("Ponte de Glúteo", "Peso corporal", "Glúteo", "quadril"),
+    ("Cadeira Abdutora", "Máquina", "Glúteo", "quadril"),
+    ("Glúteo na Polia (Coice)", "Polia", "Glúteo", "quadril,lombar"),
+    ("Glúteo Quatro Apoios", "Peso corporal", "Glúteo", "quadril,punho"),
+    ("Agachamento Sumô com Halter", "Halteres", "Glúteo", "joelho,quadril"),
+    ("Abdução de Quadril com Elástico", "Elástico", "Glúteo", "quadril"),
+    ("Abdominal Supra", "Peso corporal", "Abdômen", "cervical"),
+    ("Abdominal Infra", "Peso corporal", "Abdômen", "lombar"),
+    ("Prancha Isométrica", "Peso corporal", "Abdômen", "ombro,lombar"),
+    ("Prancha Lateral", "Peso corporal", "Abdômen", "ombro"),
+    ("Abdominal na Polia", "Polia", "Abdômen", "lombar"),
+    ("Abdominal na Máquina", "Máquina", "Abdômen", "lombar"),
+    ("Elevação de Pernas na Barra", "Peso corporal", "Abdômen", "ombro,lombar"),
+    ("Abdominal Bicicleta", "Peso corporal", "Abdômen", "cervical,lombar"),
+]
+
+# Palavras que não ajudam a distinguir exercícios na comparação de nomes
+PALAVRAS_IGNORADAS = {"com", "de", "do", "da", "na", "no", "em", "e", "o", "a", "sem"}
+
+# Similaridade mínima (caracteres) para associar um nome gerado pela IA a um exercício do catálogo
+SIMILARIDADE_MINIMA = 0.75
+# Fração mínima das palavras do exercício do catálogo que precisam aparecer no nome gerado
+COBERTURA_MINIMA = 0.6
+# Palavras com grafia próxima são aceitas como erro de digitação só a partir desta semelhança
+# e com o mesmo início ("adutora"/"abdutora" e "inclinado"/"declinado" continuam diferentes)
+SIMILARIDADE_PALAVRA = 0.85
+PREFIXO_PALAVRA = 3
+
+# Termos aceitos na anamnese para cada equipamento do catálogo (nomes normalizados)
+SINONIMOS_EQUIPAMENTO = {
+    "barra": ("barra", "barras", "anilha", "anilhas"),
+    "halteres": ("halter", "halteres", "dumbbell", "dumbbells"),
+    "maquina": ("maquina", "maquinas", "aparelho", "aparelhos"),
+    "polia": ("polia", "polias", "cabo", "cabos", "crossover"),
+    "smith": ("smith",),
+    "elastico": ("elastico", "elasticos", "faixa", "faixas"),
+    "peso corporal": (),
+}
+
+# Termos da lesão informada na anamnese -> região articular do catálogo
+REGIOES_LESAO = {
+    "joelho": ("joelho", "menisco", "ligamento", "patela", "condromalacia"),
+    "ombro": ("ombro", "manguito", "rotador", "bursite"),
+    "lombar": ("lombar", "coluna", "hernia", "lombalgia", "ciatico"),
+    "cervical": ("cervical", "pescoco"),
+    "cotovelo": ("cotovelo", "epicondilite", "tendinite no cotovelo"),
+    "punho": ("punho", "pulso", "tunel do carpo"),
+    "quadril": ("quadril",),
+    "tornozelo": ("tornozelo", "entorse"),
+}
+
+# Respostas que indicam acesso a todos os equipamentos
+EQUIPAMENTOS_COMPLETOS = ("academia", "completa", "completo", "todos", "todas")
+
+
+def normalizar_nome(nome: str) -> str:
+    sem_acento = unicodedata.normalize("NFKD", nome or "").encode("ascii", "ignore").decode("ascii")
+    limpo = "".join(char if char.isalnum() else " " for char in sem_acento.lower())
+    return " ".join(palavra for palavra in limpo.split() if palavra not in PALAVRAS_IGNORADAS)
+
+
+def equipamentos_permitidos(equipamentos: str | None) -> set[str] | None:
+    """Equipamentos do catálogo liberados pela resposta da anamnese; None quando não há restrição."""
+    texto = normalizar_nome(equipamentos or "")
+    if not texto or any(termo in texto for termo in EQUIPAMENTOS_COMPLETOS):
+        return None
+    palavras = set(texto.split())
+    permitidos = {"peso corporal"}
+    for equipamento, sinonimos in SINONIMOS_EQUIPAMENTO.items():
+        if palavras & set(sinonimos):
+            permitidos.add(equipamento)
+    return permitidos
+
+
+def regioes_lesionadas(lesao: str | None) -> set[str]:
+    """Regiões articulares do catálogo citadas no texto livre de lesões."""
+    texto = normalizar_nome(lesao or "")
+    return {regiao for regiao, termos in REGIOES_LESAO.items() if any(termo in texto for termo in termos)}
+
+
+def termos_excluidos(texto: str | None) -> list[str]:
+    """Quebra um texto livre ("leg press, agachamento e stiff") em termos normalizados."""
+    if not texto:
+        return []
+    partes = texto.replace(";", ",").replace("/", ",").replace(" e ", ",").split(",")
+    termos = [normalizar_nome(parte) for parte in partes]
+    return [termo for termo in termos if len(termo) >= 3 and termo not in {"nenhum", "nenhuma", "nao", "nada"}]
+
+
+class CatalogoExercicios:
+    """Índice em memória do catálogo de exercícios: por id, grupo muscular, equipamento e nome normalizado."""
+
+    def __init__(self, linhas: list[dict] | None = None):
+        self._lock = Lock()
+        self.carregar(linhas or [])
+
+    def carregar(self, linhas: list[dict]) -> None:
+        por_id: dict[int, dict] = {}
+        por_grupo: dict[str, list[int]] = {}
+        por_equipamento: dict[str, list[int]] = {}
+        por_nome: dict[str, int] = {}
+        for linha in linhas:
+            exercicio = {
+                "id_exercicio": int(linha["id_exercicio"]),
+                "nome": linha["nome"],
+                "equipamento": linha["equipamento"],
+                "grupo_muscular": linha["grupo_muscular"],
+                "regioes": tuple(regiao for regiao in (linha.get("regioes") or "").split(",") if regiao),
+            }
+            id_exercicio = exercicio["id_exercicio"]
+            por_id[id_exercicio] = exercicio
+            por_grupo.setdefault(normalizar_nome(exercicio["grupo_muscular"]), []).append(id_exercicio)
+            por_equipamento.setdefault(normalizar_nome(exercicio["equipamento"]), []).append(id_exercicio)
+            por_nome[normalizar_nome(exercicio["nome"])] = id_exercicio
+
+        # Troca atômica das estruturas para leituras concorrentes durante a recarga
+        with self._lock:
+            self.por_id = por_id
+            self.por_grupo = {chave: tuple(ids) for chave, ids in por_grupo.items()}
+            self.por_equipamento = {chave: tuple(ids) for chave, ids in por_equipamento.items()}
+            self.por_nome = por_nome
+
+    def __len__(self) -> int:
+        return len(self.por_id)
+
+    def buscar_ids(self, ids: list[int]) -> list[dict]:
+        por_id = self.por_id
+        return [por_id[id_exercicio] for id_exercicio in ids if id_exercicio in por_id]
+
+    def filtrar(self, grupo_muscular: str | None = None, equipamento: str | None = None) -> list[dict]:
+        ids: set[int] | None = None
+        if grupo_muscular:
+            ids = set(self.por_grupo.get(normalizar_nome(grupo_muscular), ()))
+        if equipamento:
+            por_equipamento = set(self.por_equipamento.get(normalizar_nome(equipamento), ()))
+            ids = por_equipamento if ids is None else ids & por_equipamento
+        if ids is None:
+            return list(self.por_id.values())
+        return [self.por_id[id_exercicio] for id_exercicio in sorted(ids)]
+
+    def candidatos(
+        self,
+        grupo_muscular: str,
+        equipamentos: str | None = None,
+        excluir: str | None = None,
+        lesao: str | None = None,
+    ) -> list[dict]:
+        """
+        Exercícios de um grupo muscular compatíveis com os equipamentos disponíveis, sem os termos
+        que o usuário pediu para evitar e sem sobrecarregar regiões lesionadas (textos livres da anamnese).
+        """
+        exercicios = [self.por_id[id_ex] for id_ex in self.por_grupo.get(normalizar_nome(grupo_muscular), ())]
+        permitido = equipamentos_permitidos(equipamentos)
+        termos = termos_excluidos(excluir)
+        lesionadas = regioes_lesionadas(lesao)
+        return [
+            exercicio for exercicio in exercicios
+            if (permitido is None or normalizar_nome(exercicio["equipamento"]) in permitido)
+            and not any(termo in normalizar_nome(exercicio["nome"]) for termo in termos)
+            and not lesionadas.intersection(exercicio["regioes"])
+        ]
+
+    def associar(self, nome: str, grupo_muscular: str | None = None) -> int | None:
+        """
+        Associa um nome de exercício gerado pela IA ao id do catálogo.
+        Usa correspondência exata do nome normalizado e, em seguida, correspondência aproximada restrita
+        ao grupo muscular quando informado: todas as palavras do nome gerado precisam existir no exercício
+        do catálogo (admitindo erro de digitação) e o nome precisa ser parecido com o do catálogo.
+        Returns:
+            int | None: Id do exercício, ou None quando nenhum ou mais de um exercício serve (não chuta).
+        """
+        normalizado = normalizar_nome(nome)
+        if not normalizado:
+            return None
+        exato = self.por_nome.get(normalizado)
+        if exato is not None:
+            return exato
+
+        candidatos = self.por_grupo.get(normalizar_nome(grupo_muscular or ""), ()) or tuple(self.por_id)
+        palavras = [_radical(palavra) for palavra in normalizado.split()]
+        aceitos = []
+        for id_exercicio in candidatos:
+            candidato = normalizar_nome(self.por_id[id_exercicio]["nome"])
+            palavras_candidato = [_radical(palavra) for palavra in candidato.split()]
+            # Palavra do nome gerado ausente no catálogo distingue outro exercício (ex.: "arnold", "adutora")
+            if not all(any(_mesma_palavra(palavra, outra) for outra in palavras_candidato) for palavra in palavras):
+                continue
+            cobertura = sum(
+                any(_mesma_palavra(outra, palavra) for palavra in palavras) for outra in palavras_candidato
+            ) / len(palavras_candidato)
+            aceitos.append((cobertura, SequenceMatcher(None, normalizado, candidato).ratio(), id_exercicio))
+        if not aceitos:
+            return None
+        aceitos.sort(reverse=True)
+        # Empate na cobertura (ex.: "Supino Reto" com barra, halteres ou máquina) é ambíguo
+        if len(aceitos) > 1 and aceitos[0][0] == aceitos[1][0]:
+            return None
+        cobertura, similaridade, id_exercicio = aceitos[0]
+        return id_exercicio if cobertura >= COBERTURA_MINIMA and similaridade >= SIMILARIDADE_MINIMA else None
+
+
+def _radical(palavra: str) -> str:
+    # Singular aproximado: "halteres" -> "halter", "barras" -> "barra"
+    if len(palavra) > 4 and palavra.endswith("es"):
+        return palavra[:-2]
+    if len(palavra) > 3 and palavra.endswith("s"):
+        return palavra[:-1]
+    return palavra
+
+
+def _mesma_palavra(palavra: str, outra: str) -> bool:
+    if palavra == outra:
+        return True
+    return (
+        palavra[:PREFIXO_PALAVRA] == outra[:PREFIXO_PALAVRA]
+        and SequenceMatcher(None, palavra, outra).ratio() >= SIMILARIDADE_PALAVRA
+    )
+
+
+catalogo = CatalogoExercicios()
+
+# Cópia do catálogo padrão com ids provisórios, usada quando o banco não pôde ser carregado
+catalogo_padrao = CatalogoExercicios([
+    {"id_exercicio": indice, "nome": nome, "equipamento": equipamento, "grupo_muscular": grupo, "regioes": regioes}
+    for indice, (nome, equipamento, grupo, regioes) in enumerate(EXERCICIOS_PADRAO, start=1)
+])
+
+
+def catalogo_disponivel() -> CatalogoExercicios:
+    return catalogo if len(catalogo) else catalogo_padrao
+
+
+def popular_catalogo(session: Session) -> None:
+    """Insere os exercícios padrão que ainda não existem no catálogo e completa as regiões dos existentes."""
+    session.execute(
+        text(
+            """
+            INSERT INTO TCC.EXERCICIO_CATALOGO (nome, equipamento, grupo_muscular, regioes)
+            VALUES (:nome, :equipamento, :grupo_muscular, :regioes)
+            ON DUPLICATE KEY UPDATE regioes = COALESCE(regioes, VALUES(regioes))
+            """
+        ),
+        [
+            {"nome": nome, "equipamento": equipamento, "grupo_muscular": grupo, "regioes": regioes}
+            for nome, equipamento, grupo, regioes in EXERCICIOS_PADRAO
+        ],
+    )
+    session.commit()
+
+
+def carregar_catalogo(session: Session) -> None:
+    linhas = consulta_get(
+        "SELECT id_exercicio, nome, equipamento, grupo_muscular, regioes FROM TCC.EXERCICIO_CATALOGO",
+        session,
+    )
+    catalogo.carregar(linhas)
+
+
+def inicializar_catalogo() -> None:
+    """Popula e carrega o catálogo de exercícios na inicialização da aplicação."""
+    db_gen = get_db_mysql()
+    session = next(db_gen)
+    try:
+        popular_catalogo(session)
+        carregar_catalogo(session)
+    except Exception as e:
+        print(f"Erro ao carregar catálogo de exercícios: {e}")
+    finally:
+        session.close()
@@ -1,23 +1,59 @@
-from fastapi import Depends, HTTPException, Query
+from fastapi import Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text, bindparam
 from pydantic import BaseModel, Field
 
 from src.routers.router import router
-from src.core.database import get_db_mysql
+from src.core.replicas import get_db_leitura
 from src.routers.models.consultas import consulta_get
+from src.routers.models.cache_http import validar_cache
+from src.routers.apis.treino.catalogo import catalogo
 
 
 class ExerciseCatalogRequest(BaseModel):
     exercicios_ids: list[int] = Field(default_factory=list, alias="exerciciosIds")
 
 
+@router.post("/exercicios/catalogo")
+def buscar_exercicios_catalogo(payload: ExerciseCatalogRequest):
+    """Retorna, em lote, os exercícios do catálogo a partir dos ids informados.
+    
+    Args:
+        payload (ExerciseCatalogRequest): Lista de ids do catálogo (exerciciosIds).
+    Returns:
+        dict: Exercícios encontrados e ids inexistentes no catálogo.
+    """
+    encontrados = catalogo.buscar_ids(payload.exercicios_ids)
+    ids_encontrados = {exercicio["id_exercicio"] for exercicio in encontrados}
+    return {
+        "exercicios": encontrados,
+        "naoEncontrados": [id_ex for id_ex in payload.exercicios_ids if id_ex not in ids_encontrados],
+    }
+
+
+@router.get("/exercicios/catalogo")
+def listar_exercicios_catalogo(
+    grupo_muscular: str | None = Query(None, alias="grupoMuscular", description="Grupo muscular"),
+    equipamento: str | None = Query(None, description="Equipamento"),
+):
+    """Lista os exercícios do catálogo, opcionalmente filtrados por grupo muscular e equipamento.
+    
+    Args:
+        grupo_muscular (str | None): Grupo muscular (ex: Peito, Costas).
+        equipamento (str | None): Equipamento (ex: Halteres, Máquina).
+    Returns:
+        list: Exercícios do catálogo.
+    """
+    return catalogo.filtrar(grupo_muscular, equipamento)
+
 
 @router.get("/exercicios-treinos")
 def listar_ex(
+    request: Request,
+    response: Response,
     user_id: int,
     id_treino: int,
-    session: Session = Depends(get_db_mysql)
+    session: Session = Depends(get_db_leitura)
 ):
     """Retorna os exercícios associados a um treino específico.
     
@@ -26,11 +62,14 @@ def listar_ex(
         id_treino (int): ID do treino.
         session (Session): Sessão do banco de dados.
     Returns:
-        dict: Dicionário contendo a lista de exercícios do treino.
+        dict: Dicionário contendo a lista de exercícios do treino (304 se o ETag enviado ainda vale).
     """
+    nao_modificado = validar_cache(request, response, session, "exercicios_treino", {"id_treino": id_treino})
+    if nao_modificado:
+        return nao_modificado
 
     query = """
-   SELECT et.id_ex_treino, et.nome_exercicio, et.grupo_muscular, et.equipamento, et.descanso, et.series, et.reps  FROM TCC.TREINO t
+   SELECT et.id_ex_treino, et.id_exercicio, et.nome_exercicio, et.grupo_muscular, et.equipamento, et.descanso, et.series, et.reps  FROM TCC.TREINO t
 LEFT JOIN TCC.EXERCICIO_TREINO et ON t.ID = et.id_treino
 where et.id_treino = :id_treino;
 """
@@ -41,8 +80,10 @@ where et.id_treino = :id_treino;
 
 @router.get("/programas")
 def listar_programas_treino(
+    request: Request,
+    response: Response,
     user_id: int = Query(..., alias="userId", description="ID do usuário"),
-    session: Session = Depends(get_db_mysql)
+    session: Session = Depends(get_db_leitura)
 ):
     """Retorna os programas de treino associados a um usuário.
     
@@ -50,8 +91,11 @@ def listar_programas_treino(
         user_id (int): ID do usuário.
         session (Session): Sessão do banco de dados.
     Returns:
-        dict: Dicionário contendo a lista de programas de treino do usuário.
+        dict: Dicionário contendo a lista de programas de treino do usuário (304 se o ETag enviado ainda vale).
     """
+    nao_modificado = validar_cache(request, response, session, "programas", {"user_id": user_id})
+    if nao_modificado:
+        return nao_modificado
     query = """
         SELECT 
             pt.id_programa_treino,
@@ -71,9 +115,11 @@ def listar_programas_treino(
 
 @router.get("/treinos-programa")
 def listar_treinos_programas(
+    request: Request,
+    response: Response,
     user_id: int,
     id_programa: int,
-    session: Session = Depends(get_db_mysql)
+    session: Session = Depends(get_db_leitura)
 ):
     
     """Retorna os treinos associados a um programa de treino específico.
@@ -82,8 +128,11 @@ def listar_treinos_programas(
         id_programa (int): ID do programa de treino.
         session (Session): Sessão do banco de dados.
     Returns:
-        list: Lista de treinos do programa de treino.
+        list: Lista de treinos do programa de treino (304 se o ETag enviado ainda vale).
     """
+    nao_modificado = validar_cache(request, response, session, "treinos_programa", {"id_programa": id_programa})
+    if nao_modificado:
+        return nao_modificado
     query = """
     SELECT t.id, t.nome, t.descricao, t.duracao, t.dificuldade FROM 
 TCC.PROGRAMA_TREINO pt 
@@ -0,0 +1,390 @@
+from fastapi import HTTPException
+from sqlalchemy import text, bindparam
+from threading import Event, Thread
+from datetime import date
+
+from src.routers.router import router
+from src.core.config import SettingsSeries
+from src.core.database import get_db_mysql
+from src.routers.models.consultas import consulta_get
+from src.routers.models.query_db import queries_db
+
+
+COLUNAS_SERIE = "id_serie, numero_serie, repeticoes, carga, id_ex_treino, id_sessao"
+# Séries órfãs removidas por transação na limpeza da manutenção
+LINHAS_POR_LIMPEZA = 5000
+
+# Copia a data da sessão para a série: quem grava séries não precisa conhecê-la e todas as séries
+# da sessão caem na mesma partição. Sem o gatilho, as inserções usam o DEFAULT CURRENT_TIMESTAMP da coluna.
+GATILHO_DATA = """
+    CREATE TRIGGER TCC.trg_series_data BEFORE INSERT ON TCC.{tabela} FOR EACH ROW
+    SET NEW.realizada_em = COALESCE(
+        (SELECT realizada_em FROM TCC.SESSAO_TREINO WHERE id_sessao = NEW.id_sessao),
+        NEW.realizada_em
+    )
+"""
+
+# Espelham na tabela nova as escritas feitas na antiga enquanto a cópia acontece
+GATILHOS_MIGRACAO = {
+    "trg_series_migracao_ins": f"""
+        CREATE TRIGGER TCC.trg_series_migracao_ins AFTER INSERT ON TCC.SERIES FOR EACH ROW
+        REPLACE INTO TCC.SERIES_NOVA ({COLUNAS_SERIE})
+        VALUES (NEW.id_serie, NEW.numero_serie, NEW.repeticoes, NEW.carga, NEW.id_ex_treino, NEW.id_sessao)
+    """,
+    "trg_series_migracao_upd": f"""
+        CREATE TRIGGER TCC.trg_series_migracao_upd AFTER UPDATE ON TCC.SERIES FOR EACH ROW
+        BEGIN
+            DELETE FROM TCC.SERIES_NOVA WHERE id_serie = OLD.id_serie;
+            INSERT INTO TCC.SERIES_NOVA ({COLUNAS_SERIE})
+            VALUES (NEW.id_serie, NEW.numero_serie, NEW.repeticoes, NEW.carga, NEW.id_ex_treino, NEW.id_sessao);
+        END
+    """,
+    "trg_series_migracao_del": """
+        CREATE TRIGGER TCC.trg_series_migracao_del AFTER DELETE ON TCC.SERIES FOR EACH ROW
+        DELETE FROM TCC.SERIES_NOVA WHERE id_serie = OLD.id_serie
+    """,
+}
+
+_sett = SettingsSeries()
+
+
+def _sessao():
+    return next(get_db_mysql())
+
+
+def _to_days(data: date) -> int:
+    # Equivalente ao TO_DAYS do MySQL
+    return data.toordinal() + 365
+
+
+def _somar_meses(data: date, meses: int) -> date:
+    total = data.year * 12 + data.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _definicao_particoes(inicio: date, fim: date) -> str:
+    """Partições mensais de inicio até fim (inclusive) e a partição pmax."""
+    particoes = []
+    mes = date(inicio.year, inicio.month, 1)
+    while mes <= fim:
+        limite = _somar_meses(mes, 1)
+        particoes.append(f"PARTITION p{mes:%Y%m} VALUES LESS THAN ({_to_days(limite)})")
+        mes = limite
+    particoes.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return ",\n            ".join(particoes)
+
+
+def _particoes(session) -> list[dict]:
+    return consulta_get(
+        """
+        SELECT PARTITION_NAME AS nome, PARTITION_DESCRIPTION AS limite, TABLE_ROWS AS linhas
+        FROM information_schema.PARTITIONS
+        WHERE UPPER(TABLE_SCHEMA) = 'TCC' AND UPPER(TABLE_NAME) = 'SERIES' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION;
+        """,
+        session,
+    )
+
+
+def _criar_gatilho(session, nome: str, query: str) -> None:
+    existe = session.execute(text("""
+        SELECT 1 FROM information_schema.TRIGGERS
+        WHERE UPPER(TRIGGER_SCHEMA) = 'TCC' AND TRIGGER_NAME = :nome
+    """), {"nome": nome}).first()
+    if not existe:
+        session.execute(text(query))
+        session.commit()
+
+
+def _garantir_data_padrao(session) -> None:
+    # Tabelas criadas antes do DEFAULT da coluna; o gatilho antigo (que só preenchia datas nulas) é recriado
+    for tabela in ("SERIES", "SERIES_ARQUIVO"):
+        sem_padrao = consulta_get(
+            """
+            SELECT 1 FROM information_schema.COLUMNS
+            WHERE UPPER(TABLE_SCHEMA) = 'TCC' AND UPPER(TABLE_NAME) = :tabela
+              AND COLUMN_NAME = 'realizada_em' AND COLUMN_DEFAULT IS NULL;
+            """,
+            session,
+            {"tabela": tabela},
+        )
+        if sem_padrao:
+            session.execute(text(
+                f"ALTER TABLE TCC.{tabela} MODIFY realizada_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP"
+            ))
+            if tabela == "SERIES":
+                session.execute(text("DROP TRIGGER IF EXISTS TCC.trg_series_data"))
+    session.commit()
+
+
+def _bloquear(session, nome: str) -> bool:
+    # Lock do MySQL por conexão: só um processo mantém ou migra a tabela por vez
+    return bool(session.execute(text("SELECT GET_LOCK(:nome, 0)"), {"nome": nome}).scalar())
+
+
+def _liberar(session, nome: str) -> None:
+    session.execute(text("SELECT RELEASE_LOCK(:nome)"), {"nome": nome})
+
+
+def garantir_particoes(session) -> list[str]:
+    """Cria as partições do mês atual e dos próximos SERIES_PARTICOES_FUTURAS meses dividindo pmax."""
+    limites = [int(particao["limite"]) for particao in _particoes(session) if particao["limite"] != "MAXVALUE"]
+    ultimo = max(limites, default=0)
+    mes = _somar_meses(date.today(), 0)
+    novas = []
+    for _ in range(_sett.SERIES_PARTICOES_FUTURAS + 1):
+        limite = _somar_meses(mes, 1)
+        if _to_days(limite) > ultimo:
+            novas.append((f"p{mes:%Y%m}", _to_days(limite)))
+        mes = limite
+    if novas:
+        definicao = ", ".join(f"PARTITION {nome} VALUES LESS THAN ({limite})" for nome, limite in novas)
+        session.execute(text(
+            f"ALTER TABLE TCC.SERIES REORGANIZE PARTITION pmax INTO "
+            f"({definicao}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        ))
+        session.commit()
+    return [nome for nome, _ in novas]
+
+
+def remover_orfas(session) -> dict[str, int]:
+    """
+    Remove de TCC.SERIES e TCC.SERIES_ARQUIVO as séries cuja sessão ou exercício não existe mais.
+    Sem chaves estrangeiras, a exclusão em cascata de usuários, treinos, sessões e exercícios não chega
+    às séries (e gatilhos não disparam em cascatas): a limpeza substitui o ON DELETE CASCADE.
+    """
+    removidas = {}
+    for tabela in ("TCC.SERIES", "TCC.SERIES_ARQUIVO"):
+        total = 0
+        while True:
+            ids = [
+                linha["id_serie"]
+                for linha in consulta_get(
+                    f"""
+                    SELECT s.id_serie FROM {tabela} s
+                    WHERE NOT EXISTS (SELECT 1 FROM TCC.SESSAO_TREINO st WHERE st.id_sessao = s.id_sessao)
+                       OR NOT EXISTS (SELECT 1 FROM TCC.EXERCICIO_TREINO et WHERE et.id_ex_treino = s.id_ex_treino)
+                    LIMIT :limite;
+                    """,
+                    session,
+                    {"limite": LINHAS_POR_LIMPEZA},
+                )
+            ]
+            if not ids:
+                break
+            total += session.execute(
+                text(f"DELETE FROM {tabela} WHERE id_serie IN :ids").bindparams(bindparam("ids", expanding=True)),
+                {"ids": ids},
+            ).rowcount
+            session.commit()
+            if len(ids) < LINHAS_POR_LIMPEZA:
+                break
+        removidas[tabela] = total
+    return removidas
+
+
+def arquivar_particoes(session) -> dict[str, int]:
+    """
+    Move para TCC.SERIES_ARQUIVO as partições inteiramente anteriores ao corte e as remove de TCC.SERIES.
+    A cópia ignora linhas já arquivadas, então uma execução interrompida pode ser repetida.
+    Roda depois de remover_orfas, para que séries de dados excluídos não sejam arquivadas.
+    """
+    corte = _to_days(_somar_meses(date.today(), -_sett.SERIES_ARQUIVAR_APOS_MESES))
+    arquivadas = {}
+    for particao in _particoes(session):
+        if particao["limite"] == "MAXVALUE" or int(particao["limite"]) > corte:
+            continue
+        linhas = session.execute(text(f"""
+            INSERT IGNORE INTO TCC.SERIES_ARQUIVO ({COLUNAS_SERIE}, realizada_em)
+            SELECT {COLUNAS_SERIE}, realizada_em FROM TCC.SERIES PARTITION ({particao["nome"]})
+        """)).rowcount
+        session.commit()
+        session.execute(text(f"ALTER TABLE TCC.SERIES DROP PARTITION {particao['nome']}"))
+        session.commit()
+        arquivadas[particao["nome"]] = linhas
+    return arquivadas
+
+
+def series_particionada(session) -> bool:
+    return bool(_particoes(session))
+
+
+def executar_manutencao() -> dict:
+    """
+    Cria as partições futuras, remove as séries órfãs e arquiva as partições antigas
+    (ignorada se outro processo já está executando).
+    """
+    session = _sessao()
+    try:
+        if not series_particionada(session):
+            return {"particionada": False}
+        if not _bloquear(session, "tcc_series_manutencao"):
+            return {"particionada": True, "executando": True}
+        try:
+            return {
+                "particionada": True,
+                "criadas": garantir_particoes(session),
+                "orfas": remover_orfas(session),
+                "arquivadas": arquivar_particoes(session),
+            }
+        finally:
+            _liberar(session, "tcc_series_manutencao")
+    finally:
+        session.close()
+
+
+def migrar_series() -> dict:
+    """
+    Migra TCC.SERIES para o layout particionado sem parar as escritas: cria TCC.SERIES_NOVA, espelha nela
+    as escritas da tabela antiga por gatilhos, copia o histórico em blocos de id_serie e troca as tabelas
+    com um RENAME atômico. A tabela antiga fica como TCC.SERIES_ANTIGA para conferência.
+    Returns:
+        dict: Linhas copiadas e partições criadas.
+    """
+    session = _sessao()
+    try:
+        if series_particionada(session):
+            return {"migrada": False, "detail": "TCC.SERIES já está particionada"}
+        if not _bloquear(session, "tcc_series_migracao"):
+            raise HTTPException(status_code=409, detail="Migração de TCC.SERIES já em andamento")
+        try:
+            inicio = consulta_get("SELECT MIN(realizada_em) AS inicio FROM TCC.SESSAO_TREINO;", session)[0]["inicio"]
+            inicio = inicio.date() if inicio else date.today()
+            fim = _somar_meses(date.today(), _sett.SERIES_PARTICOES_FUTURAS)
+            ddl = (
+                queries_db["series"]
+                .replace("TCC.SERIES (", "TCC.SERIES_NOVA (")
+                .replace("PARTITION pmax VALUES LESS THAN MAXVALUE", _definicao_particoes(inicio, fim))
+            )
+            session.execute(text(ddl))
+            session.commit()
+            _criar_gatilho(session, "trg_series_data", GATILHO_DATA.format(tabela="SERIES_NOVA"))
+            for nome, query in GATILHOS_MIGRACAO.items():
+                _criar_gatilho(session, nome, query)
+
+            maximo = session.execute(text("SELECT COALESCE(MAX(id_serie), 0) FROM TCC.SERIES")).scalar()
+            copiadas = 0
+            for bloco in range(0, maximo + 1, _sett.SERIES_MIGRACAO_LOTE):
+                copiadas += session.execute(text(f"""
+                    INSERT IGNORE INTO TCC.SERIES_NOVA ({COLUNAS_SERIE}, realizada_em)
+                    SELECT s.id_serie, s.numero_serie, s.repeticoes, s.carga, s.id_ex_treino, s.id_sessao,
+                           st.realizada_em
+                    FROM TCC.SERIES s
+                    JOIN TCC.SESSAO_TREINO st ON st.id_sessao = s.id_sessao
+                    WHERE s.id_serie >= :inicio AND s.id_serie < :fim
+                """), {"inicio": bloco, "fim": bloco + _sett.SERIES_MIGRACAO_LOTE}).rowcount
+                session.commit()
+
+            session.execute(text("RENAME TABLE TCC.SERIES TO TCC.SERIES_ANTIGA, TCC.SERIES_NOVA TO TCC.SERIES"))
+            for nome in GATILHOS_MIGRACAO:
+                session.execute(text(f"DROP TRIGGER IF EXISTS TCC.{nome}"))
+            session.commit()
+            return {"migrada": True, "copiadas": copiadas, "criadas": garantir_particoes(session)}
+        finally:
+            _liberar(session, "tcc_series_migracao")
+    finally:
+        session.close()
+
+
+class ManutencaoSeries:
+    """
+    Thread própria das séries: na inicialização e a cada SERIES_MANUTENCAO_HORAS migra TCC.SERIES para o
+    layout particionado (enquanto não estiver) e executa a manutenção das partições. A migração é uma cópia
+    longa e não ocupa os workers da fila de geração.
+    """
+
+    def __init__(self, intervalo_horas: float):
+        self.intervalo = intervalo_horas * 3600
+        self._thread: Thread | None = None
+        self._acordar = Event()
+        self.migracao: dict | None = None
+
+    def _migrar(self) -> None:
+        session = _sessao()
+        try:
+            if series_particionada(session):
+                return
+        finally:
+            session.close()
+        self.migracao = {"status": "executando"}
+        try:
+            self.migracao = {"status": "concluida", **migrar_series()}
+        except Exception as exc:
+            detalhe = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            self.migracao = {"status": "erro", "detail": detalhe}
+            print(f"Erro na migração de TCC.SERIES: {detalhe}")
+
+    def _executar(self) -> None:
+        while True:
+            self._acordar.clear()
+            try:
+                self._migrar()
+                resultado = executar_manutencao()
+                if any((resultado.get("orfas") or {}).values()):
+                    print(f"Séries órfãs removidas: {resultado['orfas']}")
+                if resultado.get("arquivadas"):
+                    print(f"Partições de TCC.SERIES arquivadas: {resultado['arquivadas']}")
+            except Exception as exc:
+                print(f"Erro na manutenção das partições de TCC.SERIES: {exc}")
+            self._acordar.wait(self.intervalo)
+
+    def iniciar(self) -> None:
+        if self._thread is None:
+            self._thread = Thread(target=self._executar, name="series-manutencao", daemon=True)
+            self._thread.start()
+
+    def acordar(self) -> None:
+        """Antecipa a próxima execução (migração e manutenção)."""
+        self.iniciar()
+        self._acordar.set()
+
+
+manutencao_series = ManutencaoSeries(_sett.SERIES_MANUTENCAO_HORAS)
+
+
+def inicializar_particionamento() -> None:
+    """Garante a data padrão e o gatilho de data das séries e inicia a thread de migração e manutenção."""
+    session = _sessao()
+    try:
+        if series_particionada(session):
+            _garantir_data_padrao(session)
+            _criar_gatilho(session, "trg_series_data", GATILHO_DATA.format(tabela="SERIES"))
+    except Exception as e:
+        print(f"Erro ao verificar particionamento de TCC.SERIES: {e}")
+    finally:
+        session.close()
+    manutencao_series.iniciar()
+
+
+@router.get("/series/particoes")
+def listar_particoes_series():
+    """
+    Estado do particionamento de TCC.SERIES.
+    Returns:
+        dict: Se a tabela está particionada, o estado da última migração e, por partição,
+            o limite (TO_DAYS) e a estimativa de linhas.
+    """
+    session = _sessao()
+    try:
+        particoes = _particoes(session)
+        return {"particionada": bool(particoes), "migracao": manutencao_series.migracao, "particoes": particoes}
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar partições: {exc}")
+    finally:
+        session.close()
+
+
+@router.post("/series/migrar", status_code=202)
+def migrar_series_agora():
+    """Antecipa a migração online de TCC.SERIES para o layout particionado (acompanhe em /series/particoes)."""
+    manutencao_series.acordar()
+    return {"migracao": manutencao_series.migracao or {"status": "agendada"}}
+
+
+@router.post("/series/manutencao")
+def manutencao_series_agora():
+    """Cria as partições futuras e arquiva as antigas imediatamente."""
+    try:
+        return executar_manutencao()
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Erro na manutenção das partições: {exc}")
@@ -0,0 +1,233 @@
+from fastapi import Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import text, bindparam
+from datetime import datetime
+
+from src.routers.router import router
+from src.core.database import get_db_mysql
+from src.core.replicas import get_db_leitura
+from src.routers.models.consultas import consulta_get
+from src.routers.apis.gpt.jobs import fila_jobs
+
+
+# Usuários reconstruídos por transação no backfill
+USUARIOS_POR_TRANSACAO = 200
+MAX_PONTOS = 2000
+# Menor valor aceito por colunas TIMESTAMP: mantém a leitura como faixa no índice
+INICIO_HISTORICO = datetime(1970, 1, 2)
+
+# Agregado de cada (usuário, exercício do catálogo) por sessão: um ponto dos gráficos.
+# e1RM pela fórmula de Epley; série de 1 repetição vale a própria carga.
+_AGREGADO_SESSAO = """
+    SELECT t.id_usuario, et.id_exercicio, st.id_sessao, st.realizada_em,
+           COUNT(*) AS series,
+           SUM(s.repeticoes) AS repeticoes,
+           SUM(COALESCE(s.carga, 0) * s.repeticoes) AS volume,
+           MAX(COALESCE(s.carga, 0)) AS carga_maxima,
+           MAX(CASE WHEN s.repeticoes = 1 THEN COALESCE(s.carga, 0)
+                    ELSE COALESCE(s.carga, 0) * (1 + s.repeticoes / 30) END) AS e1rm
+    FROM TCC.SESSAO_TREINO st
+    JOIN TCC.TREINO t ON t.id = st.id_treino
+    JOIN {series} s ON s.id_sessao = st.id_sessao
+    JOIN TCC.EXERCICIO_TREINO et ON et.id_ex_treino = s.id_ex_treino
+    WHERE {filtro} AND et.id_exercicio IS NOT NULL
+    GROUP BY t.id_usuario, et.id_exercicio, st.id_sessao, st.realizada_em
+"""
+
+_COLUNAS_SESSAO = "id_usuario, id_exercicio, id_sessao, realizada_em, series, repeticoes, volume, carga_maxima, e1rm"
+
+# Totais do resumo a partir dos pontos; ultima_sessao é a mais recente do grupo
+_RESUMO = """
+    SELECT ps.id_usuario, ps.id_exercicio, COUNT(*) AS sessoes, SUM(ps.series) AS series,
+           SUM(ps.repeticoes) AS repeticoes, SUM(ps.volume) AS volume_total,
+           MAX(ps.carga_maxima) AS carga_maxima, MAX(ps.e1rm) AS e1rm_maximo,
+           CAST(SUBSTRING_INDEX(GROUP_CONCAT(ps.id_sessao ORDER BY ps.realizada_em DESC, ps.id_sessao DESC), ',', 1) AS UNSIGNED) AS ultima_sessao,
+           MAX(ps.realizada_em) AS ultima_realizacao
+    FROM TCC.PROGRESSO_SESSAO ps
+    WHERE {filtro}
+    GROUP BY ps.id_usuario, ps.id_exercicio
+"""
+
+_COLUNAS_RESUMO = (
+    "id_usuario, id_exercicio, sessoes, series, repeticoes, volume_total, carga_maxima, "
+    "e1rm_maximo, ultima_sessao, ultima_realizacao"
+)
+
+
+def atualizar_progresso(db: Session, ids_sessao: list[int]) -> None:
+    """
+    Soma ao resumo de progresso as sessões recém-gravadas, na transação do chamador (sem commit).
+    Cada sessão deve ser informada uma única vez, depois de todas as suas séries gravadas.
+    Args:
+        db (Session): Sessão do banco com a transação que inseriu as sessões.
+        ids_sessao (list[int]): Sessões novas.
+    """
+    if not ids_sessao:
+        return
+    params = {"ids": list(ids_sessao)}
+    db.execute(
+        text(f"INSERT INTO TCC.PROGRESSO_SESSAO ({_COLUNAS_SESSAO}) "
+             + _AGREGADO_SESSAO.format(series="TCC.SERIES", filtro="st.id_sessao IN :ids")).bindparams(bindparam("ids", expanding=True)),
+        params,
+    )
+    # Totais acumulados; as atribuições são avaliadas em ordem, então ultima_sessao compara com a data antiga
+    db.execute(
+        text(f"INSERT INTO TCC.PROGRESSO_EXERCICIO ({_COLUNAS_RESUMO}) SELECT * FROM ("
+             + _RESUMO.format(filtro="ps.id_sessao IN :ids")
+             + """
+             ) AS novo
+             ON DUPLICATE KEY UPDATE
+                 sessoes = PROGRESSO_EXERCICIO.sessoes + novo.sessoes,
+                 series = PROGRESSO_EXERCICIO.series + novo.series,
+                 repeticoes = PROGRESSO_EXERCICIO.repeticoes + novo.repeticoes,
+                 volume_total = PROGRESSO_EXERCICIO.volume_total + novo.volume_total,
+                 carga_maxima = GREATEST(PROGRESSO_EXERCICIO.carga_maxima, novo.carga_maxima),
+                 e1rm_maximo = GREATEST(PROGRESSO_EXERCICIO.e1rm_maximo, novo.e1rm_maximo),
+                 ultima_sessao = IF(novo.ultima_realizacao >= PROGRESSO_EXERCICIO.ultima_realizacao,
+                                    novo.ultima_sessao, PROGRESSO_EXERCICIO.ultima_sessao),
+                 ultima_realizacao = GREATEST(PROGRESSO_EXERCICIO.ultima_realizacao, novo.ultima_realizacao)
+             """).bindparams(bindparam("ids", expanding=True)),
+        params,
+    )
+
+
+def reconstruir_progresso(payload: dict) -> dict:
+    """
+    Recalcula pontos e resumos a partir de todo o histórico, em blocos de usuários (um INSERT ... SELECT
+    agregado por tabela e bloco). Corrige resumos após exclusões de sessões ou séries.
+    Args:
+        payload (dict): {"idUsuario": int | None}; sem usuário, reconstrói todos.
+    Returns:
+        dict: Quantidade de usuários e de pontos gravados.
+    """
+    session = next(get_db_mysql())
+    try:
+        if payload.get("idUsuario") is not None:
+            usuarios = [payload["idUsuario"]]
+        else:
+            usuarios = [
+                linha["id_usuario"]
+                for linha in consulta_get(
+                    """
+                    SELECT DISTINCT t.id_usuario FROM TCC.TREINO t
+                    JOIN TCC.SESSAO_TREINO st ON st.id_treino = t.id
+                    ORDER BY t.id_usuario;
+                    """,
+                    session,
+                )
+            ]
+
+        pontos = 0
+        for inicio in range(0, len(usuarios), USUARIOS_POR_TRANSACAO):
+            params = {"usuarios": usuarios[inicio:inicio + USUARIOS_POR_TRANSACAO]}
+
+            def executar(query: str):
+                return session.execute(text(query).bindparams(bindparam("usuarios", expanding=True)), params)
+
+            try:
+                executar("DELETE FROM TCC.PROGRESSO_EXERCICIO WHERE id_usuario IN :usuarios")
+                executar("DELETE FROM TCC.PROGRESSO_SESSAO WHERE id_usuario IN :usuarios")
+                # As séries de uma sessão ficam todas na mesma partição: ou no arquivo ou na tabela atual
+                for series in ("TCC.SERIES", "TCC.SERIES_ARQUIVO"):
+                    pontos += executar(
+                        f"INSERT INTO TCC.PROGRESSO_SESSAO ({_COLUNAS_SESSAO}) "
+                        + _AGREGADO_SESSAO.format(series=series, filtro="t.id_usuario IN :usuarios")
+                    ).rowcount
+                executar(
+                    f"INSERT INTO TCC.PROGRESSO_EXERCICIO ({_COLUNAS_RESUMO}) "
+                    + _RESUMO.format(filtro="ps.id_usuario IN :usuarios")
+                )
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+        return {"usuarios": len(usuarios), "pontos": pontos}
+    finally:
+        session.close()
+
+
+fila_jobs.registrar("progresso", reconstruir_progresso)
+
+
+@router.get("/progresso/resumo")
+def resumo_progresso(
+    id_usuario: int = Query(..., alias="idUsuario", description="ID do usuário"),
+    session: Session = Depends(get_db_leitura),
+):
+    """
+    Retorna o resumo de progresso de cada exercício já realizado pelo usuário.
+    Args:
+        id_usuario (int): ID do usuário.
+        session (Session): Sessão do banco de dados.
+    Returns:
+        list[dict]: Por exercício, totais de sessões, séries, repetições e volume, carga máxima,
+        1RM estimado máximo e a última sessão.
+    """
+    try:
+        return consulta_get(
+            """
+            SELECT pe.id_exercicio, ec.nome AS nome_exercicio, ec.grupo_muscular, pe.sessoes, pe.series,
+                   pe.repeticoes, pe.volume_total, pe.carga_maxima, pe.e1rm_maximo,
+                   pe.ultima_sessao, pe.ultima_realizacao
+            FROM TCC.PROGRESSO_EXERCICIO pe
+            JOIN TCC.EXERCICIO_CATALOGO ec ON ec.id_exercicio = pe.id_exercicio
+            WHERE pe.id_usuario = :id_usuario
+            ORDER BY pe.ultima_realizacao DESC;
+            """,
+            session,
+            {"id_usuario": id_usuario},
+        )
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar progresso: {exc}")
+
+
+@router.get("/progresso/exercicio/{id_exercicio}")
+def pontos_progresso(
+    id_exercicio: int,
+    id_usuario: int = Query(..., alias="idUsuario", description="ID do usuário"),
+    desde: datetime | None = Query(None, description="Início do período do gráfico"),
+    limite: int = Query(500, ge=1, le=MAX_PONTOS, description="Quantidade máxima de pontos (os mais recentes)"),
+    session: Session = Depends(get_db_leitura),
+):
+    """
+    Retorna a série histórica de um exercício do catálogo para os gráficos, um ponto por sessão.
+    Args:
+        id_exercicio (int): ID do exercício no catálogo.
+        id_usuario (int): ID do usuário.
+        desde (datetime | None): Data inicial; sem ela, todo o histórico.
+        limite (int): Quantidade máxima de pontos.
+        session (Session): Sessão do banco de dados.
+    Returns:
+        list[dict]: Pontos em ordem cronológica com volume, carga máxima e 1RM estimado.
+    """
+    if desde is None:
+        desde = INICIO_HISTORICO
+    elif desde.tzinfo is not None:
+        desde = desde.replace(tzinfo=None)
+    try:
+        pontos = consulta_get(
+            """
+            SELECT id_sessao, realizada_em, series, repeticoes, volume, carga_maxima, e1rm
+            FROM TCC.PROGRESSO_SESSAO
+            WHERE id_usuario = :id_usuario AND id_exercicio = :id_exercicio
+              AND realizada_em >= :desde
+            ORDER BY realizada_em DESC
+            LIMIT :limite;
+            """,
+            session,
+            {"id_usuario": id_usuario, "id_exercicio": id_exercicio, "desde": desde, "limite": limite},
+        )
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar progresso: {exc}")
+    return pontos[::-1]
+
+
+@router.post("/progresso/reconstruir", status_code=202)
+def reconstruir_progresso_job(
+    id_usuario: int | None = Query(None, alias="idUsuario", description="Usuário a reconstruir; sem ele, todos"),
+):
+    """
+    Enfileira a reconstrução dos resumos de progresso a partir do histórico de séries.
+    O andamento é consultado em /gpt/jobs/{idJob}.
+    """
+    return fila_jobs.enfileirar("progresso", {"idUsuario": id_usuario}, usuario_id=id_usuario)
@@ -0,0 +1,231 @@
+from fastapi import Depends, HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from collections import OrderedDict
+from threading import Lock
+import numpy as np
+
+from src.routers.router import router
+from src.core.replicas import get_db_leitura
+from src.routers.models.consultas import consulta_get
+from src.routers.apis.treino.treino_usuario import CARGA_MAXIMA
+
+
+# Sessões finalizadas mais recentes do treino usadas na análise (o resto do histórico não é lido)
+SESSOES_ANALISADAS = 8
+# Progressão de carga: 2,5% arredondado para 0,5 kg, com pelo menos 1 kg
+INCREMENTO_PERCENTUAL = 0.025
+INCREMENTO_MINIMO = 1.0
+ARREDONDAMENTO_CARGA = 0.5
+# Deload: queda do 1RM estimado abaixo de 90% do melhor recente ou tendência de queda com falhas seguidas
+QUEDA_DELOAD = 0.9
+FATOR_DELOAD = 0.9
+FALHAS_DELOAD = 2
+MIN_SESSOES_TENDENCIA = 3
+MAX_CACHE = 1024
+
+CONSULTA_SERIES = """
+    SELECT s.id_ex_treino, ult.posicao, s.repeticoes, COALESCE(s.carga, 0) AS carga
+    FROM (
+        SELECT id_sessao,
+               ROW_NUMBER() OVER (ORDER BY realizada_em DESC, id_sessao DESC) - 1 AS posicao
+        FROM TCC.SESSAO_TREINO
+        WHERE id_treino = :id_treino AND duracao_sessao IS NOT NULL
+        ORDER BY realizada_em DESC, id_sessao DESC
+        LIMIT :sessoes
+    ) ult
+    JOIN TCC.SERIES s ON s.id_sessao = ult.id_sessao
+"""
+
+
+class CacheRecomendacoes:
+    """
+    Recomendações por treino, válidas enquanto não houver sessão finalizada nova nem mudança na prescrição
+    (a chave inclui a última sessão e a prescrição, relidas a cada consulta por índice).
+    """
+
+    def __init__(self, tamanho: int):
+        self.tamanho = tamanho
+        self._itens: OrderedDict[int, tuple[tuple, list[dict]]] = OrderedDict()
+        self._lock = Lock()
+
+    def obter(self, id_treino: int, versao: tuple) -> list[dict] | None:
+        with self._lock:
+            item = self._itens.get(id_treino)
+            if item is None or item[0] != versao:
+                return None
+            self._itens.move_to_end(id_treino)
+            return item[1]
+
+    def guardar(self, id_treino: int, versao: tuple, recomendacoes: list[dict]) -> None:
+        with self._lock:
+            self._itens[id_treino] = (versao, recomendacoes)
+            self._itens.move_to_end(id_treino)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+
+cache_recomendacoes = CacheRecomendacoes(MAX_CACHE)
+
+
+def _arredondar_carga(carga: np.ndarray) -> np.ndarray:
+    return np.clip(np.round(carga / ARREDONDAMENTO_CARGA) * ARREDONDAMENTO_CARGA, 0, CARGA_MAXIMA)
+
+
+def calcular_recomendacoes(
+    ids_ex: np.ndarray, series_prescritas: np.ndarray, reps_prescritas: np.ndarray, series: np.ndarray
+) -> dict[str, np.ndarray]:
+    """
+    Calcula as metas da próxima sessão de todos os exercícios de uma vez (progressão dupla).
+    Args:
+        ids_ex (np.ndarray): id_ex_treino dos exercícios do treino, em ordem crescente.
+        series_prescritas, reps_prescritas (np.ndarray): Prescrição de cada exercício (0 quando ausente).
+        series (np.ndarray): Séries realizadas, uma por linha: id_ex_treino, posição da sessão
+            (0 = mais recente), repetições e carga.
+    Returns:
+        dict[str, np.ndarray]: Carga, repetições, séries e situação por exercício, na ordem de ids_ex.
+        Exercício sem histórico recebe a prescrição e carga NaN (não há carga prescrita no treino).
+    """
+    total, sessoes = len(ids_ex), SESSOES_ANALISADAS
+    linhas = series[np.isin(series[:, 0], ids_ex)] if len(series) else np.zeros((0, 4))
+    e = np.searchsorted(ids_ex, linhas[:, 0])
+    p = linhas[:, 1].astype(int)
+    reps, carga = linhas[:, 2], linhas[:, 3]
+
+    # Grade exercício x sessão
+    feitas = np.zeros((total, sessoes))
+    np.add.at(feitas, (e, p), 1)
+    carga_max = np.zeros((total, sessoes))
+    np.maximum.at(carga_max, (e, p), carga)
+    reps_min = np.full((total, sessoes), np.inf)
+    np.minimum.at(reps_min, (e, p), reps)
+    e1rm = np.zeros((total, sessoes))
+    np.maximum.at(e1rm, (e, p), np.where(reps == 1, carga, carga * (1 + reps / 30)))
+
+    realizado = feitas > 0
+    tem_historico = realizado.any(axis=1)
+    ultima = np.argmax(realizado, axis=1)
+    linha = np.arange(total)
+    carga_ult = carga_max[linha, ultima]
+    reps_ult = np.where(tem_historico, reps_min[linha, ultima], 0)
+    meta_reps = np.where(reps_prescritas > 0, reps_prescritas, reps_ult)
+    meta_series = np.where(series_prescritas > 0, series_prescritas, feitas[linha, ultima])
+
+    cumpriu = realizado & (feitas >= meta_series[:, None]) & (reps_min >= meta_reps[:, None])
+    progredir = tem_historico & cumpriu[linha, ultima]
+
+    # Tendência do 1RM estimado: mínimos quadrados só nas sessões em que o exercício foi feito
+    quantidade = realizado.sum(axis=1)
+    x = -np.arange(sessoes, dtype=float)[None, :]
+    media_x = np.where(quantidade > 0, (realizado * x).sum(axis=1) / np.maximum(quantidade, 1), 0)
+    media_y = np.where(quantidade > 0, (realizado * e1rm).sum(axis=1) / np.maximum(quantidade, 1), 0)
+    dx = np.where(realizado, x - media_x[:, None], 0)
+    variancia = (dx ** 2).sum(axis=1)
+    tendencia = np.divide(
+        (dx * (e1rm - media_y[:, None])).sum(axis=1), variancia, out=np.zeros(total), where=variancia > 0
+    )
+
+    falhas = (realizado & ~cumpriu)[:, :MIN_SESSOES_TENDENCIA].sum(axis=1)
+    melhor = e1rm.max(axis=1)
+    deload = (
+        tem_historico
+        & (quantidade >= MIN_SESSOES_TENDENCIA)
+        & (carga_ult > 0)
+        & (
+            ((tendencia < 0) & (falhas >= FALHAS_DELOAD))
+            | (e1rm[linha, ultima] < QUEDA_DELOAD * melhor)
+        )
+    )
+    progredir &= ~deload
+
+    incremento = np.maximum(carga_ult * INCREMENTO_PERCENTUAL, INCREMENTO_MINIMO)
+    nova_carga = np.select(
+        [deload, progredir & (carga_ult > 0)],
+        [carga_ult * FATOR_DELOAD, carga_ult + incremento],
+        carga_ult,
+    )
+    # Sem histórico vale a prescrição: reps_ult é 0 e não pode servir de base para a meta
+    novas_reps = np.where(~tem_historico | progredir | deload, meta_reps, np.minimum(meta_reps, reps_ult + 1))
+    novas_series = np.where(deload, np.maximum(meta_series - 1, 1), meta_series)
+    situacao = np.select(
+        [~tem_historico, deload, progredir],
+        ["sem_historico", "deload", "progredir"],
+        "manter",
+    )
+    return {
+        "carga": np.where(tem_historico, _arredondar_carga(nova_carga), np.nan),
+        "repeticoes": novas_reps,
+        "series": novas_series,
+        "situacao": situacao,
+        "carga_anterior": carga_ult,
+        "repeticoes_anteriores": reps_ult,
+        "tendencia_e1rm": tendencia,
+    }
+
+
+@router.get("/sessoes/recomendacao")
+def recomendar_proxima_sessao(id_treino: int, db: Session = Depends(get_db_leitura)):
+    """
+    Sugere carga, repetições e séries da próxima sessão de cada exercício do treino, a partir das
+    últimas sessões finalizadas. O resultado fica em cache até a próxima sessão do treino.
+    Args:
+        id_treino (int): ID do treino.
+        db (Session): Sessão do banco de dados.
+    Returns:
+        list[dict]: Por exercício, a prescrição, a meta sugerida e a situação
+        ("sem_historico", "progredir", "manter" ou "deload"); sem histórico, a meta é a prescrição e a carga é nula.
+    """
+    try:
+        prescricao = consulta_get(
+            """
+            SELECT et.id_ex_treino, et.nome_exercicio, et.series, et.reps,
+                   (SELECT MAX(st.id_sessao) FROM TCC.SESSAO_TREINO st
+                    WHERE st.id_treino = :id_treino AND st.duracao_sessao IS NOT NULL) AS ultima_sessao
+            FROM TCC.EXERCICIO_TREINO et
+            WHERE et.id_treino = :id_treino
+            ORDER BY et.id_ex_treino;
+            """,
+            db,
+            {"id_treino": id_treino},
+        )
+        if not prescricao:
+            raise HTTPException(status_code=404, detail="Treino sem exercícios ou inexistente.")
+
+        versao = tuple((ex["id_ex_treino"], ex["series"], ex["reps"], ex["ultima_sessao"]) for ex in prescricao)
+        recomendacoes = cache_recomendacoes.obter(id_treino, versao)
+        if recomendacoes is not None:
+            return recomendacoes
+
+        series = np.array(
+            db.execute(text(CONSULTA_SERIES), {"id_treino": id_treino, "sessoes": SESSOES_ANALISADAS}).all(),
+            dtype=float,
+        ).reshape(-1, 4)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar histórico do treino: {exc}")
+
+    metas = calcular_recomendacoes(
+        np.array([ex["id_ex_treino"] for ex in prescricao], dtype=float),
+        np.array([ex["series"] or 0 for ex in prescricao], dtype=float),
+        np.array([ex["reps"] or 0 for ex in prescricao], dtype=float),
+        series,
+    )
+    recomendacoes = [
+        {
+            "id_ex_treino": ex["id_ex_treino"],
+            "nome_exercicio": ex["nome_exercicio"],
+            "series_prescritas": ex["series"],
+            "reps_prescritas": ex["reps"],
+            "situacao": str(metas["situacao"][i]),
+            "carga": None if np.isnan(metas["carga"][i]) else float(metas["carga"][i]),
+            "repeticoes": int(metas["repeticoes"][i]),
+            "series": int(metas["series"][i]),
+            "carga_anterior": float(metas["carga_anterior"][i]),
+            "repeticoes_anteriores": int(metas["repeticoes_anteriores"][i]),
+            "tendencia_e1rm": round(float(metas["tendencia_e1rm"][i]), 2),
+        }
+        for i, ex in enumerate(prescricao)
+    ]
+    cache_recomendacoes.guardar(id_treino, versao, recomendacoes)
+    return recomendacoes
@@ -0,0 +1,480 @@
+from fastapi import WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import SQLAlchemyError
+from threading import Lock, Thread
+import fcntl
+import glob
+import json
+import os
+import time
+
+from src.routers.router import router
+from src.core.config import SettingsSessao
+from src.core.database import get_db_mysql
+from src.routers.models.consultas import consulta_get, inserir_em_lote
+from src.routers.apis.treino.treino_usuario import CARGA_MAXIMA
+from src.routers.apis.treino.progresso import atualizar_progresso
+
+
+COLUNAS_SERIE = ["numero_serie", "repeticoes", "carga", "id_ex_treino", "id_sessao"]
+INTERVALO_VERIFICACAO_SEGUNDOS = 1.0
+# Frequência da busca por sessões abertas há mais de SESSAO_EXPIRACAO_HORAS
+INTERVALO_EXPIRACAO_SEGUNDOS = 600.0
+# Acima deste tamanho o log é reescrito só com as séries ainda não gravadas
+TAMANHO_MAXIMO_LOG = 1024 * 1024
+
+
+def _sessao():
+    return next(get_db_mysql())
+
+
+class LogSeries:
+    """
+    Log local só de acréscimo (JSON por linha) das séries recebidas e ainda não gravadas no banco.
+    Cada processo escreve no próprio arquivo e o mantém travado (flock): na inicialização,
+    só são recuperados os logs que nenhum processo vivo está usando.
+    """
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        self.caminho = os.path.join(diretorio, f"series_pendentes_{os.getpid()}.log")
+        self._arquivo = None
+        self._lock = Lock()
+
+    def _abrir(self) -> None:
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._arquivo = open(self.caminho, "a", encoding="utf-8")
+        fcntl.flock(self._arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def acrescentar(self, registros: list[dict]) -> None:
+        with self._lock:
+            if self._arquivo is None:
+                self._abrir()
+            self._arquivo.write("".join(json.dumps(registro) + "\n" for registro in registros))
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+
+    def compactar(self) -> None:
+        """
+        Reescreve o log só com as séries ainda não marcadas como gravadas (vazio quando tudo já foi gravado).
+        As pendentes são lidas do próprio log sob a trava das escritas: uma série acrescentada enquanto
+        outra sessão era gravada nunca é descartada.
+        """
+        with self._lock:
+            if self._arquivo is None:
+                return
+            with open(self.caminho, "r", encoding="utf-8") as atual:
+                pendentes = list(_series_pendentes(atual).values())
+            if pendentes and os.path.getsize(self.caminho) < TAMANHO_MAXIMO_LOG:
+                return
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, "w", encoding="utf-8") as novo:
+                novo.write("".join(json.dumps({"op": "serie", **serie}) + "\n" for serie in pendentes))
+                novo.flush()
+                os.fsync(novo.fileno())
+            os.replace(temporario, self.caminho)
+            antigo = self._arquivo
+            self._abrir()
+            antigo.close()
+
+    @staticmethod
+    def ler_abandonados(diretorio: str) -> tuple[list[dict], list]:
+        """
+        Lê os logs de processos encerrados.
+        Returns:
+            tuple: Séries não marcadas como gravadas e os arquivos (abertos e travados) lidos.
+        """
+        series: dict[tuple, dict] = {}
+        arquivos = []
+        for caminho in glob.glob(os.path.join(diretorio, "series_pendentes_*.log")):
+            arquivo = open(caminho, "r+", encoding="utf-8")
+            try:
+                fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                arquivo.close()
+                continue
+            arquivos.append(arquivo)
+            series.update(_series_pendentes(arquivo))
+        return list(series.values()), arquivos
+
+
+def _chave(serie: dict) -> tuple:
+    return serie["id_sessao"], serie["id_ex_treino"], serie["numero_serie"]
+
+
+def _series_pendentes(linhas) -> dict[tuple, dict]:
+    """Séries do log ainda não marcadas como gravadas, por chave."""
+    series: dict[tuple, dict] = {}
+    for linha in linhas:
+        try:
+            registro = json.loads(linha)
+        except json.JSONDecodeError:
+            continue  # última linha truncada por queda no meio da escrita
+        if registro.get("op") == "serie":
+            registro.pop("op")
+            series[_chave(registro)] = registro
+        elif registro.get("op") == "gravado":
+            for id_ex_treino, numero_serie in registro["chaves"]:
+                series.pop((registro["id_sessao"], id_ex_treino, numero_serie), None)
+    return series
+
+
+def _chaves_gravadas(session, series: list[dict]) -> set[tuple]:
+    ids_sessao = {serie["id_sessao"] for serie in series}
+    if not ids_sessao:
+        return set()
+    consulta = text("""
+        SELECT id_sessao, id_ex_treino, numero_serie FROM TCC.SERIES WHERE id_sessao IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+    return {tuple(linha) for linha in session.execute(consulta, {"ids": list(ids_sessao)}).all()}
+
+
+class BufferSeries:
+    """
+    Séries das sessões ao vivo mantidas em memória (write-behind) e gravadas em TCC.SERIES com um
+    INSERT de várias linhas quando a sessão acumula `series_por_flush` séries, quando a série mais
+    antiga passa de `flush_segundos` ou quando a sessão é finalizada. Toda série é antes registrada no log.
+    O `seq` de cada mensagem é guardado até a sessão terminar: o reenvio de uma série já confirmada
+    (ack perdido numa reconexão) não a registra de novo.
+    """
+
+    def __init__(self, series_por_flush: int, flush_segundos: float, log: LogSeries):
+        self.series_por_flush = series_por_flush
+        self.flush_segundos = flush_segundos
+        self.log = log
+        self._buffers: dict[int, list[dict]] = {}
+        self._primeira: dict[int, float] = {}
+        self._seqs: dict[int, dict[int, int]] = {}
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._thread: Thread | None = None
+
+    def recebida(self, id_sessao: int, seq: int | None) -> int | None:
+        """Número da série já registrada com este seq na sessão, ou None."""
+        if seq is None:
+            return None
+        with self._lock:
+            return self._seqs.get(id_sessao, {}).get(seq)
+
+    def adicionar(self, serie: dict, seq: int | None = None) -> None:
+        self.log.acrescentar([{"op": "serie", **serie}])
+        with self._lock:
+            self._buffers.setdefault(serie["id_sessao"], []).append(serie)
+            self._primeira.setdefault(serie["id_sessao"], time.monotonic())
+            if seq is not None:
+                self._seqs.setdefault(serie["id_sessao"], {})[seq] = serie["numero_serie"]
+            cheio = len(self._buffers[serie["id_sessao"]]) >= self.series_por_flush
+        if cheio:
+            # A série já está no log: falha na gravação antecipada não desfaz o registro
+            try:
+                self.gravar(serie["id_sessao"])
+            except Exception as exc:
+                print(f"Erro inesperado ao gravar séries: {exc}")
+
+    def encerrar(self, id_sessao: int) -> None:
+        """Descarta os seqs da sessão finalizada."""
+        with self._lock:
+            self._seqs.pop(id_sessao, None)
+
+    def pendentes(self, id_sessao: int) -> int:
+        with self._lock:
+            return len(self._buffers.get(id_sessao, ()))
+
+    def ultimas(self, id_sessao: int) -> dict[int, int]:
+        """Maior número de série em memória por exercício (sessão retomada antes do flush)."""
+        with self._lock:
+            ultimas: dict[int, int] = {}
+            for serie in self._buffers.get(id_sessao, ()):
+                ultimas[serie["id_ex_treino"]] = max(serie["numero_serie"], ultimas.get(serie["id_ex_treino"], 0))
+            return ultimas
+
+    def gravar(self, id_sessao: int) -> int:
+        """Grava as séries pendentes da sessão. Em falha, mantém o buffer para a próxima tentativa."""
+        with self._flush_lock:
+            with self._lock:
+                series = self._buffers.pop(id_sessao, [])
+                self._primeira.pop(id_sessao, None)
+            if not series:
+                return 0
+            session = _sessao()
+            try:
+                inserir_em_lote(session, "TCC.SERIES", COLUNAS_SERIE, series)
+                session.commit()
+            except Exception as exc:
+                session.rollback()
+                with self._lock:
+                    self._buffers[id_sessao] = series + self._buffers.get(id_sessao, [])
+                    self._primeira.setdefault(id_sessao, time.monotonic())
+                print(f"Erro ao gravar séries da sessão {id_sessao}: {exc}")
+                return 0
+            finally:
+                session.close()
+
+            self.log.acrescentar([{
+                "op": "gravado",
+                "id_sessao": id_sessao,
+                "chaves": [[serie["id_ex_treino"], serie["numero_serie"]] for serie in series],
+            }])
+            self.log.compactar()
+            return len(series)
+
+    def _vencidas(self) -> list[int]:
+        agora = time.monotonic()
+        with self._lock:
+            return [id_sessao for id_sessao, inicio in self._primeira.items() if agora - inicio >= self.flush_segundos]
+
+    def _executar(self) -> None:
+        proxima_expiracao = time.monotonic()
+        while True:
+            time.sleep(INTERVALO_VERIFICACAO_SEGUNDOS)
+            for id_sessao in self._vencidas():
+                try:
+                    self.gravar(id_sessao)
+                except Exception as exc:
+                    print(f"Erro inesperado ao gravar séries: {exc}")
+            if time.monotonic() >= proxima_expiracao:
+                proxima_expiracao = time.monotonic() + INTERVALO_EXPIRACAO_SEGUNDOS
+                try:
+                    expiradas = _expirar_sessoes(_sett.SESSAO_EXPIRACAO_HORAS)
+                    if expiradas:
+                        print(f"{expiradas} sessões ao vivo abandonadas foram encerradas")
+                except Exception as exc:
+                    print(f"Erro ao encerrar sessões abandonadas: {exc}")
+
+    def iniciar(self) -> None:
+        if self._thread is None:
+            self._thread = Thread(target=self._executar, name="series-write-behind", daemon=True)
+            self._thread.start()
+
+    def recuperar(self) -> int:
+        """Regrava as séries de logs de processos encerrados que não chegaram ao banco."""
+        series, arquivos = LogSeries.ler_abandonados(self.log.diretorio)
+        try:
+            if series:
+                session = _sessao()
+                try:
+                    # A queda pode ter ocorrido entre o commit e a marca "gravado": não duplica
+                    gravadas = _chaves_gravadas(session, series)
+                    faltantes = [serie for serie in series if _chave(serie) not in gravadas]
+                    inserir_em_lote(session, "TCC.SERIES", COLUNAS_SERIE, faltantes)
+                    session.commit()
+                finally:
+                    session.close()
+            else:
+                faltantes = []
+            for arquivo in arquivos:
+                os.remove(arquivo.name)
+            return len(faltantes)
+        finally:
+            for arquivo in arquivos:
+                arquivo.close()
+
+
+_sett = SettingsSessao()
+buffer_series = BufferSeries(
+    _sett.SESSAO_SERIES_POR_FLUSH,
+    _sett.SESSAO_FLUSH_SEGUNDOS,
+    LogSeries(_sett.SESSAO_DIRETORIO_LOG),
+)
+
+
+def inicializar_sessoes_ao_vivo() -> None:
+    """Recupera séries de execuções anteriores e inicia a gravação periódica."""
+    try:
+        recuperadas = buffer_series.recuperar()
+        if recuperadas:
+            print(f"{recuperadas} séries recuperadas do log local")
+    except Exception as e:
+        print(f"Erro ao recuperar séries do log local: {e}")
+    buffer_series.iniciar()
+
+
+def _abrir_sessao(mensagem: dict) -> dict:
+    """Cria a sessão (ou retoma a de mesmo idCliente) e carrega os exercícios e a última série de cada um."""
+    session = _sessao()
+    try:
+        existente = consulta_get(
+            "SELECT id_sessao, id_treino, duracao_sessao FROM TCC.SESSAO_TREINO WHERE id_cliente = :id_cliente;",
+            session,
+            {"id_cliente": mensagem["idCliente"]},
+        )
+        if existente and existente[0]["duracao_sessao"] is not None:
+            raise ValueError("Sessão já finalizada.")
+        if existente:
+            id_sessao, id_treino = existente[0]["id_sessao"], existente[0]["id_treino"]
+        else:
+            id_treino = int(mensagem["id_treino"])
+            if not consulta_get("SELECT 1 FROM TCC.TREINO WHERE id = :id;", session, {"id": id_treino}):
+                raise ValueError(f"Treino {id_treino} não encontrado.")
+            id_sessao = session.execute(text("""
+                INSERT INTO TCC.SESSAO_TREINO (duracao_sessao, descricao, id_treino, id_cliente)
+                VALUES (NULL, :descricao, :id_treino, :id_cliente)
+            """), {
+                "descricao": mensagem.get("descricao", ""),
+                "id_treino": id_treino,
+                "id_cliente": mensagem["idCliente"],
+            }).lastrowid
+            session.commit()
+        exercicios = {
+            linha["id_ex_treino"]
+            for linha in consulta_get(
+                "SELECT id_ex_treino FROM TCC.EXERCICIO_TREINO WHERE id_treino = :id_treino;",
+                session,
+                {"id_treino": id_treino},
+            )
+        }
+        ultimas = {
+            linha["id_ex_treino"]: linha["ultima"]
+            for linha in consulta_get(
+                "SELECT id_ex_treino, MAX(numero_serie) AS ultima FROM TCC.SERIES WHERE id_sessao = :id_sessao GROUP BY id_ex_treino;",
+                session,
+                {"id_sessao": id_sessao},
+            )
+        }
+        for id_ex_treino, ultima in buffer_series.ultimas(id_sessao).items():
+            ultimas[id_ex_treino] = max(ultima, ultimas.get(id_ex_treino, 0))
+        return {"id_sessao": id_sessao, "exercicios": exercicios, "ultimas": ultimas}
+    finally:
+        session.close()
+
+
+def _finalizar_sessao(id_sessao: int, duracao: int) -> int:
+    buffer_series.gravar(id_sessao)
+    if buffer_series.pendentes(id_sessao):
+        raise RuntimeError("Séries ainda não gravadas; tente finalizar novamente.")
+    session = _sessao()
+    try:
+        # A duração marca a sessão como finalizada: o progresso é somado uma única vez
+        finalizada = session.execute(
+            text("""
+                UPDATE TCC.SESSAO_TREINO SET duracao_sessao = :duracao
+                WHERE id_sessao = :id_sessao AND duracao_sessao IS NULL;
+            """),
+            {"duracao": duracao, "id_sessao": id_sessao},
+        ).rowcount
+        if finalizada:
+            atualizar_progresso(session, [id_sessao])
+        session.commit()
+        buffer_series.encerrar(id_sessao)
+        return consulta_get(
+            "SELECT COUNT(*) AS total FROM TCC.SERIES WHERE id_sessao = :id_sessao;", session, {"id_sessao": id_sessao}
+        )[0]["total"]
+    finally:
+        session.close()
+
+
+def _expirar_sessoes(horas: float) -> int:
+    """
+    Finaliza as sessões ao vivo abertas há mais de `horas` (app fechado sem "finalizar"), para que entrem
+    no progresso e nas recomendações. A duração real é desconhecida e fica 0.
+    Returns:
+        int: Quantidade de sessões encerradas.
+    """
+    session = _sessao()
+    try:
+        abandonadas = [
+            linha["id_sessao"]
+            for linha in consulta_get(
+                """
+                SELECT id_sessao FROM TCC.SESSAO_TREINO
+                WHERE duracao_sessao IS NULL AND realizada_em < NOW() - INTERVAL :minutos MINUTE;
+                """,
+                session,
+                {"minutos": int(horas * 60)},
+            )
+        ]
+    finally:
+        session.close()
+
+    encerradas = 0
+    for id_sessao in abandonadas:
+        try:
+            _finalizar_sessao(id_sessao, 0)
+            encerradas += 1
+        except RuntimeError:
+            continue  # séries ainda não gravadas: nova tentativa na próxima verificação
+    return encerradas
+
+
+@router.websocket("/sessoes/ao-vivo")
+async def sessao_ao_vivo(websocket: WebSocket):
+    """
+    Canal da sessão de treino em andamento: o app envia cada série assim que ela é feita.
+    Mensagens do cliente (JSON):
+    - {"tipo": "iniciar", "idCliente": "uuid", "id_treino": 1, "descricao": ""}  (mesmo idCliente retoma a sessão)
+    - {"tipo": "serie", "seq": 1, "id_exercicio": 10, "repeticoes": 12, "carga": 20, "numero_serie": 1 (opcional)}
+    - {"tipo": "finalizar", "duracao": 45}
+    Respostas: "iniciada" (id_sessao), "ack" (seq, depois de registrada no log local), "finalizada" e "erro".
+    Uma série reenviada com um seq já confirmado na sessão recebe o mesmo ack sem ser registrada de novo.
+    "erro" com "temporario": true (falha de disco ou do banco) não registrou a mensagem: reenvie com o mesmo seq.
+    Erros inesperados fecham o canal com o código 1011.
+    Sessões não finalizadas são encerradas após SESSAO_EXPIRACAO_HORAS.
+    """
+    await websocket.accept()
+    estado: dict | None = None
+    try:
+        while True:
+            mensagem = await websocket.receive_json()
+            if not isinstance(mensagem, dict):
+                mensagem = {}
+            tipo = mensagem.get("tipo")
+            try:
+                if tipo == "iniciar":
+                    estado = await run_in_threadpool(_abrir_sessao, mensagem)
+                    await websocket.send_json({"tipo": "iniciada", "id_sessao": estado["id_sessao"]})
+
+                elif estado is None:
+                    raise ValueError("Envie 'iniciar' antes das séries.")
+
+                elif tipo == "serie" and (
+                    repetida := buffer_series.recebida(estado["id_sessao"], mensagem.get("seq"))
+                ) is not None:
+                    await websocket.send_json({"tipo": "ack", "seq": mensagem["seq"], "numero_serie": repetida})
+
+                elif tipo == "serie":
+                    id_ex_treino = int(mensagem["id_exercicio"])
+                    repeticoes = int(mensagem["repeticoes"])
+                    carga = float(mensagem.get("carga") or 0)
+                    if id_ex_treino not in estado["exercicios"]:
+                        raise ValueError(f"Exercício {id_ex_treino} não pertence ao treino da sessão.")
+                    if repeticoes <= 0 or not 0 <= carga <= CARGA_MAXIMA:
+                        raise ValueError("Repetições devem ser positivas e a carga estar no intervalo permitido.")
+                    numero_serie = int(mensagem.get("numero_serie") or estado["ultimas"].get(id_ex_treino, 0) + 1)
+                    await run_in_threadpool(buffer_series.adicionar, {
+                        "id_sessao": estado["id_sessao"],
+                        "id_ex_treino": id_ex_treino,
+                        "numero_serie": numero_serie,
+                        "repeticoes": repeticoes,
+                        "carga": carga,
+                    }, mensagem.get("seq"))
+                    estado["ultimas"][id_ex_treino] = max(numero_serie, estado["ultimas"].get(id_ex_treino, 0))
+                    await websocket.send_json({"tipo": "ack", "seq": mensagem.get("seq"), "numero_serie": numero_serie})
+
+                elif tipo == "finalizar":
+                    total = await run_in_threadpool(
+                        _finalizar_sessao, estado["id_sessao"], int(mensagem.get("duracao") or 0)
+                    )
+                    await websocket.send_json({"tipo": "finalizada", "id_sessao": estado["id_sessao"], "series": total})
+                    await websocket.close()
+                    return
+
+                else:
+                    raise ValueError(f"Tipo de mensagem desconhecido: {tipo}")
+            except (KeyError, TypeError, ValueError, RuntimeError) as exc:
+                await websocket.send_json({"tipo": "erro", "seq": mensagem.get("seq"), "detail": str(exc)})
+            except (OSError, SQLAlchemyError) as exc:
+                # Log local ou banco indisponível: nada foi confirmado e o cliente pode reenviar a mesma mensagem
+                await websocket.send_json({
+                    "tipo": "erro", "seq": mensagem.get("seq"), "temporario": True,
+                    "detail": f"Falha ao registrar, tente novamente: {exc}",
+                })
+            except WebSocketDisconnect:
+                raise
+            except Exception as exc:
+                await websocket.send_json({"tipo": "erro", "seq": mensagem.get("seq"), "detail": f"Erro interno: {exc}"})
+                await websocket.close(code=1011)
+                return
+    except WebSocketDisconnect:
+        # Conexão perdida: as séries já confirmadas seguem no buffer e no log e são gravadas pelo temporizador
+        return
@@ -0,0 +1,85 @@
+from fastapi import HTTPException
+import copy
+
+from src.routers.apis.treino.catalogo import catalogo_disponivel, normalizar_nome
+
+
+# Pesos do ranqueamento de substitutos
+PESO_PADRAO_MOVIMENTO = 3.0
+PESO_SIMILARIDADE_NOME = 2.0
+PESO_MESMO_EQUIPAMENTO = 1.0
+
+
+def localizar_exercicio(plano: dict, indice_treino: int, indice_exercicio: int) -> dict:
+    treinos = plano.get("treinos") if isinstance(plano, dict) else None
+    if not isinstance(treinos, list) or not 0 <= indice_treino < len(treinos):
+        raise HTTPException(status_code=400, detail="Treino informado não existe no plano")
+    exercicios = treinos[indice_treino].get("exercicios") or []
+    if not 0 <= indice_exercicio < len(exercicios):
+        raise HTTPException(status_code=400, detail="Exercício informado não existe no treino")
+    return exercicios[indice_exercicio]
+
+
+def ranquear_substitutos(
+    plano: dict,
+    indice_treino: int,
+    indice_exercicio: int,
+    equipamentos: str | None = None,
+    lesao: str | None = None,
+    exercicio_nao_gosta: str | None = None,
+    limite: int = 5,
+) -> list[dict]:
+    """
+    Lista alternativas do catálogo para um exercício do plano, do mesmo grupo muscular,
+    respeitando equipamentos, lesões e exercícios que o usuário não gosta.
+    Args:
+        plano (dict): Plano de treino ({"programaTreino", "treinos"}).
+        indice_treino (int): Posição do treino no plano.
+        indice_exercicio (int): Posição do exercício no treino.
+        equipamentos, lesao, exercicio_nao_gosta (str | None): Restrições em texto livre da anamnese.
+        limite (int): Quantidade máxima de alternativas.
+    Returns:
+        list: Exercícios do catálogo ordenados do mais para o menos parecido, com o campo "score".
+    """
+    atual = localizar_exercicio(plano, indice_treino, indice_exercicio)
+    catalogo = catalogo_disponivel()
+    grupo = atual.get("grupoMuscular") or ""
+    nome_atual = normalizar_nome(atual.get("nomeExercicio") or "")
+    tokens_atual = set(nome_atual.split())
+    movimento_atual = nome_atual.split()[0] if nome_atual else ""
+    equipamento_atual = normalizar_nome(atual.get("equipamento") or "")
+
+    # Não sugere o próprio exercício nem os que já estão no mesmo treino
+    no_treino = {
+        normalizar_nome(exercicio.get("nomeExercicio") or "")
+        for exercicio in plano["treinos"][indice_treino].get("exercicios") or []
+    }
+
+    ranqueados = []
+    for candidato in catalogo.candidatos(grupo, equipamentos, exercicio_nao_gosta, lesao):
+        nome = normalizar_nome(candidato["nome"])
+        if nome in no_treino:
+            continue
+        tokens = set(nome.split())
+        score = PESO_SIMILARIDADE_NOME * len(tokens & tokens_atual) / max(len(tokens | tokens_atual), 1)
+        if movimento_atual and nome.split()[0] == movimento_atual:
+            score += PESO_PADRAO_MOVIMENTO
+        if normalizar_nome(candidato["equipamento"]) == equipamento_atual:
+            score += PESO_MESMO_EQUIPAMENTO
+        ranqueados.append({**candidato, "regioes": list(candidato["regioes"]), "score": round(score, 3)})
+
+    ranqueados.sort(key=lambda item: (-item["score"], item["id_exercicio"]))
+    return ranqueados[:limite]
+
+
+def aplicar_substituto(plano: dict, indice_treino: int, indice_exercicio: int, substituto: dict) -> dict:
+    """Troca o exercício do plano pelo substituto, mantendo séries, repetições e descanso."""
+    novo_plano = copy.deepcopy(plano)
+    atual = localizar_exercicio(novo_plano, indice_treino, indice_exercicio)
+    atual.update({
+        "nomeExercicio": substituto["nome"],
+        "equipamento": substituto["equipamento"],
+        "grupoMuscular": substituto["grupo_muscular"],
+        "idExercicio": substituto["id_exercicio"],
+    })
+    return novo_plano
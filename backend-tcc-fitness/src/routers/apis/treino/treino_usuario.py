@@ -1,15 +1,20 @@
 # ...existing code...
 from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel, Field
 from typing import List
+from datetime import datetime
 
 from src.routers.router import router
 from src.core.database import get_db_mysql
+from src.core.replicas import get_db_leitura
+from src.routers.models.consultas import inserir_em_lote
+from src.routers.apis.treino.progresso import atualizar_progresso
 
 @router.get("/sessoes/perfil")
-def get_treinos_usuario(id_usuario: int, db: Session = Depends(get_db_mysql)):
+def get_treinos_usuario(id_usuario: int, db: Session = Depends(get_db_leitura)):
     """
     Retorna as sessões de treino do usuário com:
     - id_sessao
@@ -42,10 +47,10 @@ def get_treinos_usuario(id_usuario: int, db: Session = Depends(get_db_mysql)):
 
 # ...existing code...
 @router.get("/sessoes/exercicios")
-def get_exercicios_por_sessao(id_sessao: int, db: Session = Depends(get_db_mysql)):
+def get_exercicios_por_sessao(id_sessao: int, db: Session = Depends(get_db_leitura)):
     """
     Retorna todos os exercícios realizados em uma sessão específica,
-    incluindo as séries com repetições e cargas:
+    incluindo as séries com repetições e cargas (de TCC.SERIES_ARQUIVO se a sessão já foi arquivada):
     - id_ex_treino
     - nome_exercicio
     - equipamento (opcional)
@@ -60,13 +65,16 @@ def get_exercicios_por_sessao(id_sessao: int, db: Session = Depends(get_db_mysql
       s.numero_serie,
       s.repeticoes,
       s.carga
-    FROM TCC.SERIES s
+    FROM {tabela} s
     JOIN TCC.EXERCICIO_TREINO et ON s.id_ex_treino = et.id_ex_treino
     WHERE s.id_sessao = :id_sessao
     ORDER BY et.id_ex_treino, s.numero_serie;
     """
     try:
-        rows = db.execute(text(query), {"id_sessao": id_sessao}).mappings().all()
+        rows = db.execute(text(query.format(tabela="TCC.SERIES")), {"id_sessao": id_sessao}).mappings().all()
+        if not rows:
+            # Sessões antigas: as partições já arquivadas são lidas do arquivo
+            rows = db.execute(text(query.format(tabela="TCC.SERIES_ARQUIVO")), {"id_sessao": id_sessao}).mappings().all()
         # agrupa por exercício para retornar estrutura aninhada
         exercicios = {}
         for r in rows:
@@ -89,6 +97,11 @@ def get_exercicios_por_sessao(id_sessao: int, db: Session = Depends(get_db_mysql
         raise HTTPException(status_code=500, detail=f"Erro ao buscar exercícios da sessão: {exc}")
 
 
+def _sem_fuso(data: datetime | None) -> datetime | None:
+    # TIMESTAMP sem fuso, como as datas enviadas pela sincronização
+    return data.replace(tzinfo=None) if data is not None and data.tzinfo is not None else data
+
+
 class ExercicioInsert(BaseModel):
     id_exercicio: int = Field(..., alias="id_exercicio")
     repeticoes: List[int]
@@ -98,6 +111,7 @@ class SessaoInsert(BaseModel):
     duracao: int
     id_treino: int
     descricao: str = ""
+    realizada_em: datetime | None = None
     exercicios: List[ExercicioInsert]
 
 @router.post("/sessoes")
@@ -109,6 +123,7 @@ def criar_sessao_treino(payload: SessaoInsert, db: Session = Depends(get_db_mysq
       "duracao": 0,
       "id_treino": 1,
       "descricao": "",
+      "realizada_em": "2025-01-01T18:00:00" (opcional; padrão: agora),
       "exercicios": [
         {
           "id_exercicio": 0,
@@ -121,8 +136,8 @@ def criar_sessao_treino(payload: SessaoInsert, db: Session = Depends(get_db_mysq
     Retorna id_sessao e lista das séries inseridas.
     """
     insert_sessao_q = text("""
-        INSERT INTO TCC.SESSAO_TREINO (duracao_sessao, descricao, id_treino)
-        VALUES (:duracao, :descricao, :id_treino)
+        INSERT INTO TCC.SESSAO_TREINO (duracao_sessao, descricao, id_treino, realizada_em)
+        VALUES (:duracao, :descricao, :id_treino, COALESCE(:realizada_em, CURRENT_TIMESTAMP))
     """)
     insert_serie_q = text("""
         INSERT INTO TCC.SERIES (numero_serie, repeticoes, carga, id_ex_treino, id_sessao)
@@ -137,7 +152,8 @@ def criar_sessao_treino(payload: SessaoInsert, db: Session = Depends(get_db_mysq
         db.execute(insert_sessao_q, {
             "duracao": payload.duracao,
             "descricao": payload.descricao,
-            "id_treino": payload.id_treino
+            "id_treino": payload.id_treino,
+            "realizada_em": _sem_fuso(payload.realizada_em),
         })
         # obter id gerado da sessão
         id_sessao = db.execute(text("SELECT LAST_INSERT_ID()")).scalar()
@@ -166,6 +182,7 @@ def criar_sessao_treino(payload: SessaoInsert, db: Session = Depends(get_db_mysq
                     "carga": carga
                 })
 
+        atualizar_progresso(db, [id_sessao])
         db.commit()
         return {"id_sessao": id_sessao, "series": series_inseridas}
     except HTTPException:
@@ -173,4 +190,178 @@ def criar_sessao_treino(payload: SessaoInsert, db: Session = Depends(get_db_mysq
         raise
     except Exception as exc:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Erro ao inserir sessão: {exc}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Erro ao inserir sessão: {exc}")
+
+# Envio em lote das sessões registradas offline
+MAX_SESSOES_LOTE = 500
+SESSOES_POR_TRANSACAO = 100
+CARGA_MAXIMA = 999.99  # SERIES.carga é DECIMAL(5,2)
+
+
+class SessaoLoteItem(SessaoInsert):
+    id_cliente: str = Field(..., alias="idCliente", min_length=1, max_length=64)
+
+
+class SessaoLotePayload(BaseModel):
+    sessoes: List[SessaoLoteItem] = Field(..., min_length=1, max_length=MAX_SESSOES_LOTE)
+
+
+def validar_sessao(sessao: SessaoInsert, treinos: set[int], exercicios: set[int]) -> str | None:
+    """Retorna o motivo da rejeição da sessão ou None se ela pode ser inserida."""
+    if not sessao.exercicios:
+        return "Lista de exercícios vazia."
+    if sessao.id_treino not in treinos:
+        return f"Treino {sessao.id_treino} não encontrado."
+    for exerc in sessao.exercicios:
+        if exerc.id_exercicio not in exercicios:
+            return f"Exercício {exerc.id_exercicio} não encontrado."
+        if len(exerc.repeticoes) != len(exerc.cargas):
+            return f"Listas de repetições e cargas com tamanhos diferentes para exercício {exerc.id_exercicio}."
+        if any(rep <= 0 for rep in exerc.repeticoes):
+            return f"Repetições devem ser positivas no exercício {exerc.id_exercicio}."
+        if any(carga < 0 or carga > CARGA_MAXIMA for carga in exerc.cargas):
+            return f"Carga fora do intervalo permitido no exercício {exerc.id_exercicio}."
+    return None
+
+
+def _ids_existentes(db: Session, query: str, ids: set) -> dict:
+    if not ids:
+        return {}
+    consulta = text(query).bindparams(bindparam("ids", expanding=True))
+    return {linha[0]: linha[1] for linha in db.execute(consulta, {"ids": list(ids)}).all()}
+
+
+def _inserir_bloco(db: Session, bloco: list[SessaoLoteItem]) -> dict[str, int]:
+    """Insere sessões, séries e progresso do bloco com INSERTs de várias linhas. Returns: id_sessao por idCliente."""
+    agora = db.execute(text("SELECT NOW()")).scalar()
+    inserir_em_lote(
+        db,
+        "TCC.SESSAO_TREINO",
+        ["duracao_sessao", "descricao", "id_treino", "id_cliente", "realizada_em"],
+        [
+            {
+                "duracao_sessao": sessao.duracao,
+                "descricao": sessao.descricao,
+                "id_treino": sessao.id_treino,
+                "id_cliente": sessao.id_cliente,
+                "realizada_em": _sem_fuso(sessao.realizada_em) or agora,
+            }
+            for sessao in bloco
+        ],
+    )
+    # Os ids são relidos pelo índice único de id_cliente: não dependem de auto-incremento consecutivo
+    ids_sessao = _ids_existentes(
+        db,
+        "SELECT id_cliente, id_sessao FROM TCC.SESSAO_TREINO WHERE id_cliente IN :ids",
+        {sessao.id_cliente for sessao in bloco},
+    )
+    inserir_em_lote(
+        db,
+        "TCC.SERIES",
+        ["numero_serie", "repeticoes", "carga", "id_ex_treino", "id_sessao"],
+        [
+            {
+                "numero_serie": numero,
+                "repeticoes": rep,
+                "carga": carga,
+                "id_ex_treino": exerc.id_exercicio,
+                "id_sessao": ids_sessao[sessao.id_cliente],
+            }
+            for sessao in bloco
+            for exerc in sessao.exercicios
+            for numero, (rep, carga) in enumerate(zip(exerc.repeticoes, exerc.cargas), start=1)
+        ],
+    )
+    atualizar_progresso(db, list(ids_sessao.values()))
+    return ids_sessao
+
+
+@router.post("/sessoes/lote")
+def criar_sessoes_lote(payload: SessaoLotePayload, db: Session = Depends(get_db_mysql)):
+    """
+    Insere em uma requisição as sessões registradas offline pelo app.
+    Todas as sessões são validadas antes de qualquer escrita; as válidas são gravadas com INSERTs de
+    várias linhas, em transações de até SESSOES_POR_TRANSACAO sessões. Sessões cujo idCliente já
+    foi gravado (reenvio) não são duplicadas.
+    Body esperado:
+    {
+      "sessoes": [
+        {"idCliente": "uuid-gerado-no-app", "duracao": 0, "id_treino": 1, "descricao": "", "exercicios": [...]},
+        ...
+      ]
+    }
+    Retorna, por idCliente, o status ("criada", "duplicada" ou "invalida"), o id_sessao e o erro.
+    """
+    sessoes = payload.sessoes
+    resultados: dict[str, dict] = {}
+
+    try:
+        treinos = set(_ids_existentes(
+            db, "SELECT id, id FROM TCC.TREINO WHERE id IN :ids", {sessao.id_treino for sessao in sessoes}
+        ))
+        exercicios = set(_ids_existentes(
+            db,
+            "SELECT id_ex_treino, id_ex_treino FROM TCC.EXERCICIO_TREINO WHERE id_ex_treino IN :ids",
+            {exerc.id_exercicio for sessao in sessoes for exerc in sessao.exercicios},
+        ))
+        ja_gravadas = _ids_existentes(
+            db,
+            "SELECT id_cliente, id_sessao FROM TCC.SESSAO_TREINO WHERE id_cliente IN :ids",
+            {sessao.id_cliente for sessao in sessoes},
+        )
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Erro ao validar sessões: {exc}")
+
+    novas: list[SessaoLoteItem] = []
+    for sessao in sessoes:
+        if sessao.id_cliente in resultados:
+            # Repetida no próprio lote: vale a primeira ocorrência
+            continue
+        if sessao.id_cliente in ja_gravadas:
+            resultados[sessao.id_cliente] = {"status": "duplicada", "id_sessao": ja_gravadas[sessao.id_cliente], "erro": None}
+            continue
+        erro = validar_sessao(sessao, treinos, exercicios)
+        if erro:
+            resultados[sessao.id_cliente] = {"status": "invalida", "id_sessao": None, "erro": erro}
+            continue
+        resultados[sessao.id_cliente] = {"status": "criada", "id_sessao": None, "erro": None}
+        novas.append(sessao)
+
+    for inicio in range(0, len(novas), SESSOES_POR_TRANSACAO):
+        bloco = novas[inicio:inicio + SESSOES_POR_TRANSACAO]
+        try:
+            ids_sessao = _inserir_bloco(db, bloco)
+            db.commit()
+        except IntegrityError:
+            # Reenvio concorrente do mesmo idCliente: descarta o bloco e grava só o que ainda falta
+            db.rollback()
+            gravadas = _ids_existentes(
+                db,
+                "SELECT id_cliente, id_sessao FROM TCC.SESSAO_TREINO WHERE id_cliente IN :ids",
+                {sessao.id_cliente for sessao in bloco},
+            )
+            for id_cliente, id_sessao in gravadas.items():
+                resultados[id_cliente] = {"status": "duplicada", "id_sessao": id_sessao, "erro": None}
+            bloco = [sessao for sessao in bloco if sessao.id_cliente not in gravadas]
+            try:
+                ids_sessao = _inserir_bloco(db, bloco) if bloco else {}
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                ids_sessao = {}
+                for sessao in bloco:
+                    resultados[sessao.id_cliente] = {"status": "erro", "id_sessao": None, "erro": f"Erro ao inserir sessão: {exc}"}
+        except Exception as exc:
+            db.rollback()
+            ids_sessao = {}
+            for sessao in bloco:
+                resultados[sessao.id_cliente] = {"status": "erro", "id_sessao": None, "erro": f"Erro ao inserir sessão: {exc}"}
+
+        for id_cliente, id_sessao in ids_sessao.items():
+            resultados[id_cliente]["id_sessao"] = id_sessao
+
+    return {
+        "total": len(sessoes),
+        "criadas": sum(resultado["status"] == "criada" for resultado in resultados.values()),
+        "resultados": resultados,
+    }
@@ -0,0 +1,267 @@
+from fastapi import HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from pymysql.constants import FIELD_TYPE
+from typing import Iterator, Literal
+import csv
+import io
+import json
+
+from src.routers.router import router
+from src.core.replicas import roteador_leitura
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional: sem ele, só NDJSON e CSV
+    pa = pq = None
+
+
+# Linhas lidas do cursor do servidor por vez (e por row group no Parquet)
+LINHAS_POR_LOTE = 5000
+
+# Cada coleção é lida em ordem das suas chaves (as primeiras colunas), o que permite retomar a exportação
+# a partir da última linha recebida. As séries de uma sessão ficam todas na tabela atual ou todas no arquivo.
+EXPORTACOES = {
+    "sessoes": {
+        "chaves": ["st.id_sessao"],
+        "query": """
+            SELECT st.id_sessao, st.id_treino, t.nome AS treino_nome, st.realizada_em, st.duracao_sessao, st.descricao
+            FROM TCC.SESSAO_TREINO st
+            JOIN TCC.TREINO t ON t.id = st.id_treino
+            WHERE t.id_usuario = :id_usuario AND {apos}
+            ORDER BY st.id_sessao
+        """,
+    },
+    "series": {
+        # A condição de retomada vai dentro de cada ramo do UNION: filtrar por fora materializaria todo o histórico
+        "chaves": ["s.id_sessao", "s.id_serie"],
+        "query": """
+            SELECT * FROM (
+                SELECT s.id_sessao, s.id_serie, st.realizada_em, s.id_ex_treino, et.nome_exercicio,
+                       et.id_exercicio, s.numero_serie, s.repeticoes, s.carga
+                FROM TCC.TREINO t
+                JOIN TCC.SESSAO_TREINO st ON st.id_treino = t.id
+                JOIN TCC.SERIES s ON s.id_sessao = st.id_sessao
+                JOIN TCC.EXERCICIO_TREINO et ON et.id_ex_treino = s.id_ex_treino
+                WHERE t.id_usuario = :id_usuario AND {apos}
+                UNION ALL
+                SELECT s.id_sessao, s.id_serie, st.realizada_em, s.id_ex_treino, et.nome_exercicio,
+                       et.id_exercicio, s.numero_serie, s.repeticoes, s.carga
+                FROM TCC.TREINO t
+                JOIN TCC.SESSAO_TREINO st ON st.id_treino = t.id
+                JOIN TCC.SERIES_ARQUIVO s ON s.id_sessao = st.id_sessao
+                JOIN TCC.EXERCICIO_TREINO et ON et.id_ex_treino = s.id_ex_treino
+                WHERE t.id_usuario = :id_usuario AND {apos}
+            ) series
+            ORDER BY id_sessao, id_serie
+        """,
+    },
+    "programas": {
+        "chaves": ["t.id", "COALESCE(et.id_ex_treino, 0)"],
+        "query": """
+            SELECT t.id AS id_treino, COALESCE(et.id_ex_treino, 0) AS id_ex_treino,
+                   pt.id_programa_treino, pt.nome AS programa_nome, t.nome AS treino_nome, t.descricao,
+                   t.duracao, t.dificuldade, et.id_exercicio, et.nome_exercicio, et.grupo_muscular,
+                   et.equipamento, et.series, et.reps, et.descanso
+            FROM TCC.TREINO t
+            LEFT JOIN TCC.PROGRAMA_TREINO pt ON pt.id_programa_treino = t.id_programa_treino
+            LEFT JOIN TCC.EXERCICIO_TREINO et ON et.id_treino = t.id
+            WHERE t.id_usuario = :id_usuario AND {apos}
+            ORDER BY t.id, COALESCE(et.id_ex_treino, 0)
+        """,
+    },
+    "dietas": {
+        "chaves": ["d.id_dieta", "COALESCE(r.id_refeicao, 0)"],
+        "query": """
+            SELECT d.id_dieta, COALESCE(r.id_refeicao, 0) AS id_refeicao, d.nome AS dieta_nome,
+                   d.descricao, r.tipo_refeicao, r.calorias, r.alimentos
+            FROM TCC.DIETA d
+            LEFT JOIN TCC.REFEICOES r ON r.id_dieta = d.id_dieta
+            WHERE d.id_usuario = :id_usuario AND {apos}
+            ORDER BY d.id_dieta, COALESCE(r.id_refeicao, 0)
+        """,
+    },
+}
+
+TIPOS_PARQUET = {
+    FIELD_TYPE.TINY: "int64",
+    FIELD_TYPE.SHORT: "int64",
+    FIELD_TYPE.INT24: "int64",
+    FIELD_TYPE.LONG: "int64",
+    FIELD_TYPE.LONGLONG: "int64",
+    FIELD_TYPE.FLOAT: "float64",
+    FIELD_TYPE.DOUBLE: "float64",
+    FIELD_TYPE.DECIMAL: "float64",
+    FIELD_TYPE.NEWDECIMAL: "float64",
+    FIELD_TYPE.DATETIME: "timestamp",
+    FIELD_TYPE.TIMESTAMP: "timestamp",
+    FIELD_TYPE.DATE: "date32",
+}
+
+MIDIA = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _condicao_apos(chaves: list[str], apos: str | None) -> tuple[str, dict]:
+    """Condição de keyset a partir do cursor "k1" ou "k1-k2" (valores das chaves da última linha recebida)."""
+    if not apos:
+        return "1 = 1", {}
+    try:
+        valores = [int(valor) for valor in apos.split("-")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if len(valores) != len(chaves):
+        raise HTTPException(status_code=400, detail="Cursor inválido para a coleção")
+    if len(chaves) == 1:
+        return f"{chaves[0]} > :k1", {"k1": valores[0]}
+    return f"({chaves[0]} > :k1 OR ({chaves[0]} = :k1 AND {chaves[1]} > :k2))", {"k1": valores[0], "k2": valores[1]}
+
+
+def _lotes(engine: Engine, query: str, params: dict) -> Iterator[tuple[list[str], list, list]]:
+    """
+    Lê a consulta com cursor do servidor (stream_results), LINHAS_POR_LOTE linhas por vez.
+    Yields:
+        tuple: Nomes das colunas, descrição do cursor e as linhas do lote.
+    """
+    with engine.connect() as conexao:
+        resultado = conexao.execution_options(stream_results=True, yield_per=LINHAS_POR_LOTE).execute(text(query), params)
+        colunas = list(resultado.keys())
+        descricao = resultado.cursor.description if resultado.cursor is not None else []
+        for lote in resultado.partitions(LINHAS_POR_LOTE):
+            yield colunas, descricao, lote
+
+
+def _ndjson(lotes) -> Iterator[bytes]:
+    for colunas, _, lote in lotes:
+        yield "".join(
+            json.dumps(dict(zip(colunas, linha)), ensure_ascii=False, default=str) + "\n" for linha in lote
+        ).encode("utf-8")
+
+
+def _csv(lotes, cabecalho: bool) -> Iterator[bytes]:
+    for colunas, _, lote in lotes:
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        if cabecalho:
+            escritor.writerow(colunas)
+            cabecalho = False
+        escritor.writerows(lote)
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _SaidaParquet(io.RawIOBase):
+    """Arquivo só de escrita cujo conteúdo é drenado a cada row group e enviado na resposta."""
+
+    def __init__(self):
+        self._partes: list[bytes] = []
+        self._posicao = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def drenar(self) -> bytes:
+        dados, self._partes = b"".join(self._partes), []
+        return dados
+
+
+def _esquema_parquet(colunas: list[str], descricao) -> "pa.Schema":
+    tipos = {"int64": pa.int64(), "float64": pa.float64(), "timestamp": pa.timestamp("s"), "date32": pa.date32()}
+    return pa.schema([
+        (coluna, tipos.get(TIPOS_PARQUET.get(campo[1]) if campo else None, pa.string()))
+        for coluna, campo in zip(colunas, list(descricao) + [None] * (len(colunas) - len(descricao)))
+    ])
+
+
+def _valores_parquet(valores: list, tipo) -> list:
+    if pa.types.is_floating(tipo):
+        return [None if valor is None else float(valor) for valor in valores]
+    if pa.types.is_string(tipo):
+        return [None if valor is None else str(valor) for valor in valores]
+    return valores
+
+
+def _parquet(lotes, chaves: int) -> Iterator[bytes]:
+    """Um row group por lote; o cursor da última linha vai nos metadados ("proximo") do arquivo."""
+    saida = _SaidaParquet()
+    escritor, esquema, ultima = None, None, None
+    for colunas, descricao, lote in lotes:
+        if escritor is None:
+            esquema = _esquema_parquet(colunas, descricao)
+        colunas_lote = list(zip(*lote))
+        tabela = pa.Table.from_arrays(
+            [pa.array(_valores_parquet(list(valores), campo.type), type=campo.type)
+             for valores, campo in zip(colunas_lote, esquema)],
+            schema=esquema,
+        )
+        if escritor is None:
+            escritor = pq.ParquetWriter(saida, esquema, compression="zstd")
+        escritor.write_table(tabela)
+        ultima = lote[-1]
+        yield saida.drenar()
+    if escritor is None:
+        return
+    escritor.add_key_value_metadata({"proximo": "-".join(str(valor) for valor in ultima[:chaves])})
+    escritor.close()
+    yield saida.drenar()
+
+
+@router.get("/exportacao/{colecao}")
+def exportar(
+    colecao: Literal["sessoes", "series", "programas", "dietas"],
+    request: Request,
+    id_usuario: int = Query(..., alias="idUsuario", description="ID do usuário"),
+    formato: Literal["ndjson", "csv", "parquet"] = Query("ndjson"),
+    apos: str | None = Query(None, description="Chaves da última linha recebida, para retomar (ex.: 10 ou 10-532)"),
+    limite: int | None = Query(None, ge=1, description="Máximo de linhas nesta resposta"),
+):
+    """
+    Exporta uma coleção completa do usuário em streaming, com memória constante.
+    As primeiras colunas de cada linha são as chaves da coleção: para retomar um download interrompido,
+    envie em `apos` as chaves da última linha completa recebida (ex.: "id_sessao-id_serie").
+    No Parquet, cada resposta é um arquivo completo (row groups de LINHAS_POR_LOTE linhas); use `limite`
+    para baixar em partes e o metadado "proximo" do arquivo como `apos` da parte seguinte.
+    Resposta vazia indica que não há mais linhas após o cursor.
+    Args:
+        colecao (str): "sessoes", "series", "programas" (treinos e exercícios) ou "dietas" (com refeições).
+        id_usuario (int): ID do usuário.
+        formato (str): "ndjson", "csv" ou "parquet".
+        apos (str | None): Cursor de retomada.
+        limite (int | None): Quantidade máxima de linhas.
+    Returns:
+        StreamingResponse: Linhas em ordem das chaves.
+    """
+    if formato == "parquet" and pq is None:
+        raise HTTPException(status_code=400, detail="Formato parquet indisponível: instale pyarrow")
+    exportacao = EXPORTACOES[colecao]
+    condicao, params = _condicao_apos(exportacao["chaves"], apos)
+    query = exportacao["query"].format(apos=condicao)
+    if limite:
+        query += f" LIMIT {limite}"
+    # Exportações são leituras longas: vão para uma réplica quando houver
+    lotes = _lotes(roteador_leitura.engine_para(request), query, {"id_usuario": id_usuario, **params})
+
+    if formato == "ndjson":
+        corpo = _ndjson(lotes)
+    elif formato == "csv":
+        corpo = _csv(lotes, cabecalho=not apos)
+    else:
+        corpo = _parquet(lotes, len(exportacao["chaves"]))
+
+    return StreamingResponse(
+        corpo,
+        media_type=MIDIA[formato],
+        headers={"Content-Disposition": f'attachment; filename="{colecao}_{id_usuario}.{formato}"'},
+    )
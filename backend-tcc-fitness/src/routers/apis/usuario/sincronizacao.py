@@ -0,0 +1,111 @@
+from fastapi import Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import datetime, timedelta, timezone
+import time
+
+from src.routers.router import router
+from src.core.config import SettingsSync
+from src.core.database import get_db_mysql
+from src.routers.models.consultas import consulta_get
+
+
+# Cada coleção é lida por faixa de updated_at sobre os índices (dono, updated_at)
+CONSULTAS_SYNC = {
+    "programas": """
+        SELECT pt.id_programa_treino, pt.id_usu, pt.nome, pt.descricao, pt.created_at, pt.updated_at
+        FROM TCC.PROGRAMA_TREINO pt
+        WHERE pt.id_usu = :id_usuario AND pt.updated_at >= :desde
+    """,
+    "treinos": """
+        SELECT t.id, t.id_programa_treino, t.nome, t.descricao, t.duracao, t.dificuldade, t.updated_at
+        FROM TCC.TREINO t
+        WHERE t.id_usuario = :id_usuario AND t.updated_at >= :desde
+    """,
+    "exercicios": """
+        SELECT et.id_ex_treino, et.id_treino, et.id_exercicio, et.nome_exercicio, et.grupo_muscular,
+               et.equipamento, et.descanso, et.series, et.reps, et.updated_at
+        FROM TCC.TREINO t
+        JOIN TCC.EXERCICIO_TREINO et ON et.id_treino = t.id
+        WHERE t.id_usuario = :id_usuario AND et.updated_at >= :desde
+    """,
+    "dietas": """
+        SELECT d.id_dieta, d.nome, d.descricao, d.updated_at
+        FROM TCC.DIETA d
+        WHERE d.id_usuario = :id_usuario AND d.updated_at >= :desde
+    """,
+    "refeicoes": """
+        SELECT r.id_refeicao, r.id_dieta, r.tipo_refeicao, r.calorias, r.alimentos, r.updated_at
+        FROM TCC.DIETA d
+        JOIN TCC.REFEICOES r ON r.id_dieta = d.id_dieta
+        WHERE d.id_usuario = :id_usuario AND r.updated_at >= :desde
+    """,
+}
+
+# Início de uma sincronização completa (menor valor aceito por colunas TIMESTAMP)
+INICIO_COMPLETO = datetime(1970, 1, 2)
+INTERVALO_LIMPEZA_SEGUNDOS = 3600
+
+_sett = SettingsSync()
+_ultima_limpeza = 0.0
+
+
+def _limpar_exclusoes(session: Session) -> None:
+    global _ultima_limpeza
+    if time.monotonic() - _ultima_limpeza < INTERVALO_LIMPEZA_SEGUNDOS:
+        return
+    _ultima_limpeza = time.monotonic()
+    session.execute(
+        text("DELETE FROM TCC.SYNC_EXCLUSAO WHERE excluido_em < NOW() - INTERVAL :dias DAY;"),
+        {"dias": _sett.SYNC_RETENCAO_EXCLUSOES_DIAS},
+    )
+    session.commit()
+
+
+@router.get("/sync")
+def sincronizar(
+    id_usuario: int = Query(..., alias="idUsuario", description="ID do usuário"),
+    desde: datetime | None = Query(None, description="Marca retornada pela sincronização anterior"),
+    session: Session = Depends(get_db_mysql),
+):
+    """Retorna somente o que mudou para o usuário desde a última sincronização.
+
+    Args:
+        id_usuario (int): ID do usuário.
+        desde (datetime | None): Marca ("watermark") da sincronização anterior; sem ela, envia tudo.
+        session (Session): Sessão do banco de dados.
+    Returns:
+        dict: Nova marca, se a resposta é completa (o cliente substitui os dados locais), registros alterados por coleção
+        (programas, treinos, exercicios, dietas, refeicoes) e ids excluídos por coleção.
+        Registros podem se repetir entre sincronizações: o cliente deve aplicá-los como upsert.
+    """
+    _limpar_exclusoes(session)
+
+    # A marca vem do relógio do banco, o mesmo que preenche updated_at
+    relogio = consulta_get("SELECT NOW() AS agora, UTC_TIMESTAMP() AS utc;", session)[0]
+    agora = relogio["agora"]
+    if desde is not None and desde.tzinfo is not None:
+        # Marca com fuso (ex.: "...Z") é convertida para o fuso da sessão do banco antes de comparar com updated_at
+        fuso_banco = timezone(timedelta(minutes=round((agora - relogio["utc"]).total_seconds() / 60)))
+        desde = desde.astimezone(fuso_banco).replace(tzinfo=None)
+    completo = desde is None or desde < agora - timedelta(days=_sett.SYNC_RETENCAO_EXCLUSOES_DIAS)
+    inicio = INICIO_COMPLETO if completo else desde - timedelta(seconds=_sett.SYNC_MARGEM_SEGUNDOS)
+    params = {"id_usuario": id_usuario, "desde": inicio}
+
+    resposta: dict = {"watermark": agora, "completo": completo}
+    for colecao, query in CONSULTAS_SYNC.items():
+        resposta[colecao] = consulta_get(query, session, params)
+
+    exclusoes: dict[str, list[int]] = {colecao: [] for colecao in CONSULTAS_SYNC}
+    if not completo:
+        for linha in consulta_get(
+            """
+            SELECT tabela, id_registro FROM TCC.SYNC_EXCLUSAO
+            WHERE id_usuario = :id_usuario AND excluido_em >= :desde;
+            """,
+            session,
+            params,
+        ):
+            exclusoes.setdefault(linha["tabela"], []).append(linha["id_registro"])
+    resposta["exclusoes"] = exclusoes
+    return resposta
@@ -0,0 +1,78 @@
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from email.utils import format_datetime
+import hashlib
+
+from src.routers.models.consultas import consulta_get
+
+
+# Consultas de validação: só MAX(updated_at) e COUNT(*) sobre os índices (dono, updated_at), sem ler as linhas.
+# O COUNT muda em exclusões, que não alteram o MAX. updated_at tem microssegundos e UNIX_TIMESTAMP o converte
+# para segundos desde a época em UTC, independente do fuso da sessão do banco.
+VALIDADORES = {
+    "programas": """
+        SELECT UNIX_TIMESTAMP(MAX(updated_at)) AS ultima, COUNT(*) AS total
+        FROM TCC.PROGRAMA_TREINO WHERE id_usu = :user_id
+    """,
+    "treinos_programa": """
+        SELECT UNIX_TIMESTAMP(MAX(updated_at)) AS ultima, COUNT(*) AS total
+        FROM TCC.TREINO WHERE id_programa_treino = :id_programa
+    """,
+    "exercicios_treino": """
+        SELECT UNIX_TIMESTAMP(MAX(updated_at)) AS ultima, COUNT(*) AS total
+        FROM TCC.EXERCICIO_TREINO WHERE id_treino = :id_treino
+    """,
+    "dietas_usuario": """
+        SELECT UNIX_TIMESTAMP(MAX(d.updated_at)) AS ultima, COUNT(*) AS total
+        FROM TCC.DIETA d WHERE d.id_usuario = :id_usuario
+        UNION ALL
+        SELECT UNIX_TIMESTAMP(MAX(r.updated_at)) AS ultima, COUNT(*) AS total
+        FROM TCC.DIETA d JOIN TCC.REFEICOES r ON r.id_dieta = d.id_dieta
+        WHERE d.id_usuario = :id_usuario
+    """,
+    "refeicoes_dieta": """
+        SELECT UNIX_TIMESTAMP(MAX(updated_at)) AS ultima, COUNT(*) AS total
+        FROM TCC.REFEICOES WHERE id_dieta = :id_dieta
+    """,
+}
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_corresponde(cabecalho: str | None, etag: str) -> bool:
+    if not cabecalho:
+        return False
+    valor = etag.removeprefix("W/")
+    return any(
+        candidato.strip() == "*" or candidato.strip().removeprefix("W/") == valor
+        for candidato in cabecalho.split(",")
+    )
+
+
+def validar_cache(request: Request, response: Response, session: Session, validador: str, params: dict) -> Response | None:
+    """
+    Calcula o ETag do recurso pela consulta de validação e responde 304 se o cliente já tem a versão atual.
+    Args:
+        request (Request): Requisição, lida para If-None-Match e para compor o ETag (caminho e parâmetros).
+        response (Response): Resposta do endpoint, que recebe ETag, Last-Modified e Cache-Control.
+        session (Session): Sessão do banco de dados.
+        validador (str): Chave em VALIDADORES.
+        params (dict): Parâmetros da consulta de validação.
+    Returns:
+        Response | None: Resposta 304 pronta ou None para o endpoint executar a consulta principal.
+    """
+    linhas = consulta_get(VALIDADORES[validador], session, params)
+    assinatura = "|".join(f"{linha['ultima']}:{linha['total']}" for linha in linhas)
+    escopo = f"{request.url.path}?{sorted(request.query_params.multi_items())}"
+    etag = f'W/"{hashlib.sha1(f"{escopo}|{assinatura}".encode("utf-8")).hexdigest()[:32]}"'
+
+    cabecalhos = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    ultimas = [linha["ultima"] for linha in linhas if linha["ultima"] is not None]
+    if ultimas:
+        cabecalhos["Last-Modified"] = format_datetime(datetime.fromtimestamp(int(max(ultimas)), timezone.utc), usegmt=True)
+
+    if _etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabecalhos)
+    response.headers.update(cabecalhos)
+    return None
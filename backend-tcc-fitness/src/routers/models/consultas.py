@@ -30,4 +30,31 @@ def consulta_get_img(query: str, session: Session, params: dict | None = None) -
             for key, value in dict(row).items()
         }
         for row in result
-    ]
\ No newline at end of file
+    ]
+
+def inserir_em_lote(session: Session, tabela: str, colunas: list[str], linhas: list[dict], tamanho: int = 1000) -> int:
+    """
+    Insere as linhas com INSERTs de várias linhas (VALUES (...), (...)), até `tamanho` linhas por comando.
+    Args:
+        tabela (str): Nome completo da tabela (ex: TCC.SERIES). Nunca vem do usuário.
+        colunas (list[str]): Colunas inseridas, na ordem das chaves de cada linha.
+        linhas (list[dict]): Valores por coluna.
+    Returns:
+        int: Total de linhas inseridas.
+    """
+    total = 0
+    for inicio in range(0, len(linhas), tamanho):
+        bloco = linhas[inicio:inicio + tamanho]
+        valores = ", ".join(
+            "(" + ", ".join(f":{coluna}_{posicao}" for coluna in colunas) + ")"
+            for posicao in range(len(bloco))
+        )
+        params = {
+            f"{coluna}_{posicao}": linha[coluna]
+            for posicao, linha in enumerate(bloco)
+            for coluna in colunas
+        }
+        total += session.execute(
+            text(f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES {valores}"), params
+        ).rowcount
+    return total
@@ -0,0 +1,61 @@
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import List
+
+
+class ExercicioPlano(BaseModel):
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+    nome_exercicio: str = Field(..., alias="nomeExercicio", min_length=1)
+    equipamento: str = Field(..., min_length=1)
+    grupo_muscular: str = Field(..., alias="grupoMuscular", min_length=1)
+    series: int = Field(..., ge=1)
+    repeticoes: int = Field(..., ge=1)
+    descanso_segundos: int = Field(..., alias="descansoSegundos", ge=15)
+
+
+class TreinoPlano(BaseModel):
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+    nome: str = Field(..., min_length=1)
+    descricao: str = Field(..., min_length=1)
+    id_usuario: int = Field(..., alias="idUsuario", ge=1)
+    duracao_minutos: int = Field(..., alias="duracaoMinutos", ge=10)
+    dificuldade: str = Field(..., min_length=1)
+    exercicios: List[ExercicioPlano] = Field(..., min_length=1)
+
+
+class ProgramaTreinoPlano(BaseModel):
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+    nome_programa: str = Field(..., alias="nomePrograma", min_length=1)
+    descricao_programa: str = Field(..., alias="descricaoPrograma", min_length=1)
+
+
+class PlanoTreino(BaseModel):
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+    programa_treino: ProgramaTreinoPlano = Field(..., alias="programaTreino")
+    treinos: List[TreinoPlano] = Field(..., min_length=1)
+
+    @model_validator(mode="after")
+    def mesmo_usuario(self):
+        if len({treino.id_usuario for treino in self.treinos}) > 1:
+            raise ValueError("Todos os treinos do programa devem pertencer ao mesmo usuário")
+        return self
+
+
+class RefeicaoPlano(BaseModel):
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+    calorias: int = Field(..., ge=0)
+    alimentos: str = Field(..., min_length=1)
+    tipo_refeicao: str = Field(..., alias="tipoRefeicao", min_length=1)
+
+
+class PlanoDieta(BaseModel):
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+    nome: str = Field(..., min_length=1)
+    descricao: str = Field(..., min_length=1)
+    usuario: int = Field(..., ge=1)
+    refeicoes: List[RefeicaoPlano] = Field(..., min_length=1)
@@ -25,7 +25,8 @@ queries_db = {
             nome VARCHAR(100) NOT NULL,
             descricao VARCHAR(255),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+            INDEX idx_programa_atualizacao (id_usu, updated_at),
             FOREIGN KEY (id_usu)
                 REFERENCES TCC.USUARIO(id)
                 ON DELETE CASCADE
@@ -43,7 +44,9 @@ queries_db = {
             duracao INT,
             dificuldade VARCHAR(50),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+            INDEX idx_treino_atualizacao (id_usuario, updated_at),
+            INDEX idx_treino_programa_atualizacao (id_programa_treino, updated_at),
             FOREIGN KEY (id_usuario)
                 REFERENCES TCC.USUARIO(id)
                 ON DELETE CASCADE
@@ -55,6 +58,18 @@ queries_db = {
         );
     """,
 
+    "exercicio_catalogo": """
+        CREATE TABLE IF NOT EXISTS TCC.EXERCICIO_CATALOGO (
+            id_exercicio INT AUTO_INCREMENT PRIMARY KEY,
+            nome VARCHAR(100) NOT NULL UNIQUE,
+            equipamento VARCHAR(100) NOT NULL,
+            grupo_muscular VARCHAR(100) NOT NULL,
+            regioes VARCHAR(100) NULL,
+            INDEX idx_catalogo_grupo (grupo_muscular),
+            INDEX idx_catalogo_equipamento (equipamento)
+        );
+    """,
+
     "exercicio_treino": """
         CREATE TABLE IF NOT EXISTS TCC.EXERCICIO_TREINO (
             id_ex_treino INT AUTO_INCREMENT PRIMARY KEY,
@@ -62,12 +77,20 @@ queries_db = {
             equipamento VARCHAR(100) NOT NULL,
             grupo_muscular VARCHAR(100) NOT NULL,
             id_treino INT NOT NULL,
+            id_exercicio INT NULL,
             series INT,
             descanso INT,
             reps INT,
+            updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+            INDEX idx_ex_treino_exercicio (id_exercicio),
+            INDEX idx_ex_treino_atualizacao (id_treino, updated_at),
             FOREIGN KEY (id_treino)
                 REFERENCES TCC.TREINO(id)
                 ON DELETE CASCADE
+                ON UPDATE CASCADE,
+            FOREIGN KEY (id_exercicio)
+                REFERENCES TCC.EXERCICIO_CATALOGO(id_exercicio)
+                ON DELETE SET NULL
                 ON UPDATE CASCADE
         );
     """,
@@ -78,6 +101,10 @@ queries_db = {
             duracao_sessao INT,
             descricao TEXT,
             id_treino INT NOT NULL,
+            id_cliente VARCHAR(64) NULL,
+            realizada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE INDEX uq_sessao_cliente (id_cliente),
+            INDEX idx_sessao_treino_data (id_treino, realizada_em),
             FOREIGN KEY (id_treino)
                 REFERENCES TCC.TREINO(id)
                 ON DELETE CASCADE
@@ -85,22 +112,24 @@ queries_db = {
         );
     """,
 
+    # Particionada por mês da sessão (mantida pelo módulo de particionamento). Tabelas particionadas
+    # não aceitam chaves estrangeiras: séries de sessões ou exercícios excluídos ficam órfãs até a limpeza
+    # periódica da manutenção (remover_orfas), que também vale para TCC.SERIES_ARQUIVO.
     "series": """
         CREATE TABLE IF NOT EXISTS TCC.SERIES (
-            id_serie INT AUTO_INCREMENT PRIMARY KEY,
+            id_serie INT AUTO_INCREMENT,
             numero_serie INT NOT NULL CHECK (numero_serie > 0),
             repeticoes INT NOT NULL CHECK (repeticoes > 0),
             carga DECIMAL(5,2) CHECK (carga >= 0),
             id_ex_treino INT NOT NULL,
             id_sessao INT NOT NULL,
-            FOREIGN KEY (id_ex_treino)
-                REFERENCES TCC.EXERCICIO_TREINO(id_ex_treino)
-                ON DELETE CASCADE
-                ON UPDATE CASCADE,
-            FOREIGN KEY (id_sessao)
-                REFERENCES TCC.SESSAO_TREINO(id_sessao)
-                ON DELETE CASCADE
-                ON UPDATE CASCADE
+            realizada_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id_serie, realizada_em),
+            INDEX idx_series_sessao (id_sessao),
+            INDEX idx_series_ex_treino (id_ex_treino)
+        )
+        PARTITION BY RANGE (TO_DAYS(realizada_em)) (
+            PARTITION pmax VALUES LESS THAN MAXVALUE
         );
     """,
 
@@ -110,6 +139,8 @@ queries_db = {
     nome VARCHAR(100) NOT NULL,
     descricao TEXT,
     id_usuario INT NOT NULL,
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX idx_dieta_atualizacao (id_usuario, updated_at),
     
     CONSTRAINT fk_dieta_usuario
         FOREIGN KEY (id_usuario)
@@ -124,6 +155,8 @@ queries_db = {
     alimentos VARCHAR(5000) NOT NULL,
     tipo_refeicao VARCHAR(50) NOT NULL,
     id_dieta INT NOT NULL,
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    INDEX idx_refeicao_atualizacao (id_dieta, updated_at),
     
     CONSTRAINT fk_refeicao_dieta
         FOREIGN KEY (id_dieta)
@@ -131,6 +164,208 @@ queries_db = {
         ON DELETE CASCADE
         ON UPDATE CASCADE
 );
+""",
+    "alimento_composicao": """
+        CREATE TABLE IF NOT EXISTS TCC.ALIMENTO_COMPOSICAO (
+    id_alimento INT AUTO_INCREMENT PRIMARY KEY,
+    nome VARCHAR(100) NOT NULL UNIQUE,
+    kcal DECIMAL(6,1) NOT NULL,
+    proteina DECIMAL(5,1) NOT NULL,
+    carboidrato DECIMAL(5,1) NOT NULL,
+    gordura DECIMAL(5,1) NOT NULL,
+    gramas_unidade DECIMAL(6,1) NULL,
+    categoria VARCHAR(20) NOT NULL,
+    restricoes VARCHAR(100) NOT NULL DEFAULT ''
+);
+""",
+    "alimento_refeicao": """
+        CREATE TABLE IF NOT EXISTS TCC.ALIMENTO_REFEICAO (
+    id_alimento_refeicao INT AUTO_INCREMENT PRIMARY KEY,
+    id_refeicao INT NOT NULL,
+    ordem INT NOT NULL,
+    nome VARCHAR(100) NOT NULL,
+    quantidade VARCHAR(50) NOT NULL,
+    preparo VARCHAR(100) NOT NULL DEFAULT '',
+    gramas DECIMAL(7,1) NULL,
+    id_alimento INT NULL,
+    kcal DECIMAL(7,1) NOT NULL DEFAULT 0,
+    proteina DECIMAL(6,1) NOT NULL DEFAULT 0,
+    carboidrato DECIMAL(6,1) NOT NULL DEFAULT 0,
+    gordura DECIMAL(6,1) NOT NULL DEFAULT 0,
+
+    CONSTRAINT fk_alimento_refeicao_refeicao
+        FOREIGN KEY (id_refeicao)
+        REFERENCES TCC.REFEICOES(id_refeicao)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE,
+
+    CONSTRAINT fk_alimento_refeicao_composicao
+        FOREIGN KEY (id_alimento)
+        REFERENCES TCC.ALIMENTO_COMPOSICAO(id_alimento)
+        ON DELETE SET NULL
+        ON UPDATE CASCADE,
+
+    INDEX idx_alimento_refeicao_refeicao (id_refeicao, ordem)
+);
+""",
+    "job_geracao": """
+        CREATE TABLE IF NOT EXISTS TCC.JOB_GERACAO (
+    id_job CHAR(36) PRIMARY KEY,
+    tipo VARCHAR(30) NOT NULL,
+    prioridade TINYINT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+    id_usuario INT NULL,
+    payload LONGTEXT NOT NULL,
+    resultado LONGTEXT NULL,
+    erro VARCHAR(2000) NULL,
+    status_code INT NULL,
+    tentativas INT NOT NULL DEFAULT 0,
+    criado_em DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    iniciado_em DATETIME(3) NULL,
+    concluido_em DATETIME(3) NULL,
+
+    INDEX idx_job_status (status, prioridade, criado_em),
+    INDEX idx_job_usuario (id_usuario, criado_em)
+);
+""",
+    "lote_geracao_item": """
+        CREATE TABLE IF NOT EXISTS TCC.LOTE_GERACAO_ITEM (
+    id_item INT AUTO_INCREMENT PRIMARY KEY,
+    id_lote CHAR(36) NOT NULL,
+    posicao INT NOT NULL,
+    id_usuario INT NOT NULL,
+    chave CHAR(64) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+    origem VARCHAR(20) NULL,
+    resultado LONGTEXT NULL,
+    erro VARCHAR(2000) NULL,
+    id_persistido INT NULL,
+    atualizado_em DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+
+    CONSTRAINT fk_lote_item_job
+        FOREIGN KEY (id_lote)
+        REFERENCES TCC.JOB_GERACAO(id_job)
+        ON DELETE CASCADE,
+
+    UNIQUE INDEX uq_lote_item (id_lote, posicao),
+    INDEX idx_lote_item_chave (id_lote, chave)
+);
+""",
+    "sync_exclusao": """
+        CREATE TABLE IF NOT EXISTS TCC.SYNC_EXCLUSAO (
+    id_exclusao BIGINT AUTO_INCREMENT PRIMARY KEY,
+    tabela VARCHAR(30) NOT NULL,
+    id_registro INT NOT NULL,
+    id_usuario INT NULL,
+    excluido_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    INDEX idx_sync_exclusao_usuario (id_usuario, excluido_em)
+);
+""",
+    "progresso_sessao": """
+        CREATE TABLE IF NOT EXISTS TCC.PROGRESSO_SESSAO (
+    id_usuario INT NOT NULL,
+    id_exercicio INT NOT NULL,
+    id_sessao INT NOT NULL,
+    realizada_em TIMESTAMP NOT NULL,
+    series INT NOT NULL,
+    repeticoes INT NOT NULL,
+    volume DECIMAL(12,2) NOT NULL,
+    carga_maxima DECIMAL(5,2) NOT NULL,
+    e1rm DECIMAL(7,2) NOT NULL,
+
+    PRIMARY KEY (id_usuario, id_exercicio, id_sessao),
+    INDEX idx_progresso_sessao_data (id_usuario, id_exercicio, realizada_em),
+    INDEX idx_progresso_sessao_sessao (id_sessao),
+
+    CONSTRAINT fk_progresso_sessao_sessao
+        FOREIGN KEY (id_sessao)
+        REFERENCES TCC.SESSAO_TREINO(id_sessao)
+        ON DELETE CASCADE
+);
+""",
+    "progresso_exercicio": """
+        CREATE TABLE IF NOT EXISTS TCC.PROGRESSO_EXERCICIO (
+    id_usuario INT NOT NULL,
+    id_exercicio INT NOT NULL,
+    sessoes INT NOT NULL,
+    series INT NOT NULL,
+    repeticoes INT NOT NULL,
+    volume_total DECIMAL(14,2) NOT NULL,
+    carga_maxima DECIMAL(5,2) NOT NULL,
+    e1rm_maximo DECIMAL(7,2) NOT NULL,
+    ultima_sessao INT NOT NULL,
+    ultima_realizacao TIMESTAMP NOT NULL,
+
+    PRIMARY KEY (id_usuario, id_exercicio),
+
+    CONSTRAINT fk_progresso_exercicio_usuario
+        FOREIGN KEY (id_usuario)
+        REFERENCES TCC.USUARIO(id)
+        ON DELETE CASCADE
+);
+""",
+    # Séries de partições arquivadas (compactada): lida junto com TCC.SERIES pela view SERIES_HISTORICO
+    "series_arquivo": """
+        CREATE TABLE IF NOT EXISTS TCC.SERIES_ARQUIVO (
+    id_serie INT PRIMARY KEY,
+    numero_serie INT NOT NULL,
+    repeticoes INT NOT NULL,
+    carga DECIMAL(5,2),
+    id_ex_treino INT NOT NULL,
+    id_sessao INT NOT NULL,
+    realizada_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    INDEX idx_series_arquivo_sessao (id_sessao)
+) ROW_FORMAT=COMPRESSED;
+""",
+    "series_historico": """
+        CREATE OR REPLACE VIEW TCC.SERIES_HISTORICO AS
+    SELECT id_serie, numero_serie, repeticoes, carga, id_ex_treino, id_sessao FROM TCC.SERIES
+    UNION ALL
+    SELECT id_serie, numero_serie, repeticoes, carga, id_ex_treino, id_sessao FROM TCC.SERIES_ARQUIVO;
+""",
+    # Uma linha por chamada ao modelo; só recebe inserções em lote e é consolidada por dia em USO_GPT_DIARIO
+    "uso_gpt": """
+        CREATE TABLE IF NOT EXISTS TCC.USO_GPT (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    registrado_em DATETIME(3) NOT NULL,
+    id_usuario INT NULL,
+    rota VARCHAR(40) NOT NULL,
+    modelo VARCHAR(120) NOT NULL,
+    sucesso TINYINT NOT NULL,
+    tokens_entrada INT NOT NULL,
+    tokens_cache INT NOT NULL,
+    tokens_saida INT NOT NULL,
+    latencia_ms INT NOT NULL
+);
+""",
+    "uso_gpt_diario": """
+        CREATE TABLE IF NOT EXISTS TCC.USO_GPT_DIARIO (
+    dia DATE NOT NULL,
+    id_usuario INT NOT NULL,
+    rota VARCHAR(40) NOT NULL,
+    chamadas INT NOT NULL,
+    falhas INT NOT NULL,
+    tokens_entrada BIGINT NOT NULL,
+    tokens_cache BIGINT NOT NULL,
+    tokens_saida BIGINT NOT NULL,
+    latencia_total_ms BIGINT NOT NULL,
+    latencia_maxima_ms INT NOT NULL,
+
+    PRIMARY KEY (dia, id_usuario, rota),
+    INDEX idx_uso_gpt_diario_usuario (id_usuario, dia)
+);
+""",
+    # Maior id de TCC.USO_GPT já somado em USO_GPT_DIARIO
+    "uso_gpt_consolidacao": """
+        CREATE TABLE IF NOT EXISTS TCC.USO_GPT_CONSOLIDACAO (
+    id TINYINT PRIMARY KEY,
+    ultimo_id BIGINT NOT NULL
+);
+""",
+    "uso_gpt_consolidacao_inicial": """
+        INSERT IGNORE INTO TCC.USO_GPT_CONSOLIDACAO (id, ultimo_id) VALUES (1, 0);
 """,
 "usuario_primario": f"""
 INSERT INTO TCC.USUARIO (nome, email, username, senha)
@@ -143,3 +378,181 @@ WHERE NOT EXISTS (
 
 """
 }
+
+# Alterações em tabelas já existentes: aplicadas somente quando a coluna/índice ainda não existe
+migrations_db = [
+    {
+        "tabela": "EXERCICIO_TREINO",
+        "coluna": "id_exercicio",
+        "query": """
+            ALTER TABLE TCC.EXERCICIO_TREINO
+                ADD COLUMN id_exercicio INT NULL AFTER id_treino,
+                ADD INDEX idx_ex_treino_exercicio (id_exercicio),
+                ADD FOREIGN KEY (id_exercicio)
+                    REFERENCES TCC.EXERCICIO_CATALOGO(id_exercicio)
+                    ON DELETE SET NULL
+                    ON UPDATE CASCADE;
+        """,
+    },
+    {
+        "tabela": "EXERCICIO_CATALOGO",
+        "coluna": "regioes",
+        "query": "ALTER TABLE TCC.EXERCICIO_CATALOGO ADD COLUMN regioes VARCHAR(100) NULL;",
+    },
+    # Id gerado pelo app para sessões registradas offline: deduplica reenvios
+    {
+        "tabela": "SESSAO_TREINO",
+        "coluna": "id_cliente",
+        "query": """
+            ALTER TABLE TCC.SESSAO_TREINO
+                ADD COLUMN id_cliente VARCHAR(64) NULL,
+                ADD UNIQUE INDEX uq_sessao_cliente (id_cliente);
+        """,
+    },
+    # Data da sessão para os gráficos de progresso (sessões anteriores recebem a data da migração)
+    {
+        "tabela": "SESSAO_TREINO",
+        "coluna": "realizada_em",
+        "query": """
+            ALTER TABLE TCC.SESSAO_TREINO
+                ADD COLUMN realizada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                ADD INDEX idx_sessao_treino_data (id_treino, realizada_em);
+        """,
+    },
+    # Sincronização incremental: updated_at em todas as tabelas do app e índices (dono, updated_at)
+    {
+        "tabela": "EXERCICIO_TREINO",
+        "coluna": "updated_at",
+        "query": """
+            ALTER TABLE TCC.EXERCICIO_TREINO
+                ADD COLUMN updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+                ADD INDEX idx_ex_treino_atualizacao (id_treino, updated_at);
+        """,
+    },
+    {
+        "tabela": "DIETA",
+        "coluna": "updated_at",
+        "query": """
+            ALTER TABLE TCC.DIETA
+                ADD COLUMN updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+                ADD INDEX idx_dieta_atualizacao (id_usuario, updated_at);
+        """,
+    },
+    {
+        "tabela": "REFEICOES",
+        "coluna": "updated_at",
+        "query": """
+            ALTER TABLE TCC.REFEICOES
+                ADD COLUMN updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+                ADD INDEX idx_refeicao_atualizacao (id_dieta, updated_at);
+        """,
+    },
+    {
+        "tabela": "PROGRAMA_TREINO",
+        "indice": "idx_programa_atualizacao",
+        "query": "ALTER TABLE TCC.PROGRAMA_TREINO ADD INDEX idx_programa_atualizacao (id_usu, updated_at);",
+    },
+    {
+        "tabela": "TREINO",
+        "indice": "idx_treino_atualizacao",
+        "query": "ALTER TABLE TCC.TREINO ADD INDEX idx_treino_atualizacao (id_usuario, updated_at);",
+    },
+    {
+        "tabela": "TREINO",
+        "indice": "idx_treino_programa_atualizacao",
+        "query": "ALTER TABLE TCC.TREINO ADD INDEX idx_treino_programa_atualizacao (id_programa_treino, updated_at);",
+    },
+    # updated_at com microssegundos: duas alterações no mesmo segundo geram ETags diferentes
+    {
+        "tabela": "PROGRAMA_TREINO",
+        "coluna": "updated_at",
+        "precisao": 6,
+        "query": """
+            ALTER TABLE TCC.PROGRAMA_TREINO
+                MODIFY COLUMN updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+        """,
+    },
+    {
+        "tabela": "TREINO",
+        "coluna": "updated_at",
+        "precisao": 6,
+        "query": """
+            ALTER TABLE TCC.TREINO
+                MODIFY COLUMN updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+        """,
+    },
+    {
+        "tabela": "EXERCICIO_TREINO",
+        "coluna": "updated_at",
+        "precisao": 6,
+        "query": """
+            ALTER TABLE TCC.EXERCICIO_TREINO
+                MODIFY COLUMN updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+        """,
+    },
+    {
+        "tabela": "DIETA",
+        "coluna": "updated_at",
+        "precisao": 6,
+        "query": """
+            ALTER TABLE TCC.DIETA
+                MODIFY COLUMN updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+        """,
+    },
+    {
+        "tabela": "REFEICOES",
+        "coluna": "updated_at",
+        "precisao": 6,
+        "query": """
+            ALTER TABLE TCC.REFEICOES
+                MODIFY COLUMN updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+        """,
+    },
+    # Tombstones das exclusões diretas. Exclusões em cascata não disparam triggers no MySQL:
+    # o cliente remove os filhos junto com o pai excluído.
+    {
+        "tabela": "PROGRAMA_TREINO",
+        "gatilho": "trg_sync_programa_exclusao",
+        "query": """
+            CREATE TRIGGER TCC.trg_sync_programa_exclusao AFTER DELETE ON TCC.PROGRAMA_TREINO FOR EACH ROW
+            INSERT INTO TCC.SYNC_EXCLUSAO (tabela, id_registro, id_usuario)
+            VALUES ('programas', OLD.id_programa_treino, OLD.id_usu);
+        """,
+    },
+    {
+        "tabela": "TREINO",
+        "gatilho": "trg_sync_treino_exclusao",
+        "query": """
+            CREATE TRIGGER TCC.trg_sync_treino_exclusao AFTER DELETE ON TCC.TREINO FOR EACH ROW
+            INSERT INTO TCC.SYNC_EXCLUSAO (tabela, id_registro, id_usuario)
+            VALUES ('treinos', OLD.id, OLD.id_usuario);
+        """,
+    },
+    {
+        "tabela": "EXERCICIO_TREINO",
+        "gatilho": "trg_sync_ex_treino_exclusao",
+        "query": """
+            CREATE TRIGGER TCC.trg_sync_ex_treino_exclusao AFTER DELETE ON TCC.EXERCICIO_TREINO FOR EACH ROW
+            INSERT INTO TCC.SYNC_EXCLUSAO (tabela, id_registro, id_usuario)
+            VALUES ('exercicios', OLD.id_ex_treino, (SELECT id_usuario FROM TCC.TREINO WHERE id = OLD.id_treino));
+        """,
+    },
+    {
+        "tabela": "DIETA",
+        "gatilho": "trg_sync_dieta_exclusao",
+        "query": """
+            CREATE TRIGGER TCC.trg_sync_dieta_exclusao AFTER DELETE ON TCC.DIETA FOR EACH ROW
+            INSERT INTO TCC.SYNC_EXCLUSAO (tabela, id_registro, id_usuario)
+            VALUES ('dietas', OLD.id_dieta, OLD.id_usuario);
+        """,
+    },
+    {
+        "tabela": "REFEICOES",
+        "gatilho": "trg_sync_refeicao_exclusao",
+        "query": """
+            CREATE TRIGGER TCC.trg_sync_refeicao_exclusao AFTER DELETE ON TCC.REFEICOES FOR EACH ROW
+            INSERT INTO TCC.SYNC_EXCLUSAO (tabela, id_registro, id_usuario)
+            VALUES ('refeicoes', OLD.id_refeicao, (SELECT id_usuario FROM TCC.DIETA WHERE id_dieta = OLD.id_dieta));
+        """,
+    },
+]
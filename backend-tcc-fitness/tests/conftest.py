@@ -0,0 +1,13 @@
+import os
+
+# Os módulos leem as configurações ao serem importados; os testes não abrem conexão com o banco
+for chave, valor in {
+    "MYSQL_HOST": "127.0.0.1",
+    "MYSQL_DB": "tcc",
+    "MYSQL_PORT": "3306",
+    "MYSQL_USER": "tcc",
+    "MYSQL_PASSWORD": "tcc",
+    "SECRET_KEY": "teste",
+    "ALGORITHM": "HS256",
+}.items():
+    os.environ.setdefault(chave, valor)
@@ -0,0 +1,154 @@
+import copy
+
+import pytest
+from fastapi import HTTPException
+
+from src.routers.apis.gpt import ajuste_patch
+from src.routers.apis.gpt.ajuste_patch import aplicar_operacoes_dieta, aplicar_operacoes_treino, ajustar_por_operacoes
+
+
+def _exercicio(nome):
+    return {
+        "nomeExercicio": nome, "equipamento": "halteres", "grupoMuscular": "peito",
+        "series": 3, "repeticoes": 10, "descansoSegundos": 60,
+    }
+
+
+PLANO_TREINO = {
+    "programaTreino": {"nomePrograma": "Programa", "descricaoPrograma": "Hipertrofia"},
+    "treinos": [
+        {
+            "nome": "Treino A", "descricao": "Peito", "idUsuario": 7, "duracaoMinutos": 60, "dificuldade": "média",
+            "exercicios": [_exercicio("Supino reto"), _exercicio("Crucifixo")],
+        },
+        {
+            "nome": "Treino B", "descricao": "Peito leve", "idUsuario": 7, "duracaoMinutos": 45, "dificuldade": "fácil",
+            "exercicios": [_exercicio("Flexão")],
+        },
+    ],
+}
+
+PLANO_DIETA = {
+    "nome": "Dieta", "descricao": "Dieta equilibrada", "usuario": 7,
+    "refeicoes": [
+        {"tipoRefeicao": "Café da manhã", "calorias": 400, "alimentos": "Aveia - 40g - crua"},
+        {"tipoRefeicao": "Almoço", "calorias": 800, "alimentos": "Arroz - 100g - cozido"},
+    ],
+}
+
+
+def _status(funcao, *args):
+    with pytest.raises(HTTPException) as erro:
+        funcao(*args)
+    return erro.value.status_code
+
+
+def test_operacoes_de_treino_sao_aplicadas_em_ordem_sem_alterar_o_original():
+    original = copy.deepcopy(PLANO_TREINO)
+    plano = aplicar_operacoes_treino(PLANO_TREINO, [
+        {"op": "alterar_programa", "campos": {"nomePrograma": "Novo"}},
+        {"op": "alterar_treino", "treino": 0, "campos": {"duracaoMinutos": 50}},
+        {"op": "substituir_exercicio", "treino": 0, "exercicio": 0, "valor": {"nomeExercicio": "Supino inclinado"}},
+        {"op": "alterar_exercicio", "treino": 0, "exercicio": 1, "campos": {"series": 4}},
+        {"op": "adicionar_exercicio", "treino": 1, "valor": _exercicio("Mergulho")},
+        {"op": "remover_exercicio", "treino": 1, "exercicio": 0},
+        {"op": "adicionar_treino", "valor": {**PLANO_TREINO["treinos"][1], "nome": "Treino C", "idUsuario": 7}},
+        {"op": "remover_treino", "treino": 1},
+    ])
+    assert PLANO_TREINO == original
+    assert plano["programaTreino"]["nomePrograma"] == "Novo"
+    assert [treino["nome"] for treino in plano["treinos"]] == ["Treino A", "Treino C"]
+    primeiro = plano["treinos"][0]
+    assert primeiro["duracaoMinutos"] == 50
+    # A substituição parcial herda os campos não informados
+    assert primeiro["exercicios"][0]["nomeExercicio"] == "Supino inclinado"
+    assert primeiro["exercicios"][0]["series"] == 3
+    assert primeiro["exercicios"][1]["series"] == 4
+
+
+def test_operacoes_de_dieta_sao_aplicadas_em_ordem():
+    plano = aplicar_operacoes_dieta(PLANO_DIETA, [
+        {"op": "alterar_dieta", "campos": {"nome": "Dieta nova"}},
+        {"op": "adicionar_refeicao", "posicao": 1,
+         "valor": {"tipoRefeicao": "Lanche da manhã", "calorias": 200, "alimentos": "Banana - 100g - crua"}},
+        {"op": "alterar_refeicao", "refeicao": 0, "campos": {"calorias": 350}},
+        {"op": "substituir_refeicao", "refeicao": 2, "valor": {"alimentos": "Feijão - 100g - cozido"}},
+        {"op": "remover_refeicao", "refeicao": 1},
+    ])
+    assert plano["nome"] == "Dieta nova"
+    assert [(refeicao["tipoRefeicao"], refeicao["calorias"]) for refeicao in plano["refeicoes"]] == [
+        ("Café da manhã", 350), ("Almoço", 800),
+    ]
+    assert plano["refeicoes"][1]["alimentos"] == "Feijão - 100g - cozido"
+
+
+@pytest.mark.parametrize("operacoes", [
+    {"op": "remover_treino"},
+    [{"op": "remover_treino", "treino": 2}],
+    [{"op": "remover_treino", "treino": -1}],
+    [{"op": "remover_exercicio", "treino": 0, "exercicio": "x"}],
+    [{"op": "alterar_treino", "treino": 0, "campos": {"idUsuario": 8}}],
+    [{"op": "adicionar_exercicio", "treino": 0, "valor": {}}],
+    [{"op": "renomear", "treino": 0}],
+    [{"treino": 0}],
+])
+def test_operacoes_de_treino_invalidas_retornam_502(operacoes):
+    assert _status(aplicar_operacoes_treino, PLANO_TREINO, operacoes) == 502
+
+
+@pytest.mark.parametrize("operacoes", [
+    [{"op": "remover_refeicao", "refeicao": 5}],
+    [{"op": "alterar_refeicao", "refeicao": 0, "campos": {"usuario": 8}}],
+    [{"op": "trocar_refeicao", "refeicao": 0}],
+])
+def test_operacoes_de_dieta_invalidas_retornam_502(operacoes):
+    assert _status(aplicar_operacoes_dieta, PLANO_DIETA, operacoes) == 502
+
+
+def test_plano_resultante_invalido_e_culpa_da_ia():
+    # Esvaziar um treino gera um plano que não passa na validação
+    operacoes = [{"op": "remover_exercicio", "treino": 1, "exercicio": 0}]
+    assert _status(aplicar_operacoes_treino, PLANO_TREINO, operacoes) == 502
+    todas = [{"op": "remover_refeicao", "refeicao": 0}, {"op": "remover_refeicao", "refeicao": 0}]
+    assert _status(aplicar_operacoes_dieta, PLANO_DIETA, todas) == 502
+
+
+@pytest.mark.parametrize("plano", [
+    ["x"],
+    {"treinos": ["x"]},
+    {"treinos": {"nome": "A"}},
+    {"treinos": [{"nome": "A", "exercicios": ["x"]}]},
+    {"programaTreino": "x", "treinos": []},
+])
+def test_estrutura_invalida_do_plano_de_treino_retorna_400(plano):
+    assert _status(aplicar_operacoes_treino, plano, []) == 400
+
+
+@pytest.mark.parametrize("plano", [["x"], {"refeicoes": ["x"]}, {"refeicoes": None}])
+def test_estrutura_invalida_da_dieta_retorna_400(plano):
+    assert _status(aplicar_operacoes_dieta, plano, []) == 400
+
+
+def test_ajuste_por_operacoes_repete_a_chamada_com_os_motivos(monkeypatch):
+    respostas = [
+        {"operacoes": [{"op": "remover_exercicio", "treino": 1, "exercicio": 0}]},
+        {"operacoes": [{"op": "alterar_treino", "treino": 1, "campos": {"nome": "Treino B2"}}]},
+    ]
+    prompts = []
+
+    def resposta(prompt, **_):
+        prompts.append(prompt)
+        return respostas[len(prompts) - 1]
+
+    monkeypatch.setattr(ajuste_patch, "gpt_response", resposta)
+    plano, operacoes = ajustar_por_operacoes("ajuste", "treino", PLANO_TREINO, 7)
+    assert plano["treinos"][1]["nome"] == "Treino B2"
+    assert operacoes == respostas[1]["operacoes"]
+    assert prompts[0] == "ajuste" and "plano resultante é inválido" in prompts[1]
+
+
+def test_ajuste_por_operacoes_nao_repete_erro_do_plano_do_cliente(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(ajuste_patch, "gpt_response", lambda prompt, **_: chamadas.append(prompt) or {"operacoes": []})
+    assert _status(ajustar_por_operacoes, "ajuste", "dieta", {"refeicoes": ["x"]}, 7) == 400
+    assert len(chamadas) == 1
@@ -0,0 +1,44 @@
+import pytest
+
+from src.routers.apis.dieta.alimentos import estruturar_refeicoes, tabela_padrao
+from src.routers.apis.dieta.energia import atualizar_total_descricao
+
+
+def _nome(indice):
+    return None if indice is None else tabela_padrao.nomes[indice]
+
+
+@pytest.mark.parametrize("nome, preparo", [
+    ("Iogurte Desnatado", ""),
+    ("Batata Cozida", ""),
+])
+def test_nao_associa_alimento_diferente_ou_ambiguo(nome, preparo):
+    assert tabela_padrao.associar(nome, preparo) is None
+
+
+@pytest.mark.parametrize("nome, preparo, esperado", [
+    ("Batata Doce", "", "Batata Doce Cozida"),
+    ("Ovos", "cozidos", "Ovo Cozido"),
+])
+def test_associa_variacoes_do_mesmo_alimento(nome, preparo, esperado):
+    assert _nome(tabela_padrao.associar(nome, preparo)) == esperado
+
+
+def test_item_nao_associado_fica_sinalizado():
+    composicao = estruturar_refeicoes(
+        [{"tipoRefeicao": "Lanche", "calorias": 200, "alimentos": "Iogurte Desnatado - 200g - natural"}],
+        tabela_padrao,
+    )
+    (item,) = composicao["itens"][0]
+    assert not item["associado"]
+    assert not composicao["cobertura"][0]
+
+
+def test_descricao_acompanha_total_das_refeicoes():
+    plano = {
+        "descricao": "Dieta hipertrófica. Total calórico diário: 2500 kcal.",
+        "refeicoes": [{"calorias": 1200}, {"calorias": 1150}],
+    }
+    assert atualizar_total_descricao(plano)
+    assert plano["descricao"] == "Dieta hipertrófica. Total calórico diário: 2350 kcal."
+    assert not atualizar_total_descricao(plano)
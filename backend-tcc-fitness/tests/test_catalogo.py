@@ -0,0 +1,47 @@
+import pytest
+
+from src.routers.apis.treino.catalogo import CatalogoExercicios, catalogo_padrao
+
+
+def _nome(id_exercicio):
+    return None if id_exercicio is None else catalogo_padrao.por_id[id_exercicio]["nome"]
+
+
+# Catálogo sem o exercício certo: a associação não pode cair no vizinho parecido
+CATALOGO_INCOMPLETO = CatalogoExercicios([
+    {"id_exercicio": 1, "nome": "Cadeira Abdutora", "equipamento": "Máquina", "grupo_muscular": "Glúteo"},
+    {"id_exercicio": 2, "nome": "Supino Inclinado", "equipamento": "Barra", "grupo_muscular": "Peito"},
+    {"id_exercicio": 3, "nome": "Rosca Martelo", "equipamento": "Halteres", "grupo_muscular": "Braço"},
+    {"id_exercicio": 4, "nome": "Agachamento Livre", "equipamento": "Barra", "grupo_muscular": "Perna"},
+    {"id_exercicio": 5, "nome": "Desenvolvimento c/ Barra", "equipamento": "Barra", "grupo_muscular": "Ombro"},
+])
+
+
+@pytest.mark.parametrize("nome", [
+    "Cadeira Adutora",
+    "Supino Declinado",
+    "Rosca Direta",
+    "Elevação Frontal",
+    "Desenvolvimento Arnold",
+])
+def test_nao_associa_exercicio_diferente(nome):
+    assert CATALOGO_INCOMPLETO.associar(nome) is None
+
+
+@pytest.mark.parametrize("nome, grupo, esperado", [
+    ("Cadeira Adutora", "Glúteo", None),
+    ("Supino Declinado", "Peito", "Supino Declinado com Barra"),
+    ("Rosca Direta", "Braço", "Rosca Direta com Barra"),
+    ("Elevação Frontal", None, "Elevação Frontal com Halteres"),
+    ("Desenvolvimento Arnold", "Ombro", None),
+    ("Triceps Pulley", "Braço", "Tríceps Pulley"),
+    ("Elevação Lateral Halter", None, "Elevação Lateral com Halteres"),
+    ("remada curvada barra", None, "Remada Curvada com Barra"),
+])
+def test_associa_no_catalogo_padrao(nome, grupo, esperado):
+    assert _nome(catalogo_padrao.associar(nome, grupo)) == esperado
+
+
+def test_nome_ambiguo_nao_e_associado():
+    # Barra, halteres e máquina cobrem "Supino Reto" igualmente
+    assert catalogo_padrao.associar("Supino Reto", "Peito") is None
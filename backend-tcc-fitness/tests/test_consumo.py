@@ -0,0 +1,44 @@
+import pytest
+from fastapi import HTTPException
+
+from src.routers.apis.gpt.consumo import ConsumoGPT
+
+CONFIG = {"rota": "treino", "modelo": "gpt-4o-mini"}
+
+
+def _consumo(**limites_usuarios):
+    return ConsumoGPT(1000, 1, limites_usuarios, 5.0, 300.0, 30)
+
+
+def test_registrar_soma_entrada_e_saida_no_consumo_do_dia():
+    consumo = _consumo()
+    consumo.registrar(7, CONFIG, 1.5, True, tokens_entrada=300, tokens_cache=100, tokens_saida=200)
+    consumo.registrar(None, CONFIG, 0.5, False, tokens_entrada=50)
+    assert consumo.consumidos(7) == 500
+    assert [registro["latencia_ms"] for registro in consumo._pendentes] == [1500, 500]
+
+
+def test_reservar_recusa_orcamento_esgotado():
+    consumo = _consumo()
+    consumo.registrar(7, CONFIG, 1.0, True, tokens_entrada=1000)
+    with pytest.raises(HTTPException) as erro:
+        with consumo.reservar(7):
+            pass
+    assert erro.value.status_code == 429
+    assert consumo.recusadas["orcamento"] == 1
+    with consumo.reservar(8):
+        pass
+
+
+def test_reservar_limita_chamadas_simultaneas_e_libera_ao_sair():
+    consumo = _consumo(**{"9": {"concorrencia": 2}})
+    with consumo.reservar(7):
+        with pytest.raises(HTTPException):
+            with consumo.reservar(7):
+                pass
+        with consumo.reservar(9), consumo.reservar(9):
+            pass
+    with consumo.reservar(7):
+        pass
+    assert consumo.recusadas["concorrencia"] == 1
+    assert not consumo._em_andamento
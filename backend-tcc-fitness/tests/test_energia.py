@@ -0,0 +1,51 @@
+import itertools
+
+import pytest
+
+from src.routers.models.anamnesemodel import PostAnamneseDieta
+from src.routers.apis.dieta.energia import calcular_metas, calcular_metas_lote, refeicoes_do_dia
+
+
+def _anamnese(**campos):
+    dados = {
+        "usuario_id": 1, "sexo": "Masculino", "idade": 30, "altura": 1.75, "pesoatual": 80.0, "pesodesejado": 75.0,
+        "objetivo": "emagrecer", "data_meta": "", "avalicao_rotina": "moderadamente ativo", "orcamento": "",
+        "alimentos_acessiveis": True, "come_fora": False, "tipo_alimentacao": "", "alimentos_gosta": "",
+        "alimentos_nao_gosta": "", "qtd_refeicoes": 3, "lanche_entre_refeicoes": False, "horario_alimentacao": "",
+        "prepara_propria_refeicao": True, "onde_come": "", "possui_alergias": False, "possui_condicao_medica": "",
+        "uso_suplementos": False,
+    }
+    return PostAnamneseDieta(**{**dados, **campos})
+
+
+# Combinações de sexo, objetivo, rotina, medidas e quantidade de refeições (inclui fora de 1 a 6)
+ANAMNESES = [
+    _anamnese(sexo=sexo, objetivo=objetivo, avalicao_rotina=rotina, pesoatual=peso, altura=altura, idade=idade,
+              qtd_refeicoes=qtd)
+    for (sexo, objetivo, rotina), (peso, altura, idade), qtd in itertools.product(
+        [("Masculino", "emagrecer", "sedentário"), ("Feminino", "ganhar massa", "muito ativa"), ("", "manter", "leve")],
+        [(52.3, 1.58, 19), (97.0, 183, 47), (71.4, 1.69, 66)],
+        [0, 1, 2, 3, 4, 5, 6, 9],
+    )
+]
+
+
+@pytest.mark.parametrize("formula", ["mifflin", "harris"])
+def test_refeicoes_somam_exatamente_o_total_diario(formula):
+    for anamnese, metas in zip(ANAMNESES, calcular_metas_lote(ANAMNESES, formula)):
+        calorias = [refeicao["calorias"] for refeicao in metas["refeicoes"]]
+        assert sum(calorias) == metas["calorias_diarias"]
+        assert all(caloria > 0 for caloria in calorias)
+        assert [refeicao["tipoRefeicao"] for refeicao in metas["refeicoes"]] == refeicoes_do_dia(anamnese.qtd_refeicoes)
+
+
+@pytest.mark.parametrize("formula", ["mifflin", "harris"])
+def test_lote_igual_ao_calculo_linha_a_linha(formula):
+    assert calcular_metas_lote(ANAMNESES, formula) == [calcular_metas(anamnese, formula) for anamnese in ANAMNESES]
+
+
+def test_piso_calorico_e_deficit_limitado():
+    metas = calcular_metas(_anamnese(sexo="Feminino", pesoatual=45.0, altura=1.50, idade=60, avalicao_rotina="sedentária"))
+    assert metas["calorias_diarias"] >= 1200
+    assert metas["ajuste"] >= -0.2 * metas["gasto_total"] - 1
+    assert calcular_metas_lote([]) == []
@@ -0,0 +1,59 @@
+from threading import Event, Thread
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from src.routers.apis.gpt import funcs_gpt
+from src.routers.apis.gpt.consumo import ConsumoGPT
+from src.routers.apis.gpt.funcs_gpt import _decodificar
+
+
+def test_decodifica_objeto_cercado_por_texto():
+    assert _decodificar('Segue o plano:\n```json\n{"operacoes": []}\n```') == {"operacoes": []}
+
+
+@pytest.mark.parametrize("texto", ['[{"op": "remover_treino"}]', "42", '"texto"', "", "sem json"])
+def test_resposta_que_nao_e_objeto_vira_502(texto):
+    with pytest.raises(HTTPException) as erro:
+        _decodificar(texto)
+    assert erro.value.status_code == 502
+
+
+
+def _participantes() -> int:
+    em_andamento = list(funcs_gpt.single_flight_gpt._em_andamento.values())
+    return em_andamento[0].participantes if em_andamento else 0
+
+
+def test_chamadas_agrupadas_nao_ocupam_vaga_do_usuario(monkeypatch):
+    liberar, chamadas = Event(), []
+
+    def modelo(rota, chamar, prazo):
+        chamadas.append(rota)
+        liberar.wait(5)
+        return {"treinos": []}
+
+    # Uma chamada simultânea por usuário: sem o agrupamento, a segunda e a terceira receberiam 429
+    monkeypatch.setattr(funcs_gpt, "consumo_gpt", ConsumoGPT(0, 1, {}, 5.0, 300.0, 30))
+    monkeypatch.setattr(funcs_gpt.hedger_gpt, "executar", modelo)
+    respostas, erros = [], []
+
+    def pedir():
+        try:
+            respostas.append(funcs_gpt.gpt_response("mesmo prompt", usuario_id=7))
+        except HTTPException as exc:
+            erros.append(exc.status_code)
+
+    threads = [Thread(target=pedir) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    limite = time.monotonic() + 5
+    while _participantes() < 3 and time.monotonic() < limite:
+        time.sleep(0.01)
+    liberar.set()
+    for thread in threads:
+        thread.join()
+    assert erros == []
+    assert len(respostas) == 3
+    assert len(chamadas) == 1
@@ -0,0 +1,44 @@
+import pytest
+from fastapi import HTTPException
+
+from src.routers.models.anamnesemodel import PostAnamnese
+from src.routers.apis.gpt.gerador_local import MIN_EXERCICIOS, gerar_plano_local, interpretar_dias
+
+
+def _anamnese(**campos):
+    dados = {
+        "usuario_id": 1, "idade": 30, "sexo": "M", "peso": 80.0, "experiencia": "intermediário",
+        "tempo_treino": "1 ano", "dias_semana": "3", "tempo_treino_por_dia": "60 minutos",
+        "objetivos": ["hipertrofia"], "objetivo_especifico": "", "lesao": "nenhuma",
+        "condicao_medica": "nenhuma", "exercicio_nao_gosta": "", "equipamentos": None,
+    }
+    return PostAnamnese(**{**dados, **campos})
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("segunda a sexta", 5),
+    ("de segunda-feira até sábado", 6),
+    ("sexta a segunda", 4),
+    ("todos os dias", 7),
+    ("segunda, quarta e sexta", 3),
+    ("fim de semana", 2),
+    ("4 dias", 4),
+    ("quatro vezes por semana", 4),
+    ("", 3),
+])
+def test_interpretar_dias(texto, esperado):
+    assert interpretar_dias(texto) == esperado
+
+
+def test_treinos_respeitam_minimo_de_exercicios_com_catalogo_restrito():
+    plano = gerar_plano_local(_anamnese(dias_semana="segunda a sexta", equipamentos="peso corporal"))
+    assert len(plano["treinos"]) == 5
+    assert all(len(treino["exercicios"]) >= MIN_EXERCICIOS for treino in plano["treinos"])
+
+
+def test_restricoes_sem_exercicios_suficientes_sao_rejeitadas():
+    with pytest.raises(HTTPException) as erro:
+        gerar_plano_local(_anamnese(
+            equipamentos="peso corporal", exercicio_nao_gosta="flexão, mergulho, barra, abdominal, agachamento, prancha, ponte",
+        ))
+    assert erro.value.status_code == 422
@@ -0,0 +1,92 @@
+from threading import current_thread
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from src.routers.apis.gpt.hedging import Hedger
+
+ATRASO = 0.2
+
+
+def _hedger(taxa_maxima=1.0, janela=10):
+    hedger = Hedger(ativo=True, percentil=95.0, janela=janela, min_amostras=3, atraso_minimo=0.0, taxa_maxima=taxa_maxima)
+    for _ in range(3):
+        hedger.registrar_latencia("plano", ATRASO)
+    return hedger
+
+
+class Modelo:
+    """Tentativa falsa: a primária demora `primaria` segundos (ou até ser cancelada) e o hedge responde na hora."""
+
+    def __init__(self, primaria: float):
+        self.primaria = primaria
+        self.inicios: dict[str, float] = {}
+        self.cancelamentos = {}
+
+    def __call__(self, cancelamento):
+        tipo = "hedge" if current_thread().name.endswith("-hedge") else "primaria"
+        self.inicios[tipo] = time.monotonic()
+        self.cancelamentos[tipo] = cancelamento
+        if tipo == "primaria":
+            cancelamento._evento.wait(self.primaria)
+        return tipo
+
+
+def test_sem_amostras_suficientes_nao_ha_hedge():
+    hedger = Hedger(True, 95.0, 10, 3, 0.0, 1.0)
+    hedger.registrar_latencia("plano", ATRASO)
+    assert hedger.atraso_hedge("plano") is None
+
+
+def test_hedge_dispara_so_depois_do_percentil_e_cancela_a_perdedora():
+    hedger, modelo = _hedger(), Modelo(primaria=5.0)
+    assert hedger.atraso_hedge("plano") == pytest.approx(ATRASO)
+
+    assert hedger.executar("plano", modelo, prazo=5.0) == "hedge"
+    assert modelo.inicios["hedge"] - modelo.inicios["primaria"] >= ATRASO
+    assert modelo.cancelamentos["primaria"].cancelado
+    assert not modelo.cancelamentos["hedge"].cancelado
+    assert hedger.estado()["hedges_vencedores"] == 1
+
+
+def test_resposta_antes_do_percentil_nao_dispara_hedge():
+    hedger, modelo = _hedger(), Modelo(primaria=ATRASO / 4)
+    assert hedger.executar("plano", modelo, prazo=5.0) == "primaria"
+    assert "hedge" not in modelo.inicios
+    assert hedger.estado()["hedges"] == 0
+
+
+def test_orcamento_de_hedges_e_respeitado():
+    # Janela de 10 chamadas com taxa de 10%: cabe um hedge
+    hedger = _hedger(taxa_maxima=0.1, janela=10)
+    assert hedger.executar("plano", Modelo(primaria=5.0), prazo=5.0) == "hedge"
+
+    modelo = Modelo(primaria=ATRASO * 2)
+    assert hedger.executar("plano", modelo, prazo=5.0) == "primaria"
+    assert "hedge" not in modelo.inicios
+    estado = hedger.estado()
+    assert (estado["hedges"], estado["hedges_negados"]) == (1, 1)
+
+
+def test_prazo_estourado_retorna_504_e_cancela_as_tentativas():
+    hedger = Hedger(True, 95.0, 10, 3, 0.0, 1.0)
+    modelo = Modelo(primaria=5.0)
+    inicio = time.monotonic()
+    with pytest.raises(HTTPException) as erro:
+        hedger.executar("plano", modelo, prazo=0.1)
+    assert erro.value.status_code == 504
+    assert time.monotonic() - inicio < 1.0
+    assert modelo.cancelamentos["primaria"].cancelado
+    assert hedger.estado()["prazos_estourados"] == 1
+
+
+def test_erro_da_tentativa_e_repassado():
+    hedger = Hedger(True, 95.0, 10, 3, 0.0, 1.0)
+
+    def falhar(cancelamento):
+        raise HTTPException(status_code=502, detail="Resposta vazia do modelo")
+
+    with pytest.raises(HTTPException) as erro:
+        hedger.executar("plano", falhar, prazo=1.0)
+    assert erro.value.status_code == 502
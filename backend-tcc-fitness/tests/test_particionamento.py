@@ -0,0 +1,25 @@
+from datetime import date
+
+from src.routers.apis.treino.particionamento import _definicao_particoes, _somar_meses, _to_days
+
+
+def test_to_days_equivale_ao_mysql():
+    # SELECT TO_DAYS('2024-01-01') = 739251
+    assert _to_days(date(2024, 1, 1)) == 739251
+
+
+def test_somar_meses_volta_ao_primeiro_dia_e_vira_o_ano():
+    assert _somar_meses(date(2024, 11, 20), 1) == date(2024, 12, 1)
+    assert _somar_meses(date(2024, 11, 20), 3) == date(2025, 2, 1)
+    assert _somar_meses(date(2024, 1, 31), -1) == date(2023, 12, 1)
+
+
+def test_definicao_particoes_mensais_ate_o_fim_inclusive():
+    definicao = _definicao_particoes(date(2024, 11, 15), date(2025, 1, 1))
+    particoes = [linha.strip() for linha in definicao.split(",\n")]
+    assert particoes == [
+        f"PARTITION p202411 VALUES LESS THAN ({_to_days(date(2024, 12, 1))})",
+        f"PARTITION p202412 VALUES LESS THAN ({_to_days(date(2025, 1, 1))})",
+        f"PARTITION p202501 VALUES LESS THAN ({_to_days(date(2025, 2, 1))})",
+        "PARTITION pmax VALUES LESS THAN MAXVALUE",
+    ]
@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.routers.apis.treino.recomendacao import calcular_recomendacoes
+
+
+def _calcular(series, series_prescritas=(3, 3), reps_prescritas=(8, 10)):
+    return calcular_recomendacoes(
+        np.array([1.0, 2.0]),
+        np.array(series_prescritas, dtype=float),
+        np.array(reps_prescritas, dtype=float),
+        np.array(series, dtype=float).reshape(-1, 4),
+    )
+
+
+def test_sem_historico_recebe_a_prescricao():
+    metas = _calcular([])
+    assert list(metas["situacao"]) == ["sem_historico", "sem_historico"]
+    assert list(metas["repeticoes"]) == [8, 10]
+    assert list(metas["series"]) == [3, 3]
+    assert np.isnan(metas["carga"]).all()
+
+
+def test_progride_quando_cumpriu_a_prescricao():
+    # Exercício 1: 3x8 com 40 kg na última sessão; exercício 2 nunca feito
+    metas = _calcular([[1, 0, 8, 40], [1, 0, 8, 40], [1, 0, 8, 40]])
+    assert metas["situacao"][0] == "progredir"
+    assert metas["carga"][0] == 41.0
+    assert metas["repeticoes"][0] == 8
+    assert metas["situacao"][1] == "sem_historico"
+    assert metas["repeticoes"][1] == 10
+
+
+def test_mantem_carga_e_sobe_uma_repeticao():
+    metas = _calcular([[1, 0, 6, 40], [1, 0, 6, 40], [1, 0, 6, 40]])
+    assert metas["situacao"][0] == "manter"
+    assert metas["carga"][0] == 40.0
+    assert metas["repeticoes"][0] == 7
+
+
+def test_deload_com_queda_do_1rm():
+    series = [[1, posicao, 8, 60] for posicao in (1, 2, 3) for _ in range(3)]
+    series += [[1, 0, 4, 40]] * 3
+    metas = _calcular(series)
+    assert metas["situacao"][0] == "deload"
+    assert metas["carga"][0] == 36.0
+    assert metas["series"][0] == 2
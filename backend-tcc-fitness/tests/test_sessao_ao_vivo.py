@@ -0,0 +1,109 @@
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from src.routers.apis.treino import sessao_ao_vivo
+from src.routers.apis.treino.sessao_ao_vivo import BufferSeries, LogSeries
+
+
+def _serie(id_sessao, numero_serie, id_ex_treino=10):
+    return {"id_sessao": id_sessao, "id_ex_treino": id_ex_treino, "numero_serie": numero_serie, "repeticoes": 10, "carga": 20.0}
+
+
+def _gravado(id_sessao, *numeros, id_ex_treino=10):
+    return {"op": "gravado", "id_sessao": id_sessao, "chaves": [[id_ex_treino, numero] for numero in numeros]}
+
+
+def _fechar(log):
+    log._arquivo.close()
+    log._arquivo = None
+
+
+def test_compactacao_mantem_series_acrescentadas_durante_a_gravacao(tmp_path):
+    log = LogSeries(str(tmp_path))
+    log.acrescentar([{"op": "serie", **_serie(1, 1)}, {"op": "serie", **_serie(2, 1)}])
+    # A série 2 da sessão 1 chega depois do snapshot do buffer e antes da marca "gravado"
+    log.acrescentar([{"op": "serie", **_serie(1, 2)}, _gravado(1, 1)])
+    log.compactar()
+    _fechar(log)
+
+    series, arquivos = LogSeries.ler_abandonados(str(tmp_path))
+    for arquivo in arquivos:
+        arquivo.close()
+    assert sorted((serie["id_sessao"], serie["numero_serie"]) for serie in series) == [(1, 2), (2, 1)]
+
+
+def test_compactacao_esvazia_log_quando_tudo_foi_gravado(tmp_path):
+    log = LogSeries(str(tmp_path))
+    log.acrescentar([{"op": "serie", **_serie(1, 1)}, _gravado(1, 1)])
+    log.compactar()
+    _fechar(log)
+    assert (tmp_path / f"series_pendentes_{os.getpid()}.log").read_text() == ""
+
+
+def test_ultima_linha_truncada_e_ignorada(tmp_path):
+    caminho = tmp_path / "series_pendentes_999999.log"
+    caminho.write_text('{"op": "serie", "id_sessao": 1, "id_ex_treino": 10, "numero_serie": 1}\n{"op": "se')
+    series, arquivos = LogSeries.ler_abandonados(str(tmp_path))
+    for arquivo in arquivos:
+        arquivo.close()
+    assert [serie["numero_serie"] for serie in series] == [1]
+
+
+def test_seq_repetido_devolve_a_serie_registrada(tmp_path):
+    buffer = BufferSeries(100, 60.0, LogSeries(str(tmp_path)))
+    buffer.adicionar(_serie(1, 3), seq=7)
+    assert buffer.recebida(1, 7) == 3
+    assert buffer.recebida(1, 8) is None
+    assert buffer.recebida(2, 7) is None
+    assert buffer.pendentes(1) == 1
+
+    buffer.encerrar(1)
+    assert buffer.recebida(1, 7) is None
+    _fechar(buffer.log)
+
+
+def _canal(monkeypatch, adicionar):
+    monkeypatch.setattr(sessao_ao_vivo, "_abrir_sessao", lambda mensagem: {"id_sessao": 1, "exercicios": {10}, "ultimas": {}})
+    monkeypatch.setattr(sessao_ao_vivo.buffer_series, "adicionar", adicionar)
+    app = FastAPI()
+    app.add_api_websocket_route("/sessoes/ao-vivo", sessao_ao_vivo.sessao_ao_vivo)
+    return TestClient(app)
+
+
+SERIE = {"tipo": "serie", "seq": 1, "id_exercicio": 10, "repeticoes": 10, "carga": 20}
+
+
+def test_falha_de_disco_ou_banco_responde_erro_temporario_sem_ack(monkeypatch):
+    falhas = [OSError("disco cheio"), OperationalError("INSERT", {}, Exception("banco fora"))]
+    registradas = []
+
+    def adicionar(serie, seq=None):
+        if falhas:
+            raise falhas.pop(0)
+        registradas.append(seq)
+
+    with _canal(monkeypatch, adicionar).websocket_connect("/sessoes/ao-vivo") as canal:
+        canal.send_json({"tipo": "iniciar", "idCliente": "a", "id_treino": 1})
+        assert canal.receive_json()["tipo"] == "iniciada"
+        for _ in range(2):
+            canal.send_json(SERIE)
+            resposta = canal.receive_json()
+            assert (resposta["tipo"], resposta["seq"], resposta["temporario"]) == ("erro", 1, True)
+        canal.send_json(SERIE)
+        assert canal.receive_json() == {"tipo": "ack", "seq": 1, "numero_serie": 1}
+    assert registradas == [1]
+
+
+def test_erro_inesperado_fecha_o_canal_com_1011(monkeypatch):
+    def adicionar(serie, seq=None):
+        raise LookupError("falha")
+
+    with _canal(monkeypatch, adicionar).websocket_connect("/sessoes/ao-vivo") as canal:
+        canal.send_json({"tipo": "iniciar", "idCliente": "a", "id_treino": 1})
+        canal.receive_json()
+        canal.send_json(SERIE)
+        assert canal.receive_json()["tipo"] == "erro"
+        assert canal.receive()["code"] == 1011
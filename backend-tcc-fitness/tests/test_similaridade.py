@@ -0,0 +1,60 @@
+import copy
+import os
+
+import numpy as np
+
+from src.routers.models.anamnesemodel import PostAnamnese
+from src.routers.apis.gpt import similaridade
+from src.routers.apis.gpt.similaridade import (
+    IndiceSimilaridade,
+    anamnese_da_geracao,
+    conteudo_plano,
+    registrar_geracao,
+)
+
+
+PLANO_DIETA = {
+    "nome": "Dieta", "descricao": "Total calórico diário: 500 kcal.", "usuario": 7,
+    "refeicoes": [{"tipoRefeicao": "Almoço", "calorias": 500, "alimentos": "Arroz - 100g - cozido"}],
+}
+
+
+def _anamnese(usuario_id=7):
+    return PostAnamnese(
+        usuario_id=usuario_id, idade=30, sexo="M", peso=80.0, experiencia="iniciante", tempo_treino="0",
+        dias_semana="3", tempo_treino_por_dia="60", objetivos=["hipertrofia"], objetivo_especifico="",
+        lesao="nenhuma", condicao_medica="nenhuma", exercicio_nao_gosta="",
+    )
+
+
+def test_conteudo_plano_descarta_dados_da_persistencia():
+    salvo = copy.deepcopy(PLANO_DIETA)
+    salvo["refeicoes"][0].update({"idRefeicao": 99, "nutrientes": {"kcal": 130}, "caloriasDeclaradas": 480})
+    assert conteudo_plano("dieta", salvo) == PLANO_DIETA
+
+
+def test_so_o_plano_gerado_sem_edicoes_usa_a_anamnese_do_servidor():
+    anamnese = _anamnese()
+    registrar_geracao("dieta", anamnese, PLANO_DIETA)
+    assert anamnese_da_geracao("dieta", copy.deepcopy(PLANO_DIETA)) is anamnese
+
+    editado = copy.deepcopy(PLANO_DIETA)
+    editado["refeicoes"][0]["alimentos"] = "Pizza - 300g - assada"
+    assert anamnese_da_geracao("dieta", editado) is None
+    assert anamnese_da_geracao("dieta", {**PLANO_DIETA, "usuario": 8}) is None
+    similaridade._pendentes.clear()
+
+
+def test_indice_so_regrava_o_arquivo_quando_alterado(tmp_path):
+    arquivo = str(tmp_path / "indice.npz")
+    indice = IndiceSimilaridade(2, arquivo, 10)
+    assert not indice.salvar()
+
+    indice.adicionar("a", np.array([1.0, 2.0], dtype=np.float32), PLANO_DIETA)
+    assert not os.path.exists(arquivo)
+    assert indice.salvar()
+    assert not indice.salvar()
+
+    carregado = IndiceSimilaridade(2, arquivo, 10)
+    carregado.carregar()
+    assert carregado.buscar_lote([("a", np.array([1.0, 2.0], dtype=np.float32))], 1.0)[0] == (PLANO_DIETA, 0.0)
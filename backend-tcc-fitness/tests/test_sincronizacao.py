@@ -0,0 +1,39 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.routers.apis.usuario import sincronizacao
+
+# Banco em UTC-3: NOW() = UTC_TIMESTAMP() - 3h
+AGORA = datetime(2026, 10, 19, 12, 0, 0)
+UTC = AGORA + timedelta(hours=3)
+
+
+@pytest.fixture
+def consultas(monkeypatch):
+    chamadas = []
+
+    def consulta_get(query, session, params=None):
+        chamadas.append(params)
+        if "UTC_TIMESTAMP" in query:
+            return [{"agora": AGORA, "utc": UTC}]
+        return []
+
+    monkeypatch.setattr(sincronizacao, "consulta_get", consulta_get)
+    monkeypatch.setattr(sincronizacao, "_ultima_limpeza", time.monotonic())
+    return chamadas
+
+
+def test_marca_com_fuso_e_convertida_para_o_fuso_do_banco(consultas):
+    # 14:00Z é 11:00 no banco: sem a conversão a janela começaria 3h depois e perderia alterações
+    resposta = sincronizacao.sincronizar(id_usuario=1, desde=datetime(2026, 10, 19, 14, 0, tzinfo=timezone.utc), session=None)
+    assert resposta["completo"] is False
+    margem = timedelta(seconds=sincronizacao._sett.SYNC_MARGEM_SEGUNDOS)
+    assert consultas[1]["desde"] == datetime(2026, 10, 19, 11, 0) - margem
+
+
+def test_marca_sem_fuso_e_usada_como_veio(consultas):
+    sincronizacao.sincronizar(id_usuario=1, desde=datetime(2026, 10, 19, 11, 0), session=None)
+    margem = timedelta(seconds=sincronizacao._sett.SYNC_MARGEM_SEGUNDOS)
+    assert consultas[1]["desde"] == datetime(2026, 10, 19, 11, 0) - margem
@@ -0,0 +1,87 @@
+from threading import Event, Thread
+import time
+
+from src.routers.apis.gpt.single_flight import SingleFlight
+
+
+def _aguardar_participantes(single_flight, chave, quantidade):
+    limite = time.monotonic() + 5
+    while time.monotonic() < limite:
+        with single_flight._lock:
+            chamada = single_flight._em_andamento.get(chave)
+            if chamada is not None and chamada.participantes >= quantidade:
+                return
+        time.sleep(0.005)
+    raise AssertionError("chamadas não foram agrupadas")
+
+
+def _em_paralelo(single_flight, chave, funcao, quantidade):
+    resultados = []
+
+    def chamar():
+        try:
+            resultados.append(single_flight.executar(chave, funcao))
+        except Exception as exc:
+            resultados.append(exc)
+
+    threads = [Thread(target=chamar) for _ in range(quantidade)]
+    for thread in threads:
+        thread.start()
+    return threads, resultados
+
+
+def test_agrupados_recebem_copias_do_resultado_do_lider():
+    single_flight, liberar, execucoes = SingleFlight(10), Event(), []
+
+    def funcao():
+        execucoes.append(1)
+        liberar.wait(5)
+        return {"treinos": [1]}
+
+    threads, resultados = _em_paralelo(single_flight, "a", funcao, 3)
+    _aguardar_participantes(single_flight, "a", 3)
+    liberar.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(execucoes) == 1
+    assert resultados == [{"treinos": [1]}] * 3
+    assert len({id(resultado) for resultado in resultados}) == 3
+    assert single_flight.estado() == {"executadas": 1, "agrupadas": 2, "sem_agrupamento": 0, "em_andamento": 0}
+
+
+def test_agrupados_recebem_a_excecao_do_lider():
+    single_flight, liberar = SingleFlight(10), Event()
+    erro = ValueError("falha do modelo")
+
+    def funcao():
+        liberar.wait(5)
+        raise erro
+
+    threads, resultados = _em_paralelo(single_flight, "a", funcao, 2)
+    _aguardar_participantes(single_flight, "a", 2)
+    liberar.set()
+    for thread in threads:
+        thread.join()
+
+    assert resultados == [erro, erro]
+    assert single_flight.estado()["em_andamento"] == 0
+    # Encerrada a chamada, a mesma chave volta a executar
+    assert single_flight.executar("a", lambda: 2) == 2
+
+
+def test_acima_do_limite_as_chamadas_seguem_sem_agrupamento():
+    single_flight, liberar = SingleFlight(1), Event()
+    threads, _ = _em_paralelo(single_flight, "a", lambda: liberar.wait(5), 1)
+    _aguardar_participantes(single_flight, "a", 1)
+
+    assert single_flight.executar("b", lambda: "b") == "b"
+    assert single_flight.estado() == {"executadas": 1, "agrupadas": 0, "sem_agrupamento": 1, "em_andamento": 1}
+    liberar.set()
+    threads[0].join()
+    assert single_flight.estado()["em_andamento"] == 0
+
+
+def test_chave_depende_de_todas_as_partes():
+    assert SingleFlight.chave("prompt", "gpt-4o", 100) == SingleFlight.chave("prompt", "gpt-4o", 100)
+    assert SingleFlight.chave("prompt", "gpt-4o", 100) != SingleFlight.chave("prompt", "gpt-4o", None)
@@ -0,0 +1,73 @@
+import pytest
+from fastapi import HTTPException
+
+from src.routers.apis.dieta.alimentos import TabelaComposicao
+from src.routers.apis.dieta.substituicao import aplicar_substituto, ranquear_substitutos, restricoes_excluidas
+
+
+def _alimento(id_alimento, nome, kcal, proteina, carboidrato, gordura, restricoes=""):
+    return {
+        "id_alimento": id_alimento, "nome": nome, "categoria": "cereais", "restricoes": restricoes,
+        "kcal": kcal, "proteina": proteina, "carboidrato": carboidrato, "gordura": gordura,
+    }
+
+
+TABELA = TabelaComposicao([
+    _alimento(1, "Arroz Branco Cozido", 128, 2.5, 28.1, 0.2),
+    _alimento(2, "Macarrao Cozido", 157, 5.8, 30.9, 0.9, "gluten"),
+    _alimento(3, "Mandioca Cozida", 125, 0.6, 30.1, 0.3),
+    _alimento(4, "Agua", 0, 0, 0, 0),
+    _alimento(5, "Mel", 309, 0.3, 84.0, 0.0, "mel"),
+])
+
+ARROZ = {"nome": "Arroz Branco", "preparo": "Cozido", "gramas": 100.0, "kcal": 128.0}
+
+
+@pytest.mark.parametrize("alergias, esperado", [
+    ("mel", {"mel"}),
+    ("melão", set()),
+    ("ovos", {"ovo"}),
+    ("nenhuma, como ovo novo", {"ovo"}),
+    ("novo", set()),
+    ("frutos do mar e camarões", {"frutos_mar"}),
+    ("amendoins e nozes", {"amendoim", "castanha"}),
+    ("", set()),
+])
+def test_alergias_casam_palavras_inteiras(alergias, esperado):
+    assert restricoes_excluidas(None, alergias) == esperado
+
+
+def test_tipo_de_alimentacao_exclui_restricoes():
+    assert restricoes_excluidas("Vegana", None) >= {"carne", "leite", "mel"}
+    assert restricoes_excluidas("sem glúten", None) == {"gluten"}
+
+
+def test_substitutos_ignoram_alimentos_sem_calorias_e_reescalam_a_porcao():
+    substitutos = ranquear_substitutos(TABELA, [ARROZ], 0)
+    nomes = [substituto["nome"] for substituto in substitutos]
+    assert "Agua" not in nomes
+    assert set(nomes) == {"Macarrao Cozido", "Mandioca Cozida", "Mel"}
+    mandioca = next(substituto for substituto in substitutos if substituto["nome"] == "Mandioca Cozida")
+    assert mandioca["gramas"] == 100.0
+    assert all(substituto["gramas"] % 5 == 0 for substituto in substitutos)
+
+
+def test_substitutos_respeitam_restricoes_e_alimentos_da_refeicao():
+    mandioca = {"nome": "Mandioca", "preparo": "Cozida", "gramas": 50.0, "kcal": 62.5}
+    substitutos = ranquear_substitutos(TABELA, [ARROZ, mandioca], 0, tipo_alimentacao="sem gluten", alergias="mel")
+    assert substitutos == []
+
+
+def test_alimento_fora_da_tabela_retorna_400():
+    with pytest.raises(HTTPException) as erro:
+        ranquear_substitutos(TABELA, [{"nome": "Pizza", "preparo": "", "gramas": 100.0, "kcal": 280.0}], 0)
+    assert erro.value.status_code == 400
+
+
+def test_aplicar_substituto_recalcula_as_calorias_da_refeicao():
+    (substituto,) = [s for s in ranquear_substitutos(TABELA, [ARROZ], 0) if s["nome"] == "Macarrao Cozido"]
+    item = {**ARROZ, "quantidade_texto": "100 g", "valor": 100.0, "unidade": "g", "id_alimento": 1,
+            "proteina": 2.5, "carboidrato": 28.1, "gordura": 0.2}
+    refeicao, itens = aplicar_substituto({"calorias": 500, "alimentos": "Arroz Branco - 100g - cozido"}, [item], 0, substituto)
+    assert itens[0]["nome"] == "Macarrao Cozido"
+    assert refeicao["calorias"] == round(500 - 128 + substituto["kcal"])
@@ -0,0 +1,68 @@
+import pytest
+from fastapi import HTTPException
+
+from src.routers.apis.treino import substituicao
+from src.routers.apis.treino.catalogo import CatalogoExercicios
+from src.routers.apis.treino.substituicao import aplicar_substituto, localizar_exercicio, ranquear_substitutos
+
+CATALOGO = CatalogoExercicios([
+    {"id_exercicio": 1, "nome": "Supino Reto", "equipamento": "Barra", "grupo_muscular": "Peito", "regioes": "ombro"},
+    {"id_exercicio": 2, "nome": "Supino Inclinado", "equipamento": "Halteres", "grupo_muscular": "Peito", "regioes": "ombro"},
+    {"id_exercicio": 3, "nome": "Supino Reto", "equipamento": "Halteres", "grupo_muscular": "Peito", "regioes": "ombro"},
+    {"id_exercicio": 4, "nome": "Crucifixo", "equipamento": "Halteres", "grupo_muscular": "Peito", "regioes": "ombro"},
+    {"id_exercicio": 5, "nome": "Flexão de Braço", "equipamento": "Peso corporal", "grupo_muscular": "Peito", "regioes": "punho"},
+    {"id_exercicio": 6, "nome": "Remada Curvada", "equipamento": "Barra", "grupo_muscular": "Costas", "regioes": "lombar"},
+])
+
+PLANO = {
+    "programaTreino": {"nomePrograma": "Programa", "descricaoPrograma": "Hipertrofia"},
+    "treinos": [{
+        "nome": "Treino A",
+        "exercicios": [
+            {"nomeExercicio": "Supino Reto", "equipamento": "Barra", "grupoMuscular": "Peito", "idExercicio": 1,
+             "series": 4, "repeticoes": 10, "descansoSegundos": 90},
+            {"nomeExercicio": "Crucifixo", "equipamento": "Halteres", "grupoMuscular": "Peito", "idExercicio": 4,
+             "series": 3, "repeticoes": 12, "descansoSegundos": 60},
+        ],
+    }],
+}
+
+
+@pytest.fixture(autouse=True)
+def _catalogo(monkeypatch):
+    monkeypatch.setattr(substituicao, "catalogo_disponivel", lambda: CATALOGO)
+
+
+def _ids(alternativas):
+    return [alternativa["id_exercicio"] for alternativa in alternativas]
+
+
+def test_substitutos_do_mesmo_grupo_ordenados_por_movimento_e_equipamento():
+    # Mesmo movimento ("supino") vem antes; o próprio exercício e os do treino ficam de fora
+    alternativas = ranquear_substitutos(PLANO, 0, 0)
+    assert _ids(alternativas) == [2, 5]
+    assert alternativas[0]["score"] > alternativas[1]["score"]
+
+
+def test_substitutos_respeitam_equipamentos_lesao_e_preferencias():
+    # Peso corporal é sempre permitido
+    assert _ids(ranquear_substitutos(PLANO, 0, 0, equipamentos="barra")) == [5]
+    assert _ids(ranquear_substitutos(PLANO, 0, 0, lesao="dor no ombro")) == [5]
+    assert _ids(ranquear_substitutos(PLANO, 0, 0, exercicio_nao_gosta="supino inclinado")) == [5]
+    assert _ids(ranquear_substitutos(PLANO, 0, 0, limite=1)) == [2]
+
+
+@pytest.mark.parametrize("treino, exercicio", [(1, 0), (-1, 0), (0, 2)])
+def test_posicao_inexistente_retorna_400(treino, exercicio):
+    with pytest.raises(HTTPException) as erro:
+        localizar_exercicio(PLANO, treino, exercicio)
+    assert erro.value.status_code == 400
+
+
+def test_aplicar_substituto_mantem_volume_e_nao_altera_o_original():
+    (substituto,) = ranquear_substitutos(PLANO, 0, 0, limite=1)
+    plano = aplicar_substituto(PLANO, 0, 0, substituto)
+    exercicio = plano["treinos"][0]["exercicios"][0]
+    assert (exercicio["nomeExercicio"], exercicio["equipamento"], exercicio["idExercicio"]) == ("Supino Inclinado", "Halteres", 2)
+    assert (exercicio["series"], exercicio["repeticoes"], exercicio["descansoSegundos"]) == (4, 10, 90)
+    assert PLANO["treinos"][0]["exercicios"][0]["idExercicio"] == 1
@@ -0,0 +1,32 @@
+import pytest
+
+from src.routers.apis.gpt.validacao import reparar_plano_dieta, total_calorico_descricao
+
+
+@pytest.mark.parametrize("descricao, esperado", [
+    ("Total: 2000 kcal", 2000),
+    ("Total calórico diário: 2.350 kcal.", 2350),
+    ("Dieta de 2200 kcal. Total calórico diário: 2350 kcal.", 2350),
+    ("Total de aproximadamente 2500 kcal por dia, com almoço de 900 kcal", 2500),
+    ("Plano de 1800 calorias", 1800),
+    ("Café da manhã com 400 kcal e almoço com 800 kcal", None),
+    ("Total: 2000 kcal. Total: 2100 kcal", None),
+    ("Dieta equilibrada", None),
+])
+def test_total_calorico_descricao(descricao, esperado):
+    assert total_calorico_descricao(descricao) == esperado
+
+
+def test_descricao_ambigua_nao_reescala_refeicoes():
+    plano = {
+        "nome": "Dieta", "usuario": 1,
+        "descricao": "Café da manhã com 400 kcal e almoço com 800 kcal.",
+        "refeicoes": [
+            {"tipoRefeicao": "Café da manhã", "calorias": 450, "alimentos": "Aveia - 40g - crua"},
+            {"tipoRefeicao": "Almoço", "calorias": 750, "alimentos": "Arroz - 100g - cozido"},
+        ],
+    }
+    reparado, reparos = reparar_plano_dieta(plano, 1)
+    assert [refeicao["calorias"] for refeicao in reparado["refeicoes"]] == [450, 750]
+    assert "calorias:total_ausente" in reparos
+    assert total_calorico_descricao(reparado["descricao"]) == 1200